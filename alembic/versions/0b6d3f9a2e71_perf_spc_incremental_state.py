@@ -0,0 +1,47 @@
+"""perf: incremental SPC state (spc_state, spc_points)
+
+Revision ID: 0b6d3f9a2e71
+Revises: f4a2c8d16e05
+Create Date: 2026-10-18 21:40:31.214876
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+revision: str = '0b6d3f9a2e71'
+down_revision: Union[str, Sequence[str], None] = 'f4a2c8d16e05'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """규칙별 누적 상태와 서브그룹 점. 기존 데이터는 첫 조회/검사 등록 때 이력으로 채워진다."""
+    op.execute("""
+        CREATE TABLE IF NOT EXISTS spc_state (
+            rule_id        INTEGER PRIMARY KEY REFERENCES spc_rules(rule_id) ON DELETE CASCADE,
+            chart_type     VARCHAR(20) NOT NULL,
+            sample_size    INTEGER NOT NULL,
+            subgroup_count INTEGER NOT NULL DEFAULT 0,
+            sum_x          DOUBLE PRECISION NOT NULL DEFAULT 0,
+            sum_r          DOUBLE PRECISION NOT NULL DEFAULT 0,
+            buffer         JSONB NOT NULL DEFAULT '[]',
+            recent         JSONB NOT NULL DEFAULT '[]',
+            updated_at     TIMESTAMP DEFAULT NOW()
+        )
+    """)
+    op.execute("""
+        CREATE TABLE IF NOT EXISTS spc_points (
+            rule_id       INTEGER NOT NULL REFERENCES spc_rules(rule_id) ON DELETE CASCADE,
+            subgroup_no   INTEGER NOT NULL,
+            value         DOUBLE PRECISION NOT NULL,
+            spread        DOUBLE PRECISION,
+            inspection_id INTEGER,
+            created_at    TIMESTAMP DEFAULT NOW(),
+            PRIMARY KEY (rule_id, subgroup_no)
+        )
+    """)
+
+
+def downgrade() -> None:
+    op.execute("DROP TABLE IF EXISTS spc_points")
+    op.execute("DROP TABLE IF EXISTS spc_state")
@@ -0,0 +1,31 @@
+"""perf: composite indexes for keyset (cursor) pagination
+
+Revision ID: 3b8f2d6e91c0
+Revises: 7c3e91a5d2f4
+Create Date: 2026-10-18 11:02:47.530114
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+revision: str = '3b8f2d6e91c0'
+down_revision: Union[str, Sequence[str], None] = '7c3e91a5d2f4'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# (index, table, columns) — 정렬 키 + PK tie-breaker
+KEYSET_INDEXES = [
+    ("idx_audit_created_id", "audit_trail", "created_at, audit_id"),
+    ("idx_plans_due_id", "production_plans", "due_date, plan_id"),
+]
+
+
+def upgrade() -> None:
+    """audit_trail 은 init.sql 에서만 생성되므로 IF NOT EXISTS 로 생성."""
+    for name, table, cols in KEYSET_INDEXES:
+        op.execute(f"CREATE INDEX IF NOT EXISTS {name} ON {table} ({cols})")
+
+
+def downgrade() -> None:
+    for name, _, _ in KEYSET_INDEXES:
+        op.execute(f"DROP INDEX IF EXISTS {name}")
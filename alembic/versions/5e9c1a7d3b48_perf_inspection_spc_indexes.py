@@ -0,0 +1,31 @@
+"""perf: inspection indexes for single-query SPC / Cpk fetch
+
+Revision ID: 5e9c1a7d3b48
+Revises: 0b6d3f9a2e71
+Create Date: 2026-10-18 22:26:09.870412
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+revision: str = '5e9c1a7d3b48'
+down_revision: Union[str, Sequence[str], None] = '0b6d3f9a2e71'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# (index, table, columns)
+INSPECTION_INDEXES = [
+    ("idx_insp_item_time", "inspections", "item_code, inspected_at"),
+    ("idx_insp_detail_insp_check", "inspection_details", "inspection_id, check_name"),
+]
+
+
+def upgrade() -> None:
+    """품목 검사 이력(item_code, inspected_at) → 상세(inspection_id, check_name) 조인용."""
+    for name, table, cols in INSPECTION_INDEXES:
+        op.execute(f"CREATE INDEX IF NOT EXISTS {name} ON {table} ({cols})")
+
+
+def downgrade() -> None:
+    for name, _, _ in INSPECTION_INDEXES:
+        op.execute(f"DROP INDEX IF EXISTS {name}")
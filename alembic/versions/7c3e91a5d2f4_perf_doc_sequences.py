@@ -0,0 +1,29 @@
+"""perf: doc_sequences counter table for document numbering
+
+Revision ID: 7c3e91a5d2f4
+Revises: e20bee5ef217
+Create Date: 2026-10-18 10:12:03.418220
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+revision: str = '7c3e91a5d2f4'
+down_revision: Union[str, Sequence[str], None] = 'e20bee5ef217'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """(prefix, 일자)별 채번 카운터 — COUNT(*) LIKE 채번 대체."""
+    op.create_table(
+        "doc_sequences",
+        sa.Column("prefix", sa.String(20), primary_key=True),
+        sa.Column("seq_date", sa.CHAR(8), primary_key=True),
+        sa.Column("last_no", sa.Integer, nullable=False, server_default="0"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("doc_sequences")
@@ -0,0 +1,131 @@
+"""perf: daily RANGE partitioning for sensor_data / equip_sensors
+
+Revision ID: a4d19c7e5b62
+Revises: 3b8f2d6e91c0
+Create Date: 2026-10-18 13:40:21.904512
+
+기존 힙 테이블은 데이터 복사 없이 ``<table>_legacy`` 파티션
+(MINVALUE ~ 내일 00:00)으로 붙이고, 이후 구간은 일 단위 파티션 + DEFAULT
+파티션으로 받는다. 이후 파티션 생성/보존기간 관리는
+``python -m api_modules.sensor_partitions`` (CronJob) 가 담당한다.
+"""
+from datetime import timedelta
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+revision: str = 'a4d19c7e5b62'
+down_revision: Union[str, Sequence[str], None] = '3b8f2d6e91c0'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+PREMAKE_DAYS = 7
+
+# table → (id 컬럼, id 타입, 파티션 키, 컬럼 DDL, 인덱스[(이름, 컬럼)])
+TABLES = {
+    "sensor_data": (
+        "data_id", "BIGINT", "collected_at",
+        """equip_code    VARCHAR(20)  NOT NULL,
+           sensor_type   VARCHAR(50)  NOT NULL,
+           value         NUMERIC(12,4),
+           collected_at  TIMESTAMP    NOT NULL DEFAULT NOW(),
+           source        VARCHAR(20)  DEFAULT 'MQTT'
+                         CHECK (source IN ('MQTT','OPCUA','MANUAL'))""",
+        [("idx_sensor_equip", "equip_code"),
+         ("idx_sensor_time", "collected_at"),
+         ("idx_sensor_equip_time", "equip_code, collected_at")],
+    ),
+    "equip_sensors": (
+        "sensor_id", "INTEGER", "recorded_at",
+        """equip_code  VARCHAR(20) REFERENCES equipments(equip_code),
+           vibration   DECIMAL(8,4),
+           temperature DECIMAL(8,4),
+           current_amp DECIMAL(8,4),
+           recorded_at TIMESTAMP NOT NULL DEFAULT NOW()""",
+        [("idx_equip_sensors_equip_time", "equip_code, recorded_at")],
+    ),
+}
+
+
+def _relkind(bind, table):
+    return bind.execute(
+        sa.text("SELECT relkind FROM pg_class WHERE oid = to_regclass(:t)"),
+        {"t": table},
+    ).scalar()
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    cutover = bind.execute(sa.text("SELECT (CURRENT_DATE + 1)::timestamp")).scalar()
+
+    for table, (id_col, id_type, key, cols, indexes) in TABLES.items():
+        kind = _relkind(bind, table)
+        if kind == "p":
+            continue  # init.sql 로 이미 파티션 테이블로 생성됨
+        legacy = f"{table}_legacy"
+        seq = f"{table}_{id_col}_seq"
+
+        if kind == "r":
+            op.execute(f"ALTER TABLE {table} RENAME TO {legacy}")
+            op.execute(f"ALTER TABLE {legacy} RENAME CONSTRAINT {table}_pkey TO {legacy}_pkey")
+            for name, _ in indexes:
+                op.execute(f"ALTER INDEX IF EXISTS {name} RENAME TO {name}_legacy")
+        else:
+            op.execute(f"CREATE SEQUENCE IF NOT EXISTS {seq}")
+
+        op.execute(
+            f"""CREATE TABLE {table} (
+                    {id_col} {id_type} NOT NULL DEFAULT nextval('{seq}'),
+                    {cols},
+                    PRIMARY KEY ({id_col}, {key})
+                ) PARTITION BY RANGE ({key})"""
+        )
+        op.execute(f"ALTER SEQUENCE {seq} OWNED BY {table}.{id_col}")
+        for name, icols in indexes:
+            op.execute(f"CREATE INDEX {name} ON {table} ({icols})")
+
+        if kind == "r":
+            # 유효한 CHECK 가 있으면 SET NOT NULL / ATTACH 가 재검증 스캔을 생략
+            op.execute(f"UPDATE {legacy} SET {key} = 'epoch' WHERE {key} IS NULL")
+            op.execute(
+                f"ALTER TABLE {legacy} ADD CONSTRAINT {legacy}_range "
+                f"CHECK ({key} IS NOT NULL AND {key} < '{cutover}') NOT VALID"
+            )
+            op.execute(f"ALTER TABLE {legacy} VALIDATE CONSTRAINT {legacy}_range")
+            op.execute(f"ALTER TABLE {legacy} ALTER COLUMN {key} SET NOT NULL")
+            op.execute(f"ALTER TABLE {legacy} ALTER COLUMN {id_col} DROP DEFAULT")
+            op.execute(
+                f"ALTER TABLE {table} ATTACH PARTITION {legacy} "
+                f"FOR VALUES FROM (MINVALUE) TO ('{cutover}')"
+            )
+            op.execute(f"ALTER TABLE {legacy} DROP CONSTRAINT {legacy}_range")
+
+        for i in range(PREMAKE_DAYS):
+            lo = cutover + timedelta(days=i)
+            op.execute(
+                f"CREATE TABLE {table}_p{lo:%Y%m%d} PARTITION OF {table} "
+                f"FOR VALUES FROM ('{lo}') TO ('{lo + timedelta(days=1)}')"
+            )
+        op.execute(f"CREATE TABLE {table}_default PARTITION OF {table} DEFAULT")
+
+
+def downgrade() -> None:
+    """파티션 데이터를 단일 힙 테이블로 되돌림 (전체 복사)."""
+    for table, (id_col, id_type, key, cols, indexes) in TABLES.items():
+        seq = f"{table}_{id_col}_seq"
+        op.execute(f"ALTER SEQUENCE {seq} OWNED BY NONE")
+        op.execute(f"ALTER TABLE {table} RENAME TO {table}_parted")
+        for name, _ in indexes:
+            op.execute(f"ALTER INDEX {name} RENAME TO {name}_parted")
+        op.execute(
+            f"""CREATE TABLE {table} (
+                    {id_col} {id_type} PRIMARY KEY DEFAULT nextval('{seq}'),
+                    {cols}
+                )"""
+        )
+        op.execute(f"INSERT INTO {table} SELECT * FROM {table}_parted")
+        op.execute(f"DROP TABLE {table}_parted CASCADE")
+        op.execute(f"ALTER SEQUENCE {seq} OWNED BY {table}.{id_col}")
+        for name, icols in indexes:
+            op.execute(f"CREATE INDEX {name} ON {table} ({icols})")
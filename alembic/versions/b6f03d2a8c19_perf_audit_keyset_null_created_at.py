@@ -0,0 +1,34 @@
+"""perf: audit keyset index on COALESCE(created_at) so NULL rows stay pageable
+
+Revision ID: b6f03d2a8c19
+Revises: 5e9c1a7d3b48
+Create Date: 2026-10-18 23:40:15.214087
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+revision: str = 'b6f03d2a8c19'
+down_revision: Union[str, Sequence[str], None] = '5e9c1a7d3b48'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """audit_trail.created_at 은 NULL 허용 — mes_audit 의 정렬 키 표현식과 같은 인덱스로 교체.
+
+    append-only 테이블이라 NOT NULL 백필 대신 표현식 인덱스를 쓴다.
+    """
+    op.execute("DROP INDEX IF EXISTS idx_audit_created_id")
+    op.execute(
+        "CREATE INDEX IF NOT EXISTS idx_audit_created_id ON audit_trail "
+        "((COALESCE(created_at, '-infinity'::timestamp)), audit_id)"
+    )
+
+
+def downgrade() -> None:
+    op.execute("DROP INDEX IF EXISTS idx_audit_created_id")
+    op.execute(
+        "CREATE INDEX IF NOT EXISTS idx_audit_created_id "
+        "ON audit_trail (created_at, audit_id)"
+    )
@@ -0,0 +1,85 @@
+"""perf: incrementally maintained sensor rollups (1min/5min/1h/1d)
+
+Revision ID: c7e24f81a3d9
+Revises: a4d19c7e5b62
+Create Date: 2026-10-18 15:05:37.226871
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+revision: str = 'c7e24f81a3d9'
+down_revision: Union[str, Sequence[str], None] = 'a4d19c7e5b62'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+GRAINS_SQL = (
+    "(VALUES ('1min', INTERVAL '1 minute'), ('5min', INTERVAL '5 minutes'), "
+    "('1h', INTERVAL '1 hour'), ('1d', INTERVAL '1 day')) AS g(grain, step)"
+)
+
+ROLLUP_SELECT = f"""
+    SELECT n.equip_code, g.grain, n.sensor_type,
+           date_bin(g.step, n.collected_at, TIMESTAMP '2000-01-01') AS bucket_start,
+           COUNT(*), SUM(n.value), SUM(n.value * n.value), MIN(n.value), MAX(n.value)
+    FROM {{source}} n
+    CROSS JOIN {GRAINS_SQL}
+    WHERE n.value IS NOT NULL
+    GROUP BY 1, 2, 3, 4
+    ORDER BY 1, 2, 3, 4
+"""
+
+
+def upgrade() -> None:
+    op.create_table(
+        "sensor_rollups",
+        sa.Column("equip_code", sa.String(20), primary_key=True),
+        sa.Column("grain", sa.String(8), primary_key=True),
+        sa.Column("sensor_type", sa.String(50), primary_key=True),
+        sa.Column("bucket_start", sa.TIMESTAMP, primary_key=True),
+        sa.Column("cnt", sa.BigInteger, nullable=False),
+        sa.Column("sum_val", sa.Float(53), nullable=False),
+        sa.Column("sumsq_val", sa.Float(53), nullable=False),
+        sa.Column("min_val", sa.Numeric(12, 4)),
+        sa.Column("max_val", sa.Numeric(12, 4)),
+        sa.CheckConstraint("grain IN ('1min','5min','1h','1d')", name="ck_sensor_rollup_grain"),
+    )
+    # 보존기간 정리(grain, bucket_start < cutoff)용
+    op.create_index("idx_sensor_rollups_grain_time", "sensor_rollups", ["grain", "bucket_start"])
+    op.execute(f"""
+        CREATE OR REPLACE FUNCTION sensor_rollup_ingest()
+        RETURNS TRIGGER AS $$
+        BEGIN
+            INSERT INTO sensor_rollups AS r
+                (equip_code, grain, sensor_type, bucket_start,
+                 cnt, sum_val, sumsq_val, min_val, max_val)
+            {ROLLUP_SELECT.format(source="new_rows")}
+            ON CONFLICT (equip_code, grain, sensor_type, bucket_start) DO UPDATE SET
+                cnt       = r.cnt + EXCLUDED.cnt,
+                sum_val   = r.sum_val + EXCLUDED.sum_val,
+                sumsq_val = r.sumsq_val + EXCLUDED.sumsq_val,
+                min_val   = LEAST(r.min_val, EXCLUDED.min_val),
+                max_val   = GREATEST(r.max_val, EXCLUDED.max_val);
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql
+    """)
+    # 기존 원천 데이터 백필 (트리거 생성 전 — 같은 트랜잭션이라 누락/중복 없음)
+    op.execute(
+        "INSERT INTO sensor_rollups (equip_code, grain, sensor_type, bucket_start, "
+        "cnt, sum_val, sumsq_val, min_val, max_val) "
+        + ROLLUP_SELECT.format(source="sensor_data")
+    )
+    op.execute("""
+        CREATE TRIGGER trg_sensor_rollup
+            AFTER INSERT ON sensor_data
+            REFERENCING NEW TABLE AS new_rows
+            FOR EACH STATEMENT EXECUTE FUNCTION sensor_rollup_ingest()
+    """)
+
+
+def downgrade() -> None:
+    op.execute("DROP TRIGGER IF EXISTS trg_sensor_rollup ON sensor_data")
+    op.execute("DROP FUNCTION IF EXISTS sensor_rollup_ingest()")
+    op.drop_table("sensor_rollups")
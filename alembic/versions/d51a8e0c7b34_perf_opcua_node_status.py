@@ -0,0 +1,33 @@
+"""perf: opcua_node_status — in-memory node state snapshot from the OPC-UA engine
+
+Revision ID: d51a8e0c7b34
+Revises: c7e24f81a3d9
+Create Date: 2026-10-18 16:20:11.204517
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+revision: str = 'd51a8e0c7b34'
+down_revision: Union[str, Sequence[str], None] = 'c7e24f81a3d9'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """opcua_config 는 init.sql 에서만 생성되므로 IF NOT EXISTS 로 생성."""
+    op.execute("""
+        CREATE TABLE IF NOT EXISTS opcua_node_status (
+            config_id   INTEGER      PRIMARY KEY
+                        REFERENCES opcua_config(config_id) ON DELETE CASCADE,
+            status      VARCHAR(20)  NOT NULL,
+            last_seen   TIMESTAMP,
+            last_value  NUMERIC(12,4),
+            error       TEXT,
+            updated_at  TIMESTAMP    DEFAULT NOW()
+        )
+    """)
+
+
+def downgrade() -> None:
+    op.execute("DROP TABLE IF EXISTS opcua_node_status")
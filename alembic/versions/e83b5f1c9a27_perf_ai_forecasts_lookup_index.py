@@ -0,0 +1,26 @@
+"""perf: ai_forecasts lookup index for precomputed demand forecasts
+
+Revision ID: e83b5f1c9a27
+Revises: d51a8e0c7b34
+Create Date: 2026-10-18 19:05:42.381190
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+revision: str = 'e83b5f1c9a27'
+down_revision: Union[str, Sequence[str], None] = 'd51a8e0c7b34'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """predict_demand 의 품목별 최신 배치 결과 조회용."""
+    op.execute(
+        "CREATE INDEX IF NOT EXISTS idx_ai_forecasts_type_item "
+        "ON ai_forecasts (model_type, item_code, created_at DESC)"
+    )
+
+
+def downgrade() -> None:
+    op.execute("DROP INDEX IF EXISTS idx_ai_forecasts_type_item")
@@ -0,0 +1,32 @@
+"""perf: allow I_MR (individuals / moving range) in spc_rules.rule_type
+
+Revision ID: f4a2c8d16e05
+Revises: e83b5f1c9a27
+Create Date: 2026-10-18 20:12:07.553120
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+revision: str = 'f4a2c8d16e05'
+down_revision: Union[str, Sequence[str], None] = 'e83b5f1c9a27'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """init.sql 로 만든 DB 는 자동 이름(spc_rules_rule_type_check)이므로 둘 다 제거."""
+    op.execute("ALTER TABLE spc_rules DROP CONSTRAINT IF EXISTS spc_rules_rule_type_check")
+    op.execute("ALTER TABLE spc_rules DROP CONSTRAINT IF EXISTS ck_spc_rule_type")
+    op.execute(
+        "ALTER TABLE spc_rules ADD CONSTRAINT ck_spc_rule_type "
+        "CHECK (rule_type IN ('XBAR_R','XBAR_S','I_MR','P','NP','C','U'))"
+    )
+
+
+def downgrade() -> None:
+    op.execute("ALTER TABLE spc_rules DROP CONSTRAINT IF EXISTS ck_spc_rule_type")
+    op.execute(
+        "ALTER TABLE spc_rules ADD CONSTRAINT ck_spc_rule_type "
+        "CHECK (rule_type IN ('XBAR_R','XBAR_S','P','NP','C','U'))"
+    )
@@ -2,86 +2,327 @@
 
 학습된 모델을 pickle(joblib)로 디스크에 저장하고, 메모리 캐시를 병행하여
 캐시 히트 시 재학습 없이 바로 예측을 수행한다.
+
+모델은 이름(model_key)과 함께 학습 데이터 지문(행 수 + 최대 타임스탬프 +
+내용 해시)으로 검증한다. 데이터가 같으면 재사용, 바뀌었으면 재학습 —
+단, 최근 AI_MODEL_MIN_RETRAIN_MINUTES 이내에 학습한 모델은 데이터가 바뀌어도
+재사용한다 (요청마다 학습 창이 한 행씩 밀리는 모델의 연속 재학습 방지).
+메타데이터는 <key>.meta.json 사이드카로 저장되어 get_stats 에 노출된다.
+
+요청 경로에서는 get_or_schedule 을 쓴다: 학습은 프로세스 풀(AI_TRAIN_WORKERS)의
+잡으로 넘기고, 그동안은 직전 모델(stale)을, 모델이 아예 없으면 None 을 돌려준다
+(호출자는 규칙 기반 fallback). train_func 은 프로세스로 전달되므로 모듈 최상위
+함수여야 한다. 잡 상태는 get_jobs 로 조회한다.
+
+메모리 티어는 모델 수(AI_MODEL_CACHE_MAX_MODELS)와 추정 바이트
+(AI_MODEL_CACHE_MAX_MB) 상한이 있는 LRU 다. 디스크 저장은 기본 압축
+(AI_MODEL_COMPRESS=3)이다. AI_MODEL_COMPRESS=0 일 때만 mmap_mode="r" 로 로드하며,
+이는 순수 ndarray 속성에만 적용된다 — sklearn 트리(IsolationForest 등)·XGBoost·Prophet
+모델은 __setstate__ 에서 배열을 새로 만들므로 프로세스마다 사본을 가진다.
 """
 
+import hashlib
+import json
 import logging
+import multiprocessing
 import os
+import pickle
+import threading
 import time
-from datetime import datetime, timedelta
+from collections import OrderedDict, deque
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from datetime import datetime
+
+import numpy as np
+
+from api_modules.lazy_import import available, lazy_module
 
 log = logging.getLogger(__name__)
 
 MODEL_DIR = os.getenv("MES_MODEL_CACHE_DIR", "/tmp/mes_models")
 CACHE_TTL_HOURS = int(os.getenv("AI_MODEL_CACHE_TTL_HOURS", "24"))
+MIN_RETRAIN_MINUTES = float(os.getenv("AI_MODEL_MIN_RETRAIN_MINUTES", "10"))
+TRAIN_WORKERS = int(os.getenv("AI_TRAIN_WORKERS", "1"))
+TRAIN_START_METHOD = os.getenv("AI_TRAIN_START_METHOD", "spawn")
+JOB_HISTORY = 50
+MAX_MODELS = int(os.getenv("AI_MODEL_CACHE_MAX_MODELS", "64"))
+MAX_BYTES = int(float(os.getenv("AI_MODEL_CACHE_MAX_MB", "512")) * 1024 * 1024)
+COMPRESS = int(os.getenv("AI_MODEL_COMPRESS", "3"))
+
+
+def _estimate_bytes(model) -> int:
+    """pickle(protocol 5) 크기 — 배열 버퍼는 복사 없이 크기만 센다."""
+    buffers = []
+    try:
+        head = pickle.dumps(model, protocol=5,
+                            buffer_callback=lambda b: buffers.append(b.raw().nbytes))
+    except Exception:
+        return 0
+    return len(head) + sum(buffers)
+
+
+class _ModelLRU:
+    """모델 수 + 추정 바이트 상한 LRU (스레드 안전). 값: {"model", "meta"}."""
+
+    def __init__(self, max_models: int = None, max_bytes: int = None):
+        self.max_models = MAX_MODELS if max_models is None else max_models
+        self.max_bytes = MAX_BYTES if max_bytes is None else max_bytes
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+        self.bytes = 0
+        self.evictions = 0
+
+    def __len__(self):
+        return len(self._data)
+
+    def __contains__(self, key):
+        return key in self._data
+
+    def get(self, key):
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is not None:
+                self._data.move_to_end(key)
+            return entry
+
+    def __setitem__(self, key, entry):
+        entry.setdefault("size", _estimate_bytes(entry["model"]))
+        with self._lock:
+            old = self._data.pop(key, None)
+            if old is not None:
+                self.bytes -= old["size"]
+            self._data[key] = entry
+            self.bytes += entry["size"]
+            # 방금 넣은 모델은 남긴다 (단일 모델이 상한보다 커도 사용은 가능)
+            while len(self._data) > 1 and (len(self._data) > self.max_models
+                                           or self.bytes > self.max_bytes):
+                evicted_key, evicted = self._data.popitem(last=False)
+                self.bytes -= evicted["size"]
+                self.evictions += 1
+                log.info("Model evicted from memory: %s", evicted_key)
+
+    def pop(self, key, default=None):
+        with self._lock:
+            entry = self._data.pop(key, None)
+            if entry is None:
+                return default
+            self.bytes -= entry["size"]
+            return entry
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self.bytes = 0
+
+    def items(self):
+        with self._lock:
+            return list(self._data.items())
+
 
 # in-memory 캐시 (프로세스 내)
-_memory_cache: dict = {}
+_memory_cache = _ModelLRU()
+
+# 백그라운드 학습 잡
+_executor = None
+_executor_lock = threading.Lock()
+_jobs: dict = {}                       # model_key → 진행 중 잡
+_job_history = deque(maxlen=JOB_HISTORY)
+_jobs_lock = threading.Lock()
 
-try:
-    import joblib
-    _HAS_JOBLIB = True
-except ImportError:
-    _HAS_JOBLIB = False
+# joblib 은 첫 저장/로드 시 import (API 기동 시간 단축)
+joblib = lazy_module("joblib")
+_HAS_JOBLIB = available("joblib")
+if not _HAS_JOBLIB:
     log.warning("joblib not available — model caching disabled")
 
 
+def _max_timestamp(data):
+    """DataFrame 의 datetime 열 최댓값 (없으면 None)."""
+    for col in getattr(data, "columns", ()):
+        series = data[col]
+        if str(series.dtype).startswith("datetime64") and len(series):
+            return series.max().isoformat()
+    return None
+
+
+def _hash_array(h, arr):
+    if arr.dtype == object:  # 객체 배열의 tobytes 는 포인터값이라 내용으로 해시
+        h.update(repr(arr.tolist()).encode())
+    else:
+        h.update(str((arr.shape, arr.dtype.str)).encode())
+        h.update(np.ascontiguousarray(arr).tobytes())
+
+
+def data_fingerprint(data) -> str:
+    """학습 데이터의 가벼운 지문: "n<행 수>[-<최대 시각>]-<해시 16자리>"."""
+    h = hashlib.blake2b(digest_size=8)
+    parts = data if isinstance(data, tuple) else (data,)
+    max_ts = None
+    for part in parts:
+        if hasattr(part, "to_numpy") and hasattr(part, "columns"):  # DataFrame
+            max_ts = max_ts or _max_timestamp(part)
+            h.update(",".join(map(str, part.columns)).encode())
+            for col in part.columns:
+                _hash_array(h, part[col].to_numpy())
+        elif isinstance(part, np.ndarray):
+            _hash_array(h, part)
+        else:
+            h.update(pickle.dumps(part, protocol=4))
+    ts = f"-{max_ts}" if max_ts else ""
+    return f"n{_row_count(data)}{ts}-{h.hexdigest()}"
+
+
+def _row_count(data) -> int:
+    part = data[0] if isinstance(data, tuple) and data else data
+    return len(part) if hasattr(part, "__len__") else 1
+
+
+def _meta_path(model_key: str) -> str:
+    return os.path.join(MODEL_DIR, f"{model_key}.meta.json")
+
+
+def _read_meta(model_key: str):
+    try:
+        with open(_meta_path(model_key)) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
 class ModelCache:
-    """디스크 + 메모리 2-tier 모델 캐시."""
+    """디스크 + 메모리 2-tier 모델 캐시 (학습 데이터 지문으로 검증)."""
 
     @staticmethod
-    def get_or_train(model_key: str, train_func, data, max_age_hours: int = None):
+    def _reusable(meta: dict, fingerprint: str, max_age_hours: float) -> bool:
+        age = time.time() - meta["trained_ts"]
+        if age >= max_age_hours * 3600:
+            return False
+        return meta["fingerprint"] == fingerprint or age < MIN_RETRAIN_MINUTES * 60
+
+    @staticmethod
+    def get_or_train(model_key: str, train_func, data, max_age_hours: int = None,
+                     fingerprint: str = None):
         """캐시된 모델 반환 또는 train_func 호출 후 캐싱.
 
         Args:
             model_key: 캐시 키 (파일명에 사용)
             train_func: callable(data) -> trained model
             data: train_func에 전달할 데이터
-            max_age_hours: 캐시 유효 시간 (기본 CACHE_TTL_HOURS)
+            max_age_hours: 캐시 유효 시간 상한 (기본 CACHE_TTL_HOURS)
+            fingerprint: 데이터 지문 (기본 data_fingerprint(data))
         Returns:
             학습된 모델 객체
         """
         if max_age_hours is None:
             max_age_hours = CACHE_TTL_HOURS
+        if fingerprint is None:
+            fingerprint = data_fingerprint(data)
 
-        # 1. 메모리 캐시 확인
-        if model_key in _memory_cache:
-            entry = _memory_cache[model_key]
-            if time.time() - entry["ts"] < max_age_hours * 3600:
-                log.debug("Model memory cache hit: %s", model_key)
-                return entry["model"]
-            else:
-                del _memory_cache[model_key]
-
-        if not _HAS_JOBLIB:
-            model = train_func(data)
-            _memory_cache[model_key] = {"model": model, "ts": time.time()}
+        model, fresh = ModelCache._lookup(model_key, fingerprint, max_age_hours)
+        if fresh:
             return model
 
-        os.makedirs(MODEL_DIR, exist_ok=True)
-        path = os.path.join(MODEL_DIR, f"{model_key}.joblib")
+        # 3. 캐시 미스 또는 데이터 변경 — 학습 후 저장
+        log.info("Model cache miss — training: %s (%s)", model_key, fingerprint)
+        model, meta = _train_job(model_key, train_func, data, fingerprint)
+        ModelCache._store(model_key, model, meta)
+        return model
 
-        # 2. 디스크 캐시 확인
-        if os.path.exists(path):
+    @staticmethod
+    def _lookup(model_key: str, fingerprint: str, max_age_hours: float):
+        """(model, fresh) — 메모리 → 디스크 순. 없으면 (None, False).
+
+        메모리 모델이 유효하지 않으면 디스크에 더 최근 모델(다른 워커가
+        학습한 것)이 있는지 확인한다.
+        """
+        entry = _memory_cache.get(model_key)
+        if entry is not None and ModelCache._reusable(entry["meta"], fingerprint, max_age_hours):
+            log.debug("Model memory cache hit: %s", model_key)
+            return entry["model"], True
+        if _HAS_JOBLIB:
+            path = os.path.join(MODEL_DIR, f"{model_key}.joblib")
+            meta = _read_meta(model_key)
+            newer = meta and (entry is None or meta["trained_ts"] > entry["meta"]["trained_ts"])
+            if newer and os.path.exists(path):
+                try:
+                    # 압축 파일에 mmap_mode 를 주면 joblib 이 매번 경고 후 무시한다
+                    mmap_mode = "r" if COMPRESS == 0 else None
+                    entry = {"model": joblib.load(path, mmap_mode=mmap_mode), "meta": meta}
+                    _memory_cache[model_key] = entry
+                    log.info("Model disk cache load: %s", model_key)
+                except Exception as e:
+                    log.warning("Cache load failed for %s: %s", model_key, e)
+        if entry is None:
+            return None, False
+        return entry["model"], ModelCache._reusable(entry["meta"], fingerprint, max_age_hours)
+
+    @staticmethod
+    def _store(model_key: str, model, meta: dict):
+        _memory_cache[model_key] = {"model": model, "meta": meta}
+        if _HAS_JOBLIB:
             try:
-                mtime = datetime.fromtimestamp(os.path.getmtime(path))
-                if datetime.now() - mtime < timedelta(hours=max_age_hours):
-                    model = joblib.load(path)
-                    _memory_cache[model_key] = {"model": model, "ts": os.path.getmtime(path)}
-                    log.info("Model disk cache hit: %s", model_key)
-                    return model
+                os.makedirs(MODEL_DIR, exist_ok=True)
+                # 임시 파일 → rename: 다른 워커가 mmap 중인 기존 파일(inode)을
+                # 덮어쓰지 않는다 (제자리 truncate 시 SIGBUS)
+                path = os.path.join(MODEL_DIR, f"{model_key}.joblib")
+                tmp = f"{path}.{os.getpid()}.tmp"
+                joblib.dump(model, tmp, compress=COMPRESS)
+                os.replace(tmp, path)
+                tmp = f"{_meta_path(model_key)}.{os.getpid()}.tmp"
+                with open(tmp, "w") as f:
+                    json.dump(meta, f)
+                os.replace(tmp, _meta_path(model_key))
             except Exception as e:
-                log.warning("Cache load failed for %s: %s", model_key, e)
+                log.warning("Cache save failed for %s: %s", model_key, e)
 
-        # 3. 캐시 미스 — 학습 후 저장
-        log.info("Model cache miss — training: %s", model_key)
-        model = train_func(data)
-        try:
-            joblib.dump(model, path, compress=3)
-            _memory_cache[model_key] = {"model": model, "ts": time.time()}
-        except Exception as e:
-            log.warning("Cache save failed for %s: %s", model_key, e)
+    @staticmethod
+    def get_or_schedule(model_key: str, train_func, data, max_age_hours: int = None,
+                        fingerprint: str = None):
+        """요청 경로용: 학습을 기다리지 않는다.
+
+        Returns:
+            유효한 모델, 재학습 중이면 직전 모델(stale), 모델이 없으면 None.
+            유효하지 않으면 백그라운드 학습 잡을 (키당 1개만) 등록한다.
+        """
+        if max_age_hours is None:
+            max_age_hours = CACHE_TTL_HOURS
+        if fingerprint is None:
+            fingerprint = data_fingerprint(data)
+        model, fresh = ModelCache._lookup(model_key, fingerprint, max_age_hours)
+        if not fresh:
+            _submit(model_key, train_func, data, fingerprint)
         return model
 
+    @staticmethod
+    def get_companion(model_key: str, model, name: str, factory):
+        """모델에 딸린 파생 객체(예: SHAP explainer)를 모델과 함께 캐싱.
+
+        메모리 엔트리의 모델이 바로 이 model 일 때만 엔트리에 붙여 두므로,
+        재학습·퇴출 시 함께 사라진다 (LRU 바이트 추정에는 포함되지 않음).
+        그 외에는 factory() 결과를 캐싱 없이 돌려준다.
+        """
+        entry = _memory_cache.get(model_key)
+        if entry is None or entry["model"] is not model:
+            return factory()
+        companions = entry.setdefault("companions", {})
+        if name not in companions:
+            companions[name] = factory()
+        return companions[name]
+
+    @staticmethod
+    def get_jobs() -> dict:
+        """대기/실행 중 잡과 최근 완료 잡."""
+        with _jobs_lock:
+            active = [_job_view(j) for j in _jobs.values()]
+            recent = [_job_view(j) for j in reversed(_job_history)]
+        return {
+            "workers": TRAIN_WORKERS,
+            "queued": [j for j in active if j["state"] == "queued"],
+            "running": [j for j in active if j["state"] == "running"],
+            "recent": recent,
+        }
+
     @staticmethod
     def invalidate(model_key: str):
         """캐시 무효화."""
@@ -92,15 +333,16 @@ class ModelCache:
         if os.path.exists(path):
             os.remove(path)
             log.info("Model cache invalidated: %s", model_key)
+        if os.path.exists(_meta_path(model_key)):
+            os.remove(_meta_path(model_key))
 
     @staticmethod
     def clear_all():
         """전체 캐시 삭제."""
-        global _memory_cache
-        _memory_cache = {}
+        _memory_cache.clear()
         if os.path.exists(MODEL_DIR):
             for f in os.listdir(MODEL_DIR):
-                if f.endswith(".joblib"):
+                if f.endswith((".joblib", ".meta.json")):
                     os.remove(os.path.join(MODEL_DIR, f))
             log.info("All model caches cleared")
 
@@ -109,16 +351,130 @@ class ModelCache:
         """캐시 통계."""
         disk_count = 0
         disk_size = 0
+        models = {}
         if os.path.exists(MODEL_DIR):
             for f in os.listdir(MODEL_DIR):
                 if f.endswith(".joblib"):
                     disk_count += 1
                     disk_size += os.path.getsize(os.path.join(MODEL_DIR, f))
+                    key = f[:-len(".joblib")]
+                    meta = _read_meta(key)
+                    if meta:
+                        models[key] = {**meta, "in_memory": False}
+        for key, entry in _memory_cache.items():
+            models[key] = {**entry["meta"], "in_memory": True, "memory_bytes": entry["size"]}
+        for meta in models.values():
+            meta.pop("trained_ts", None)
 
         return {
             "memory_count": len(_memory_cache),
+            "memory_mb": round(_memory_cache.bytes / 1024 / 1024, 2),
+            "memory_max_models": _memory_cache.max_models,
+            "memory_max_mb": round(_memory_cache.max_bytes / 1024 / 1024, 2),
+            "memory_evictions": _memory_cache.evictions,
             "disk_count": disk_count,
             "disk_size_mb": round(disk_size / 1024 / 1024, 2),
             "model_dir": MODEL_DIR,
             "cache_ttl_hours": CACHE_TTL_HOURS,
+            "min_retrain_minutes": MIN_RETRAIN_MINUTES,
+            "models": sorted(models.values(), key=lambda m: m["model_key"]),
         }
+
+
+# ── 백그라운드 학습 ──
+
+def _train_job(model_key: str, train_func, data, fingerprint: str):
+    """학습 1회 + 메타데이터. 프로세스 풀 워커에서도 그대로 실행된다."""
+    started = time.perf_counter()
+    model = train_func(data)
+    meta = {
+        "model_key": model_key,
+        "fingerprint": fingerprint,
+        "training_rows": _row_count(data),
+        "train_seconds": round(time.perf_counter() - started, 3),
+        "trained_at": datetime.now().isoformat(timespec="seconds"),
+        "trained_ts": time.time(),
+    }
+    return model, meta
+
+
+def _get_executor():
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ProcessPoolExecutor(
+                max_workers=TRAIN_WORKERS,
+                mp_context=multiprocessing.get_context(TRAIN_START_METHOD))
+        return _executor
+
+
+def _discard_executor(executor):
+    """학습 자식이 죽어(OOM kill, segfault) 깨진 풀을 버린다 — 다음 submit 이 새로 만든다."""
+    global _executor
+    with _executor_lock:
+        if _executor is not executor:
+            return
+        _executor = None
+    executor.shutdown(wait=False, cancel_futures=True)
+    log.warning("Training process pool broken — a new pool will be started")
+
+
+def _job_view(job: dict) -> dict:
+    view = {k: v for k, v in job.items() if k != "future"}
+    fut = job.get("future")
+    if view["state"] == "queued" and fut is not None and fut.running():
+        view["state"] = "running"
+    return view
+
+
+def _on_done(model_key: str, executor, fut):
+    with _jobs_lock:
+        job = _jobs.pop(model_key, None)
+    if job is None:
+        return
+    job["finished_at"] = datetime.now().isoformat(timespec="seconds")
+    job["total_seconds"] = round(time.time() - job.pop("submitted_ts"), 3)
+    try:
+        model, meta = fut.result()
+        ModelCache._store(model_key, model, meta)
+        job.update(state="done", train_seconds=meta["train_seconds"])
+        log.info("Background training done: %s (%.2fs)", model_key, meta["train_seconds"])
+    except Exception as e:
+        if isinstance(e, BrokenProcessPool):
+            _discard_executor(executor)
+        job.update(state="failed", error=str(e)[:500])
+        log.warning("Background training failed for %s: %s", model_key, e)
+    job.pop("future", None)
+    with _jobs_lock:
+        _job_history.append(job)
+
+
+def _submit(model_key: str, train_func, data, fingerprint: str):
+    """키당 하나만 — 이미 대기/실행 중이면 무시."""
+    with _jobs_lock:
+        if model_key in _jobs:
+            return
+        job = {
+            "model_key": model_key,
+            "fingerprint": fingerprint,
+            "training_rows": _row_count(data),
+            "state": "queued",
+            "submitted_at": datetime.now().isoformat(timespec="seconds"),
+            "submitted_ts": time.time(),
+        }
+        _jobs[model_key] = job
+    executor = _get_executor()
+    try:
+        try:
+            fut = executor.submit(_train_job, model_key, train_func, data, fingerprint)
+        except BrokenProcessPool:
+            _discard_executor(executor)
+            executor = _get_executor()
+            fut = executor.submit(_train_job, model_key, train_func, data, fingerprint)
+    except Exception as e:
+        with _jobs_lock:
+            _jobs.pop(model_key, None)
+        log.warning("Could not schedule training for %s: %s", model_key, e)
+        return
+    job["future"] = fut
+    fut.add_done_callback(lambda f: _on_done(model_key, executor, f))
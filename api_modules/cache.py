@@ -1,17 +1,195 @@
-"""NFR-006/009: Redis 캐시 유틸리티 — 선택적 Redis, fallback 메모리 캐시."""
+"""NFR-006/009: Redis 캐시 유틸리티 — 선택적 Redis, fallback 메모리 캐시.
 
+키는 "<namespace>:<나머지>" 형식 (예: "items:list:1:20").
+무효화는 KEYS 스캔 대신 네임스페이스 버전 카운터로 한다:
+    - 실제 Redis 키: "<namespace>:v<버전>:<나머지>"
+    - 버전: "cachever:<namespace>" (INCR 로 O(1) 무효화)
+    - 이전 버전 키는 아무도 읽지 않고 TTL 로 자연 만료된다.
+
+프로세스 메모리 캐시(LRUCache)는 항목 수/바이트 상한이 있는 LRU 로,
+    - Redis 가 없을 때는 fallback 저장소 (요청 TTL 그대로)
+    - Redis 가 있을 때는 L1 (CACHE_L1_TTL 초만 보관) — 핫 키는 네트워크
+      왕복과 JSON 디코딩 없이 반환된다. 반환 객체는 공유되므로 수정 금지.
+
+워커 간 L1 일관성: cache_delete 는 무효화 패턴을 Redis pub/sub
+(CACHE_INVALIDATION_CHANNEL)로 발행하고, 각 프로세스의 리스너 스레드가
+받아서 자기 L1 에서 제거한다. 리스너가 구독 중일 때만 마스터 데이터
+네임스페이스(MASTER_NAMESPACES)를 CACHE_L1_MASTER_TTL 동안 L1 에 둔다 —
+구독이 끊기면 이벤트를 놓쳤을 수 있으므로 L1 을 비우고 짧은 TTL 로 돌아간다.
+
+get_or_compute: 캐시 미스 시 동시 요청을 1회 계산으로 합친다 (single-flight).
+    - 프로세스 내: 같은 키의 진행 중 계산(Future)을 공유
+    - 워커 간: Redis SET NX 락 — 락을 못 얻은 워커는 결과가 캐시될 때까지 대기
+    - 확률적 조기 갱신(XFetch): 만료가 가까울수록, 계산이 오래 걸릴수록
+      높은 확률로 만료 전에 백그라운드 재계산 → 핫 키가 일제히 만료되지 않음
+"""
+
+import asyncio
+import inspect
 import json
 import logging
+import math
 import os
+import random
+import threading
 import time
+import uuid
+from collections import OrderedDict
+
+from api_modules.database import run_in_db_thread
 
 log = logging.getLogger(__name__)
 
+try:
+    from prometheus_client import Counter
+    _HAS_PROMETHEUS = True
+except ImportError:
+    _HAS_PROMETHEUS = False
+
 _redis = None
-_memory_cache: dict[str, tuple[float, str]] = {}  # key → (expire_ts, json_value)
 
 REDIS_URL = os.getenv("REDIS_URL", "redis://localhost:6379/0")
 DEFAULT_TTL = 300  # 5분
+MEMORY_MAX_ENTRIES = int(os.getenv("CACHE_MEMORY_MAX_ENTRIES", "10000"))
+MEMORY_MAX_BYTES = int(os.getenv("CACHE_MEMORY_MAX_BYTES", str(64 * 1024 * 1024)))
+L1_TTL = float(os.getenv("CACHE_L1_TTL", "5"))  # 0 이면 Redis 앞 L1 비활성
+L1_MASTER_TTL = float(os.getenv("CACHE_L1_MASTER_TTL", "300"))
+MASTER_NAMESPACES = frozenset({"items", "bom", "process", "routing", "equip"})
+INVALIDATION_CHANNEL = os.getenv("CACHE_INVALIDATION_CHANNEL", "cache:invalidate")
+LOCK_PREFIX = "cachelock:"
+LOCK_TIMEOUT = float(os.getenv("CACHE_LOCK_TIMEOUT_SEC", "10"))
+LOCK_POLL = 0.05
+EARLY_REFRESH_BETA = float(os.getenv("CACHE_EARLY_REFRESH_BETA", "1.0"))
+VERSION_PREFIX = "cachever:"
+
+# 버전 조회 + 값 조회를 한 번의 왕복으로 (KEYS[1]=버전 키, ARGV=키 앞/뒤)
+_GET_LUA = """
+local v = redis.call('GET', KEYS[1]) or '0'
+return redis.call('GET', ARGV[1] .. v .. ARGV[2])
+"""
+_get_script = None
+_UNLOCK_LUA = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then return redis.call('DEL', KEYS[1]) end
+return 0
+"""
+_unlock_script = None
+_inflight: dict[str, asyncio.Future] = {}
+_refreshing: dict[str, asyncio.Task] = {}  # 조기 갱신 태스크 (참조 유지)
+
+if _HAS_PROMETHEUS:
+    _CACHE_REQUESTS = Counter("mes_cache_requests_total",
+                              "Cache lookups by tier and result",
+                              ["tier", "result"])
+    _CACHE_EVICTIONS = Counter("mes_cache_evictions_total",
+                               "Memory cache entries evicted", ["reason"])
+
+
+class LRUCache:
+    """항목 수 + 바이트 상한이 있는 TTL LRU (스레드 안전).
+
+    값은 디코딩된 객체 그대로 보관하고, 크기는 저장 시 JSON 길이로 계산한다.
+    만료 항목은 조회 시, 그리고 공간이 필요할 때 LRU 끝에서부터 정리된다.
+    """
+
+    def __init__(self, max_entries: int = MEMORY_MAX_ENTRIES,
+                 max_bytes: int = MEMORY_MAX_BYTES):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._data: OrderedDict[str, tuple[float, int, object]] = OrderedDict()
+        self._lock = threading.Lock()
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def __len__(self):
+        return len(self._data)
+
+    def _drop(self, key: str, reason: str):
+        _, size, _ = self._data.pop(key)
+        self.bytes -= size
+        if reason == "expired":
+            self.expirations += 1
+        else:
+            self.evictions += 1
+        if _HAS_PROMETHEUS:
+            _CACHE_EVICTIONS.labels(reason=reason).inc()
+
+    def get(self, key: str):
+        """히트 시 값, 미스/만료 시 None."""
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is not None:
+                if entry[0] > time.monotonic():
+                    self._data.move_to_end(key)
+                    self.hits += 1
+                    return entry[2]
+                self._drop(key, "expired")
+            self.misses += 1
+            return None
+
+    def set(self, key: str, value, ttl: float, size: int):
+        if size > self.max_bytes or ttl <= 0:
+            return
+        with self._lock:
+            if key in self._data:
+                old = self._data.pop(key)
+                self.bytes -= old[1]
+            now = time.monotonic()
+            # 공간 확보: LRU 끝부터 — 만료 항목은 expired, 나머지는 lru 로 집계
+            while self._data and (len(self._data) >= self.max_entries
+                                  or self.bytes + size > self.max_bytes):
+                oldest = next(iter(self._data))
+                self._drop(oldest, "expired" if self._data[oldest][0] <= now else "lru")
+            self._data[key] = (now + ttl, size, value)
+            self.bytes += size
+
+    def delete_prefix(self, prefix: str):
+        with self._lock:
+            for k in [k for k in self._data if k.startswith(prefix)]:
+                _, size, _ = self._data.pop(k)
+                self.bytes -= size
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self.bytes = 0
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._data),
+            "bytes": self.bytes,
+            "max_entries": self.max_entries,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+        }
+
+
+_memory_cache = LRUCache()
+_listener = None
+_coherent = threading.Event()  # 무효화 채널 구독 중
+# 네임스페이스별 무효화 세대 (None=전체). Redis GET 도중 무효화되면 읽은 값을 L1 에 넣지 않는다
+_generations: dict = {}
+_generations_lock = threading.Lock()
+
+
+def _split(key: str):
+    """"ns:rest" → ("ns", "rest"). 네임스페이스 없는 키는 (None, key)."""
+    ns, sep, rest = key.partition(":")
+    return (ns, rest) if sep else (None, key)
+
+
+def _versioned(r, key: str) -> str:
+    ns, rest = _split(key)
+    if ns is None:
+        return key
+    return f"{ns}:v{r.get(VERSION_PREFIX + ns) or 0}:{rest}"
 
 
 def _get_redis():
@@ -22,9 +200,11 @@ def _get_redis():
     try:
         import redis as redis_lib
         _redis = redis_lib.from_url(REDIS_URL, decode_responses=True,
-                                     socket_connect_timeout=2)
+                                     socket_connect_timeout=2,
+                                     health_check_interval=30)
         _redis.ping()
         log.info("Redis connected: %s", REDIS_URL)
+        _start_listener()
         return _redis
     except Exception as e:
         log.warning("Redis unavailable, using memory cache: %s", e)
@@ -32,22 +212,99 @@ def _get_redis():
         return None
 
 
+# ── 워커 간 L1 무효화 ──
+
+def _bump_generation(pattern: str = "*"):
+    ns = _split(pattern)[0]
+    if ns is not None and "*" in ns:
+        ns = None
+    with _generations_lock:
+        _generations[ns] = _generations.get(ns, 0) + 1
+
+
+def _generation(key: str) -> tuple:
+    return _generations.get(None, 0), _generations.get(_split(key)[0], 0)
+
+
+def _on_invalidate(pattern: str):
+    _bump_generation(pattern)
+    _memory_cache.delete_prefix(pattern.rstrip("*"))
+
+
+def _clear_l1():
+    _bump_generation()
+    _memory_cache.clear()
+
+
+def _listen():
+    while True:
+        try:
+            pubsub = _redis.pubsub(ignore_subscribe_messages=True)
+            pubsub.subscribe(INVALIDATION_CHANNEL)
+            _clear_l1()  # 구독 전/끊긴 동안의 이벤트는 놓쳤을 수 있음
+            _coherent.set()
+            for msg in pubsub.listen():
+                if msg.get("type") == "message":
+                    _on_invalidate(msg["data"])
+        except Exception as e:
+            log.warning("Cache invalidation listener disconnected: %s", e)
+        finally:
+            _coherent.clear()
+            _clear_l1()
+        time.sleep(1)
+
+
+def _start_listener():
+    global _listener
+    if _listener is None and L1_TTL > 0:
+        _listener = threading.Thread(target=_listen, name="cache-invalidation",
+                                     daemon=True)
+        _listener.start()
+
+
+def _l1_ttl(key: str, ttl: float) -> float:
+    """L1 보관 시간 — 구독 중인 마스터 데이터는 길게, 그 외는 CACHE_L1_TTL."""
+    if _coherent.is_set() and _split(key)[0] in MASTER_NAMESPACES:
+        return min(ttl, max(L1_TTL, L1_MASTER_TTL))
+    return min(ttl, L1_TTL)
+
+
+def _count(tier: str, hit: bool):
+    if _HAS_PROMETHEUS:
+        _CACHE_REQUESTS.labels(tier=tier, result="hit" if hit else "miss").inc()
+
+
 def cache_get(key: str) -> dict | None:
     """캐시 조회. 히트 시 dict, 미스 시 None."""
     r = _get_redis()
+    if not r or L1_TTL > 0:
+        val = _memory_cache.get(key)
+        _count("memory", val is not None)
+        if val is not None or not r:
+            return val
     if r:
         try:
-            val = r.get(key)
+            global _get_script
+            generation = _generation(key)
+            ns, rest = _split(key)
+            if ns is None:
+                val = r.get(key)
+            else:
+                if _get_script is None:
+                    _get_script = r.register_script(_GET_LUA)
+                val = _get_script(keys=[VERSION_PREFIX + ns], args=[f"{ns}:v", f":{rest}"])
+            _count("redis", bool(val))
             if val:
-                return json.loads(val)
+                obj = json.loads(val)
+                if L1_TTL > 0 and _generation(key) == generation:
+                    # 원래 TTL 을 모르므로 get_or_compute 항목만 남은 수명까지 보관
+                    remaining = (obj["e"] - time.time()
+                                 if isinstance(obj, dict) and obj.keys() == {"v", "d", "e"}
+                                 else L1_TTL)
+                    _memory_cache.set(key, obj, _l1_ttl(key, remaining), len(val))
+                return obj
         except Exception:
             pass
-    else:
-        entry = _memory_cache.get(key)
-        if entry and entry[0] > time.time():
-            return json.loads(entry[1])
-        elif entry:
-            del _memory_cache[key]
     return None
 
 
@@ -57,27 +314,41 @@ def cache_set(key: str, value: dict, ttl: int = DEFAULT_TTL):
     r = _get_redis()
     if r:
         try:
-            r.setex(key, ttl, json_val)
+            r.setex(_versioned(r, key), ttl, json_val)
         except Exception:
             pass
+        if L1_TTL > 0:
+            _memory_cache.set(key, value, _l1_ttl(key, ttl), len(json_val))
     else:
-        _memory_cache[key] = (time.time() + ttl, json_val)
+        _memory_cache.set(key, value, ttl, len(json_val))
 
 
 def cache_delete(pattern: str):
-    """캐시 삭제 (패턴 지원)."""
+    """캐시 삭제 (다른 워커의 L1 에도 무효화 이벤트 발행).
+
+    "<namespace>:*" 는 버전 INCR 한 번으로 무효화 (Redis 전체 키 스캔 없음).
+    그 외 패턴은 SCAN 으로 점진 삭제 — KEYS 처럼 Redis 를 멈추지 않는다.
+    """
     r = _get_redis()
     if r:
         try:
-            keys = r.keys(pattern)
-            if keys:
-                r.delete(*keys)
+            ns, rest = _split(pattern)
+            if ns is not None and rest == "*" and "*" not in ns:
+                r.incr(VERSION_PREFIX + ns)
+            else:
+                match = _versioned(r, pattern) if ns is not None and "*" not in ns else pattern
+                batch = []
+                for k in r.scan_iter(match=match, count=500):
+                    batch.append(k)
+                    if len(batch) >= 500:
+                        r.unlink(*batch)
+                        batch = []
+                if batch:
+                    r.unlink(*batch)
+            r.publish(INVALIDATION_CHANNEL, pattern)
         except Exception:
             pass
-    else:
-        to_del = [k for k in _memory_cache if k.startswith(pattern.rstrip("*"))]
-        for k in to_del:
-            del _memory_cache[k]
+    _on_invalidate(pattern)
 
 
 def cache_flush():
@@ -86,6 +357,133 @@ def cache_flush():
     if r:
         try:
             r.flushdb()
+            r.publish(INVALIDATION_CHANNEL, "*")
         except Exception:
             pass
-    _memory_cache.clear()
+    _clear_l1()
+
+
+def cache_stats() -> dict:
+    """메모리 캐시(L1/fallback) 통계."""
+    r = _get_redis()
+    mode = ("l1" if L1_TTL > 0 else "off") if r else "fallback"
+    return {"backend": "redis" if r else "memory", "memory_mode": mode,
+            "invalidation_subscribed": _coherent.is_set(),
+            **_memory_cache.stats()}
+
+
+# ── single-flight ──
+
+def _cacheable(value) -> bool:
+    return value is not None and not (isinstance(value, dict) and "error" in value)
+
+
+def _should_refresh(entry: dict, beta: float) -> bool:
+    """XFetch: now - delta·beta·ln(rand) >= expiry 이면 조기 갱신."""
+    if beta <= 0:
+        return False
+    return time.time() - entry["d"] * beta * math.log(1.0 - random.random()) >= entry["e"]
+
+
+async def _run(compute):
+    if inspect.iscoroutinefunction(compute):
+        return await compute()
+    return await run_in_db_thread(compute)
+
+
+def _try_lock(r, key: str):
+    token = uuid.uuid4().hex
+    try:
+        if r.set(LOCK_PREFIX + key, token, nx=True, px=int(LOCK_TIMEOUT * 1000)):
+            return token
+        return None
+    except Exception:
+        return ""  # Redis 오류 → 락 없이 계산
+
+
+def _unlock(r, key: str, token: str):
+    global _unlock_script
+    try:
+        if _unlock_script is None:
+            _unlock_script = r.register_script(_UNLOCK_LUA)
+        _unlock_script(keys=[LOCK_PREFIX + key], args=[token])
+    except Exception:
+        pass
+
+
+async def _compute_and_store(key: str, compute, ttl: int, should_cache):
+    r = _get_redis()
+    token = _try_lock(r, key) if r else ""
+    if token is None:
+        # 다른 워커가 계산 중 → 결과가 저장될 때까지 대기, 시간 초과 시 직접 계산
+        deadline = time.monotonic() + LOCK_TIMEOUT
+        while time.monotonic() < deadline:
+            await asyncio.sleep(LOCK_POLL)
+            entry = cache_get(key)
+            if entry is not None:
+                return entry["v"]
+    try:
+        started = time.monotonic()
+        value = await _run(compute)
+        delta = time.monotonic() - started
+        if should_cache(value):
+            cache_set(key, {"v": value, "d": round(delta, 4), "e": time.time() + ttl}, ttl)
+        return value
+    finally:
+        if token:
+            _unlock(r, key, token)
+
+
+async def _single_flight(key: str, compute, ttl: int, should_cache):
+    """같은 키의 동시 미스는 리더 1개만 계산하고 나머지는 결과를 기다린다.
+
+    리더가 취소되면 대기자에게 취소를 넘기지 않고, 대기자 중 하나가 새 리더가 된다.
+    """
+    while (fut := _inflight.get(key)) is not None:
+        try:
+            return await asyncio.shield(fut)
+        except asyncio.CancelledError:
+            if not fut.cancelled():
+                raise  # 대기자 자신이 취소됨
+    fut = asyncio.get_running_loop().create_future()
+    _inflight[key] = fut
+    try:
+        value = await _compute_and_store(key, compute, ttl, should_cache)
+        fut.set_result(value)
+        return value
+    except asyncio.CancelledError:
+        fut.cancel()
+        raise
+    except BaseException as e:
+        fut.set_exception(e)
+        fut.exception()  # 대기자가 없어도 "never retrieved" 경고 방지
+        raise
+    finally:
+        if _inflight.get(key) is fut:
+            del _inflight[key]
+
+
+async def _refresh(key, compute, ttl, should_cache):
+    try:
+        await _single_flight(key, compute, ttl, should_cache)
+    except Exception as e:
+        log.warning("Cache early refresh failed for %s: %s", key, e)
+    finally:
+        _refreshing.pop(key, None)
+
+
+async def get_or_compute(key: str, compute, ttl: int = DEFAULT_TTL, *,
+                         beta: float = EARLY_REFRESH_BETA, should_cache=_cacheable):
+    """캐시 조회, 미스 시 compute() 결과를 캐시해서 반환.
+
+    compute 는 인자 없는 callable — 동기 함수는 DB 스레드 풀에서, 코루틴
+    함수는 그대로 await 된다. None 이나 {"error": ...} 는 캐시하지 않는다.
+    이 키는 메타데이터와 함께 저장되므로 cache_get 으로 직접 읽지 않는다.
+    """
+    entry = cache_get(key)
+    if entry is not None:
+        if key not in _refreshing and key not in _inflight and _should_refresh(entry, beta):
+            _refreshing[key] = asyncio.get_running_loop().create_task(
+                _refresh(key, compute, ttl, should_cache))
+        return entry["v"]
+    return await _single_flight(key, compute, ttl, should_cache)
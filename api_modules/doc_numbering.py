@@ -0,0 +1,90 @@
+"""문서번호 채번 — PREFIX-YYYYMMDD-NNN 형식의 일자별 일련번호 발급.
+
+(prefix, 일자)별 카운터 한 행을 doc_sequences 테이블에 두고
+INSERT ... ON CONFLICT DO UPDATE 한 번으로 원자적으로 증가시킨다.
+COUNT(*) ... LIKE 스캔이 필요 없고(O(1)), 동시 요청이 같은 번호를 받지 않는다.
+
+채번은 호출자의 커서(트랜잭션) 안에서 수행되므로 호출자가 롤백하면
+번호도 함께 반환되어 결번이 생기지 않는다.
+"""
+
+from datetime import date
+
+from psycopg2 import sql
+
+from api_modules.database import run_in_db_thread
+
+_BUMP_SQL = (
+    "INSERT INTO doc_sequences (prefix, seq_date, last_no) "
+    "VALUES (%s, %s, %s) "
+    "ON CONFLICT (prefix, seq_date) "
+    "DO UPDATE SET last_no = doc_sequences.last_no + EXCLUDED.last_no "
+    "RETURNING last_no, (xmax = 0) AS inserted"
+)
+
+
+def _seed_from(cur, seed, head: str) -> int:
+    """카운터 최초 생성 시 기존 테이블에 이미 발급된 최대 번호를 조회."""
+    table, column = seed
+    cur.execute(
+        sql.SQL(
+            "SELECT COALESCE(MAX(CAST(substring({col} FROM %s) AS INTEGER)), 0) "
+            "FROM {tbl} WHERE {col} LIKE %s"
+        ).format(col=sql.Identifier(column), tbl=sql.Identifier(table)),
+        (r"-(\d+)$", f"{head}-%"),
+    )
+    return cur.fetchone()[0] or 0
+
+
+def reserve_doc_nos(cur, prefix: str, n: int = 1, day: str = None,
+                    seed: tuple = None, width: int = 3) -> list[str]:
+    """번호 n개를 한 번에 예약.
+
+    Args:
+        cur: psycopg2 커서 (호출자 트랜잭션)
+        prefix: 번호 접두어 (예: "WO", "LOT")
+        n: 예약할 개수
+        day: YYYYMMDD (기본: 오늘)
+        seed: (table, column) — 당일 카운터가 처음 만들어질 때 해당 컬럼의
+            기존 최대 번호 이후부터 발급 (도입 당일 중복 방지)
+        width: 일련번호 최소 자릿수
+    Returns:
+        ["PREFIX-YYYYMMDD-001", ...]
+    """
+    if n < 1:
+        return []
+    day = day or date.today().strftime("%Y%m%d")
+    head = f"{prefix}-{day}"
+
+    cur.execute(_BUMP_SQL, (prefix, day, n))
+    last_no, inserted = cur.fetchone()
+    if inserted and seed:
+        offset = _seed_from(cur, seed, head)
+        if offset:
+            cur.execute(
+                "UPDATE doc_sequences SET last_no = last_no + %s "
+                "WHERE prefix = %s AND seq_date = %s RETURNING last_no",
+                (offset, prefix, day),
+            )
+            last_no = cur.fetchone()[0]
+
+    return [f"{head}-{no:0{width}d}" for no in range(last_no - n + 1, last_no + 1)]
+
+
+def next_doc_no(cur, prefix: str, day: str = None, seed: tuple = None,
+                width: int = 3) -> str:
+    """번호 1개 발급."""
+    return reserve_doc_nos(cur, prefix, 1, day, seed, width)[0]
+
+
+async def reserve_doc_nos_async(cur, prefix: str, n: int = 1, day: str = None,
+                                seed: tuple = None, width: int = 3) -> list[str]:
+    """AsyncCursor용 reserve_doc_nos (DB 스레드에서 실행)."""
+    return await run_in_db_thread(reserve_doc_nos, cur.raw, prefix, n, day,
+                                  seed, width)
+
+
+async def next_doc_no_async(cur, prefix: str, day: str = None,
+                            seed: tuple = None, width: int = 3) -> str:
+    """AsyncCursor용 next_doc_no."""
+    return (await reserve_doc_nos_async(cur, prefix, 1, day, seed, width))[0]
@@ -0,0 +1,176 @@
+"""전 품목 수요 예측 야간 배치 → ai_forecasts.
+
+- 품목별 최근 DEMAND_FORECAST_HISTORY_MONTHS 개월 월별 수요를 한 번의 그룹 쿼리로 로드
+- 품목별 Prophet(없으면 선형회귀) 적합을 프로세스 풀(DEMAND_FORECAST_WORKERS)에서 병렬 실행
+- 결과는 한 트랜잭션에서 기존 수요 예측 행을 교체 (model_type = 'demand')
+
+mes_ai_prediction.predict_demand 는 같은 학습 기간의 최근 배치 결과가 있으면
+그대로 반환하고, 없는 품목만 요청 시 적합한다. CronJob 에서
+``python -m api_modules.forecast_batch`` 로 실행한다.
+"""
+
+import json
+import logging
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from itertools import repeat
+
+from psycopg2.extras import Json, execute_values
+
+from api_modules.database import get_conn, release_conn, run_in_db_thread
+from api_modules.mes_ai_prediction import (
+    FORECAST_MAX_AGE_HOURS, MODEL_TYPE, forecast_series, series_query,
+)
+
+log = logging.getLogger(__name__)
+
+HISTORY_MONTHS = int(os.getenv("DEMAND_FORECAST_HISTORY_MONTHS", "12"))
+PREDICTION_MONTHS = int(os.getenv("DEMAND_FORECAST_PREDICTION_MONTHS", "6"))
+WORKERS = int(os.getenv("DEMAND_FORECAST_WORKERS", str(os.cpu_count() or 1)))
+START_METHOD = os.getenv("AI_TRAIN_START_METHOD", "spawn")
+MIN_POINTS = 3
+
+
+def load_series(cur, history_months: int) -> dict:
+    """item_code → [(ds, y), ...] (오래된 → 최근 순)."""
+    cur.execute(*series_query(cur, history_months))
+    series = {}
+    for item_code, ds, y in cur.fetchall():
+        series.setdefault(item_code, []).append((ds, y))
+    return series
+
+
+def _forecast_safe(item_code, rows, prediction_months):
+    try:
+        result = forecast_series(item_code, rows, prediction_months)
+    except Exception as e:
+        result = {"error": str(e)}
+    return {"item_code": item_code, **result}
+
+
+def fit_all(series: dict, prediction_months: int, workers: int = None) -> list:
+    """품목별 예측 결과 목록 (입력 순서). 품목이 적거나 workers<=1 이면 현재 프로세스에서."""
+    workers = WORKERS if workers is None else workers
+    codes = list(series)
+    args = (codes, [series[c] for c in codes], repeat(prediction_months))
+    if workers <= 1 or len(codes) <= 1:
+        return list(map(_forecast_safe, *args))
+    ctx = multiprocessing.get_context(START_METHOD)
+    with ProcessPoolExecutor(max_workers=min(workers, len(codes)), mp_context=ctx) as pool:
+        chunksize = max(1, len(codes) // (workers * 4))
+        return list(pool.map(_forecast_safe, *args, chunksize=chunksize))
+
+
+def write_forecasts(cur, results: list, history_months: int, prediction_months: int) -> int:
+    """기존 수요 예측을 교체. 반환: 저장한 행 수."""
+    cur.execute("DELETE FROM ai_forecasts WHERE model_type = %s", (MODEL_TYPE,))
+    rows = [
+        (MODEL_TYPE, r["item_code"],
+         Json({**r, "history_months": history_months,
+               "prediction_months": prediction_months}))
+        for r in results if "error" not in r
+    ]
+    if rows:
+        execute_values(
+            cur,
+            "INSERT INTO ai_forecasts (model_type, item_code, result_json) VALUES %s",
+            rows, page_size=500,
+        )
+    return len(rows)
+
+
+def run_batch(history_months: int = None, prediction_months: int = None,
+              workers: int = None) -> dict:
+    """시계열 로드 → 병렬 적합 → ai_forecasts 교체. 적합 중에는 DB 연결을 잡지 않는다."""
+    history_months = HISTORY_MONTHS if history_months is None else history_months
+    prediction_months = PREDICTION_MONTHS if prediction_months is None else prediction_months
+    started = time.perf_counter()
+
+    conn = get_conn(readonly=True)
+    if not conn:
+        return {"error": "데이터베이스 연결에 실패했습니다."}
+    try:
+        cur = conn.cursor()
+        series = load_series(cur, history_months)
+        cur.close()
+    except Exception as e:
+        log.error("수요 시계열 로드 오류: %s", e)
+        return {"error": str(e)}
+    finally:
+        release_conn(conn)
+
+    series = {k: v for k, v in series.items() if len(v) >= MIN_POINTS}
+    results = fit_all(series, prediction_months, workers)
+    failed = {r["item_code"]: r["error"] for r in results if "error" in r}
+
+    conn = get_conn()
+    if not conn:
+        return {"error": "데이터베이스 연결에 실패했습니다."}
+    try:
+        cur = conn.cursor()
+        written = write_forecasts(cur, results, history_months, prediction_months)
+        conn.commit()
+        cur.close()
+    except Exception as e:
+        conn.rollback()
+        log.error("수요 예측 저장 오류: %s", e)
+        return {"error": str(e)}
+    finally:
+        release_conn(conn)
+
+    models = {}
+    for r in results:
+        if "error" not in r:
+            models[r["model"]] = models.get(r["model"], 0) + 1
+    return {
+        "items": len(series),
+        "written": written,
+        "failed": failed,
+        "models": models,
+        "history_months": history_months,
+        "prediction_months": prediction_months,
+        "elapsed_sec": round(time.perf_counter() - started, 2),
+    }
+
+
+def get_batch_status() -> dict:
+    """마지막 배치 시각과 저장된 품목 수."""
+    conn = get_conn(readonly=True)
+    if not conn:
+        return {"error": "데이터베이스 연결에 실패했습니다."}
+    try:
+        cur = conn.cursor()
+        cur.execute(
+            "SELECT COUNT(*), MAX(created_at) FROM ai_forecasts WHERE model_type = %s",
+            (MODEL_TYPE,),
+        )
+        count, last = cur.fetchone()
+        cur.close()
+        return {
+            "items": count,
+            "generated_at": last.isoformat(timespec="seconds") if last else None,
+            "stale": last is None or (datetime.now() - last).total_seconds()
+            > FORECAST_MAX_AGE_HOURS * 3600,
+            "history_months": HISTORY_MONTHS,
+            "prediction_months": PREDICTION_MONTHS,
+            "workers": WORKERS,
+        }
+    except Exception as e:
+        log.error("수요 예측 배치 상태 조회 오류: %s", e)
+        return {"error": "수요 예측 배치 상태 조회 중 오류가 발생했습니다."}
+    finally:
+        release_conn(conn)
+
+
+async def get_batch_status_async() -> dict:
+    return await run_in_db_thread(get_batch_status)
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=os.getenv("LOG_LEVEL", "INFO"))
+    summary = run_batch()
+    print(json.dumps(summary, ensure_ascii=False, indent=2, default=str))
+    raise SystemExit(1 if "error" in summary else 0)
@@ -7,7 +7,11 @@ import subprocess
 import time
 from datetime import datetime, timedelta, timezone
 
-from kubernetes import client, config
+from api_modules.lazy_import import lazy_module
+
+# kubernetes client is imported on first call (not at API start-up)
+client = lazy_module("kubernetes.client")
+config = lazy_module("kubernetes.config")
 
 
 def get_status():
@@ -0,0 +1,148 @@
+"""무거운 선택 의존성의 지연 import + import 시간 프로파일.
+
+    from api_modules.lazy_import import available, lazy_module
+
+    cp_model = lazy_module("ortools.sat.python.cp_model")
+    HAS_ORTOOLS = available("ortools")
+
+- available(): 설치 여부만 확인 (find_spec — 패키지를 실행하지 않음)
+- lazy_module(): 첫 속성 접근 시점에 import 되는 모듈 프록시 (스레드 안전).
+  설치는 됐지만 import 가 실패하는 경우 예외는 첫 사용 시점에 발생한다.
+
+API 워커 기동 시 무거운 라이브러리(HEAVY_MODULES)가 로드되지 않는지 확인하려면:
+
+    python -m api_modules.lazy_import            # app import 프로파일 (상위 25개)
+    python -m api_modules.lazy_import --top 50 --target api_modules.routers
+
+``python -X importtime`` 을 하위 프로세스로 실행해 모듈별 누적/자체 시간을
+집계하고, 로드된 HEAVY_MODULES 가 있으면 종료 코드 1 을 돌려준다.
+"""
+
+import argparse
+import importlib
+import importlib.util
+import json
+import subprocess
+import sys
+import threading
+
+# API 기동 경로에서 import 되면 안 되는 패키지 (최상위 이름)
+HEAVY_MODULES = (
+    "prophet", "xgboost", "shap", "ortools", "sklearn", "scipy",
+    "kubernetes", "psutil", "pandas", "joblib",
+)
+
+
+def available(name: str) -> bool:
+    """최상위 패키지가 설치되어 있는지 (import 하지 않고 확인)."""
+    top = name.partition(".")[0]
+    if top in sys.modules:
+        return sys.modules[top] is not None
+    try:
+        return importlib.util.find_spec(top) is not None
+    except (ImportError, ValueError):
+        return False
+
+
+class LazyModule:
+    """첫 속성 접근 시 import 하는 모듈 프록시."""
+
+    def __init__(self, name: str):
+        self.__dict__["_name"] = name
+        self.__dict__["_module"] = None
+        self.__dict__["_lock"] = threading.Lock()
+
+    def _load(self):
+        module = self.__dict__["_module"]
+        if module is None:
+            with self.__dict__["_lock"]:
+                module = self.__dict__["_module"]
+                if module is None:
+                    module = importlib.import_module(self.__dict__["_name"])
+                    self.__dict__["_module"] = module
+        return module
+
+    @property
+    def loaded(self) -> bool:
+        return self.__dict__["_module"] is not None
+
+    def __getattr__(self, attr):
+        return getattr(self._load(), attr)
+
+    def __setattr__(self, attr, value):
+        setattr(self._load(), attr, value)
+
+    def __repr__(self):
+        state = "loaded" if self.loaded else "not loaded"
+        return f"<lazy module {self.__dict__['_name']!r} ({state})>"
+
+
+def lazy_module(name: str) -> LazyModule:
+    return LazyModule(name)
+
+
+# ── import 시간 프로파일 ──
+
+def parse_importtime(stderr: str) -> list[dict]:
+    """``-X importtime`` 출력 → [{"module", "self_ms", "cumulative_ms", "depth"}]."""
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+        try:
+            self_us, cum_us, name = line[len("import time:"):].split("|", 2)
+            rows.append({
+                "module": name.strip(),
+                "self_ms": int(self_us) / 1000,
+                "cumulative_ms": int(cum_us) / 1000,
+                "depth": (len(name) - len(name.lstrip(" ")) - 1) // 2,
+            })
+        except ValueError:
+            continue
+    return rows
+
+
+def profile_imports(target: str = "app") -> dict:
+    """별도 인터프리터에서 target 을 import 하고 모듈별 import 시간을 집계."""
+    code = (
+        "import sys, json\n"
+        f"import {target}\n"
+        f"print(json.dumps(sorted({{m.partition('.')[0] for m in sys.modules}})))\n"
+    )
+    proc = subprocess.run([sys.executable, "-X", "importtime", "-c", code],
+                          capture_output=True, text=True)
+    if proc.returncode != 0:
+        return {"error": proc.stderr.strip().splitlines()[-1:] or ["import failed"]}
+    rows = parse_importtime(proc.stderr)
+    loaded = set(json.loads(proc.stdout.strip().splitlines()[-1]))
+    top_level = [r for r in rows if r["depth"] == 0]
+    return {
+        "target": target,
+        "total_ms": round(sum(r["cumulative_ms"] for r in top_level), 1),
+        "modules": sorted(rows, key=lambda r: r["cumulative_ms"], reverse=True),
+        "heavy_loaded": [m for m in HEAVY_MODULES if m in loaded],
+    }
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Per-module import time profile")
+    parser.add_argument("--target", default="app")
+    parser.add_argument("--top", type=int, default=25)
+    args = parser.parse_args(argv)
+
+    report = profile_imports(args.target)
+    if "error" in report:
+        print("\n".join(report["error"]), file=sys.stderr)
+        return 2
+    print(f"import {report['target']}: {report['total_ms']:.1f} ms")
+    print(f"{'cumulative ms':>14} {'self ms':>9}  module")
+    for r in report["modules"][:args.top]:
+        print(f"{r['cumulative_ms']:14.1f} {r['self_ms']:9.1f}  {'  ' * r['depth']}{r['module']}")
+    if report["heavy_loaded"]:
+        print("heavy modules loaded at import: " + ", ".join(report["heavy_loaded"]))
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -1,21 +1,72 @@
 """REQ-015, FN-018: Demand prediction using Prophet (fallback: linear regression)."""
 
 import logging
+import os
 from datetime import datetime, timedelta
 
 from api_modules.database import get_conn, release_conn
+from api_modules.lazy_import import available, lazy_module
 
 log = logging.getLogger(__name__)
 
-# Try importing Prophet
-try:
-    from prophet import Prophet
-    HAS_PROPHET = True
-except ImportError:
-    HAS_PROPHET = False
+# Prophet is imported on first fit (not at API start-up)
+prophet = lazy_module("prophet")
+HAS_PROPHET = available("prophet")
+if not HAS_PROPHET:
     log.warning("Prophet not installed – falling back to linear regression.")
 
 
+MODEL_TYPE = "demand"
+FORECAST_MAX_AGE_HOURS = float(os.getenv("DEMAND_FORECAST_MAX_AGE_HOURS", "36"))
+
+# 월별 수요 (shipments 가 있으면 출하, 없으면 실적 양품 수량으로 대체)
+_MONTHLY_SQL = {
+    True: (
+        "SELECT item_code, date_trunc('month', ship_date)::date AS ds, "
+        "SUM(qty) AS y "
+        "FROM shipments {where}"
+        "GROUP BY 1, 2"
+    ),
+    False: (
+        "SELECT wo.item_code, date_trunc('month', wr.start_time)::date AS ds, "
+        "SUM(wr.good_qty) AS y "
+        "FROM work_results wr "
+        "JOIN work_orders wo ON wr.wo_id = wo.wo_id {where}"
+        "GROUP BY 1, 2"
+    ),
+}
+_ITEM_FILTER = {True: "WHERE item_code = %s ", False: "WHERE wo.item_code = %s "}
+
+# 품목별 최근 N개월 (오래된 → 최근 순)
+_SERIES_SQL = (
+    "SELECT item_code, ds, y FROM ("
+    "  SELECT m.*, ROW_NUMBER() OVER (PARTITION BY item_code ORDER BY ds DESC) AS rn "
+    "  FROM ({monthly}) m"
+    ") r WHERE rn <= %s "
+    "ORDER BY item_code, ds"
+)
+
+_has_shipments = None
+
+
+def _shipments_exist(cursor) -> bool:
+    """shipments 테이블 존재 여부 (프로세스당 1회 조회)."""
+    global _has_shipments
+    if _has_shipments is None:
+        cursor.execute("SELECT to_regclass('shipments') IS NOT NULL")
+        _has_shipments = bool(cursor.fetchone()[0])
+    return _has_shipments
+
+
+def series_query(cursor, history_months: int, item_code: str = None):
+    """(sql, params) for the monthly demand series of one item or all items."""
+    shipments = _shipments_exist(cursor)
+    where = _ITEM_FILTER[shipments] if item_code else ""
+    sql = _SERIES_SQL.format(monthly=_MONTHLY_SQL[shipments].format(where=where))
+    params = [item_code, history_months] if item_code else [history_months]
+    return sql, params
+
+
 async def predict_demand(
     item_code: str,
     history_months: int = 12,
@@ -23,8 +74,10 @@ async def predict_demand(
 ) -> dict:
     """Predict future demand based on historical shipment / work_results data.
 
-    Uses Facebook Prophet when available for seasonality decomposition
-    and confidence intervals. Falls back to linear regression otherwise.
+    Serves the nightly batch forecast from ai_forecasts when one exists for
+    the same history window. Otherwise fits on demand: Facebook Prophet when
+    available for seasonality decomposition and confidence intervals,
+    linear regression otherwise.
     """
     conn = None
     try:
@@ -34,38 +87,13 @@ async def predict_demand(
 
         cursor = conn.cursor()
 
-        # Try shipments table first, fall back to work_results
-        cursor.execute(
-            "SELECT EXISTS ("
-            "  SELECT 1 FROM information_schema.tables "
-            "  WHERE table_name = 'shipments'"
-            ")"
-        )
-        has_shipments = cursor.fetchone()[0]
-
-        if has_shipments:
-            cursor.execute(
-                "SELECT date_trunc('month', ship_date)::date AS ds, "
-                "SUM(qty) AS y "
-                "FROM shipments WHERE item_code = %s "
-                "GROUP BY ds ORDER BY ds "
-                "LIMIT %s",
-                (item_code, history_months),
-            )
-        else:
-            # Use work_results + work_orders as demand proxy
-            cursor.execute(
-                "SELECT date_trunc('month', wr.start_time)::date AS ds, "
-                "SUM(wr.good_qty) AS y "
-                "FROM work_results wr "
-                "JOIN work_orders wo ON wr.wo_id = wo.wo_id "
-                "WHERE wo.item_code = %s "
-                "GROUP BY ds ORDER BY ds "
-                "LIMIT %s",
-                (item_code, history_months),
-            )
-
-        rows = cursor.fetchall()
+        precomputed = _load_precomputed(cursor, item_code, history_months, prediction_months)
+        if precomputed is not None:
+            cursor.close()
+            return precomputed
+
+        cursor.execute(*series_query(cursor, history_months, item_code))
+        rows = [(ds, y) for _, ds, y in cursor.fetchall()]
         cursor.close()
 
         if len(rows) < 3:
@@ -75,9 +103,10 @@ async def predict_demand(
             }
 
         if HAS_PROPHET and len(rows) >= 4:
-            return _prophet_predict(rows, prediction_months, item_code)
-        else:
-            return _linear_predict(rows, prediction_months, item_code)
+            result = _prophet_predict(rows, prediction_months, item_code)
+            if result is not None:
+                return result
+        return _linear_predict(rows, prediction_months, item_code)
 
     except Exception as e:
         return {"error": str(e)}
@@ -86,27 +115,79 @@ async def predict_demand(
             release_conn(conn)
 
 
+def _load_precomputed(cursor, item_code, history_months, prediction_months):
+    """Latest batch forecast for the item, or None if missing/stale/different window."""
+    cursor.execute(
+        "SELECT result_json, created_at FROM ai_forecasts "
+        "WHERE model_type = %s AND item_code = %s AND created_at >= %s "
+        "ORDER BY created_at DESC LIMIT 1",
+        (MODEL_TYPE, item_code,
+         datetime.now() - timedelta(hours=FORECAST_MAX_AGE_HOURS)),
+    )
+    row = cursor.fetchone()
+    if not row:
+        return None
+    result, created_at = row
+    if (result.get("history_months") != history_months
+            or len(result.get("predictions", [])) < prediction_months):
+        return None
+    return {
+        **result,
+        "predictions": result["predictions"][:prediction_months],
+        "precomputed": True,
+        "generated_at": created_at.isoformat(timespec="seconds"),
+    }
+
+
+def forecast_series(item_code, rows, prediction_months):
+    """Fit one monthly series → result dict (batch worker; module level for the pool)."""
+    if HAS_PROPHET and len(rows) >= 4:
+        try:
+            model = _train_prophet(_prophet_frame(rows))
+            return _prophet_result(model, rows, prediction_months, item_code)
+        except Exception as e:
+            log.warning("Prophet fit failed for %s, using linear: %s", item_code, e)
+    return _linear_predict(rows, prediction_months, item_code)
+
+
+def _train_prophet(data):
+    """Background training job (module level so it can run in the process pool)."""
+    m = prophet.Prophet(
+        yearly_seasonality=True,
+        weekly_seasonality=False,
+        daily_seasonality=False,
+        seasonality_mode="multiplicative",
+    )
+    m.fit(data)
+    return m
+
+
 def _prophet_predict(rows, prediction_months, item_code):
-    """Prophet-based prediction with seasonality and confidence intervals."""
-    import pandas as pd
+    """Prophet-based prediction with seasonality and confidence intervals.
+
+    Returns None while the first model for this item is still training.
+    """
     from api_modules.ai_model_cache import ModelCache
 
+    df = _prophet_frame(rows)
+
+    # Last good model; (re)training runs in the background
+    model = ModelCache.get_or_schedule(f"prophet_{item_code}", _train_prophet, df)
+    if model is None:
+        return None
+    return _prophet_result(model, rows, prediction_months, item_code)
+
+
+def _prophet_frame(rows):
+    import pandas as pd
+
     df = pd.DataFrame(rows, columns=["ds", "y"])
     df["ds"] = pd.to_datetime(df["ds"])
     df["y"] = df["y"].astype(float)
+    return df
 
-    def train_prophet(data):
-        m = Prophet(
-            yearly_seasonality=True,
-            weekly_seasonality=False,
-            daily_seasonality=False,
-            seasonality_mode="multiplicative",
-        )
-        m.fit(data)
-        return m
-
-    model = ModelCache.get_or_train(f"prophet_{item_code}", train_prophet, df)
 
+def _prophet_result(model, rows, prediction_months, item_code):
     future = model.make_future_dataframe(periods=prediction_months, freq="MS")
     forecast = model.predict(future)
 
@@ -7,9 +7,17 @@ import hashlib
 import json
 import logging
 from api_modules.database import get_conn, release_conn
+from api_modules.pagination import (
+    TOTAL_MODES, count_rows, decode_cursor, keyset_condition, split_page,
+)
 
 log = logging.getLogger(__name__)
 
+# created_at 은 NULL 허용 — 행 비교에서 NULL 행이 빠지지 않도록 정렬 키를 맞춘다.
+# NULL 은 가장 오래된 것으로 취급해 목록 끝에 온다 (idx_audit_created_id 표현식 인덱스).
+_AUDIT_TS = "COALESCE(created_at, '-infinity'::timestamp)"
+_AUDIT_TS_MIN = "-infinity"
+
 
 def _compute_hash(audit_id, user_id, action, entity_type, entity_id,
                   old_values, new_values, prev_hash):
@@ -84,14 +92,30 @@ async def record_audit(user_id: str, action: str, entity_type: str,
 async def get_audit_logs(entity_type: str = None, entity_id: str = None,
                          user_id: str = None, action: str = None,
                          date_from: str = None, date_to: str = None,
-                         page: int = 1, page_size: int = 50) -> dict:
-    """FN-063: 감사 로그 조회 (필터 + 페이징)."""
+                         page: int = 1, page_size: int = 50,
+                         cursor: str = None, total_mode: str = None) -> dict:
+    """FN-063: 감사 로그 조회 (필터 + 페이징).
+
+    cursor 를 주면 (created_at, audit_id) 키셋 페이징으로 동작하고 page 는 무시한다.
+    created_at 이 NULL 인 행은 맨 뒤에 온다.
+    total_mode: exact | estimate | none (기본: page 모드 exact, cursor 모드 none)
+    """
+    total_mode = total_mode or ("none" if cursor else "exact")
+    if total_mode not in TOTAL_MODES:
+        return {"error": f"total_mode 는 {', '.join(TOTAL_MODES)} 중 하나여야 합니다."}
+    after = None
+    if cursor:
+        try:
+            after = decode_cursor(cursor, 2)
+        except ValueError:
+            return {"error": "잘못된 cursor 입니다."}
+
     conn = None
     try:
-        conn = get_conn()
+        conn = get_conn(readonly=True)
         if not conn:
             return {"error": "데이터베이스 연결에 실패했습니다."}
-        cursor = conn.cursor()
+        cur = conn.cursor()
 
         where = []
         params = []
@@ -115,24 +139,34 @@ async def get_audit_logs(entity_type: str = None, entity_id: str = None,
             params.append(date_to)
 
         where_clause = (" WHERE " + " AND ".join(where)) if where else ""
+        total = count_rows(cur, f"audit_trail{where_clause}", tuple(params),
+                           total_mode)
 
-        cursor.execute(f"SELECT COUNT(*) FROM audit_trail{where_clause}", tuple(params))
-        total = cursor.fetchone()[0]
+        if after:
+            cond, cond_params = keyset_condition(
+                (_AUDIT_TS, "audit_id"), after, desc=True)
+            where.append(cond)
+            params.extend(cond_params)
+            where_clause = " WHERE " + " AND ".join(where)
+            limit_sql, limit_params = "LIMIT %s", (page_size + 1,)
+        else:
+            limit_sql = "LIMIT %s OFFSET %s"
+            limit_params = (page_size + 1, (page - 1) * page_size)
 
-        offset = (page - 1) * page_size
-        cursor.execute(
+        cur.execute(
             f"""SELECT audit_id, user_id, action, entity_type, entity_id,
                        old_values, new_values, ip_address, reason,
                        prev_hash, record_hash, created_at
                 FROM audit_trail{where_clause}
-                ORDER BY created_at DESC
-                LIMIT %s OFFSET %s""",
-            tuple(params) + (page_size, offset),
+                ORDER BY {_AUDIT_TS} DESC, audit_id DESC
+                {limit_sql}""",
+            tuple(params) + limit_params,
         )
-        rows = cursor.fetchall()
-        cursor.close()
+        rows, next_cursor = split_page(cur.fetchall(), page_size,
+                                       lambda r: (r[11] or _AUDIT_TS_MIN, r[0]))
+        cur.close()
 
-        return {
+        result = {
             "items": [
                 {
                     "audit_id": r[0], "user_id": r[1], "action": r[2],
@@ -145,10 +179,14 @@ async def get_audit_logs(entity_type: str = None, entity_id: str = None,
                 for r in rows
             ],
             "total": total,
-            "page": page,
             "page_size": page_size,
-            "total_pages": (total + page_size - 1) // page_size,
+            "next_cursor": next_cursor,
         }
+        if not cursor:
+            result["page"] = page
+            if total is not None:
+                result["total_pages"] = (total + page_size - 1) // page_size
+        return result
     except Exception as e:
         log.error("감사 로그 조회 오류: %s", e)
         return {"error": "조회 중 오류가 발생했습니다."}
@@ -161,7 +199,7 @@ async def verify_chain_integrity(limit: int = 1000) -> dict:
     """NFR-014: Hash chain 무결성 검증."""
     conn = None
     try:
-        conn = get_conn()
+        conn = get_conn(readonly=True)
         if not conn:
             return {"error": "데이터베이스 연결에 실패했습니다."}
         cursor = conn.cursor()
@@ -215,7 +253,7 @@ async def get_audit_summary() -> dict:
     """감사 로그 요약 대시보드."""
     conn = None
     try:
-        conn = get_conn()
+        conn = get_conn(readonly=True)
         if not conn:
             return {"error": "데이터베이스 연결에 실패했습니다."}
         cursor = conn.cursor()
@@ -2,6 +2,7 @@
 
 import logging
 from api_modules.database import get_conn, release_conn
+from api_modules.doc_numbering import next_doc_no
 
 log = logging.getLogger(__name__)
 
@@ -20,12 +21,8 @@ async def create_batch(data: dict) -> dict:
             return {"error": "데이터베이스 연결에 실패했습니다."}
         cursor = conn.cursor()
 
-        from datetime import datetime
-        today = datetime.now().strftime("%Y%m%d")
-        cursor.execute("SELECT COUNT(*) FROM batch_orders WHERE batch_code LIKE %s",
-                       (f"BAT-{today}-%",))
-        seq = (cursor.fetchone()[0] or 0) + 1
-        batch_code = f"BAT-{today}-{seq:03d}"
+        batch_code = next_doc_no(cursor, "BAT",
+                                 seed=("batch_orders", "batch_code"))
 
         cursor.execute(
             """INSERT INTO batch_orders
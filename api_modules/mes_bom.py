@@ -1,10 +1,14 @@
 """FN-008~009: BOM (Bill of Materials) management module."""
 
+from api_modules.cache import cache_delete, cache_get, cache_set
 from api_modules.database import db_connection, get_conn, release_conn
 
 
 async def list_bom() -> dict:
     """List all BOM entries with parent/child item details."""
+    cached = cache_get("bom:list")
+    if cached:
+        return cached
     try:
         with db_connection() as conn:
             if not conn:
@@ -29,7 +33,9 @@ async def list_bom() -> dict:
                 }
                 for r in rows
             ]
-            return {"entries": entries, "total": len(entries)}
+            result = {"entries": entries, "total": len(entries)}
+            cache_set("bom:list", result, ttl=300)
+            return result
     except Exception as e:
         return {"error": str(e), "entries": [], "total": 0}
 
@@ -41,6 +47,10 @@ async def where_used(item_code: str) -> dict:
     or indirectly use the given item as a component.
     Each result includes a 'level' field (1 = direct parent, 2+ = grandparent).
     """
+    cache_key = f"bom:where_used:{item_code}"
+    cached = cache_get(cache_key)
+    if cached:
+        return cached
     try:
         with db_connection() as conn:
             if not conn:
@@ -75,13 +85,19 @@ async def where_used(item_code: str) -> dict:
 
             _walk_up(item_code, 1)
             cursor.close()
-            return {"item_code": item_code, "used_in": all_parents, "count": len(all_parents)}
+            result = {"item_code": item_code, "used_in": all_parents,
+                      "count": len(all_parents)}
+            cache_set(cache_key, result, ttl=300)
+            return result
     except Exception as e:
         return {"error": str(e), "used_in": [], "count": 0}
 
 
 async def bom_summary() -> dict:
     """Summary statistics for BOM data."""
+    cached = cache_get("bom:summary")
+    if cached:
+        return cached
     try:
         with db_connection() as conn:
             if not conn:
@@ -103,12 +119,14 @@ async def bom_summary() -> dict:
                 for r in cursor.fetchall()
             ]
             cursor.close()
-            return {
+            result = {
                 "total_entries": total_entries,
                 "parent_count": parent_count,
                 "child_count": child_count,
                 "top_parents": top_parents,
             }
+            cache_set("bom:summary", result, ttl=300)
+            return result
     except Exception as e:
         return {"error": str(e)}
 
@@ -172,6 +190,7 @@ async def create_bom(data: dict) -> dict:
         bom_id = cursor.fetchone()[0]
         conn.commit()
         cursor.close()
+        cache_delete("bom:*")
         return {"bom_id": bom_id, "success": True}
     except Exception:
         if conn:
@@ -220,6 +239,7 @@ async def update_bom(bom_id: int, data: dict) -> dict:
         cursor.execute(f"UPDATE bom SET {', '.join(sets)} WHERE bom_id = %s", params)
         conn.commit()
         cursor.close()
+        cache_delete("bom:*")
         return {"success": True, "bom_id": bom_id}
     except Exception:
         if conn:
@@ -243,6 +263,7 @@ async def delete_bom(bom_id: int) -> dict:
             return {"error": "BOM 항목을 찾을 수 없습니다."}
         conn.commit()
         cursor.close()
+        cache_delete("bom:*")
         return {"success": True, "deleted": bom_id}
     except Exception:
         if conn:
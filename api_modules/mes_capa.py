@@ -1,8 +1,8 @@
 """FN-041~043: CAPA 프로세스 — 등록, 상태 전이, 목록 조회."""
 
 import logging
-from datetime import date
 from api_modules.database import get_conn, release_conn
+from api_modules.doc_numbering import next_doc_no
 
 log = logging.getLogger(__name__)
 
@@ -36,11 +36,7 @@ async def create_capa(data: dict) -> dict:
             return {"error": "capa_type은 CORRECTIVE 또는 PREVENTIVE여야 합니다."}
 
         # CAPA ID 생성
-        date_part = date.today().strftime("%Y%m%d")
-        cursor.execute("SELECT COUNT(*) FROM capa WHERE capa_id LIKE %s",
-                        (f"CAPA-{date_part}-%",))
-        seq = cursor.fetchone()[0] + 1
-        capa_id = f"CAPA-{date_part}-{seq:03d}"
+        capa_id = next_doc_no(cursor, "CAPA", seed=("capa", "capa_id"))
 
         cursor.execute(
             """INSERT INTO capa (capa_id, capa_type, source_type, source_id,
@@ -20,7 +20,7 @@ async def get_production_dashboard_data():
     당일 품목별 목표수량 대비 실적수량 및 라인별 달성률을 집계합니다.
     """
     try:
-        with db_connection() as conn:
+        with db_connection(readonly=True) as conn:
             if not conn:
                 return []
             cursor = conn.cursor(cursor_factory=psycopg2.extras.RealDictCursor)
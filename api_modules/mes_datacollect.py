@@ -2,6 +2,7 @@
 
 import logging
 from api_modules.database import get_conn, release_conn
+from api_modules.sensor_rollups import GRAINS, merge_stats, pick_grain
 
 log = logging.getLogger(__name__)
 
@@ -99,7 +100,17 @@ async def get_realtime_sensor(equip_code: str,
                                sensor_type: str = None,
                                minutes: int = 30,
                                interval: str = "raw") -> dict:
-    """센서 데이터 실시간 조회."""
+    """센서 데이터 실시간 조회.
+
+    interval: raw | 1min | 5min | 1h | 1d | auto (조회 구간에 맞는 grain 자동 선택).
+    raw 외에는 sensor_rollups 롤업 행만 읽는다. 구간과 일부만 겹치는 첫 버킷도 포함한다
+    (버킷 끝 bucket_start + grain 이 구간 시작보다 뒤인 버킷).
+    """
+    if interval == "auto":
+        interval = pick_grain(minutes)
+    if interval != "raw" and interval not in GRAINS:
+        return {"error": f"interval은 raw, auto, {', '.join(GRAINS)} 중 하나여야 합니다."}
+
     conn = None
     try:
         conn = get_conn()
@@ -118,57 +129,50 @@ async def get_realtime_sensor(equip_code: str,
                 params.append(sensor_type)
             sql += " ORDER BY collected_at"
             cursor.execute(sql, tuple(params))
+            # raw 행도 (cnt, sum, sumsq, min, max) 버킷 형태로 맞춰 통계 공통 처리
+            rows = [
+                (r[0], r[2], 1, float(r[1]), float(r[1]) ** 2, r[1], r[1])
+                if r[1] is not None else (r[0], r[2], 0, 0.0, 0.0, None, None)
+                for r in cursor.fetchall()
+            ]
         else:
-            # 집계 (1min / 5min)
-            bucket = 1 if interval == "1min" else 5
-            sql = """SELECT sensor_type,
-                            AVG(value) AS avg_val,
-                            date_trunc('hour', collected_at)
-                              + (EXTRACT(MINUTE FROM collected_at)::int / %s * %s)
-                              * INTERVAL '1 minute' AS bucket_time
-                     FROM sensor_data
-                     WHERE equip_code = %s
-                       AND collected_at >= NOW() - INTERVAL '%s minutes'"""
-            params = [bucket, bucket, equip_code, minutes]
+            sql = """SELECT sensor_type, bucket_start, cnt, sum_val, sumsq_val,
+                            min_val, max_val
+                     FROM sensor_rollups
+                     WHERE equip_code = %s AND grain = %s
+                       AND bucket_start > NOW() - %s * INTERVAL '1 minute'
+                                          - %s * INTERVAL '1 second'"""
+            params = [equip_code, interval, minutes,
+                      int(GRAINS[interval].total_seconds())]
             if sensor_type and sensor_type != "all":
                 sql += " AND sensor_type = %s"
                 params.append(sensor_type)
-            sql += " GROUP BY sensor_type, bucket_time ORDER BY bucket_time"
+            sql += " ORDER BY bucket_start"
             cursor.execute(sql, tuple(params))
-
-        rows = cursor.fetchall()
+            rows = cursor.fetchall()
 
         # 센서별 그룹핑
         sensors = {}
-        for r in rows:
-            st = r[0]
-            if st not in sensors:
-                sensors[st] = {"type": st, "data": [], "values": []}
-            val = float(r[1]) if r[1] else 0
-            sensors[st]["data"].append({
-                "timestamp": r[2].isoformat() if r[2] else None,
-                "value": round(val, 4),
-            })
-            sensors[st]["values"].append(val)
-
-        # 통계 계산
-        result_sensors = []
-        for st, info in sensors.items():
-            vals = info["values"]
-            n = len(vals)
-            avg_v = sum(vals) / n if n else 0
-            std_v = (sum((v - avg_v) ** 2 for v in vals) / n) ** 0.5 if n > 1 else 0
-            result_sensors.append({
-                "type": st,
-                "data": info["data"],
-                "stats": {
-                    "min": round(min(vals), 4) if vals else 0,
-                    "max": round(max(vals), 4) if vals else 0,
-                    "avg": round(avg_v, 4),
-                    "std": round(std_v, 4),
-                    "count": n,
-                },
-            })
+        for st, ts, cnt, sum_v, sumsq_v, min_v, max_v in rows:
+            info = sensors.setdefault(st, {"data": [], "buckets": []})
+            point = {
+                "timestamp": ts.isoformat() if ts else None,
+                "value": round(sum_v / cnt, 4) if cnt else 0,
+            }
+            if interval != "raw":
+                point.update({
+                    "min": float(min_v) if min_v is not None else None,
+                    "max": float(max_v) if max_v is not None else None,
+                    "count": cnt,
+                })
+            info["data"].append(point)
+            info["buckets"].append((cnt, sum_v, sumsq_v, min_v, max_v))
+
+        result_sensors = [
+            {"type": st, "data": info["data"],
+             "stats": merge_stats(info["buckets"])}
+            for st, info in sensors.items()
+        ]
 
         # 마지막 수신 시각
         cursor.execute(
@@ -1,20 +1,29 @@
 """REQ-024, FN-028: Defect prediction using XGBoost+SHAP (fallback: threshold scoring)."""
 
 import logging
+import os
+
 import numpy as np
 from api_modules.database import get_conn, release_conn
+from api_modules.lazy_import import available, lazy_module
 
 log = logging.getLogger(__name__)
 
-try:
-    import xgboost as xgb
-    import shap
-    HAS_XGBOOST = True
-except ImportError:
-    HAS_XGBOOST = False
+# Imported on first training / explanation (not at API start-up)
+xgb = lazy_module("xgboost")
+shap = lazy_module("shap")
+HAS_XGBOOST = available("xgboost") and available("shap")
+if not HAS_XGBOOST:
     log.warning("XGBoost/SHAP not installed – falling back to threshold scoring.")
 
 
+FEATURES = ("temperature", "pressure", "speed", "humidity")
+_DEFAULTS = np.array([200.0, 10.0, 50.0, 55.0])  # XGBoost 입력 누락값
+TRAINING_ROWS = 500
+BATCH_MAX_ROWS = int(os.getenv("DEFECT_BATCH_MAX_ROWS", "10000"))
+BATCH_MAX_TOP_K = 100
+
+
 async def predict_defect_probability(process_params: dict) -> dict:
     """Predict defect probability based on process parameters.
 
@@ -29,22 +38,14 @@ async def predict_defect_probability(process_params: dict) -> dict:
             return _threshold_predict(process_params)
 
         cursor = conn.cursor()
-
-        # Load training data from defect_history
-        cursor.execute(
-            "SELECT temperature, pressure, speed, humidity, "
-            "defect_count, total_count "
-            "FROM defect_history "
-            "WHERE total_count > 0 "
-            "ORDER BY recorded_at DESC LIMIT 500"
-        )
-        rows = cursor.fetchall()
+        rows = _load_training_rows(cursor)
         cursor.close()
 
         if HAS_XGBOOST and len(rows) >= 10:
-            return _xgboost_predict(rows, process_params)
-        else:
-            return _threshold_predict(process_params, rows if rows else None)
+            result = _xgboost_predict(rows, process_params)
+            if result is not None:
+                return result
+        return _threshold_predict(process_params, rows if rows else None)
 
     except Exception as e:
         log.error("Defect prediction error: %s", e)
@@ -54,79 +55,176 @@ async def predict_defect_probability(process_params: dict) -> dict:
             release_conn(conn)
 
 
-def _xgboost_predict(rows, process_params):
-    """XGBoost-based prediction with SHAP factor analysis."""
-    feature_names = ["temperature", "pressure", "speed", "humidity"]
-
-    # Build training data
-    X_train = []
-    y_train = []
-    for row in rows:
-        temp, pres, spd, hum, defects, total = row
-        features = [
-            float(temp) if temp else 0,
-            float(pres) if pres else 0,
-            float(spd) if spd else 0,
-            float(hum) if hum else 0,
-        ]
-        X_train.append(features)
-        defect_rate = float(defects) / float(total) if total > 0 else 0
-        y_train.append(defect_rate)
+async def predict_defect_batch(data: dict) -> dict:
+    """Score many parameter sets at once (what-if sweeps, recipe screening).
 
-    X_train = np.array(X_train)
-    y_train = np.array(y_train)
+    data:
+        param_sets: [{"temperature", "pressure", "speed", "humidity"}, ...]
+                    (up to DEFECT_BATCH_MAX_ROWS)
+        top_k: number of highest-risk rows returned in "top" (default 10)
+        explain: SHAP factors for the "top" rows only (default false)
+    Training data is loaded once and the whole matrix goes through a single
+    model.predict call; without a model the threshold scoring is vectorized.
+    "predictions" keep the input order.
+    """
+    data = data or {}
+    param_sets = data.get("param_sets")
+    if not isinstance(param_sets, list) or not param_sets:
+        return {"error": "param_sets must be a non-empty list."}
+    if len(param_sets) > BATCH_MAX_ROWS:
+        return {"error": f"param_sets exceeds {BATCH_MAX_ROWS} rows."}
+    try:
+        X = _param_matrix(param_sets)
+        top_k = max(0, min(int(data.get("top_k", 10)), BATCH_MAX_TOP_K))
+    except (TypeError, ValueError, AttributeError):
+        return {"error": "param_sets values must be numeric objects."}
+    explain = bool(data.get("explain"))
 
-    # Train XGBoost model (with caching)
-    from api_modules.ai_model_cache import ModelCache
+    rows = []
+    conn = None
+    try:
+        conn = get_conn(readonly=True)
+        if conn:
+            cursor = conn.cursor()
+            rows = _load_training_rows(cursor)
+            cursor.close()
+    except Exception as e:
+        log.error("Defect batch training data error: %s", e)
+    finally:
+        if conn:
+            release_conn(conn)
 
-    def train_xgb(data):
-        X, y = data
-        m = xgb.XGBRegressor(
-            n_estimators=100,
-            max_depth=4,
-            learning_rate=0.1,
-            objective="reg:squarederror",
-            random_state=42,
-        )
-        m.fit(X, y)
-        return m
+    model = _get_model(rows) if HAS_XGBOOST and len(rows) >= 10 else None
+    if model is not None:
+        X_input = _fill_defaults(X)
+        probs = np.clip(model.predict(X_input).astype(float), 0.0, 1.0)
+        levels = _risk_levels(probs, 0.1, 0.05)
+        name = "XGBoost"
+    else:
+        probs, contrib = _threshold_batch(X, rows if len(rows) >= 5 else None)
+        levels = _risk_levels(probs, 0.3, 0.1)
+        name = "ThresholdScoring"
+
+    pct = np.round(probs * 100, 1)
+    predictions = [
+        {"index": i, "defect_prob": float(pct[i]), "risk_level": levels[i]}
+        for i in range(len(probs))
+    ]
+    order = np.argsort(-probs, kind="stable")[:top_k]
+    top = [dict(predictions[i]) for i in order]
+    if explain and len(order):
+        if model is not None:
+            factors = _explain(model, X_input[order])
+        else:
+            factors = [_threshold_factors(X[i], contrib[i]) for i in order]
+        for entry, f in zip(top, factors):
+            entry["factors"] = f
+            entry["params"] = param_sets[entry["index"]]
+
+    return {
+        "model": name,
+        "count": len(predictions),
+        "predictions": predictions,
+        "top": top,
+        "summary": {lv.lower(): int(np.sum(levels == lv)) for lv in ("HIGH", "MEDIUM", "LOW")},
+        "training_samples": len(rows),
+    }
 
-    model = ModelCache.get_or_train(
-        f"xgb_defect_{item_code}", train_xgb, (X_train, y_train)
+
+def _load_training_rows(cursor):
+    cursor.execute(
+        "SELECT temperature, pressure, speed, humidity, "
+        "defect_count, total_count "
+        "FROM defect_history "
+        "WHERE total_count > 0 "
+        "ORDER BY recorded_at DESC LIMIT %s",
+        (TRAINING_ROWS,),
     )
+    return cursor.fetchall()
 
-    # Predict for input params
-    X_input = np.array([[
-        float(process_params.get("temperature", process_params.get("temp", 200))),
-        float(process_params.get("pressure", 10)),
-        float(process_params.get("speed", 50)),
-        float(process_params.get("humidity", 55)),
-    ]])
 
-    predicted_rate = float(model.predict(X_input)[0])
-    predicted_rate = max(0.0, min(1.0, predicted_rate))
+def _param_matrix(param_sets):
+    """(n, 4) float matrix; missing values are NaN."""
+    X = np.full((len(param_sets), len(FEATURES)), np.nan)
+    for i, params in enumerate(param_sets):
+        for j, name in enumerate(FEATURES):
+            val = params.get(name, params.get(name[:4]))
+            if val is not None:
+                X[i, j] = float(val)
+    return X
 
-    # SHAP analysis for factor contributions
-    factors = []
+
+def _fill_defaults(X):
+    return np.where(np.isnan(X), _DEFAULTS, X)
+
+
+def _risk_levels(probs, high, medium):
+    return np.where(probs > high, "HIGH", np.where(probs > medium, "MEDIUM", "LOW"))
+
+
+def _train_xgb(data):
+    """Background training job (module level so it can run in the process pool)."""
+    X, y = data
+    m = xgb.XGBRegressor(
+        n_estimators=100,
+        max_depth=4,
+        learning_rate=0.1,
+        objective="reg:squarederror",
+        random_state=42,
+    )
+    m.fit(X, y)
+    return m
+
+
+def _get_model(rows):
+    """Last good model for defect_history; None while the first one trains."""
+    arr = np.array([[float(v) if v else 0.0 for v in row] for row in rows])
+    X_train = arr[:, :4]
+    total = arr[:, 5]
+    y_train = np.divide(arr[:, 4], total, out=np.zeros(len(arr)), where=total > 0)
+
+    from api_modules.ai_model_cache import ModelCache
+
+    # defect_history 전체로 학습하는 단일 모델 (품목별 아님)
+    return ModelCache.get_or_schedule("xgb_defect", _train_xgb, (X_train, y_train))
+
+
+def _explain(model, X):
+    """Factor list per row of X: SHAP values, or feature importances if SHAP fails.
+
+    The TreeExplainer is built once per model and cached alongside it.
+    """
     try:
-        explainer = shap.TreeExplainer(model)
-        shap_values = explainer.shap_values(X_input)
-        for i, name in enumerate(feature_names):
-            factors.append({
-                "name": name,
-                "value": float(X_input[0][i]),
-                "contribution": round(float(shap_values[0][i]), 4),
-            })
-        factors.sort(key=lambda x: abs(x["contribution"]), reverse=True)
+        from api_modules.ai_model_cache import ModelCache
+        explainer = ModelCache.get_companion(
+            "xgb_defect", model, "shap", lambda: shap.TreeExplainer(model))
+        values = np.asarray(explainer.shap_values(X))
     except Exception:
-        # Fallback to feature importance if SHAP fails
-        importances = model.feature_importances_
-        for i, name in enumerate(feature_names):
-            factors.append({
-                "name": name,
-                "value": float(X_input[0][i]),
-                "contribution": round(float(importances[i]), 4),
-            })
+        values = np.tile(model.feature_importances_, (len(X), 1))
+    result = []
+    for x, contrib in zip(X, values):
+        factors = [
+            {"name": name, "value": float(x[j]), "contribution": round(float(contrib[j]), 4)}
+            for j, name in enumerate(FEATURES)
+        ]
+        factors.sort(key=lambda f: abs(f["contribution"]), reverse=True)
+        result.append(factors)
+    return result
+
+
+def _xgboost_predict(rows, process_params):
+    """XGBoost-based prediction with SHAP factor analysis.
+
+    Returns None while the first model is still training.
+    """
+    model = _get_model(rows)
+    if model is None:
+        return None
+
+    X_input = _fill_defaults(_param_matrix([process_params]))
+    predicted_rate = float(model.predict(X_input)[0])
+    predicted_rate = max(0.0, min(1.0, predicted_rate))
+    factors = _explain(model, X_input)[0]
 
     # Risk level and recommendation
     if predicted_rate > 0.1:
@@ -151,8 +249,8 @@ def _xgboost_predict(rows, process_params):
     }
 
 
-def _threshold_predict(process_params, training_data=None):
-    """Threshold-based fallback prediction."""
+def _thresholds(training_data=None):
+    """Parameter ranges + weights (derived from data when there is enough)."""
     if training_data and len(training_data) >= 5:
         # Derive dynamic thresholds from data
         temps = [float(r[0]) for r in training_data if r[0]]
@@ -167,19 +265,42 @@ def _threshold_predict(process_params, training_data=None):
             std = (sum((v - avg) ** 2 for v in vals) / len(vals)) ** 0.5
             return avg - 2 * std, avg + 2 * std
 
-        thresholds = {
+        return {
             "temperature": {"min": _range(temps)[0], "max": _range(temps)[1], "weight": 0.4},
             "pressure": {"min": _range(press)[0], "max": _range(press)[1], "weight": 0.3},
             "speed": {"min": _range(spds)[0], "max": _range(spds)[1], "weight": 0.2},
             "humidity": {"min": _range(hums)[0], "max": _range(hums)[1], "weight": 0.1},
         }
-    else:
-        thresholds = {
-            "temperature": {"min": 180, "max": 220, "weight": 0.4},
-            "pressure": {"min": 8, "max": 12, "weight": 0.3},
-            "speed": {"min": 45, "max": 55, "weight": 0.2},
-            "humidity": {"min": 50, "max": 70, "weight": 0.1},
-        }
+    return {
+        "temperature": {"min": 180, "max": 220, "weight": 0.4},
+        "pressure": {"min": 8, "max": 12, "weight": 0.3},
+        "speed": {"min": 45, "max": 55, "weight": 0.2},
+        "humidity": {"min": 50, "max": 70, "weight": 0.1},
+    }
+
+
+def _threshold_batch(X, training_data=None):
+    """Vectorized threshold scoring → (probs (n,), contributions (n, 4))."""
+    thresholds = _thresholds(training_data)
+    lo = np.array([thresholds[f]["min"] for f in FEATURES])
+    hi = np.array([thresholds[f]["max"] for f in FEATURES])
+    weight = np.array([thresholds[f]["weight"] for f in FEATURES])
+    with np.errstate(invalid="ignore"):
+        out = ~np.isnan(X) & ((X < lo) | (X > hi))
+    contrib = out * weight
+    return np.minimum(1.0, contrib.sum(axis=1)), contrib
+
+
+def _threshold_factors(x, contrib):
+    return [
+        {"name": name, "value": float(x[j]), "contribution": round(float(contrib[j]), 4)}
+        for j, name in enumerate(FEATURES) if contrib[j] > 0
+    ]
+
+
+def _threshold_predict(process_params, training_data=None):
+    """Threshold-based fallback prediction."""
+    thresholds = _thresholds(training_data)
 
     defect_prob = 0.0
     factors = []
@@ -2,6 +2,7 @@
 
 import logging
 from api_modules.database import get_conn, release_conn
+from api_modules.doc_numbering import next_doc_no
 
 log = logging.getLogger(__name__)
 
@@ -30,8 +31,6 @@ async def auto_dispatch(plan_id: int = None) -> dict:
             cursor.close()
             return {"info": "디스패칭 대상 계획이 없습니다.", "created": 0}
 
-        from datetime import datetime
-        today = datetime.now().strftime("%Y%m%d")
 
         created = []
         for p in plans:
@@ -45,11 +44,10 @@ async def auto_dispatch(plan_id: int = None) -> dict:
             if cursor.fetchone()[0] > 0:
                 continue
 
-            # WO 코드 생성
-            cursor.execute("SELECT COUNT(*) FROM work_orders WHERE wo_code LIKE %s",
-                           (f"WO-{today}-%",))
-            seq = (cursor.fetchone()[0] or 0) + 1
-            wo_code = f"WO-{today}-{seq:03d}"
+            # WO 코드 생성 — mes_work.create_work_order 와 같은 "WO" 카운터이므로
+            # 시드 컬럼도 같아야 한다 (work_orders.wo_id)
+            wo_code = next_doc_no(cursor, "WO",
+                                  seed=("work_orders", "wo_id"))
 
             cursor.execute(
                 """INSERT INTO work_orders
@@ -1,9 +1,9 @@
 """REQ-056: 출하판정 (Shipment Disposition)."""
 
 import logging
-from datetime import datetime
 
 from api_modules.database import get_conn, release_conn
+from api_modules.doc_numbering import next_doc_no
 
 log = logging.getLogger(__name__)
 
@@ -28,13 +28,8 @@ async def create_disposition(data: dict, user_id: str = None) -> dict:
             return {"error": "데이터베이스 연결에 실패했습니다."}
         cursor = conn.cursor()
 
-        today = datetime.now().strftime("%Y%m%d")
-        cursor.execute(
-            "SELECT COUNT(*) FROM shipment_disposition WHERE disp_id LIKE %s",
-            (f"DSP-{today}-%",),
-        )
-        seq = (cursor.fetchone()[0] or 0) + 1
-        disp_id = f"DSP-{today}-{seq:03d}"
+        disp_id = next_doc_no(cursor, "DSP",
+                              seed=("shipment_disposition", "disp_id"))
 
         cursor.execute(
             """INSERT INTO shipment_disposition
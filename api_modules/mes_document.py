@@ -2,9 +2,9 @@
 
 import logging
 import os
-from datetime import datetime
 
 from api_modules.database import get_conn, release_conn
+from api_modules.doc_numbering import next_doc_no
 
 log = logging.getLogger(__name__)
 
@@ -24,13 +24,8 @@ async def create_document(data: dict, user_id: str = None) -> dict:
             return {"error": "데이터베이스 연결에 실패했습니다."}
         cursor = conn.cursor()
 
-        today = datetime.now().strftime("%Y%m%d")
-        cursor.execute(
-            "SELECT COUNT(*) FROM documents WHERE doc_code LIKE %s",
-            (f"DOC-{today}-%",),
-        )
-        seq = (cursor.fetchone()[0] or 0) + 1
-        doc_code = f"DOC-{today}-{seq:03d}"
+        doc_code = next_doc_no(cursor, "DOC",
+                               seed=("documents", "doc_code"))
 
         cursor.execute(
             """INSERT INTO documents
@@ -2,6 +2,7 @@
 
 import logging
 from api_modules.database import get_conn, release_conn
+from api_modules.doc_numbering import next_doc_no
 
 log = logging.getLogger(__name__)
 
@@ -27,12 +28,8 @@ async def create_ecr(data: dict) -> dict:
             return {"error": "데이터베이스 연결에 실패했습니다."}
         cursor = conn.cursor()
 
-        from datetime import datetime
-        today = datetime.now().strftime("%Y%m%d")
-        cursor.execute("SELECT COUNT(*) FROM ecm_requests WHERE ecr_code LIKE %s",
-                       (f"ECR-{today}-%",))
-        seq = (cursor.fetchone()[0] or 0) + 1
-        ecr_code = f"ECR-{today}-{seq:03d}"
+        ecr_code = next_doc_no(cursor, "ECR",
+                               seed=("ecm_requests", "ecr_code"))
 
         import json
         cursor.execute(
@@ -1,22 +1,34 @@
 """FN-013~014, FN-032~034: Equipment management module."""
 
 import logging
+import os
 from datetime import datetime, timedelta
 
 from api_modules.database import get_conn, release_conn
-from api_modules.cache import cache_get, cache_set, cache_delete
+from api_modules.cache import cache_delete, get_or_compute
+from api_modules.lazy_import import available, lazy_module
 
 log = logging.getLogger(__name__)
 
 try:
     import numpy as np
-    from sklearn.ensemble import IsolationForest
-    HAS_IFOREST = True
 except ImportError:
     np = None
-    HAS_IFOREST = False
+
+# scikit-learn is imported on first training (not at API start-up)
+sklearn_ensemble = lazy_module("sklearn.ensemble")
+HAS_IFOREST = np is not None and available("sklearn")
+if not HAS_IFOREST:
     log.warning("numpy/scikit-learn not installed – falling back to rule-based failure prediction.")
 
+FLEET_HISTORY_LIMIT = 200
+FLEET_LOOKBACK_DAYS = int(os.getenv("FAILURE_FLEET_LOOKBACK_DAYS", "7"))
+_FEATURES = ("vibration", "temperature", "current")
+# Rule-based thresholds (same as _rule_based_predict): threshold, span, weight
+_RULE_THRESHOLD = (3.0, 60.0, 15.0)
+_RULE_SPAN = (3.0, 30.0, 10.0)
+_RULE_WEIGHT = (0.4, 0.35, 0.25)
+
 
 async def create_equipment(data: dict) -> dict:
     """FN-013: Register a new equipment."""
@@ -67,17 +79,22 @@ async def create_equipment(data: dict) -> dict:
 
 async def get_equipments(process_code: str = None,
                          status: str = None) -> dict:
-    """FN-014: List equipments with optional filters."""
-    cache_key = f"equip:list:{process_code}:{status}"
-    cached = cache_get(cache_key)
-    if cached:
-        return cached
+    """FN-014: List equipments with optional filters.
+
+    Concurrent misses (e.g. many terminals polling) share one query.
+    """
+    result = await get_or_compute(
+        f"equip:list:{process_code}:{status}",
+        lambda: _load_equipments(process_code, status), ttl=30)
+    return {"equipments": []} if result is None else result
 
+
+def _load_equipments(process_code, status):
     conn = None
     try:
         conn = get_conn()
         if not conn:
-            return {"equipments": []}
+            return None
 
         cursor = conn.cursor()
 
@@ -110,9 +127,7 @@ async def get_equipments(process_code: str = None,
             }
             for r in rows
         ]
-        result = {"equipments": equipments}
-        cache_set(cache_key, result, ttl=30)
-        return result
+        return {"equipments": equipments}
     except Exception as e:
         return {"error": str(e)}
     finally:
@@ -303,11 +318,14 @@ async def predict_failure(data: dict) -> dict:
         else:
             history = []
 
+        result = None
         if HAS_IFOREST and len(history) >= 10:
             input_features = np.array([[vibration, temperature, current_amp]])
             result = _iforest_predict(history, input_features, equip_code)
-        else:
+        if result is None:
             result = _rule_based_predict(vibration, temperature, current_amp)
+            if HAS_IFOREST and len(history) >= 10:
+                result["model_status"] = "training"  # 첫 모델 학습 중
 
         return result
     except Exception as e:
@@ -317,26 +335,33 @@ async def predict_failure(data: dict) -> dict:
             release_conn(conn)
 
 
+def _train_iforest(data):
+    """Background training job (module level so it can run in the process pool)."""
+    m = sklearn_ensemble.IsolationForest(
+        n_estimators=100,
+        contamination=0.1,
+        random_state=42,
+    )
+    m.fit(data)
+    return m
+
+
 def _iforest_predict(history, input_features, equip_code):
-    """IsolationForest anomaly detection with remaining life estimation."""
+    """IsolationForest anomaly detection with remaining life estimation.
+
+    Returns None while the first model for this equipment is still training.
+    """
     X_hist = np.array([
         [float(r[0] or 0), float(r[1] or 0), float(r[2] or 0)]
         for r in history
     ])
 
-    # Train IsolationForest (with caching)
+    # Last good model; (re)training runs in the background
     from api_modules.ai_model_cache import ModelCache
 
-    def train_iforest(data):
-        m = IsolationForest(
-            n_estimators=100,
-            contamination=0.1,
-            random_state=42,
-        )
-        m.fit(data)
-        return m
-
-    clf = ModelCache.get_or_train(f"iforest_{equip_code}", train_iforest, X_hist)
+    clf = ModelCache.get_or_schedule(f"iforest_{equip_code}", _train_iforest, X_hist)
+    if clf is None:
+        return None
 
     # Anomaly score: sklearn returns negative scores (lower = more anomalous)
     raw_score = clf.decision_function(input_features)[0]
@@ -384,6 +409,157 @@ def _iforest_predict(history, input_features, equip_code):
     }
 
 
+async def predict_failure_fleet(data: dict = None) -> dict:
+    """Failure risk for the whole fleet in one round trip.
+
+    data (all optional):
+        readings: [{"equip_code", "vibration", "temperature", "current"}, ...]
+                  — default: latest equip_sensors row per equipment
+        equip_codes: restrict the latest-reading lookup to these equipments
+        history_limit: history rows per equipment (default 200)
+    Histories are loaded with one LATERAL query; scoring is vectorized per
+    IsolationForest model (one per equipment) and rule-based for the rest.
+    Nothing is inserted and no model is trained inline.
+    """
+    if np is None:
+        return {"error": "numpy is not installed."}
+    data = data or {}
+    history_limit = max(10, min(int(data.get("history_limit") or FLEET_HISTORY_LIMIT), 1000))
+    since = datetime.now() - timedelta(days=FLEET_LOOKBACK_DAYS)
+    conn = None
+    try:
+        conn = get_conn(readonly=True)
+        if not conn:
+            return {"error": "Database connection failed."}
+        cursor = conn.cursor()
+
+        if data.get("readings"):
+            readings = [
+                (str(r["equip_code"]), float(r.get("vibration") or 0),
+                 float(r.get("temperature") or 0), float(r.get("current") or 0), None)
+                for r in data["readings"] if isinstance(r, dict) and r.get("equip_code")
+            ]
+        else:
+            codes = data.get("equip_codes")
+            cursor.execute(
+                "SELECT e.equip_code, s.vibration, s.temperature, s.current_amp, "
+                "s.recorded_at "
+                "FROM equipments e "
+                "CROSS JOIN LATERAL ("
+                "  SELECT vibration, temperature, current_amp, recorded_at "
+                "  FROM equip_sensors es "
+                "  WHERE es.equip_code = e.equip_code AND es.recorded_at >= %s "
+                "  ORDER BY es.recorded_at DESC LIMIT 1) s "
+                + ("WHERE e.equip_code = ANY(%s) " if codes else "")
+                + "ORDER BY e.equip_code",
+                [since, list(codes)] if codes else [since],
+            )
+            readings = [(r[0], float(r[1] or 0), float(r[2] or 0), float(r[3] or 0), r[4])
+                        for r in cursor.fetchall()]
+        if not readings:
+            cursor.close()
+            return {"equipments": [], "total": 0, "summary": {"high": 0, "medium": 0, "low": 0}}
+
+        codes = sorted({r[0] for r in readings})
+        cursor.execute(
+            "SELECT c.code, h.vibration, h.temperature, h.current_amp "
+            "FROM unnest(%s::varchar[]) AS c(code) "
+            "CROSS JOIN LATERAL ("
+            "  SELECT vibration, temperature, current_amp FROM equip_sensors es "
+            "  WHERE es.equip_code = c.code ORDER BY es.recorded_at DESC LIMIT %s) h",
+            (codes, history_limit),
+        )
+        hist_rows = cursor.fetchall()
+        cursor.close()
+
+        histories = {}
+        for r in hist_rows:
+            histories.setdefault(r[0], []).append(
+                (float(r[1] or 0), float(r[2] or 0), float(r[3] or 0)))
+        histories = {k: np.array(v) for k, v in histories.items()}
+
+        X = np.array([r[1:4] for r in readings], dtype=float)
+        ranked = _score_fleet([r[0] for r in readings], X, histories,
+                              [r[4] for r in readings])
+        summary = {
+            "high": sum(1 for r in ranked if r["failure_prob"] > 70),
+            "medium": sum(1 for r in ranked if 40 < r["failure_prob"] <= 70),
+        }
+        summary["low"] = len(ranked) - summary["high"] - summary["medium"]
+        return {"equipments": ranked, "total": len(ranked), "summary": summary}
+    except Exception as e:
+        return {"error": str(e)}
+    finally:
+        if conn:
+            release_conn(conn)
+
+
+def _score_fleet(codes, X, histories, recorded_at=None):
+    """Vectorized scoring → list of results sorted by risk (highest first).
+
+    codes: equip_code per row of X (n, 3); histories: equip_code → (m, 3).
+    """
+    n = len(codes)
+    anomaly = np.zeros(n)
+    contrib = np.zeros((n, 3))
+    model = np.full(n, "RuleBased", dtype=object)
+    samples = np.zeros(n, dtype=int)
+
+    groups = {}
+    for i, code in enumerate(codes):
+        groups.setdefault(code, []).append(i)
+
+    rule_rows = []
+    if HAS_IFOREST:
+        from api_modules.ai_model_cache import ModelCache
+    for code, idx in groups.items():
+        hist = histories.get(code)
+        clf = None
+        if HAS_IFOREST and hist is not None and len(hist) >= 10:
+            clf = ModelCache.get_or_schedule(f"iforest_{code}", _train_iforest, hist)
+        if clf is None:
+            rule_rows.extend(idx)
+            continue
+        idx = np.asarray(idx)
+        score = np.clip(0.5 - clf.decision_function(X[idx]), 0.0, 1.0)
+        std = hist.std(axis=0)
+        z = np.abs((X[idx] - hist.mean(axis=0)) / np.where(std == 0, 1, std))
+        total = z.sum(axis=1, keepdims=True)
+        contrib[idx] = z / np.where(total > 0, total, 1) * score[:, None]
+        anomaly[idx] = score
+        model[idx] = "IsolationForest"
+        samples[idx] = len(hist)
+
+    if rule_rows:
+        idx = np.asarray(rule_rows)
+        c = np.clip((X[idx] - _RULE_THRESHOLD) / _RULE_SPAN, 0.0, 1.0) * _RULE_WEIGHT
+        contrib[idx] = c
+        anomaly[idx] = np.minimum(1.0, c.sum(axis=1))
+
+    prob = np.round(anomaly * 100, 1)
+    remaining = np.maximum(0, ((1 - anomaly) * 500).astype(int))
+    top = contrib.argmax(axis=1)
+    recommendation = np.select([anomaly > 0.7, anomaly > 0.4],
+                               ["즉시 점검 필요", "48시간 내 점검 권장"], "정상 범위")
+
+    results = []
+    for i in np.argsort(-anomaly, kind="stable"):
+        results.append({
+            "equip_code": codes[i],
+            "model": model[i],
+            "failure_prob": float(prob[i]),
+            "anomaly_score": round(float(anomaly[i]), 4),
+            "remaining_life_hours": int(remaining[i]),
+            "top_factor": _FEATURES[top[i]] if contrib[i, top[i]] > 0 else None,
+            "reading": dict(zip(_FEATURES, map(float, X[i]))),
+            "recorded_at": (recorded_at[i].isoformat()
+                            if recorded_at is not None and recorded_at[i] else None),
+            "training_samples": int(samples[i]),
+            "recommendation": str(recommendation[i]),
+        })
+    return results
+
+
 def _rule_based_predict(vibration, temperature, current_amp):
     """Rule-based fallback prediction."""
     anomaly = 0.0
@@ -1,9 +1,9 @@
 """REQ-053: 전자 작업지시서 (Electronic Work Instruction) 관리."""
 
 import logging
-from datetime import datetime
 
 from api_modules.database import get_conn, release_conn
+from api_modules.doc_numbering import next_doc_no
 
 log = logging.getLogger(__name__)
 
@@ -30,13 +30,8 @@ async def create_work_instruction(data: dict) -> dict:
         cursor = conn.cursor()
 
         # ID 생성
-        today = datetime.now().strftime("%Y%m%d")
-        cursor.execute(
-            "SELECT COUNT(*) FROM work_instructions WHERE wi_id LIKE %s",
-            (f"WI-{today}-%",),
-        )
-        seq = (cursor.fetchone()[0] or 0) + 1
-        wi_id = f"WI-{today}-{seq:03d}"
+        wi_id = next_doc_no(cursor, "WI",
+                            seed=("work_instructions", "wi_id"))
 
         cursor.execute(
             """INSERT INTO work_instructions
@@ -2,6 +2,7 @@
 
 import logging
 from api_modules.database import get_conn, release_conn
+from api_modules.doc_numbering import next_doc_no
 
 log = logging.getLogger(__name__)
 
@@ -19,12 +20,8 @@ async def create_fmea(data: dict) -> dict:
             return {"error": "데이터베이스 연결에 실패했습니다."}
         cursor = conn.cursor()
 
-        from datetime import datetime
-        today = datetime.now().strftime("%Y%m%d")
-        cursor.execute("SELECT COUNT(*) FROM fmea WHERE fmea_code LIKE %s",
-                       (f"FMEA-{today}-%",))
-        seq = (cursor.fetchone()[0] or 0) + 1
-        fmea_code = f"FMEA-{today}-{seq:03d}"
+        fmea_code = next_doc_no(cursor, "FMEA",
+                                seed=("fmea", "fmea_code"))
 
         cursor.execute(
             """INSERT INTO fmea (fmea_code, fmea_type, item_code, process_code,
@@ -1,27 +1,20 @@
 """FN-029~031: Inventory management (in/out/status) + LOT traceability."""
 
-from datetime import date
-
-from api_modules.database import get_conn, release_conn
+from api_modules.database import get_conn_async, release_conn_async
+from api_modules.doc_numbering import next_doc_no_async
 from api_modules.cache import cache_get, cache_set, cache_delete
 
 
-def _slip_no(prefix: str, cur) -> str:
-    today = date.today().strftime("%Y%m%d")
-    cur.execute(
-        "SELECT COUNT(*) FROM inventory_transactions "
-        "WHERE slip_no LIKE %s",
-        (f"{prefix}-{today}-%",),
-    )
-    seq = cur.fetchone()[0] + 1
-    return f"{prefix}-{today}-{seq:03d}"
+async def _slip_no(prefix: str, cur) -> str:
+    return await next_doc_no_async(
+        cur, prefix, seed=("inventory_transactions", "slip_no"))
 
 
 async def inventory_in(data: dict) -> dict:
     """FN-029: Receive goods (입고)."""
     conn = None
     try:
-        conn = get_conn()
+        conn = await get_conn_async()
         if not conn:
             return {"error": "DB connection failed."}
         cur = conn.cursor()
@@ -29,27 +22,21 @@ async def inventory_in(data: dict) -> dict:
         qty = data["qty"]
         wh = data.get("warehouse", "WH01")
         loc = data.get("location")
-        today = date.today().strftime("%Y%m%d")
 
         # Auto-generate lot_no
-        cur.execute(
-            "SELECT COUNT(*) FROM inventory "
-            "WHERE lot_no LIKE %s",
-            (f"LOT-{today}-%",),
-        )
-        lot_seq = cur.fetchone()[0] + 1
-        lot_no = f"LOT-{today}-{lot_seq:03d}"
-        slip_no = _slip_no("IN", cur)
+        lot_no = await next_doc_no_async(cur, "LOT",
+                                         seed=("inventory", "lot_no"))
+        slip_no = await _slip_no("IN", cur)
 
         # Upsert inventory
-        cur.execute(
+        await cur.execute(
             "INSERT INTO inventory (item_code, lot_no, qty, warehouse, location) "
             "VALUES (%s,%s,%s,%s,%s) "
             "ON CONFLICT (item_code, lot_no, warehouse) "
             "DO UPDATE SET qty = inventory.qty + EXCLUDED.qty",
             (item_code, lot_no, qty, wh, loc),
         )
-        cur.execute(
+        await cur.execute(
             "INSERT INTO inventory_transactions "
             "(slip_no, item_code, lot_no, qty, tx_type, warehouse, "
             "location, supplier) "
@@ -57,18 +44,18 @@ async def inventory_in(data: dict) -> dict:
             (slip_no, item_code, lot_no, qty, wh, loc,
              data.get("supplier")),
         )
-        conn.commit()
+        await conn.commit()
         cur.close()
         cache_delete("inventory:*")
         cache_delete("items:*")
         return {"lot_no": lot_no, "slip_no": slip_no}
     except Exception as e:
         if conn:
-            conn.rollback()
+            await conn.rollback()
         return {"error": str(e)}
     finally:
         if conn:
-            release_conn(conn)
+            await release_conn_async(conn)
 
 
 async def inventory_out(data: dict) -> dict:
@@ -76,7 +63,7 @@ async def inventory_out(data: dict) -> dict:
     VALID_OUT_TYPES = {"OUT", "SHIP", "SCRAP", "RETURN"}
     conn = None
     try:
-        conn = get_conn()
+        conn = await get_conn_async()
         if not conn:
             return {"error": "데이터베이스 연결에 실패했습니다."}
         cur = conn.cursor()
@@ -92,16 +79,16 @@ async def inventory_out(data: dict) -> dict:
         if out_type not in VALID_OUT_TYPES:
             return {"error": f"유효하지 않은 출고유형입니다. 허용: {', '.join(VALID_OUT_TYPES)}"}
 
-        slip_no = _slip_no("OUT", cur)
+        slip_no = await _slip_no("OUT", cur)
 
         # FIFO: oldest lots first
-        cur.execute(
+        await cur.execute(
             "SELECT inv_id, lot_no, qty, warehouse FROM inventory "
             "WHERE item_code = %s AND qty > 0 "
             "ORDER BY created_at ASC",
             (item_code,),
         )
-        lots = cur.fetchall()
+        lots = await cur.fetchall()
         remaining = qty_needed
         lots_used = []
 
@@ -109,7 +96,7 @@ async def inventory_out(data: dict) -> dict:
             if remaining <= 0:
                 break
             use = min(remaining, lot_qty)
-            cur.execute(
+            await cur.execute(
                 "UPDATE inventory SET qty = qty - %s WHERE inv_id = %s",
                 (use, inv_id),
             )
@@ -117,13 +104,13 @@ async def inventory_out(data: dict) -> dict:
             remaining -= use
 
         if remaining > 0:
-            conn.rollback()
+            await conn.rollback()
             cur.close()
             return {"error": f"재고 부족. 부족 수량: {remaining}"}
 
         # Record full transaction with lot_no and warehouse
         first_lot = lots_used[0] if lots_used else {}
-        cur.execute(
+        await cur.execute(
             "INSERT INTO inventory_transactions "
             "(slip_no, item_code, lot_no, qty, tx_type, warehouse, ref_id) "
             "VALUES (%s,%s,%s,%s,%s,%s,%s)",
@@ -133,18 +120,18 @@ async def inventory_out(data: dict) -> dict:
              first_lot.get("warehouse"),
              data.get("ref_id")),
         )
-        conn.commit()
+        await conn.commit()
         cur.close()
         cache_delete("inventory:*")
         cache_delete("items:*")
         return {"slip_no": slip_no, "lots_used": lots_used}
     except Exception:
         if conn:
-            conn.rollback()
+            await conn.rollback()
         return {"error": "출고 처리 중 오류가 발생했습니다."}
     finally:
         if conn:
-            release_conn(conn)
+            await release_conn_async(conn)
 
 
 async def get_inventory(warehouse: str = None,
@@ -157,7 +144,7 @@ async def get_inventory(warehouse: str = None,
 
     conn = None
     try:
-        conn = get_conn()
+        conn = await get_conn_async()
         if not conn:
             return {"items": []}
         cur = conn.cursor()
@@ -173,7 +160,7 @@ async def get_inventory(warehouse: str = None,
         wsql = "WHERE " + " AND ".join(where) if where else ""
 
         # available = stock - reserved (진행중 작업지시에 할당된 수량)
-        cur.execute(
+        await cur.execute(
             f"SELECT i.item_code, i.name, "
             f"COALESCE(SUM(inv.qty),0) AS stock, "
             f"i.safety_stock, "
@@ -190,7 +177,7 @@ async def get_inventory(warehouse: str = None,
             ([warehouse] if warehouse else []) +
             ([category] if category else []),
         )
-        rows = cur.fetchall()
+        rows = await cur.fetchall()
         cur.close()
 
         items = []
@@ -215,7 +202,7 @@ async def get_inventory(warehouse: str = None,
         return {"error": "재고 현황 조회 중 오류가 발생했습니다."}
     finally:
         if conn:
-            release_conn(conn)
+            await release_conn_async(conn)
 
 
 async def trace_lot(lot_no: str) -> dict:
@@ -225,13 +212,13 @@ async def trace_lot(lot_no: str) -> dict:
     """
     conn = None
     try:
-        conn = get_conn()
+        conn = await get_conn_async()
         if not conn:
             return {"error": "데이터베이스 연결에 실패했습니다."}
         cur = conn.cursor()
 
         # 1. LOT의 기본정보 (재고)
-        cur.execute(
+        await cur.execute(
             "SELECT inv.item_code, i.name, inv.qty, inv.warehouse, "
             "inv.location, inv.created_at "
             "FROM inventory inv "
@@ -239,7 +226,7 @@ async def trace_lot(lot_no: str) -> dict:
             "WHERE inv.lot_no = %s",
             (lot_no,),
         )
-        inv_rows = cur.fetchall()
+        inv_rows = await cur.fetchall()
         lot_info = [
             {"item_code": r[0], "item_name": r[1], "qty": r[2],
              "warehouse": r[3], "location": r[4],
@@ -248,14 +235,14 @@ async def trace_lot(lot_no: str) -> dict:
         ]
 
         # 2. 입출고 이력
-        cur.execute(
+        await cur.execute(
             "SELECT slip_no, item_code, qty, tx_type, warehouse, "
             "location, supplier, ref_id, created_at "
             "FROM inventory_transactions WHERE lot_no = %s "
             "ORDER BY created_at",
             (lot_no,),
         )
-        tx_rows = cur.fetchall()
+        tx_rows = await cur.fetchall()
         transactions = [
             {"slip_no": r[0], "item_code": r[1], "qty": r[2],
              "type": r[3], "warehouse": r[4], "location": r[5],
@@ -268,7 +255,7 @@ async def trace_lot(lot_no: str) -> dict:
         work_info = []
         for tx in transactions:
             if tx.get("ref_id") and tx["ref_id"].startswith("WO-"):
-                cur.execute(
+                await cur.execute(
                     "SELECT wo.wo_id, wo.item_code, i.name, "
                     "wo.equip_code, wo.work_date, wo.status "
                     "FROM work_orders wo "
@@ -276,15 +263,15 @@ async def trace_lot(lot_no: str) -> dict:
                     "WHERE wo.wo_id = %s",
                     (tx["ref_id"],),
                 )
-                wo = cur.fetchone()
+                wo = await cur.fetchone()
                 if wo:
-                    cur.execute(
+                    await cur.execute(
                         "SELECT wr.worker_id, wr.good_qty, wr.defect_qty, "
                         "wr.start_time, wr.end_time "
                         "FROM work_results wr WHERE wr.wo_id = %s",
                         (wo[0],),
                     )
-                    results = cur.fetchall()
+                    results = await cur.fetchall()
                     work_info.append({
                         "wo_id": wo[0], "item_code": wo[1],
                         "item_name": wo[2], "equip_code": wo[3],
@@ -299,7 +286,7 @@ async def trace_lot(lot_no: str) -> dict:
                     })
 
         # 4. 품질검사 이력
-        cur.execute(
+        await cur.execute(
             "SELECT ins.inspection_id, ins.inspect_type, ins.judgment, "
             "ins.inspector_id, ins.inspected_at "
             "FROM inspections ins WHERE ins.lot_no = %s "
@@ -310,7 +297,7 @@ async def trace_lot(lot_no: str) -> dict:
             {"inspection_id": r[0], "type": r[1], "judgment": r[2],
              "inspector_id": r[3],
              "time": str(r[4]) if r[4] else None}
-            for r in cur.fetchall()
+            for r in await cur.fetchall()
         ]
 
         cur.close()
@@ -326,4 +313,4 @@ async def trace_lot(lot_no: str) -> dict:
         return {"error": "LOT 추적 중 오류가 발생했습니다."}
     finally:
         if conn:
-            release_conn(conn)
+            await release_conn_async(conn)
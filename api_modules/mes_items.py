@@ -1,7 +1,10 @@
 """FN-004~007: Item master management module."""
 
 from api_modules.database import get_conn, release_conn
-from api_modules.cache import cache_get, cache_set, cache_delete
+from api_modules.cache import cache_get, cache_set, cache_delete, get_or_compute
+from api_modules.pagination import (
+    TOTAL_MODES, count_rows, decode_cursor, keyset_condition, split_page,
+)
 
 
 async def create_item(data: dict) -> dict:
@@ -52,20 +55,40 @@ async def create_item(data: dict) -> dict:
 
 
 async def get_items(keyword: str = None, category: str = None,
-                    page: int = 1, size: int = 20) -> dict:
-    """FN-005: List items with search and pagination."""
-    cache_key = f"items:list:{keyword}:{category}:{page}:{size}"
-    cached = cache_get(cache_key)
-    if cached:
-        return cached
+                    page: int = 1, size: int = 20, cursor: str = None,
+                    total_mode: str = None) -> dict:
+    """FN-005: List items with search and pagination.
+
+    Passing ``cursor`` switches to keyset paging on item_code (``page`` is
+    ignored). total_mode: exact | estimate | none (default: exact for page
+    mode, none for cursor mode).
+    """
+    total_mode = total_mode or ("none" if cursor else "exact")
+    if total_mode not in TOTAL_MODES:
+        return {"error": f"total_mode must be one of {', '.join(TOTAL_MODES)}."}
+    after = None
+    if cursor:
+        try:
+            after = decode_cursor(cursor, 1)
+        except ValueError:
+            return {"error": "Invalid cursor."}
+
+    result = await get_or_compute(
+        f"items:list:{keyword}:{category}:{page}:{size}:{cursor}:{total_mode}",
+        lambda: _load_items(keyword, category, page, size, cursor, total_mode,
+                            after),
+        ttl=60)
+    return {"items": [], "total": 0, "page": page} if result is None else result
+
 
+def _load_items(keyword, category, page, size, cursor, total_mode, after):
     conn = None
     try:
         conn = get_conn()
         if not conn:
-            return {"items": [], "total": 0, "page": page}
+            return None
 
-        cursor = conn.cursor()
+        cur = conn.cursor()
 
         where = []
         params = []
@@ -77,14 +100,19 @@ async def get_items(keyword: str = None, category: str = None,
             params.append(category)
 
         where_sql = "WHERE " + " AND ".join(where) if where else ""
+        total = count_rows(cur, f"items i {where_sql}", params, total_mode)
 
-        cursor.execute(
-            f"SELECT COUNT(*) FROM items i {where_sql}", params
-        )
-        total = cursor.fetchone()[0]
+        if after:
+            cond, cond_params = keyset_condition(("i.item_code",), after)
+            where.append(cond)
+            params.extend(cond_params)
+            where_sql = "WHERE " + " AND ".join(where)
+            limit_sql, limit_params = "LIMIT %s", [size + 1]
+        else:
+            limit_sql = "LIMIT %s OFFSET %s"
+            limit_params = [size + 1, (page - 1) * size]
 
-        offset = (page - 1) * size
-        cursor.execute(
+        cur.execute(
             f"SELECT i.item_code, i.name, i.category, i.unit, i.spec, "
             f"i.safety_stock, COALESCE(SUM(inv.qty), 0) AS stock "
             f"FROM items i "
@@ -93,11 +121,12 @@ async def get_items(keyword: str = None, category: str = None,
             f"GROUP BY i.item_code, i.name, i.category, i.unit, i.spec, "
             f"i.safety_stock "
             f"ORDER BY i.item_code "
-            f"LIMIT %s OFFSET %s",
-            params + [size, offset],
+            f"{limit_sql}",
+            params + limit_params,
         )
-        rows = cursor.fetchall()
-        cursor.close()
+        rows, next_cursor = split_page(cur.fetchall(), size,
+                                       lambda r: (r[0],))
+        cur.close()
 
         items = [
             {
@@ -107,8 +136,9 @@ async def get_items(keyword: str = None, category: str = None,
             }
             for r in rows
         ]
-        result = {"items": items, "total": total, "page": page}
-        cache_set(cache_key, result, ttl=60)
+        result = {"items": items, "total": total, "next_cursor": next_cursor}
+        if not cursor:
+            result["page"] = page
         return result
     except Exception as e:
         return {"error": str(e)}
@@ -190,6 +220,8 @@ async def update_item(item_code: str, data: dict) -> dict:
         conn.commit()
         cursor.close()
         cache_delete("items:*")
+        cache_delete("bom:*")  # BOM/라우팅 조회에 품목명 포함
+        cache_delete("routing:*")
         return {"success": True, "updated_at": "now"}
     except Exception as e:
         if conn:
@@ -218,6 +250,8 @@ async def delete_item(item_code: str) -> dict:
         conn.commit()
         cursor.close()
         cache_delete("items:*")
+        cache_delete("bom:*")  # BOM/라우팅 조회에 품목명 포함
+        cache_delete("routing:*")
         return {"success": True, "deleted": item_code}
     except Exception as e:
         if conn:
@@ -15,7 +15,7 @@ async def get_fpy(process_code: str = None, item_code: str = None,
     """
     conn = None
     try:
-        conn = get_conn()
+        conn = get_conn(readonly=True)
         if not conn:
             return {"error": "데이터베이스 연결에 실패했습니다."}
         cursor = conn.cursor()
@@ -122,7 +122,7 @@ async def get_maintenance_kpi(equip_code: str,
     """
     conn = None
     try:
-        conn = get_conn()
+        conn = get_conn(readonly=True)
         if not conn:
             return {"error": "데이터베이스 연결에 실패했습니다."}
         cursor = conn.cursor()
@@ -1,7 +1,7 @@
 """FN-048: LOT 계보 추적 — Forward/Backward 추적."""
 
 import logging
-from api_modules.database import get_conn, release_conn
+from api_modules.database import get_conn_async, release_conn_async
 
 log = logging.getLogger(__name__)
 
@@ -11,19 +11,19 @@ async def trace_genealogy(lot_no: str, direction: str = "both",
     """FN-048: LOT 계보 추적 (Forward/Backward)."""
     conn = None
     try:
-        conn = get_conn()
+        conn = await get_conn_async()
         if not conn:
             return {"error": "데이터베이스 연결에 실패했습니다."}
         cursor = conn.cursor()
 
         # LOT 기본 정보 조회
-        cursor.execute(
+        await cursor.execute(
             """SELECT inv.item_code, inv.qty, inv.warehouse, inv.location, i.name
                FROM inventory inv
                JOIN items i ON inv.item_code = i.item_code
                WHERE inv.lot_no = %s""",
             (lot_no,))
-        lot_info = cursor.fetchone()
+        lot_info = await cursor.fetchone()
         if not lot_info:
             cursor.close()
             return {"error": f"LOT {lot_no}를 찾을 수 없습니다."}
@@ -39,11 +39,11 @@ async def trace_genealogy(lot_no: str, direction: str = "both",
 
         # Forward 추적: 원자재 → 완제품
         if direction in ("forward", "both"):
-            result["forward"] = _trace_forward(cursor, lot_no, max_depth)
+            result["forward"] = await _trace_forward(cursor, lot_no, max_depth)
 
         # Backward 추적: 완제품 → 원자재
         if direction in ("backward", "both"):
-            result["backward"] = _trace_backward(cursor, lot_no, max_depth)
+            result["backward"] = await _trace_backward(cursor, lot_no, max_depth)
 
         # 리콜 시뮬레이션
         if direction in ("forward", "both"):
@@ -56,42 +56,42 @@ async def trace_genealogy(lot_no: str, direction: str = "both",
         return {"error": "LOT 추적 중 오류가 발생했습니다."}
     finally:
         if conn:
-            release_conn(conn)
+            await release_conn_async(conn)
 
 
-def _trace_forward(cursor, lot_no, max_depth, depth=0):
+async def _trace_forward(cursor, lot_no, max_depth, depth=0):
     """Forward: 이 LOT가 사용된 작업 → 완성품 LOT 추적."""
     if depth >= max_depth:
         return []
 
     # 이 LOT가 출고(OUT)된 작업지시 조회
-    cursor.execute(
+    await cursor.execute(
         """SELECT DISTINCT it.ref_id
            FROM inventory_transactions it
            WHERE it.lot_no = %s AND it.tx_type = 'OUT' AND it.ref_id IS NOT NULL""",
         (lot_no,))
-    ref_ids = [r[0] for r in cursor.fetchall()]
+    ref_ids = [r[0] for r in await cursor.fetchall()]
 
     children = []
     for ref_id in ref_ids:
         # ref_id가 작업지시 ID인 경우
-        cursor.execute(
+        await cursor.execute(
             """SELECT wo.wo_id, wo.item_code, i.name, wr.good_qty
                FROM work_orders wo
                JOIN items i ON wo.item_code = i.item_code
                LEFT JOIN work_results wr ON wo.wo_id = wr.wo_id
                WHERE wo.wo_id = %s""",
             (ref_id,))
-        wo_rows = cursor.fetchall()
+        wo_rows = await cursor.fetchall()
 
         for wo_id, item_code, item_name, good_qty in wo_rows:
             # 이 작업에서 생산된 완성품 LOT 조회
-            cursor.execute(
+            await cursor.execute(
                 """SELECT lot_no, qty
                    FROM inventory_transactions
                    WHERE ref_id = %s AND tx_type = 'IN' AND item_code = %s""",
                 (wo_id, item_code))
-            output_lots = cursor.fetchall()
+            output_lots = await cursor.fetchall()
 
             for out_lot, out_qty in output_lots:
                 child = {
@@ -100,36 +100,36 @@ def _trace_forward(cursor, lot_no, max_depth, depth=0):
                     "item_name": item_name,
                     "qty": out_qty,
                     "via_wo": wo_id,
-                    "children": _trace_forward(cursor, out_lot, max_depth, depth + 1),
+                    "children": await _trace_forward(cursor, out_lot, max_depth, depth + 1),
                 }
                 children.append(child)
 
     return children
 
 
-def _trace_backward(cursor, lot_no, max_depth, depth=0):
+async def _trace_backward(cursor, lot_no, max_depth, depth=0):
     """Backward: 이 LOT를 만든 원자재 LOT 추적."""
     if depth >= max_depth:
         return []
 
     # 이 LOT가 입고(IN)된 작업지시 조회
-    cursor.execute(
+    await cursor.execute(
         """SELECT ref_id, item_code
            FROM inventory_transactions
            WHERE lot_no = %s AND tx_type = 'IN' AND ref_id IS NOT NULL""",
         (lot_no,))
-    in_txs = cursor.fetchall()
+    in_txs = await cursor.fetchall()
 
     parents = []
     for ref_id, _ in in_txs:
         # 작업지시에서 사용된 원자재 LOT 조회
-        cursor.execute(
+        await cursor.execute(
             """SELECT it.lot_no, it.item_code, i.name, it.qty
                FROM inventory_transactions it
                JOIN items i ON it.item_code = i.item_code
                WHERE it.ref_id = %s AND it.tx_type = 'OUT'""",
             (ref_id,))
-        mat_rows = cursor.fetchall()
+        mat_rows = await cursor.fetchall()
 
         for mat_lot, mat_item, mat_name, mat_qty in mat_rows:
             parent = {
@@ -138,7 +138,7 @@ def _trace_backward(cursor, lot_no, max_depth, depth=0):
                 "item_name": mat_name,
                 "qty": mat_qty,
                 "via_wo": ref_id,
-                "parents": _trace_backward(cursor, mat_lot, max_depth, depth + 1),
+                "parents": await _trace_backward(cursor, mat_lot, max_depth, depth + 1),
             }
             parents.append(parent)
 
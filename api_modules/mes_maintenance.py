@@ -4,6 +4,7 @@ import logging
 from datetime import datetime, timedelta
 
 from api_modules.database import get_conn, release_conn
+from api_modules.doc_numbering import next_doc_no
 
 log = logging.getLogger(__name__)
 
@@ -110,13 +111,8 @@ async def create_maintenance_order(data: dict) -> dict:
             return {"error": "데이터베이스 연결에 실패했습니다."}
         cursor = conn.cursor()
 
-        today = datetime.now().strftime("%Y%m%d")
-        cursor.execute(
-            "SELECT COUNT(*) FROM maintenance_orders WHERE mo_id LIKE %s",
-            (f"MWO-{today}-%",),
-        )
-        seq = (cursor.fetchone()[0] or 0) + 1
-        mo_id = f"MWO-{today}-{seq:03d}"
+        mo_id = next_doc_no(cursor, "MWO",
+                            seed=("maintenance_orders", "mo_id"))
 
         cursor.execute(
             """INSERT INTO maintenance_orders
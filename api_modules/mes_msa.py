@@ -3,6 +3,7 @@
 import logging
 import math
 from api_modules.database import get_conn, release_conn
+from api_modules.doc_numbering import next_doc_no
 
 log = logging.getLogger(__name__)
 
@@ -23,12 +24,8 @@ async def create_study(data: dict) -> dict:
             return {"error": "데이터베이스 연결에 실패했습니다."}
         cursor = conn.cursor()
 
-        from datetime import datetime
-        today = datetime.now().strftime("%Y%m%d")
-        cursor.execute("SELECT COUNT(*) FROM msa_studies WHERE study_code LIKE %s",
-                       (f"MSA-{today}-%",))
-        seq = (cursor.fetchone()[0] or 0) + 1
-        study_code = f"MSA-{today}-{seq:03d}"
+        study_code = next_doc_no(cursor, "MSA",
+                                 seed=("msa_studies", "study_code"))
 
         cursor.execute(
             """INSERT INTO msa_studies
@@ -1,9 +1,9 @@
 """REQ-054: 부적합품 관리 (NCR — Non-Conformance Report)."""
 
 import logging
-from datetime import datetime
 
 from api_modules.database import get_conn, release_conn
+from api_modules.doc_numbering import next_doc_no
 
 log = logging.getLogger(__name__)
 
@@ -33,13 +33,8 @@ async def create_ncr(data: dict, user_id: str = None) -> dict:
             return {"error": "데이터베이스 연결에 실패했습니다."}
         cursor = conn.cursor()
 
-        today = datetime.now().strftime("%Y%m%d")
-        cursor.execute(
-            "SELECT COUNT(*) FROM ncr WHERE ncr_id LIKE %s",
-            (f"NCR-{today}-%",),
-        )
-        seq = (cursor.fetchone()[0] or 0) + 1
-        ncr_id = f"NCR-{today}-{seq:03d}"
+        ncr_id = next_doc_no(cursor, "NCR",
+                             seed=("ncr", "ncr_id"))
 
         cursor.execute(
             """INSERT INTO ncr
@@ -1,10 +1,14 @@
 """REQ-046: OPC-UA 연동 — 서버 설정, 노드 구독, 상태 모니터링 (FN-060~061)."""
 
 import logging
+import os
 from api_modules.database import get_conn, release_conn
 
 log = logging.getLogger(__name__)
 
+# opcua_node_status.updated_at 이 이보다 오래되면 STALE (엔진 heartbeat 기본 10초)
+STATUS_STALE_SEC = float(os.getenv("OPCUA_STATUS_STALE_SEC", "60"))
+
 
 async def save_opcua_config(data: dict) -> dict:
     """OPC-UA 설정 저장."""
@@ -80,7 +84,12 @@ async def get_opcua_configs() -> dict:
 
 
 async def get_opcua_status() -> dict:
-    """OPC-UA 연결 상태 대시보드."""
+    """OPC-UA 연결 상태 대시보드.
+
+    구독 엔진(opcua_ingest)이 갱신하는 opcua_node_status 만 읽는다
+    (sensor_data 전체 스캔 없음). 노드별 최근 수신 시각/값/오류 포함.
+    엔진이 STATUS_STALE_SEC 넘게 상태를 갱신하지 않은 노드는 STALE 로 보고한다.
+    """
     conn = None
     try:
         conn = get_conn()
@@ -88,28 +97,55 @@ async def get_opcua_status() -> dict:
             return {"error": "데이터베이스 연결에 실패했습니다."}
         cursor = conn.cursor()
 
-        cursor.execute("SELECT COUNT(*) FROM opcua_config WHERE is_active = TRUE")
-        active = cursor.fetchone()[0]
-        cursor.execute("SELECT COUNT(*) FROM opcua_config")
-        total = cursor.fetchone()[0]
-
-        # 최근 수집 상태
         cursor.execute(
-            """SELECT equip_code, MAX(collected_at) AS last_received
-               FROM sensor_data WHERE source = 'OPCUA'
-               GROUP BY equip_code ORDER BY last_received DESC LIMIT 20""",
+            """SELECT c.config_id, c.server_url, c.equip_code, c.node_id,
+                      c.sensor_type, c.is_active, s.status, s.last_seen,
+                      s.last_value, s.error, s.updated_at,
+                      s.updated_at < NOW() - make_interval(secs => %s)
+               FROM opcua_config c
+               LEFT JOIN opcua_node_status s ON s.config_id = c.config_id
+               ORDER BY c.config_id""",
+            (STATUS_STALE_SEC,),
         )
-        recent = [
-            {"equip_code": r[0], "last_received": r[1].isoformat() if r[1] else None}
-            for r in cursor.fetchall()
+        rows = cursor.fetchall()
+        cursor.close()
+
+        nodes = [
+            {"config_id": r[0], "server_url": r[1], "equip_code": r[2],
+             "node_id": r[3], "sensor_type": r[4], "is_active": r[5],
+             "status": ("STALE" if r[11] else r[6] or "PENDING") if r[5] else "INACTIVE",
+             "last_seen": r[7].isoformat() if r[7] else None,
+             "last_value": float(r[8]) if r[8] is not None else None,
+             "error": r[9],
+             "updated_at": r[10].isoformat() if r[10] else None}
+            for r in rows
         ]
+        active = [n for n in nodes if n["is_active"]]
+        connected = sum(1 for n in active if n["status"] == "CONNECTED")
 
-        cursor.close()
+        # 설비별 최근 수신 (기존 응답 형식 유지)
+        last_by_equip = {}
+        for n in active:
+            if n["last_seen"] and n["last_seen"] > last_by_equip.get(n["equip_code"], ""):
+                last_by_equip[n["equip_code"]] = n["last_seen"]
+        recent = sorted(
+            ({"equip_code": e, "last_received": t} for e, t in last_by_equip.items()),
+            key=lambda x: x["last_received"], reverse=True,
+        )[:20]
+
+        if not active or connected == 0:
+            status = "DISCONNECTED"
+        elif connected < len(active):
+            status = "DEGRADED"
+        else:
+            status = "CONNECTED"
         return {
-            "total_configs": total,
-            "active_configs": active,
-            "status": "CONNECTED" if active > 0 else "DISCONNECTED",
+            "total_configs": len(nodes),
+            "active_configs": len(active),
+            "connected_nodes": connected,
+            "status": status,
             "recent_data": recent,
+            "nodes": nodes,
         }
     except Exception:
         return {"error": "상태 조회 중 오류가 발생했습니다."}
@@ -2,14 +2,17 @@
 
 import logging
 from api_modules.database import get_conn, release_conn
+from api_modules.lazy_import import available, lazy_module
+from api_modules.pagination import (
+    TOTAL_MODES, count_rows, decode_cursor, keyset_condition, split_page,
+)
 
 log = logging.getLogger(__name__)
 
-try:
-    from ortools.sat.python import cp_model
-    HAS_ORTOOLS = True
-except ImportError:
-    HAS_ORTOOLS = False
+# Imported on first CP-SAT solve (not at API start-up)
+cp_model = lazy_module("ortools.sat.python.cp_model")
+HAS_ORTOOLS = available("ortools")
+if not HAS_ORTOOLS:
     log.warning("OR-Tools not installed – falling back to greedy heuristic.")
 
 
@@ -47,15 +50,31 @@ async def create_plan(data: dict) -> dict:
 
 
 async def get_plans(start_date: str = None, end_date: str = None,
-                    status: str = None, page: int = 1) -> dict:
-    """FN-016: List production plans with filters."""
+                    status: str = None, page: int = 1, size: int = 20,
+                    cursor: str = None, total_mode: str = None) -> dict:
+    """FN-016: List production plans with filters.
+
+    Passing ``cursor`` switches to keyset paging on (due_date, plan_id)
+    (``page`` is ignored). total_mode: exact | estimate | none (default:
+    exact for page mode, none for cursor mode).
+    """
+    total_mode = total_mode or ("none" if cursor else "exact")
+    if total_mode not in TOTAL_MODES:
+        return {"error": f"total_mode must be one of {', '.join(TOTAL_MODES)}."}
+    after = None
+    if cursor:
+        try:
+            after = decode_cursor(cursor, 2)
+        except ValueError:
+            return {"error": "Invalid cursor."}
+
     conn = None
     try:
         conn = get_conn()
         if not conn:
             return {"plans": [], "total": 0}
 
-        cursor = conn.cursor()
+        cur = conn.cursor()
 
         where = []
         params = []
@@ -70,14 +89,21 @@ async def get_plans(start_date: str = None, end_date: str = None,
             params.append(status)
 
         where_sql = "WHERE " + " AND ".join(where) if where else ""
+        total = count_rows(cur, f"production_plans p {where_sql}", params,
+                           total_mode)
+
+        if after:
+            cond, cond_params = keyset_condition(
+                ("p.due_date", "p.plan_id"), after)
+            where.append(cond)
+            params.extend(cond_params)
+            where_sql = "WHERE " + " AND ".join(where)
+            limit_sql, limit_params = "LIMIT %s", [size + 1]
+        else:
+            limit_sql = "LIMIT %s OFFSET %s"
+            limit_params = [size + 1, (page - 1) * size]
 
-        cursor.execute(
-            f"SELECT COUNT(*) FROM production_plans p {where_sql}", params
-        )
-        total = cursor.fetchone()[0]
-
-        offset = (page - 1) * 20
-        cursor.execute(
+        cur.execute(
             f"SELECT p.plan_id, i.name, p.plan_qty, p.due_date, "
             f"p.status, p.priority, "
             f"COALESCE(SUM(wr.good_qty), 0) AS done_qty "
@@ -88,12 +114,13 @@ async def get_plans(start_date: str = None, end_date: str = None,
             f"{where_sql} "
             f"GROUP BY p.plan_id, i.name, p.plan_qty, p.due_date, "
             f"p.status, p.priority "
-            f"ORDER BY p.due_date "
-            f"LIMIT 20 OFFSET %s",
-            params + [offset],
+            f"ORDER BY p.due_date, p.plan_id "
+            f"{limit_sql}",
+            params + limit_params,
         )
-        rows = cursor.fetchall()
-        cursor.close()
+        rows, next_cursor = split_page(cur.fetchall(), size,
+                                       lambda r: (r[3], r[0]))
+        cur.close()
 
         plans = []
         for r in rows:
@@ -103,7 +130,7 @@ async def get_plans(start_date: str = None, end_date: str = None,
                 "due_date": str(r[3]), "status": r[4],
                 "priority": r[5], "progress": progress,
             })
-        return {"plans": plans, "total": total}
+        return {"plans": plans, "total": total, "next_cursor": next_cursor}
     except Exception as e:
         return {"error": str(e)}
     finally:
@@ -162,6 +162,7 @@ async def update_process(process_code: str, data: dict) -> dict:
         conn.commit()
         cursor.close()
         cache_delete("process:*")
+        cache_delete("routing:*")  # 라우팅 조회에 공정명 포함
         return {"success": True, "process_code": process_code}
     except Exception:
         if conn:
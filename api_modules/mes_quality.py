@@ -1,20 +1,25 @@
 """FN-025~027: Quality inspection and defect management."""
 
-from api_modules.database import get_conn, release_conn
+import logging
+
+from api_modules.database import get_conn_async, release_conn_async
+from api_modules.mes_spc import update_spc_state
+
+log = logging.getLogger(__name__)
 
 
 async def create_standard(data: dict) -> dict:
     """FN-025: Register quality inspection standards."""
     conn = None
     try:
-        conn = get_conn()
+        conn = await get_conn_async()
         if not conn:
             return {"error": "DB connection failed."}
         cur = conn.cursor()
         item_code = data["item_code"]
         sid = None
         for c in data.get("checks", []):
-            cur.execute(
+            await cur.execute(
                 "INSERT INTO quality_standards "
                 "(item_code, check_name, check_type, std_value, "
                 "min_value, max_value, unit) "
@@ -22,36 +27,36 @@ async def create_standard(data: dict) -> dict:
                 (item_code, c["name"], c.get("type", "NUMERIC"),
                  c.get("std"), c.get("min"), c.get("max"), c.get("unit")),
             )
-            sid = cur.fetchone()[0]
-        conn.commit()
+            sid = (await cur.fetchone())[0]
+        await conn.commit()
         cur.close()
         return {"standard_id": sid, "success": True}
     except Exception as e:
         if conn:
-            conn.rollback()
+            await conn.rollback()
         return {"error": str(e)}
     finally:
         if conn:
-            release_conn(conn)
+            await release_conn_async(conn)
 
 
 async def create_inspection(data: dict) -> dict:
     """FN-026: Register inspection and auto-judge PASS/FAIL."""
     conn = None
     try:
-        conn = get_conn()
+        conn = await get_conn_async()
         if not conn:
             return {"error": "DB connection failed."}
         cur = conn.cursor()
         item_code = data["item_code"]
 
         # Load standards
-        cur.execute(
+        await cur.execute(
             "SELECT check_name, check_type, min_value, max_value "
             "FROM quality_standards WHERE item_code = %s",
             (item_code,),
         )
-        stds = {r[0]: r for r in cur.fetchall()}
+        stds = {r[0]: r for r in await cur.fetchall()}
 
         overall = "PASS"
         fail_items = []
@@ -97,36 +102,49 @@ async def create_inspection(data: dict) -> dict:
                 fail_items.append(name)
             details.append((name, value, j))
 
-        cur.execute(
+        await cur.execute(
             "INSERT INTO inspections "
             "(inspect_type, item_code, lot_no, judgment, inspector_id) "
             "VALUES (%s,%s,%s,%s,%s) RETURNING inspection_id",
             (data.get("type", "PROCESS"), item_code,
              data.get("lot_no"), overall, data.get("inspector_id")),
         )
-        iid = cur.fetchone()[0]
+        iid = (await cur.fetchone())[0]
 
         for name, value, j in details:
-            cur.execute(
+            await cur.execute(
                 "INSERT INTO inspection_details "
                 "(inspection_id, check_name, measured_value, judgment) "
                 "VALUES (%s,%s,%s,%s)",
                 (iid, name, value, j),
             )
 
-        conn.commit()
+        # SPC state update + real-time rule check (same transaction).
+        # Runs under a savepoint: an SPC failure must not reject the inspection.
+        await cur.execute("SAVEPOINT spc_state")
+        try:
+            violations = await update_spc_state(cur, item_code, iid, details)
+            await cur.execute("RELEASE SAVEPOINT spc_state")
+        except Exception as e:
+            log.error("SPC state update failed (item %s, inspection %s): %s",
+                      item_code, iid, e)
+            await cur.execute("ROLLBACK TO SAVEPOINT spc_state")
+            violations = []
+
+        await conn.commit()
         cur.close()
         return {
             "inspection_id": iid, "judgment": overall,
             "fail_items": fail_items,
+            "spc_violations": violations,
         }
     except Exception as e:
         if conn:
-            conn.rollback()
+            await conn.rollback()
         return {"error": str(e)}
     finally:
         if conn:
-            release_conn(conn)
+            await release_conn_async(conn)
 
 
 async def get_defects(start_date: str = None, end_date: str = None,
@@ -134,7 +152,7 @@ async def get_defects(start_date: str = None, end_date: str = None,
     """FN-027: Defect summary and trend."""
     conn = None
     try:
-        conn = get_conn()
+        conn = await get_conn_async()
         if not conn:
             return {"summary": [], "trend": []}
         cur = conn.cursor()
@@ -152,7 +170,7 @@ async def get_defects(start_date: str = None, end_date: str = None,
             params.append(item_code)
         wsql = "WHERE " + " AND ".join(where) if where else ""
 
-        cur.execute(
+        await cur.execute(
             f"SELECT COALESCE(wr.defect_code,'UNKNOWN'), "
             f"SUM(wr.defect_qty), "
             f"SUM(wr.good_qty + wr.defect_qty) "
@@ -167,10 +185,10 @@ async def get_defects(start_date: str = None, end_date: str = None,
                 "defect_type": r[0], "count": r[1],
                 "rate": round(r[1] / r[2], 4) if r[2] else 0,
             }
-            for r in cur.fetchall()
+            for r in await cur.fetchall()
         ]
 
-        cur.execute(
+        await cur.execute(
             f"SELECT wr.start_time::date AS d, "
             f"SUM(wr.defect_qty), "
             f"SUM(wr.good_qty + wr.defect_qty) "
@@ -185,7 +203,7 @@ async def get_defects(start_date: str = None, end_date: str = None,
                 "date": str(r[0]),
                 "rate": round(r[1] / r[2], 4) if r[2] else 0,
             }
-            for r in cur.fetchall()
+            for r in await cur.fetchall()
         ]
         cur.close()
         return {"summary": summary, "trend": trend}
@@ -193,4 +211,4 @@ async def get_defects(start_date: str = None, end_date: str = None,
         return {"error": str(e)}
     finally:
         if conn:
-            release_conn(conn)
+            await release_conn_async(conn)
@@ -3,6 +3,7 @@
 import json
 import logging
 from api_modules.database import get_conn, release_conn
+from api_modules.doc_numbering import next_doc_no
 
 log = logging.getLogger(__name__)
 
@@ -37,12 +38,8 @@ async def create_template(data: dict, user_id: str) -> dict:
             return {"error": "데이터베이스 연결에 실패했습니다."}
         cursor = conn.cursor()
 
-        from datetime import datetime
-        today = datetime.now().strftime("%Y%m%d")
-        cursor.execute("SELECT COUNT(*) FROM report_templates WHERE template_code LIKE %s",
-                       (f"RPT-{today}-%",))
-        seq = (cursor.fetchone()[0] or 0) + 1
-        template_code = f"RPT-{today}-{seq:03d}"
+        template_code = next_doc_no(cursor, "RPT",
+                                    seed=("report_templates", "template_code"))
 
         cursor.execute(
             """INSERT INTO report_templates
@@ -74,7 +71,7 @@ async def get_templates() -> dict:
     """리포트 템플릿 목록."""
     conn = None
     try:
-        conn = get_conn()
+        conn = get_conn(readonly=True)
         if not conn:
             return {"error": "데이터베이스 연결에 실패했습니다."}
         cursor = conn.cursor()
@@ -108,7 +105,7 @@ async def execute_report(template_id: int) -> dict:
     """리포트 실행 (데이터 조회)."""
     conn = None
     try:
-        conn = get_conn()
+        conn = get_conn(readonly=True)
         if not conn:
             return {"error": "데이터베이스 연결에 실패했습니다."}
         cursor = conn.cursor()
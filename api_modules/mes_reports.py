@@ -12,7 +12,7 @@ async def production_report(start_date: str = None, end_date: str = None,
     """FN-035: Production performance report."""
     conn = None
     try:
-        conn = get_conn()
+        conn = get_conn(readonly=True)
         if not conn:
             return {"error": "DB connection failed."}
         cur = conn.cursor()
@@ -94,7 +94,7 @@ async def quality_report(start_date: str = None, end_date: str = None,
     """FN-036: Quality analysis report with defect rate, Cpk, and control chart."""
     conn = None
     try:
-        conn = get_conn()
+        conn = get_conn(readonly=True)
         if not conn:
             return {"error": "DB connection failed."}
         cur = conn.cursor()
@@ -303,7 +303,7 @@ async def ai_insights(data: dict) -> dict:
     """
     conn = None
     try:
-        conn = get_conn()
+        conn = get_conn(readonly=True)
         if not conn:
             return {"error": "DB connection failed."}
         cur = conn.cursor()
@@ -1,90 +1,67 @@
-"""FN-038~040: SPC 관리도 — X-bar/R 차트, 규칙 설정, Cp/Cpk 분석."""
+"""FN-038~040: SPC 관리도 — X-bar/R·X-bar/S·I-MR·p·np·c·u 차트, 규칙 설정, Cp/Cpk 분석.
 
+관리도 계산과 Nelson 규칙 판정은 spc_engine (NumPy) 에서 수행한다.
+
+활성 규칙이 있는 (품목, 검사항목) 은 spc_state / spc_points 에 증분 상태를 둔다:
+- 검사 등록(mes_quality.create_inspection) 트랜잭션에서 update_spc_state 가 측정값을
+  열린 서브그룹 버퍼에 넣고, 서브그룹이 닫히면 누적합·점을 저장하고 그 점에서
+  성립한 규칙을 spc_violations 에 바로 기록한다 (SPC_MIN_SUBGROUPS 이후).
+- 관리도 조회는 상태의 누적합으로 관리한계를, spc_points 최근 SPC_CHART_POINTS 개로
+  차트를 만든다. 상태가 없거나 규칙(rule_type, sample_size)이 바뀌면 이력으로 재구성한다.
+"""
+
+import json
 import logging
 import math
-from api_modules.database import get_conn, release_conn
+import os
+
+import numpy as np
+from psycopg2.extras import execute_values
+
+from api_modules import spc_engine
+from api_modules.database import get_conn_async, release_conn_async, run_in_db_thread
+from api_modules.doc_numbering import next_doc_no_async
 
 log = logging.getLogger(__name__)
 
-# SPC 상수표 (sample size n → 계수)
-A2 = {2: 1.880, 3: 1.023, 4: 0.729, 5: 0.577, 6: 0.483, 7: 0.419, 8: 0.373, 9: 0.337, 10: 0.308}
-D3 = {2: 0, 3: 0, 4: 0, 5: 0, 6: 0, 7: 0.076, 8: 0.136, 9: 0.184, 10: 0.223}
-D4 = {2: 3.267, 3: 2.575, 4: 2.282, 5: 2.115, 6: 2.004, 7: 1.924, 8: 1.864, 9: 1.816, 10: 1.777}
-d2 = {2: 1.128, 3: 1.693, 4: 2.059, 5: 2.326, 6: 2.534, 7: 2.704, 8: 2.847, 9: 2.970, 10: 3.078}
-
-
-def _western_electric_rules(subgroups, x_bar, r_bar, n):
-    """Western Electric 규칙 위반 검사."""
-    a2 = A2.get(n, 0.577)
-    ucl = x_bar + a2 * r_bar
-    lcl = x_bar - a2 * r_bar
-    sigma = (ucl - x_bar) / 3 if ucl != x_bar else 1
-    violations = []
-
-    for i, sg in enumerate(subgroups):
-        sg_mean = sg["mean"]
-        # Rule 1: 1점이 3σ 밖
-        if sg_mean > ucl or sg_mean < lcl:
-            violations.append({"subgroup": i + 1, "rule": "RULE_1_BEYOND_3SIGMA",
-                               "value": sg_mean, "severity": "CRITICAL"})
-        # Rule 2: 연속 2점이 같은 쪽 2σ 밖
-        if i >= 1:
-            prev = subgroups[i - 1]["mean"]
-            two_sigma_up = x_bar + 2 * sigma
-            two_sigma_low = x_bar - 2 * sigma
-            if (sg_mean > two_sigma_up and prev > two_sigma_up) or \
-               (sg_mean < two_sigma_low and prev < two_sigma_low):
-                violations.append({"subgroup": i + 1, "rule": "RULE_2_2OF3_BEYOND_2SIGMA",
-                                   "value": sg_mean, "severity": "WARNING"})
-        # Rule 3: 연속 4점이 같은 쪽 1σ 밖
-        if i >= 3:
-            vals = [subgroups[j]["mean"] for j in range(i - 3, i + 1)]
-            one_sigma_up = x_bar + sigma
-            one_sigma_low = x_bar - sigma
-            if all(v > one_sigma_up for v in vals) or all(v < one_sigma_low for v in vals):
-                violations.append({"subgroup": i + 1, "rule": "RULE_3_4OF5_BEYOND_1SIGMA",
-                                   "value": sg_mean, "severity": "WARNING"})
-        # Rule 4: 연속 8점이 한쪽
-        if i >= 7:
-            vals = [subgroups[j]["mean"] for j in range(i - 7, i + 1)]
-            if all(v > x_bar for v in vals) or all(v < x_bar for v in vals):
-                violations.append({"subgroup": i + 1, "rule": "RULE_4_8_CONSECUTIVE_ONE_SIDE",
-                                   "value": sg_mean, "severity": "WARNING"})
-    return violations
+# 관리도에 표시할 최근 서브그룹 수 (관리한계는 전체 이력 기준)
+SPC_CHART_POINTS = int(os.getenv("SPC_CHART_POINTS", "500"))
+# 검사 등록 시 규칙 판정을 시작할 최소 서브그룹 수 (관리한계 안정화)
+SPC_MIN_SUBGROUPS = int(os.getenv("SPC_MIN_SUBGROUPS", "20"))
 
 
 async def get_spc_chart(item_code: str, check_name: str = None) -> dict:
-    """FN-038: SPC 관리도 데이터 (X-bar/R 차트)."""
+    """FN-038: SPC 관리도 데이터 (규칙의 rule_type 별 차트, 규칙이 없으면 X-bar/R)."""
     conn = None
     try:
-        conn = get_conn()
+        conn = await get_conn_async()
         if not conn:
             return {"error": "데이터베이스 연결에 실패했습니다."}
         cursor = conn.cursor()
 
         # SPC 규칙 조회
         if check_name:
-            cursor.execute(
+            await cursor.execute(
                 "SELECT rule_id, check_name, rule_type, ucl, lcl, target, sample_size "
                 "FROM spc_rules WHERE item_code = %s AND check_name = %s AND is_active = TRUE",
                 (item_code, check_name))
         else:
-            cursor.execute(
+            await cursor.execute(
                 "SELECT rule_id, check_name, rule_type, ucl, lcl, target, sample_size "
                 "FROM spc_rules WHERE item_code = %s AND is_active = TRUE",
                 (item_code,))
-        rules = cursor.fetchall()
+        rules = await cursor.fetchall()
 
         if not rules:
             # 규칙 없으면 검사 데이터에서 자동 계산
-            cursor.execute(
+            await cursor.execute(
                 """SELECT id.measured_value
                    FROM inspection_details id
                    JOIN inspections i ON id.inspection_id = i.inspection_id
                    WHERE i.item_code = %s
                    ORDER BY i.inspected_at""",
                 (item_code,))
-            measurements = [float(r[0]) for r in cursor.fetchall() if r[0] is not None]
+            measurements = [float(r[0]) for r in await cursor.fetchall() if r[0] is not None]
             cursor.close()
 
             if len(measurements) < 10:
@@ -94,100 +71,325 @@ async def get_spc_chart(item_code: str, check_name: str = None) -> dict:
             n = 5  # 기본 서브그룹 크기
             return _calculate_chart(item_code, "자동", measurements, n)
 
-        results = []
-        for rule_id, cn, rt, ucl, lcl, target, n in rules:
-            cursor.execute(
-                """SELECT id.measured_value
-                   FROM inspection_details id
-                   JOIN inspections i ON id.inspection_id = i.inspection_id
-                   WHERE i.item_code = %s AND id.check_name = %s
-                   ORDER BY i.inspected_at""",
-                (item_code, cn))
-            measurements = [float(r[0]) for r in cursor.fetchall() if r[0] is not None]
-
-            if len(measurements) < n * 2:
-                results.append({"check_name": cn, "message": "데이터 부족"})
-                continue
-
-            chart = _calculate_chart(item_code, cn, measurements, n,
-                                     float(ucl) if ucl else None,
-                                     float(lcl) if lcl else None,
-                                     float(target) if target else None)
-            results.append(chart)
+        results, rebuilt = await _rule_charts(cursor, item_code, rules)
+        if rebuilt:
+            await conn.commit()
 
         cursor.close()
         return {"item_code": item_code, "charts": results}
     except Exception as e:
+        if conn:
+            await conn.rollback()
         log.error("SPC chart error: %s", e)
         return {"error": "SPC 관리도 조회 중 오류가 발생했습니다."}
     finally:
         if conn:
-            release_conn(conn)
+            await release_conn_async(conn)
 
 
 def _calculate_chart(item_code, check_name, measurements, n,
-                     custom_ucl=None, custom_lcl=None, custom_target=None):
-    """X-bar/R 차트 계산."""
-    # 서브그룹 생성
-    subgroups = []
-    for i in range(0, len(measurements) - n + 1, n):
-        group = measurements[i:i + n]
-        if len(group) == n:
-            subgroups.append({
-                "no": len(subgroups) + 1,
-                "values": group,
-                "mean": sum(group) / len(group),
-                "range": max(group) - min(group),
-            })
-
-    if not subgroups:
+                     custom_ucl=None, custom_lcl=None, custom_target=None,
+                     chart_type="XBAR_R"):
+    """관리도 계산 (기본 X-bar/R)."""
+    chart = spc_engine.calculate(chart_type, measurements, n,
+                                 custom_ucl, custom_lcl, custom_target)
+    if chart is None:
         return {"check_name": check_name, "message": "서브그룹 부족"}
+    return {"check_name": check_name, "item_code": item_code, **chart}
 
-    # X-bar, R-bar 계산
-    x_bar = sum(sg["mean"] for sg in subgroups) / len(subgroups)
-    r_bar = sum(sg["range"] for sg in subgroups) / len(subgroups)
-
-    a2 = A2.get(n, 0.577)
-    d3 = D3.get(n, 0)
-    d4 = D4.get(n, 2.115)
-
-    # 관리 한계선
-    ucl_x = custom_ucl if custom_ucl is not None else x_bar + a2 * r_bar
-    lcl_x = custom_lcl if custom_lcl is not None else x_bar - a2 * r_bar
-    cl_x = custom_target if custom_target is not None else x_bar
-    ucl_r = d4 * r_bar
-    lcl_r = d3 * r_bar
 
-    # Western Electric 위반 검사
-    violations = _western_electric_rules(subgroups, x_bar, r_bar, n)
+async def _rule_charts(cursor, item_code, rules):
+    """활성 규칙들의 관리도 (저장된 상태 기준). → (차트 목록, 상태 재구성 여부)
 
+    규칙 수와 관계없이 상태 조회 1회 + 최근 점 조회 1회 (재구성 시 이력 조회 1회).
+    """
+    states, rebuilt = await _states(
+        cursor, item_code, [(rule_id, cn, rt or "XBAR_R", n)
+                            for rule_id, cn, rt, _, _, _, n in rules], lock=False)
+    limits = {rule_id: _state_limits(st) for rule_id, st in states.items() if st["count"] >= 2}
+    by_rule = {r[0]: r for r in rules}
+
+    charts = {}
+    ready = sorted(rule_id for rule_id, lim in limits.items() if lim is not None)
+    if ready:
+        await cursor.execute(_POINTS_SQL, (ready, SPC_CHART_POINTS))
+        async for rule_id, rows in _grouped(cursor):
+            _, cn, rt, ucl, lcl, target, n = by_rule[rule_id]
+            x = [float(r[2]) for r in rows]
+            spread = [float(r[3]) if r[3] is not None else math.nan for r in rows]
+            chart = spc_engine.chart(rt or "XBAR_R", n, x, spread, limits[rule_id], rows[0][1],
+                                     float(ucl) if ucl else None,
+                                     float(lcl) if lcl else None,
+                                     float(target) if target else None)
+            charts[rule_id] = {"check_name": cn, "item_code": item_code, **chart}
+
+    results = []
+    for rule_id, cn, *_ in rules:
+        if rule_id in charts:
+            results.append(charts[rule_id])
+        elif rule_id not in limits:
+            results.append({"check_name": cn, "message": "데이터 부족"})
+        else:
+            results.append({"check_name": cn, "message": "서브그룹 부족"})
+    return results, bool(rebuilt)
+
+
+# ── 증분 SPC 상태 ──
+
+# 품목의 여러 검사항목 이력을 한 번에 — check_name 별로 묶여 검사 순으로 나온다
+# (idx_insp_item_time, idx_insp_detail_insp_check 사용)
+_HISTORY_SQL = """SELECT id.check_name, id.measured_value, id.judgment = 'FAIL', i.inspection_id
+                  FROM inspections i
+                  JOIN inspection_details id ON id.inspection_id = i.inspection_id
+                  WHERE i.item_code = %s AND id.check_name = ANY(%s)
+                  ORDER BY id.check_name, i.inspected_at, i.inspection_id"""
+
+# 규칙별 최근 N 개 점 — PK (rule_id, subgroup_no) 역순 스캔을 규칙마다 한 번
+_POINTS_SQL = """SELECT r.rule_id, p.subgroup_no, p.value, p.spread
+                 FROM unnest(%s::int[]) AS r(rule_id)
+                 CROSS JOIN LATERAL (
+                     SELECT subgroup_no, value, spread FROM spc_points
+                     WHERE rule_id = r.rule_id
+                     ORDER BY subgroup_no DESC LIMIT %s
+                 ) p
+                 ORDER BY r.rule_id, p.subgroup_no"""
+
+
+async def _grouped(cursor, size=5000):
+    """첫 컬럼으로 정렬된 결과를 fetchmany 로 읽으며 (키, 행 목록) 을 차례로 넘긴다."""
+    key, group = None, []
+    while True:
+        rows = await cursor.fetchmany(size)
+        if not rows:
+            break
+        for row in rows:
+            if group and row[0] != key:
+                yield key, group
+                group = []
+            key = row[0]
+            group.append(row)
+    if group:
+        yield key, group
+
+
+def _subgroup_size(chart_type, n):
+    return 1 if chart_type == "I_MR" else n
+
+
+def _new_state(rule_id, chart_type, n):
+    return {"rule_id": rule_id, "chart_type": chart_type, "n": n, "count": 0,
+            "sum_x": 0.0, "sum_r": 0.0, "buffer": [], "recent": []}
+
+
+def _state_limits(state):
+    return spc_engine.control_limits(state["chart_type"], state["n"], state["count"],
+                                     state["sum_x"], state["sum_r"])
+
+
+def _sample(chart_type, value, judgment):
+    """검사 결과 한 건 → 상태에 넣을 값 (계수형은 불량 여부, 계량형은 측정값)."""
+    if chart_type in spc_engine.ATTRIBUTE_CHARTS:
+        return 1.0 if judgment == "FAIL" else 0.0
+    try:
+        return float(value) if value is not None else None
+    except (TypeError, ValueError):
+        return None
+
+
+def _advance(state, sample):
+    """상태에 값 하나를 반영. 서브그룹이 닫히면 {"no", "value", "spread", "violations"}."""
+    state["buffer"].append(sample)
+    if len(state["buffer"]) < _subgroup_size(state["chart_type"], state["n"]):
+        return None
+    prev = state["recent"][-1] if state["recent"] else None
+    x, spread = spc_engine.close_subgroup(state["chart_type"], state["buffer"], prev)
+    state["buffer"] = []
+    state["count"] += 1
+    state["sum_x"] += x
+    state["sum_r"] += spread or 0.0
+    no = state["count"]
+
+    found = []
+    if no >= SPC_MIN_SUBGROUPS:
+        limits = _state_limits(state)
+        if limits is not None:
+            found = spc_engine.latest_violations(state["recent"], x, limits, no)
+    state["recent"] = (state["recent"] + [x])[-spc_engine.RULE_WINDOW:]
+    return {"no": no, "value": x, "spread": spread, "violations": found}
+
+
+def _state_from_history(rule_id, chart_type, n, values):
+    """이력 값 전체 → (상태, 점 배열, 산포 배열). 과거 점의 위반은 만들지 않는다."""
+    state = _new_state(rule_id, chart_type, n)
+    x, spread = spc_engine.points(chart_type, values, n)
+    closed = len(x) * _subgroup_size(chart_type, n)
+    state.update(count=len(x), sum_x=float(x.sum()), sum_r=float(np.nansum(spread)),
+                 buffer=[float(v) for v in values[closed:]],
+                 recent=x[-spc_engine.RULE_WINDOW:].tolist())
+    return state, x, spread
+
+
+async def _lock_states(cursor, rule_ids):
+    # 같은 규칙의 상태 갱신/재구성을 트랜잭션 단위로 직렬화 (rule_id 순으로 잠가 교착 방지)
+    await cursor.execute(
+        "SELECT pg_advisory_xact_lock(hashtext('spc_state:' || r)) "
+        "FROM unnest(%s::int[]) AS r", (sorted(rule_ids),))
+
+
+async def _load_states(cursor, rule_ids):
+    await cursor.execute(
+        "SELECT rule_id, chart_type, sample_size, subgroup_count, sum_x, sum_r, buffer, recent "
+        "FROM spc_state WHERE rule_id = ANY(%s)", (list(rule_ids),))
     return {
-        "check_name": check_name,
-        "item_code": item_code,
-        "sample_size": n,
-        "subgroup_count": len(subgroups),
-        "x_bar_chart": {
-            "cl": round(cl_x, 4),
-            "ucl": round(ucl_x, 4),
-            "lcl": round(lcl_x, 4),
-            "data": [{"no": sg["no"], "mean": round(sg["mean"], 4)} for sg in subgroups],
-        },
-        "r_chart": {
-            "cl": round(r_bar, 4),
-            "ucl": round(ucl_r, 4),
-            "lcl": round(lcl_r, 4),
-            "data": [{"no": sg["no"], "range": round(sg["range"], 4)} for sg in subgroups],
-        },
-        "violations": violations,
-        "in_control": len(violations) == 0,
+        row[0]: {"rule_id": row[0], "chart_type": row[1], "n": row[2], "count": row[3],
+                 "sum_x": float(row[4]), "sum_r": float(row[5]),
+                 "buffer": list(row[6] or []), "recent": list(row[7] or [])}
+        for row in await cursor.fetchall()
     }
 
 
+async def _save_state(cursor, state):
+    await cursor.execute(
+        """INSERT INTO spc_state
+           (rule_id, chart_type, sample_size, subgroup_count, sum_x, sum_r, buffer, recent, updated_at)
+           VALUES (%s, %s, %s, %s, %s, %s, %s::jsonb, %s::jsonb, NOW())
+           ON CONFLICT (rule_id) DO UPDATE SET
+               chart_type = EXCLUDED.chart_type,
+               sample_size = EXCLUDED.sample_size,
+               subgroup_count = EXCLUDED.subgroup_count,
+               sum_x = EXCLUDED.sum_x,
+               sum_r = EXCLUDED.sum_r,
+               buffer = EXCLUDED.buffer,
+               recent = EXCLUDED.recent,
+               updated_at = NOW()""",
+        (state["rule_id"], state["chart_type"], state["n"], state["count"],
+         state["sum_x"], state["sum_r"], json.dumps(state["buffer"]), json.dumps(state["recent"])))
+
+
+async def _load_history(cursor, item_code, check_names):
+    """{check_name: [(measured_value, is_fail, inspection_id)]} — 한 번의 조회."""
+    await cursor.execute(_HISTORY_SQL, (item_code, list(check_names)))
+    return {cn: [r[1:] for r in rows] async for cn, rows in _grouped(cursor)}
+
+
+async def _rebuild_state(cursor, rule_id, chart_type, n, history):
+    """검사 이력으로 상태와 spc_points 를 다시 만든다."""
+    if chart_type in spc_engine.ATTRIBUTE_CHARTS:
+        rows = [(1.0 if fail else 0.0, iid) for _, fail, iid in history]
+    else:
+        rows = [(float(v), iid) for v, _, iid in history if v is not None]
+    state, x, spread = _state_from_history(rule_id, chart_type, n, [r[0] for r in rows])
+
+    size = _subgroup_size(chart_type, n)
+    points = [(rule_id, i + 1, v, None if math.isnan(r) else r, rows[(i + 1) * size - 1][1])
+              for i, (v, r) in enumerate(zip(x.tolist(), spread.tolist()))]
+    await cursor.execute("DELETE FROM spc_points WHERE rule_id = %s", (rule_id,))
+    if points:
+        await run_in_db_thread(
+            execute_values, cursor.raw,
+            "INSERT INTO spc_points (rule_id, subgroup_no, value, spread, inspection_id) VALUES %s",
+            points, page_size=1000)
+    await _save_state(cursor, state)
+    return state
+
+
+async def _states(cursor, item_code, specs, lock=True):
+    """규칙들의 현재 상태. specs: [(rule_id, check_name, chart_type, sample_size)].
+
+    상태가 없거나 규칙이 바뀐 것은 이력 한 번 조회로 모두 재구성한다.
+    lock=False (조회 경로) 는 재구성이 필요할 때만 잠근다.
+    → ({rule_id: 상태}, 재구성된 rule_id 집합)
+    """
+    def stale(states):
+        return [(rule_id, cn, rt, n) for rule_id, cn, rt, n in specs
+                if rule_id not in states
+                or (states[rule_id]["chart_type"], states[rule_id]["n"]) != (rt, n)]
+
+    if lock:
+        await _lock_states(cursor, [s[0] for s in specs])
+    states = await _load_states(cursor, [s[0] for s in specs])
+    todo = stale(states)
+    if todo and not lock:
+        await _lock_states(cursor, [s[0] for s in todo])
+        states.update(await _load_states(cursor, [s[0] for s in todo]))
+        todo = stale(states)
+    if todo:
+        history = await _load_history(cursor, item_code, {cn for _, cn, _, _ in todo})
+        for rule_id, cn, rt, n in todo:
+            states[rule_id] = await _rebuild_state(cursor, rule_id, rt, n, history.get(cn, []))
+    return states, {s[0] for s in todo}
+
+
+async def update_spc_state(cursor, item_code, inspection_id, details) -> list[dict]:
+    """검사 등록 트랜잭션 안에서 SPC 상태 갱신 + 새 위반 기록.
+
+    details: [(check_name, value, judgment)] — 이미 inspection_details 에 저장된 행.
+    반환: 이번 검사로 성립한 위반 [{"check_name", "subgroup", "rule", ...}].
+    """
+    by_check = {}
+    for name, value, judgment in details:
+        by_check.setdefault(name, []).append((value, judgment))
+    if not by_check:
+        return []
+
+    await cursor.execute(
+        "SELECT rule_id, check_name, rule_type, sample_size FROM spc_rules "
+        "WHERE item_code = %s AND check_name = ANY(%s) AND is_active = TRUE "
+        "ORDER BY rule_id",
+        (item_code, list(by_check)))
+    rules = [(rule_id, cn, rt or "XBAR_R", n) for rule_id, cn, rt, n in await cursor.fetchall()]
+    if not rules:
+        return []
+    states, rebuilt = await _states(cursor, item_code, rules)
+
+    found = []
+    for rule_id, cn, rt, n in rules:
+        if rule_id in rebuilt:
+            continue  # 재구성이 방금 저장된 값까지 반영했다
+        state = states[rule_id]
+        for value, judgment in by_check[cn]:
+            sample = _sample(rt, value, judgment)
+            if sample is None:
+                continue
+            point = _advance(state, sample)
+            if point is None:
+                continue
+            await cursor.execute(
+                "INSERT INTO spc_points (rule_id, subgroup_no, value, spread, inspection_id) "
+                "VALUES (%s, %s, %s, %s, %s)",
+                (rule_id, point["no"], point["value"], point["spread"], inspection_id))
+            for v in point["violations"]:
+                await cursor.execute(
+                    """INSERT INTO spc_violations
+                       (rule_id, inspection_id, violation_type, measured_value, subgroup_no, severity)
+                       VALUES (%s, %s, %s, %s, %s, %s)""",
+                    (rule_id, inspection_id, v["rule"], v["value"], v["subgroup"], v["severity"]))
+                found.append({"check_name": cn, **v})
+        await _save_state(cursor, state)
+    return found
+
+
+def _sample_size_error(rule_type, sample_size):
+    """rule_type 별 sample_size 검증 — 오류 메시지 또는 None.
+
+    X-bar 관리도는 상수표(A2/D3/D4) 범위 2~10, 계수형은 1 이상. I-MR 은 쓰지 않는다.
+    """
+    if isinstance(sample_size, bool) or not isinstance(sample_size, int):
+        return "sample_size는 정수여야 합니다."
+    if rule_type in ("XBAR_R", "XBAR_S"):
+        lo, hi = min(spc_engine.A2), max(spc_engine.A2)
+        if not lo <= sample_size <= hi:
+            return f"{rule_type} 의 sample_size는 {lo}~{hi} 이어야 합니다."
+    elif sample_size < 1:
+        return "sample_size는 1 이상이어야 합니다."
+    return None
+
+
 async def create_spc_rule(data: dict) -> dict:
     """FN-039: SPC 규칙 설정."""
     conn = None
     try:
-        conn = get_conn()
+        conn = await get_conn_async()
         if not conn:
             return {"error": "데이터베이스 연결에 실패했습니다."}
         cursor = conn.cursor()
@@ -197,8 +399,17 @@ async def create_spc_rule(data: dict) -> dict:
         if not item_code or not check_name:
             cursor.close()
             return {"error": "item_code와 check_name은 필수입니다."}
+        rule_type = data.get("rule_type", "XBAR_R")
+        if rule_type not in spc_engine.CHART_TYPES:
+            cursor.close()
+            return {"error": f"rule_type은 {', '.join(spc_engine.CHART_TYPES)} 중 하나여야 합니다."}
+        sample_size = data.get("sample_size", 5)
+        size_error = _sample_size_error(rule_type, sample_size)
+        if size_error:
+            cursor.close()
+            return {"error": size_error}
 
-        cursor.execute(
+        await cursor.execute(
             """INSERT INTO spc_rules (item_code, check_name, rule_type, ucl, lcl, target, sample_size)
                VALUES (%s, %s, %s, %s, %s, %s, %s)
                ON CONFLICT (item_code, check_name) DO UPDATE SET
@@ -209,44 +420,60 @@ async def create_spc_rule(data: dict) -> dict:
                    sample_size = EXCLUDED.sample_size
                RETURNING rule_id""",
             (item_code, check_name,
-             data.get("rule_type", "XBAR_R"),
+             rule_type,
              data.get("ucl"), data.get("lcl"), data.get("target"),
-             data.get("sample_size", 5)))
-        rule_id = cursor.fetchone()[0]
-        conn.commit()
+             sample_size))
+        rule_id = (await cursor.fetchone())[0]
+        # 규칙이 바뀌면 다음 조회/검사 등록 때 이력으로 상태를 다시 만든다
+        await cursor.execute("DELETE FROM spc_state WHERE rule_id = %s", (rule_id,))
+        await conn.commit()
         cursor.close()
         return {"success": True, "rule_id": rule_id}
     except Exception as e:
         if conn:
-            conn.rollback()
+            await conn.rollback()
         log.error("SPC rule creation error: %s", e)
         return {"error": str(e)}
     finally:
         if conn:
-            release_conn(conn)
+            await release_conn_async(conn)
 
 
 async def get_cpk(item_code: str, check_name: str = None) -> dict:
     """FN-040: Cp/Cpk 분석."""
     conn = None
     try:
-        conn = get_conn()
+        conn = await get_conn_async()
         if not conn:
             return {"error": "데이터베이스 연결에 실패했습니다."}
         cursor = conn.cursor()
 
         # 규격 한계 조회
         if check_name:
-            cursor.execute(
+            await cursor.execute(
                 "SELECT check_name, min_value, max_value, std_value "
                 "FROM quality_standards WHERE item_code = %s AND check_name = %s",
                 (item_code, check_name))
         else:
-            cursor.execute(
+            await cursor.execute(
                 "SELECT check_name, min_value, max_value, std_value "
                 "FROM quality_standards WHERE item_code = %s",
                 (item_code,))
-        standards = cursor.fetchall()
+        standards = await cursor.fetchall()
+
+        # 검사항목별 n / 평균 / 표본표준편차 — 항목 수와 관계없이 한 번의 집계
+        stats = {}
+        if standards:
+            await cursor.execute(
+                """SELECT id.check_name, COUNT(*), AVG(id.measured_value),
+                          STDDEV_SAMP(id.measured_value)
+                   FROM inspections i
+                   JOIN inspection_details id ON id.inspection_id = i.inspection_id
+                   WHERE i.item_code = %s AND id.check_name = ANY(%s)
+                   AND id.measured_value IS NOT NULL
+                   GROUP BY id.check_name""",
+                (item_code, [r[0] for r in standards]))
+            stats = {r[0]: r[1:] for r in await cursor.fetchall()}
 
         results = []
         for cn, lsl, usl, target in standards:
@@ -257,23 +484,12 @@ async def get_cpk(item_code: str, check_name: str = None) -> dict:
             lsl, usl = float(lsl), float(usl)
             target = float(target) if target else (usl + lsl) / 2
 
-            # 측정 데이터 조회
-            cursor.execute(
-                """SELECT id.measured_value
-                   FROM inspection_details id
-                   JOIN inspections i ON id.inspection_id = i.inspection_id
-                   WHERE i.item_code = %s AND id.check_name = %s
-                   AND id.measured_value IS NOT NULL""",
-                (item_code, cn))
-            values = [float(r[0]) for r in cursor.fetchall()]
-
-            if len(values) < 2:
+            count, mean, sigma = stats.get(cn, (0, None, None))
+            if count < 2:
                 results.append({"check_name": cn, "message": "데이터 부족"})
                 continue
 
-            mean = sum(values) / len(values)
-            sigma = math.sqrt(sum((v - mean) ** 2 for v in values) / (len(values) - 1))
-
+            mean, sigma = float(mean), float(sigma)
             if sigma == 0:
                 results.append({"check_name": cn, "cp": 999, "cpk": 999, "message": "변동 없음"})
                 continue
@@ -292,7 +508,7 @@ async def get_cpk(item_code: str, check_name: str = None) -> dict:
                 "target": target,
                 "mean": round(mean, 4),
                 "sigma": round(sigma, 4),
-                "n": len(values),
+                "n": count,
                 "cp": round(cp, 4),
                 "cpu": round(cpu, 4),
                 "cpl": round(cpl, 4),
@@ -307,7 +523,7 @@ async def get_cpk(item_code: str, check_name: str = None) -> dict:
         return {"error": "Cp/Cpk 분석 중 오류가 발생했습니다."}
     finally:
         if conn:
-            release_conn(conn)
+            await release_conn_async(conn)
 
 
 async def spc_auto_actions(data: dict) -> dict:
@@ -324,20 +540,20 @@ async def spc_auto_actions(data: dict) -> dict:
 
     conn = None
     try:
-        conn = get_conn()
+        conn = await get_conn_async()
         if not conn:
             return {"error": "데이터베이스 연결에 실패했습니다."}
         cursor = conn.cursor()
 
         # 해당 LOT 재고를 HOLD 처리
-        cursor.execute(
+        await cursor.execute(
             "UPDATE inventory SET status = 'HOLD' WHERE lot_no = %s AND status = 'NORMAL'",
             (lot_no,),
         )
         held = cursor.rowcount
 
         # SPC violation 기록
-        cursor.execute(
+        await cursor.execute(
             """INSERT INTO spc_violations
                (item_code, check_name, rule_name, violated_at, detail)
                VALUES (%s, %s, 'AUTO_QUARANTINE', NOW(), %s)""",
@@ -348,15 +564,9 @@ async def spc_auto_actions(data: dict) -> dict:
         # NCR 자동 생성
         ncr_id = None
         try:
-            from datetime import datetime
-            today = datetime.now().strftime("%Y%m%d")
-            cursor.execute(
-                "SELECT COUNT(*) FROM ncr WHERE ncr_id LIKE %s",
-                (f"NCR-{today}-%",),
-            )
-            seq = (cursor.fetchone()[0] or 0) + 1
-            ncr_id = f"NCR-{today}-{seq:03d}"
-            cursor.execute(
+            ncr_id = await next_doc_no_async(cursor, "NCR",
+                                             seed=("ncr", "ncr_id"))
+            await cursor.execute(
                 """INSERT INTO ncr (ncr_id, title, source, lot_no, item_code, status)
                    VALUES (%s, %s, 'PROCESS', %s, %s, 'DETECTED')""",
                 (ncr_id, f"SPC 위반 자동격리: {lot_no}", lot_no, item_code),
@@ -364,7 +574,7 @@ async def spc_auto_actions(data: dict) -> dict:
         except Exception:
             ncr_id = None
 
-        conn.commit()
+        await conn.commit()
         cursor.close()
         return {
             "success": True, "lot_no": lot_no, "held_count": held,
@@ -373,9 +583,9 @@ async def spc_auto_actions(data: dict) -> dict:
         }
     except Exception as e:
         if conn:
-            conn.rollback()
+            await conn.rollback()
         log.error("SPC auto-action error: %s", e)
         return {"error": str(e)}
     finally:
         if conn:
-            release_conn(conn)
+            await release_conn_async(conn)
@@ -2,6 +2,7 @@
 
 import logging
 from api_modules.database import get_conn, release_conn
+from api_modules.doc_numbering import next_doc_no
 
 log = logging.getLogger(__name__)
 
@@ -89,12 +90,8 @@ async def create_scar(data: dict) -> dict:
             return {"error": "데이터베이스 연결에 실패했습니다."}
         cursor = conn.cursor()
 
-        from datetime import datetime
-        today = datetime.now().strftime("%Y%m%d")
-        cursor.execute("SELECT COUNT(*) FROM scar WHERE scar_code LIKE %s",
-                       (f"SCAR-{today}-%",))
-        seq = (cursor.fetchone()[0] or 0) + 1
-        scar_code = f"SCAR-{today}-{seq:03d}"
+        scar_code = next_doc_no(cursor, "SCAR",
+                                seed=("scar", "scar_code"))
 
         cursor.execute(
             """INSERT INTO scar
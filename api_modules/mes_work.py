@@ -2,14 +2,15 @@
 
 from datetime import date
 
-from api_modules.database import get_conn, release_conn
+from api_modules.database import get_conn_async, release_conn_async
+from api_modules.doc_numbering import next_doc_no_async
 
 
 async def create_work_order(data: dict) -> dict:
     """FN-020: Create a work order from a plan."""
     conn = None
     try:
-        conn = get_conn()
+        conn = await get_conn_async()
         if not conn:
             return {"error": "Database connection failed."}
 
@@ -17,12 +18,12 @@ async def create_work_order(data: dict) -> dict:
         plan_id = data["plan_id"]
 
         # Get plan info
-        cursor.execute(
+        await cursor.execute(
             "SELECT item_code, plan_qty FROM production_plans "
             "WHERE plan_id = %s",
             (plan_id,),
         )
-        plan = cursor.fetchone()
+        plan = await cursor.fetchone()
         if not plan:
             cursor.close()
             return {"error": "Plan not found."}
@@ -31,15 +32,10 @@ async def create_work_order(data: dict) -> dict:
 
         # Generate WO ID: WO-YYYYMMDD-SEQ
         date_part = work_date.replace("-", "")
-        cursor.execute(
-            "SELECT COUNT(*) FROM work_orders "
-            "WHERE wo_id LIKE %s",
-            (f"WO-{date_part}-%",),
-        )
-        seq = cursor.fetchone()[0] + 1
-        wo_id = f"WO-{date_part}-{seq:03d}"
+        wo_id = await next_doc_no_async(cursor, "WO", day=date_part,
+                                        seed=("work_orders", "wo_id"))
 
-        cursor.execute(
+        await cursor.execute(
             "INSERT INTO work_orders "
             "(wo_id, plan_id, item_code, work_date, equip_code, plan_qty, status) "
             "VALUES (%s, %s, %s, %s, %s, %s, 'WAIT')",
@@ -48,22 +44,22 @@ async def create_work_order(data: dict) -> dict:
         )
 
         # Update plan status to PROGRESS
-        cursor.execute(
+        await cursor.execute(
             "UPDATE production_plans SET status = 'PROGRESS' "
             "WHERE plan_id = %s AND status = 'WAIT'",
             (plan_id,),
         )
 
-        conn.commit()
+        await conn.commit()
         cursor.close()
         return {"work_order_id": wo_id, "success": True}
     except Exception as e:
         if conn:
-            conn.rollback()
+            await conn.rollback()
         return {"error": str(e)}
     finally:
         if conn:
-            release_conn(conn)
+            await release_conn_async(conn)
 
 
 async def get_work_orders(work_date: str = None, line_id: str = None,
@@ -71,7 +67,7 @@ async def get_work_orders(work_date: str = None, line_id: str = None,
     """FN-021: List work orders with filters."""
     conn = None
     try:
-        conn = get_conn()
+        conn = await get_conn_async()
         if not conn:
             return {"orders": []}
 
@@ -88,7 +84,7 @@ async def get_work_orders(work_date: str = None, line_id: str = None,
 
         where_sql = "WHERE " + " AND ".join(where) if where else ""
 
-        cursor.execute(
+        await cursor.execute(
             f"SELECT wo.wo_id, i.name, wo.plan_qty, wo.status, "
             f"wo.work_date, wo.equip_code "
             f"FROM work_orders wo "
@@ -97,7 +93,7 @@ async def get_work_orders(work_date: str = None, line_id: str = None,
             f"ORDER BY wo.work_date DESC, wo.wo_id",
             params,
         )
-        rows = cursor.fetchall()
+        rows = await cursor.fetchall()
         cursor.close()
 
         orders = [
@@ -113,19 +109,19 @@ async def get_work_orders(work_date: str = None, line_id: str = None,
         return {"error": str(e)}
     finally:
         if conn:
-            release_conn(conn)
+            await release_conn_async(conn)
 
 
 async def get_work_order_detail(wo_id: str) -> dict:
     """FN-022: Get work order detail."""
     conn = None
     try:
-        conn = get_conn()
+        conn = await get_conn_async()
         if not conn:
             return {"error": "Database connection failed."}
 
         cursor = conn.cursor()
-        cursor.execute(
+        await cursor.execute(
             "SELECT wo.wo_id, i.item_code, i.name, wo.plan_qty, "
             "wo.status, wo.work_date, wo.equip_code "
             "FROM work_orders wo "
@@ -133,29 +129,29 @@ async def get_work_order_detail(wo_id: str) -> dict:
             "WHERE wo.wo_id = %s",
             (wo_id,),
         )
-        wo = cursor.fetchone()
+        wo = await cursor.fetchone()
         if not wo:
             cursor.close()
             return {"error": "Work order not found."}
 
         # Get results
-        cursor.execute(
+        await cursor.execute(
             "SELECT result_id, good_qty, defect_qty, worker_id, "
             "start_time, end_time "
             "FROM work_results WHERE wo_id = %s",
             (wo_id,),
         )
-        results = cursor.fetchall()
+        results = await cursor.fetchall()
 
         # Get routing
-        cursor.execute(
+        await cursor.execute(
             "SELECT r.seq, p.name, r.cycle_time "
             "FROM routings r "
             "JOIN processes p ON r.process_code = p.process_code "
             "WHERE r.item_code = %s ORDER BY r.seq",
             (wo[1],),
         )
-        routing = cursor.fetchall()
+        routing = await cursor.fetchall()
         cursor.close()
 
         total_good = sum(r[1] for r in results)
@@ -187,7 +183,7 @@ async def get_work_order_detail(wo_id: str) -> dict:
         return {"error": str(e)}
     finally:
         if conn:
-            release_conn(conn)
+            await release_conn_async(conn)
 
 
 async def update_work_order_status(wo_id: str, data: dict) -> dict:
@@ -200,14 +196,14 @@ async def update_work_order_status(wo_id: str, data: dict) -> dict:
     }
     conn = None
     try:
-        conn = get_conn()
+        conn = await get_conn_async()
         if not conn:
             return {"error": "데이터베이스 연결에 실패했습니다."}
         cursor = conn.cursor()
 
         new_status = data.get("status", "").upper()
-        cursor.execute("SELECT status FROM work_orders WHERE wo_id = %s", (wo_id,))
-        row = cursor.fetchone()
+        await cursor.execute("SELECT status FROM work_orders WHERE wo_id = %s", (wo_id,))
+        row = await cursor.fetchone()
         if not row:
             return {"error": "작업지시를 찾을 수 없습니다."}
 
@@ -216,27 +212,27 @@ async def update_work_order_status(wo_id: str, data: dict) -> dict:
         if new_status not in allowed:
             return {"error": f"상태 전이 불가: {current} → {new_status}. 허용: {allowed}"}
 
-        cursor.execute(
+        await cursor.execute(
             "UPDATE work_orders SET status = %s WHERE wo_id = %s",
             (new_status, wo_id),
         )
-        conn.commit()
+        await conn.commit()
         cursor.close()
         return {"success": True, "wo_id": wo_id, "status": new_status}
     except Exception:
         if conn:
-            conn.rollback()
+            await conn.rollback()
         return {"error": "상태 변경 중 오류가 발생했습니다."}
     finally:
         if conn:
-            release_conn(conn)
+            await release_conn_async(conn)
 
 
 async def create_work_result(data: dict) -> dict:
     """FN-023: Register work result with proper state transition."""
     conn = None
     try:
-        conn = get_conn()
+        conn = await get_conn_async()
         if not conn:
             return {"error": "데이터베이스 연결에 실패했습니다."}
 
@@ -246,11 +242,11 @@ async def create_work_result(data: dict) -> dict:
             return {"error": "작업지시 ID는 필수입니다."}
 
         # Validate WO exists and check current status
-        cursor.execute(
+        await cursor.execute(
             "SELECT status, plan_qty FROM work_orders WHERE wo_id = %s",
             (wo_id,),
         )
-        wo_row = cursor.fetchone()
+        wo_row = await cursor.fetchone()
         if not wo_row:
             return {"error": "작업지시를 찾을 수 없습니다."}
         if wo_row[0] == "DONE":
@@ -258,12 +254,12 @@ async def create_work_result(data: dict) -> dict:
 
         # Step 1: WAIT → WORKING transition first (before any DONE check)
         if wo_row[0] == "WAIT":
-            cursor.execute(
+            await cursor.execute(
                 "UPDATE work_orders SET status = 'WORKING' WHERE wo_id = %s",
                 (wo_id,),
             )
 
-        cursor.execute(
+        await cursor.execute(
             "INSERT INTO work_results "
             "(wo_id, good_qty, defect_qty, defect_code, worker_id, "
             "start_time, end_time) "
@@ -278,29 +274,29 @@ async def create_work_result(data: dict) -> dict:
                 data.get("end_time"),
             ),
         )
-        result_id = cursor.fetchone()[0]
+        result_id = (await cursor.fetchone())[0]
 
         # Step 2: Check if total good_qty >= plan_qty → WORKING → DONE
-        cursor.execute(
+        await cursor.execute(
             "SELECT wo.plan_qty, COALESCE(SUM(wr.good_qty), 0) "
             "FROM work_orders wo "
             "LEFT JOIN work_results wr ON wo.wo_id = wr.wo_id "
             "WHERE wo.wo_id = %s GROUP BY wo.plan_qty",
             (wo_id,),
         )
-        row = cursor.fetchone()
+        row = await cursor.fetchone()
         progress = 0
         if row:
             progress = round(row[1] / row[0] * 100, 1) if row[0] > 0 else 0
             if row[1] >= row[0]:
                 # Only WORKING → DONE (never WAIT → DONE)
-                cursor.execute(
+                await cursor.execute(
                     "UPDATE work_orders SET status = 'DONE' "
                     "WHERE wo_id = %s AND status = 'WORKING'",
                     (wo_id,),
                 )
 
-        conn.commit()
+        await conn.commit()
         cursor.close()
         return {
             "result_id": result_id,
@@ -309,18 +305,18 @@ async def create_work_result(data: dict) -> dict:
         }
     except Exception:
         if conn:
-            conn.rollback()
+            await conn.rollback()
         return {"error": "실적 등록 중 오류가 발생했습니다."}
     finally:
         if conn:
-            release_conn(conn)
+            await release_conn_async(conn)
 
 
 async def get_dashboard(target_date: str = None) -> dict:
     """FN-024: Production dashboard data."""
     conn = None
     try:
-        conn = get_conn()
+        conn = await get_conn_async(readonly=True)
         if not conn:
             return {"lines": [], "hourly": []}
 
@@ -330,7 +326,7 @@ async def get_dashboard(target_date: str = None) -> dict:
         cursor = conn.cursor()
 
         # Line-level summary
-        cursor.execute(
+        await cursor.execute(
             "SELECT wo.equip_code, "
             "SUM(wo.plan_qty) AS target, "
             "COALESCE(SUM(wr.good_qty), 0) AS actual, "
@@ -341,10 +337,10 @@ async def get_dashboard(target_date: str = None) -> dict:
             "GROUP BY wo.equip_code",
             (target_date,),
         )
-        lines = cursor.fetchall()
+        lines = await cursor.fetchall()
 
         # Hourly breakdown
-        cursor.execute(
+        await cursor.execute(
             "SELECT EXTRACT(HOUR FROM wr.start_time)::int AS hour, "
             "SUM(wr.good_qty) AS qty "
             "FROM work_results wr "
@@ -354,7 +350,7 @@ async def get_dashboard(target_date: str = None) -> dict:
             "ORDER BY hour",
             (target_date,),
         )
-        hourly = cursor.fetchall()
+        hourly = await cursor.fetchall()
         cursor.close()
 
         return {
@@ -377,4 +373,4 @@ async def get_dashboard(target_date: str = None) -> dict:
         return {"error": str(e)}
     finally:
         if conn:
-            release_conn(conn)
+            await release_conn_async(conn)
@@ -0,0 +1,397 @@
+"""REQ-042: MQTT 수집 워커 — mqtt_config 구독 → 메모리 버퍼 → sensor_data 배치 적재.
+
+API 워커(uvicorn 프로세스)마다 구독하면 같은 메시지가 중복 적재되므로
+별도 프로세스로 1개만 실행한다:
+
+    python -m api_modules.mqtt_ingest
+
+- 활성 mqtt_config 를 broker_url 별로 묶어 브로커당 클라이언트 1개, 패턴별 구독
+- 토픽에 매칭되는 설정이 여러 개면(와일드카드 중복 포함) 설정마다 따로 적재
+- collect_interval_sec: 설정·토픽별로 그 간격보다 빨리 온 메시지는 버림 (0/NULL=전부 적재)
+- 수신 메시지는 상한이 있는 버퍼에 쌓고, 가득 차면 네트워크 스레드를 잠시 막아
+  (back-pressure) 브로커 쪽 QoS1 큐에 머물게 한 뒤에도 자리가 없으면 버림
+- MQTT_FLUSH_ROWS 건 또는 MQTT_FLUSH_INTERVAL_SEC 초마다 COPY 로 한 번에 적재
+- MQTT_RELOAD_SEC 마다 설정을 다시 읽어 추가/삭제된 브로커·토픽만 반영
+- 검증은 버퍼에서 꺼낼 때 한 번만 (불량 행은 rejected). 적재 실패 배치는 재시도하되,
+  DB 연결 오류가 아닌 실패가 MQTT_FLUSH_MAX_ATTEMPTS 회 반복되면 버린다
+
+페이로드: 숫자 하나, {"value", "collected_at"|"ts", "equip_code", "sensor_type"}
+객체, 또는 그 배열. equip_code/sensor_type 은 설정값이 우선한다.
+"""
+
+import json
+import logging
+import os
+import signal
+import threading
+import time
+from collections import deque
+from urllib.parse import urlparse
+
+import psycopg2
+
+from api_modules.database import get_conn, release_conn
+from api_modules.sensor_ingest import copy_rows, validate_readings
+
+log = logging.getLogger(__name__)
+
+try:
+    import paho.mqtt.client as mqtt
+    HAS_PAHO = True
+except ImportError:
+    HAS_PAHO = False
+
+BUFFER_MAX = int(os.getenv("MQTT_BUFFER_MAX", "50000"))
+PUT_TIMEOUT = float(os.getenv("MQTT_BUFFER_PUT_TIMEOUT", "2"))
+FLUSH_ROWS = int(os.getenv("MQTT_FLUSH_ROWS", "5000"))
+FLUSH_INTERVAL = float(os.getenv("MQTT_FLUSH_INTERVAL_SEC", "1"))
+RELOAD_SEC = float(os.getenv("MQTT_RELOAD_SEC", "30"))
+MQTT_QOS = int(os.getenv("MQTT_QOS", "1"))
+FLUSH_MAX_ATTEMPTS = int(os.getenv("MQTT_FLUSH_MAX_ATTEMPTS", "3"))
+
+# 재시도해도 되는 실패 (DB 미연결/연결 끊김) — 배치 자체는 정상
+_TRANSIENT_ERRORS = (RuntimeError, psycopg2.OperationalError, psycopg2.InterfaceError)
+
+
+class ReadingBuffer:
+    """상한이 있는 스레드 안전 버퍼. 가득 차면 put 이 최대 put_timeout 초 대기."""
+
+    def __init__(self, maxsize: int = BUFFER_MAX, put_timeout: float = PUT_TIMEOUT):
+        self.maxsize = maxsize
+        self.put_timeout = put_timeout
+        self._items = deque()
+        self._cond = threading.Condition()
+        self.received = 0
+        self.dropped = 0
+
+    def __len__(self):
+        return len(self._items)
+
+    def put(self, reading: dict) -> bool:
+        with self._cond:
+            self.received += 1
+            if len(self._items) >= self.maxsize:
+                self._cond.notify_all()  # flush 스레드를 깨움
+                self._cond.wait_for(lambda: len(self._items) < self.maxsize,
+                                    self.put_timeout)
+                if len(self._items) >= self.maxsize:
+                    self.dropped += 1
+                    return False
+            self._items.append(reading)
+            if len(self._items) >= FLUSH_ROWS:
+                self._cond.notify_all()
+            return True
+
+    def wait(self, min_rows: int, timeout: float) -> None:
+        """min_rows 건이 쌓이거나 timeout 이 지날 때까지 대기."""
+        with self._cond:
+            self._cond.wait_for(lambda: len(self._items) >= min_rows, timeout)
+
+    def drain(self, max_rows: int) -> list:
+        with self._cond:
+            n = min(max_rows, len(self._items))
+            batch = [self._items.popleft() for _ in range(n)]
+            self._cond.notify_all()  # 대기 중인 put 해제
+            return batch
+
+    def wake(self):
+        with self._cond:
+            self._cond.notify_all()
+
+
+def parse_broker_url(url: str) -> tuple:
+    """mqtt://host:port, tcp://host:port, host:port, host → (host, port)."""
+    parsed = urlparse(url if "://" in url else f"mqtt://{url}")
+    return parsed.hostname or "localhost", parsed.port or 1883
+
+
+def parse_payload(cfg: dict, payload: bytes) -> list:
+    """페이로드 → reading dict 리스트 (검증은 sensor_ingest 에서 일괄)."""
+    try:
+        data = json.loads(payload)
+    except ValueError:
+        data = payload.decode("utf-8", "replace").strip()
+    items = data if isinstance(data, list) else [data]
+    readings = []
+    for item in items:
+        if isinstance(item, dict):
+            r = {
+                "equip_code": cfg.get("equip_code") or item.get("equip_code"),
+                "sensor_type": cfg.get("sensor_type") or item.get("sensor_type"),
+                "value": item.get("value"),
+                "collected_at": item.get("collected_at") or item.get("ts")
+                or item.get("timestamp"),
+            }
+        else:
+            r = {"equip_code": cfg.get("equip_code"),
+                 "sensor_type": cfg.get("sensor_type"), "value": item}
+        r["source"] = "MQTT"
+        readings.append(r)
+    return readings
+
+
+def load_configs() -> list:
+    """활성 mqtt_config (토픽 패턴이 있는 행만)."""
+    conn = get_conn()
+    if not conn:
+        raise RuntimeError("데이터베이스 연결에 실패했습니다.")
+    try:
+        cur = conn.cursor()
+        cur.execute(
+            """SELECT config_id, broker_url, topic_pattern, equip_code, sensor_type,
+                      collect_interval_sec
+               FROM mqtt_config
+               WHERE is_active = TRUE AND COALESCE(topic_pattern, '') <> ''
+               ORDER BY config_id""",
+        )
+        rows = cur.fetchall()
+        cur.close()
+        return [
+            {"config_id": r[0], "broker_url": r[1], "topic_pattern": r[2],
+             "equip_code": r[3], "sensor_type": r[4], "collect_interval_sec": r[5]}
+            for r in rows
+        ]
+    finally:
+        release_conn(conn)
+
+
+def write_rows(rows: list) -> int:
+    """검증된 행 COPY + 커밋. 적재 건수 반환. DB 오류는 예외로 전파."""
+    conn = get_conn()
+    if not conn:
+        raise RuntimeError("데이터베이스 연결에 실패했습니다.")
+    try:
+        cur = conn.cursor()
+        copy_rows(cur, rows)
+        conn.commit()
+        cur.close()
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        release_conn(conn)
+    return len(rows)
+
+
+def _paho_client(client_id: str):
+    return mqtt.Client(mqtt.CallbackAPIVersion.VERSION2, client_id=client_id)
+
+
+class _Broker:
+    """브로커 1개 — 클라이언트 + 구독 패턴 → 설정 목록."""
+
+    def __init__(self, url: str, client):
+        self.url = url
+        self.client = client
+        self.patterns = {}  # topic_pattern → [cfg, ...]
+        self.routes = {}    # topic → [cfg, ...] (매칭 결과 캐시, 설정 변경 시 초기화)
+        self.last_kept = {}  # (config_id, topic) → 마지막 적재 시각 (monotonic)
+        self.throttled = 0
+        self.connected = False
+
+
+class MqttIngestWorker:
+    """mqtt_config 기반 구독 + 배치 적재 워커."""
+
+    def __init__(self, client_factory=None, writer=write_rows,
+                 config_loader=load_configs, buffer: ReadingBuffer = None):
+        self.client_factory = client_factory or _paho_client
+        self.writer = writer
+        self.config_loader = config_loader
+        self.buffer = buffer or ReadingBuffer()
+        self.brokers = {}
+        self._configs = None
+        self._pending = []  # 적재 실패로 재시도 대기 중인 (검증된) 행
+        self._attempts = 0  # _pending 의 비일시적 실패 횟수
+        self._stop = threading.Event()
+        self.accepted = 0
+        self.rejected = 0
+        self.flush_errors = 0
+        self.dropped = 0    # 재시도 한도 초과로 버린 행
+
+    # ── 설정 / 구독 ──
+
+    def reload(self) -> bool:
+        """설정을 다시 읽어 변경이 있으면 반영. 변경 여부 반환."""
+        configs = self.config_loader()
+        key = [tuple(sorted(c.items())) for c in configs]
+        if key == self._configs:
+            return False
+        self._configs = key
+        self.apply_configs(configs)
+        return True
+
+    def apply_configs(self, configs: list) -> None:
+        wanted = {}
+        for cfg in configs:
+            wanted.setdefault(cfg["broker_url"], {}) \
+                  .setdefault(cfg["topic_pattern"], []).append(cfg)
+
+        for url in list(self.brokers):
+            if url not in wanted:
+                self._stop_broker(self.brokers.pop(url))
+
+        for url, patterns in wanted.items():
+            broker = self.brokers.get(url)
+            if broker is None:
+                broker = self.brokers[url] = self._start_broker(url)
+            removed = set(broker.patterns) - set(patterns)
+            added = set(patterns) - set(broker.patterns)
+            broker.patterns = patterns
+            broker.routes = {}
+            if broker.connected:
+                for p in removed:
+                    broker.client.unsubscribe(p)
+                for p in added:
+                    broker.client.subscribe(p, qos=MQTT_QOS)
+            log.info("MQTT %s: 구독 %d개 (+%d/-%d)", url, len(patterns),
+                     len(added), len(removed))
+
+    def _start_broker(self, url: str) -> _Broker:
+        client = self.client_factory(f"mes-ingest-{os.getpid()}-{len(self.brokers)}")
+        broker = _Broker(url, client)
+
+        def on_connect(c, userdata, flags, reason_code, properties=None):
+            broker.connected = True
+            for p in broker.patterns:
+                c.subscribe(p, qos=MQTT_QOS)
+            log.info("MQTT 연결: %s (%s)", url, reason_code)
+
+        def on_disconnect(c, userdata, flags, reason_code, properties=None):
+            broker.connected = False
+            log.warning("MQTT 연결 끊김: %s (%s)", url, reason_code)
+
+        client.on_connect = on_connect
+        client.on_disconnect = on_disconnect
+        client.on_message = lambda c, userdata, msg: self.on_message(broker, msg)
+        host, port = parse_broker_url(url)
+        client.reconnect_delay_set(min_delay=1, max_delay=30)
+        client.connect_async(host, port, keepalive=60)
+        client.loop_start()
+        return broker
+
+    @staticmethod
+    def _stop_broker(broker: _Broker) -> None:
+        broker.client.disconnect()
+        broker.client.loop_stop()
+        log.info("MQTT 구독 해제: %s", broker.url)
+
+    # ── 수신 / 적재 ──
+
+    def on_message(self, broker: _Broker, msg) -> None:
+        cfgs = broker.routes.get(msg.topic)
+        if cfgs is None:
+            cfgs = [cfg for pattern, matched in broker.patterns.items()
+                    if pattern == msg.topic
+                    or (HAS_PAHO and mqtt.topic_matches_sub(pattern, msg.topic))
+                    for cfg in matched]
+            broker.routes[msg.topic] = cfgs
+        now = time.monotonic()
+        for cfg in cfgs:
+            interval = cfg.get("collect_interval_sec") or 0
+            key = (cfg["config_id"], msg.topic)
+            if interval > 0:
+                last = broker.last_kept.get(key)
+                if last is not None and now - last < interval:
+                    broker.throttled += 1
+                    continue
+                broker.last_kept[key] = now
+            for r in parse_payload(cfg, msg.payload):
+                self.buffer.put(r)
+
+    def flush(self) -> int:
+        """버퍼 (+ 재시도 대기 배치) 적재. 적재 건수 반환."""
+        if not self._pending:
+            batch = self.buffer.drain(FLUSH_ROWS)
+            if not batch:
+                return 0
+            try:
+                rows, rejected = validate_readings(batch, "MQTT")
+            except Exception as e:
+                log.error("센서 배치 검증 오류 (%d건 거부): %s", len(batch), e)
+                rows, rejected = [], batch
+            self.rejected += len(rejected)
+            if not rows:
+                return 0
+            self._pending = rows
+        rows = self._pending
+        try:
+            accepted = self.writer(rows)
+        except _TRANSIENT_ERRORS as e:
+            # 재시도 대기 중에는 버퍼를 비우지 않으므로 put 쪽에 back-pressure 가 걸림
+            self.flush_errors += 1
+            log.error("센서 배치 적재 실패 (%d건, 재시도 예정): %s", len(rows), e)
+            return 0
+        except Exception as e:
+            self.flush_errors += 1
+            self._attempts += 1
+            if self._attempts < FLUSH_MAX_ATTEMPTS:
+                log.error("센서 배치 적재 실패 (%d건, %d/%d회): %s",
+                          len(rows), self._attempts, FLUSH_MAX_ATTEMPTS, e)
+                return 0
+            # 같은 배치가 계속 실패하면 이후 수집 전체가 막히므로 버린다
+            log.error("센서 배치 폐기 (%d건, %d회 실패): %s", len(rows), self._attempts, e)
+            self._pending = []
+            self._attempts = 0
+            self.dropped += len(rows)
+            return 0
+        self._pending = []
+        self._attempts = 0
+        self.accepted += accepted
+        return accepted
+
+    def stats(self) -> dict:
+        return {
+            "brokers": {u: {"connected": b.connected, "topics": len(b.patterns),
+                            "throttled": b.throttled}
+                        for u, b in self.brokers.items()},
+            "buffered": len(self.buffer),
+            "pending": len(self._pending),
+            "received": self.buffer.received,
+            "dropped": self.buffer.dropped + self.dropped,
+            "accepted": self.accepted,
+            "rejected": self.rejected,
+            "flush_errors": self.flush_errors,
+        }
+
+    def run(self) -> None:
+        next_reload = 0.0
+        while not self._stop.is_set():
+            if time.monotonic() >= next_reload:
+                try:
+                    self.reload()
+                except Exception as e:
+                    log.error("MQTT 설정 로드 실패: %s", e)
+                next_reload = time.monotonic() + RELOAD_SEC
+            self.buffer.wait(FLUSH_ROWS, FLUSH_INTERVAL)
+            while self.flush() >= FLUSH_ROWS:
+                pass  # 밀린 데이터는 interval 을 기다리지 않고 연속 적재
+            if self._pending:
+                self._stop.wait(min(FLUSH_INTERVAL * 5, 10))
+        # 종료 시 남은 데이터 적재 (DB 오류면 중단)
+        for broker in self.brokers.values():
+            self._stop_broker(broker)
+        while self._pending or len(self.buffer):
+            errors = self.flush_errors
+            self.flush()
+            if self.flush_errors != errors:
+                break
+
+    def stop(self, *_args) -> None:
+        self._stop.set()
+        self.buffer.wake()
+
+
+def main() -> None:
+    logging.basicConfig(level=os.getenv("LOG_LEVEL", "INFO"))
+    if not HAS_PAHO:
+        raise SystemExit("paho-mqtt 가 설치되어 있지 않습니다.")
+    worker = MqttIngestWorker()
+    signal.signal(signal.SIGTERM, worker.stop)
+    signal.signal(signal.SIGINT, worker.stop)
+    worker.run()
+    log.info("MQTT 수집 종료: %s", worker.stats())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,395 @@
+"""REQ-046: OPC-UA 구독 엔진 — opcua_config 노드 구독 → sensor_data 배치 적재.
+
+MQTT 수집 워커와 같은 이유로 별도 프로세스 1개로 실행한다:
+
+    python -m api_modules.opcua_ingest
+
+- server_url 별로 세션 1개를 열고 그 서버의 모든 노드를 한 세션에 다중화
+  (subscribe_interval_ms 가 같은 노드끼리 Subscription 1개, 샘플링 주기도 동일)
+- 데이터 변경 알림은 메모리 버퍼에 쌓고 OPCUA_FLUSH_ROWS 건 또는
+  OPCUA_FLUSH_INTERVAL_SEC 초마다 COPY 로 적재 (sensor_ingest.copy_rows)
+- 노드별 상태(last_seen/last_value/오류)는 메모리에 두고, 바뀐 노드만
+  opcua_node_status 에 주기적으로 upsert — 상태 API 는 이 작은 테이블만 읽는다
+- 연결이 끊기면 지수 백오프로 재연결, OPCUA_RELOAD_SEC 마다 설정 재로딩
+- OPCUA_HEARTBEAT_SEC 마다 모든 노드 상태를 다시 써서 updated_at 을 갱신 —
+  상태 API 는 updated_at 이 오래된 노드를 STALE 로 보고한다 (엔진 중단 감지)
+- 적재 실패 배치는 재시도하되, DB 연결 오류가 아닌 실패(데이터 오류)가
+  OPCUA_FLUSH_MAX_ATTEMPTS 회 반복되면 그 배치는 버리고 다음으로 넘어간다
+"""
+
+import asyncio
+import logging
+import os
+import signal
+from collections import deque
+from datetime import datetime, timezone
+
+import psycopg2
+from psycopg2.extras import execute_values
+
+from api_modules.database import get_conn, release_conn, run_in_db_thread
+from api_modules.sensor_ingest import copy_rows, storable_value, validate_readings
+
+log = logging.getLogger(__name__)
+
+try:
+    from asyncua import Client
+    HAS_ASYNCUA = True
+except ImportError:
+    HAS_ASYNCUA = False
+
+BUFFER_MAX = int(os.getenv("OPCUA_BUFFER_MAX", "50000"))
+FLUSH_ROWS = int(os.getenv("OPCUA_FLUSH_ROWS", "5000"))
+FLUSH_INTERVAL = float(os.getenv("OPCUA_FLUSH_INTERVAL_SEC", "1"))
+RELOAD_SEC = float(os.getenv("OPCUA_RELOAD_SEC", "30"))
+CONNECT_TIMEOUT = float(os.getenv("OPCUA_CONNECT_TIMEOUT_SEC", "5"))
+RECONNECT_MAX_DELAY = float(os.getenv("OPCUA_RECONNECT_MAX_DELAY_SEC", "30"))
+HEARTBEAT_SEC = float(os.getenv("OPCUA_HEARTBEAT_SEC", "10"))
+FLUSH_MAX_ATTEMPTS = int(os.getenv("OPCUA_FLUSH_MAX_ATTEMPTS", "3"))
+
+# 재시도해도 되는 실패 (DB 미연결/연결 끊김) — 배치 자체는 정상
+_TRANSIENT_ERRORS = (RuntimeError, psycopg2.OperationalError, psycopg2.InterfaceError)
+
+
+def _local(ts: datetime) -> datetime:
+    """OPC-UA 타임스탬프(UTC) → sensor_data 와 같은 naive 로컬 시각."""
+    if ts.tzinfo is None:
+        ts = ts.replace(tzinfo=timezone.utc)
+    return ts.astimezone().replace(tzinfo=None)
+
+
+class NodeState:
+    """노드(=opcua_config 행) 1개의 메모리 상태."""
+
+    __slots__ = ("config_id", "status", "last_seen", "last_value", "error", "dirty")
+
+    def __init__(self, config_id: int):
+        self.config_id = config_id
+        self.status = "CONNECTING"
+        self.last_seen = None
+        self.last_value = None
+        self.error = None
+        self.dirty = True
+
+    def set(self, status: str, error: str = None):
+        if (status, error) != (self.status, self.error):
+            self.status, self.error, self.dirty = status, error, True
+
+
+class _Handler:
+    """asyncua 구독 콜백 → 엔진 버퍼."""
+
+    def __init__(self, engine, session):
+        self.engine = engine
+        self.session = session
+
+    def datachange_notification(self, node, val, data):
+        ts = None
+        try:
+            dv = data.monitored_item.Value
+            ts = dv.SourceTimestamp or dv.ServerTimestamp
+        except AttributeError:
+            pass
+        for cfg in self.session.by_node.get(node.nodeid.to_string(), ()):
+            self.engine.on_sample(cfg, val, ts)
+
+    def status_change_notification(self, status):
+        log.warning("OPC-UA 구독 상태 변경 (%s): %s", self.session.url, status)
+
+
+class ServerSession:
+    """OPC-UA 서버 1개 — 세션 1개로 모든 노드 구독, 끊기면 재연결."""
+
+    def __init__(self, engine, url: str, configs: list, client_factory=None):
+        self.engine = engine
+        self.url = url
+        self.configs = configs
+        self.client_factory = client_factory or (lambda u: Client(url=u, timeout=CONNECT_TIMEOUT))
+        self.by_node = {}
+        for cfg in configs:
+            self.by_node.setdefault(cfg["node_id"], []).append(cfg)
+        self.connected = False
+        self._task = None
+
+    def start(self):
+        self._task = asyncio.create_task(self._run(), name=f"opcua:{self.url}")
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+
+    def _mark(self, status: str, error: str = None):
+        for cfg in self.configs:
+            self.engine.state(cfg["config_id"]).set(status, error)
+
+    async def _subscribe(self, client):
+        handler = _Handler(self.engine, self)
+        by_interval = {}
+        for cfg in self.configs:
+            by_interval.setdefault(cfg["subscribe_interval_ms"] or 1000, []).append(cfg)
+        for interval_ms, cfgs in by_interval.items():
+            sub = await client.create_subscription(interval_ms, handler)
+            nodes = [client.get_node(c["node_id"]) for c in cfgs]
+            results = await sub.subscribe_data_change(nodes, sampling_interval=interval_ms)
+            if not isinstance(results, list):
+                results = [results]
+            for cfg, res in zip(cfgs, results):
+                if isinstance(res, int):
+                    self.engine.state(cfg["config_id"]).set("CONNECTED")
+                else:  # 노드 ID 오류 등 → 해당 노드만 실패
+                    self.engine.state(cfg["config_id"]).set("BAD_NODE", str(res))
+
+    async def _run(self):
+        delay = 1.0
+        while True:
+            client = self.client_factory(self.url)
+            try:
+                await client.connect()
+                self.connected = True
+                delay = 1.0
+                log.info("OPC-UA 연결: %s (노드 %d개)", self.url, len(self.configs))
+                await self._subscribe(client)
+                while True:
+                    await asyncio.sleep(1)
+                    await client.check_connection()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                log.warning("OPC-UA 연결 오류 (%s): %s — %.0f초 후 재연결", self.url, e, delay)
+                self._mark("DISCONNECTED", str(e)[:500])
+            finally:
+                self.connected = False
+                try:
+                    await client.disconnect()
+                except Exception:
+                    pass
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, RECONNECT_MAX_DELAY)
+
+
+def load_configs() -> list:
+    conn = get_conn()
+    if not conn:
+        raise RuntimeError("데이터베이스 연결에 실패했습니다.")
+    try:
+        cur = conn.cursor()
+        cur.execute(
+            """SELECT config_id, server_url, equip_code, node_id, sensor_type,
+                      subscribe_interval_ms
+               FROM opcua_config WHERE is_active = TRUE ORDER BY config_id""",
+        )
+        rows = cur.fetchall()
+        cur.close()
+        return [
+            {"config_id": r[0], "server_url": r[1], "equip_code": r[2],
+             "node_id": r[3], "sensor_type": r[4], "subscribe_interval_ms": r[5]}
+            for r in rows
+        ]
+    finally:
+        release_conn(conn)
+
+
+def write_batch(readings: list, states: list) -> tuple:
+    """샘플 COPY + 변경된 노드 상태 upsert 를 한 트랜잭션으로. (accepted, rejected)."""
+    rows, rejected = validate_readings(readings, "OPCUA")
+    if not rows and not states:
+        return 0, len(rejected)
+    conn = get_conn()
+    if not conn:
+        raise RuntimeError("데이터베이스 연결에 실패했습니다.")
+    try:
+        cur = conn.cursor()
+        copy_rows(cur, rows)
+        if states:
+            execute_values(
+                cur,
+                """INSERT INTO opcua_node_status
+                   (config_id, status, last_seen, last_value, error, updated_at)
+                   VALUES %s
+                   ON CONFLICT (config_id) DO UPDATE SET
+                       status = EXCLUDED.status, last_seen = EXCLUDED.last_seen,
+                       last_value = EXCLUDED.last_value, error = EXCLUDED.error,
+                       updated_at = EXCLUDED.updated_at""",
+                states,
+                template="(%s, %s, %s, %s, %s, NOW())",
+            )
+        conn.commit()
+        cur.close()
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        release_conn(conn)
+    return len(rows), len(rejected)
+
+
+class OpcuaEngine:
+    """opcua_config 기반 구독 엔진."""
+
+    def __init__(self, client_factory=None, writer=write_batch, config_loader=load_configs):
+        self.client_factory = client_factory
+        self.writer = writer
+        self.config_loader = config_loader
+        self.sessions = {}
+        self.nodes = {}
+        self.buffer = deque()
+        self._configs = None
+        self._pending = None
+        self._attempts = 0
+        self._wake = None
+        self.received = 0
+        self.dropped = 0
+        self.accepted = 0
+        self.rejected = 0
+
+    def state(self, config_id: int) -> NodeState:
+        st = self.nodes.get(config_id)
+        if st is None:
+            st = self.nodes[config_id] = NodeState(config_id)
+        return st
+
+    def on_sample(self, cfg: dict, value, ts: datetime = None):
+        self.received += 1
+        st = self.state(cfg["config_id"])
+        st.last_seen = _local(ts) if ts else datetime.now()
+        st.last_value = value
+        st.status, st.error, st.dirty = "CONNECTED", None, True
+        if len(self.buffer) >= BUFFER_MAX:
+            self.buffer.popleft()  # 적재가 밀리면 가장 오래된 샘플부터 버림
+            self.dropped += 1
+        self.buffer.append({
+            "equip_code": cfg["equip_code"], "sensor_type": cfg["sensor_type"],
+            "value": value, "collected_at": st.last_seen.isoformat(),
+            "source": "OPCUA",
+        })
+        if len(self.buffer) >= FLUSH_ROWS and self._wake:
+            self._wake.set()
+
+    async def apply_configs(self, configs: list):
+        wanted = {}
+        for cfg in configs:
+            wanted.setdefault(cfg["server_url"], []).append(cfg)
+        for url in list(self.sessions):
+            if url not in wanted or self.sessions[url].configs != wanted[url]:
+                await self.sessions.pop(url).stop()
+        for url, cfgs in wanted.items():
+            if url not in self.sessions:
+                session = ServerSession(self, url, cfgs, self.client_factory)
+                self.sessions[url] = session
+                session.start()
+        active = {c["config_id"] for c in configs}
+        for cid in list(self.nodes):
+            if cid not in active:
+                del self.nodes[cid]
+
+    async def reload(self) -> bool:
+        configs = await run_in_db_thread(self.config_loader)
+        if configs == self._configs:
+            return False
+        self._configs = list(configs)
+        await self.apply_configs(configs)
+        return True
+
+    async def flush(self) -> int:
+        if self._pending is None:
+            n = min(len(self.buffer), FLUSH_ROWS)
+            readings = [self.buffer.popleft() for _ in range(n)]
+            states = []
+            for st in self.nodes.values():
+                if st.dirty:
+                    states.append((st.config_id, st.status, st.last_seen,
+                                   storable_value(st.last_value), st.error))
+                    st.dirty = False
+            self._pending = (readings, states)
+        readings, states = self._pending
+        if not readings and not states:
+            self._pending = None
+            return 0
+        try:
+            accepted, rejected = await run_in_db_thread(self.writer, readings, states)
+        except _TRANSIENT_ERRORS as e:
+            log.error("OPC-UA 배치 적재 실패 (%d건, 재시도 예정): %s", len(readings), e)
+            return 0
+        except Exception as e:
+            self._attempts += 1
+            if self._attempts < FLUSH_MAX_ATTEMPTS:
+                log.error("OPC-UA 배치 적재 실패 (%d건, %d/%d회): %s",
+                          len(readings), self._attempts, FLUSH_MAX_ATTEMPTS, e)
+                return 0
+            # 같은 배치가 계속 실패하면 이후 수집 전체가 막히므로 버린다
+            log.error("OPC-UA 배치 폐기 (%d건, %d회 실패): %s", len(readings), self._attempts, e)
+            self._pending = None
+            self._attempts = 0
+            self.dropped += len(readings)
+            return 0
+        self._pending = None
+        self._attempts = 0
+        self.accepted += accepted
+        self.rejected += rejected
+        return accepted
+
+    def heartbeat(self):
+        """모든 노드 상태를 다음 flush 에 다시 써서 updated_at 을 갱신."""
+        for st in self.nodes.values():
+            st.dirty = True
+
+    def stats(self) -> dict:
+        return {
+            "servers": {u: s.connected for u, s in self.sessions.items()},
+            "buffered": len(self.buffer),
+            "received": self.received,
+            "dropped": self.dropped,
+            "accepted": self.accepted,
+            "rejected": self.rejected,
+        }
+
+    async def run(self, stop: asyncio.Event):
+        self._wake = asyncio.Event()
+        loop = asyncio.get_running_loop()
+        next_reload = 0.0
+        next_heartbeat = loop.time() + HEARTBEAT_SEC
+        while not stop.is_set():
+            if loop.time() >= next_heartbeat:
+                self.heartbeat()
+                next_heartbeat = loop.time() + HEARTBEAT_SEC
+            if loop.time() >= next_reload:
+                try:
+                    await self.reload()
+                except Exception as e:
+                    log.error("OPC-UA 설정 로드 실패: %s", e)
+                next_reload = loop.time() + RELOAD_SEC
+            try:
+                await asyncio.wait_for(self._wake.wait(), FLUSH_INTERVAL)
+            except asyncio.TimeoutError:
+                pass
+            self._wake.clear()
+            while await self.flush() >= FLUSH_ROWS:
+                pass
+        for url in list(self.sessions):
+            await self.sessions.pop(url).stop()
+        await self.flush()
+
+
+async def _main():
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGTERM, signal.SIGINT):
+        loop.add_signal_handler(sig, stop.set)
+    engine = OpcuaEngine()
+    await engine.run(stop)
+    log.info("OPC-UA 수집 종료: %s", engine.stats())
+
+
+def main() -> None:
+    logging.basicConfig(level=os.getenv("LOG_LEVEL", "INFO"))
+    if not HAS_ASYNCUA:
+        raise SystemExit("asyncua 가 설치되어 있지 않습니다.")
+    asyncio.run(_main())
+
+
+if __name__ == "__main__":
+    main()
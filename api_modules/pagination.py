@@ -0,0 +1,70 @@
+"""키셋(cursor) 페이지네이션 공통 헬퍼.
+
+LIMIT/OFFSET 은 깊은 페이지일수록 앞쪽 행을 모두 읽고 버려야 하므로 느려진다.
+정렬 키(예: created_at, id)의 마지막 값을 불투명한 cursor 문자열로 돌려주고,
+다음 요청에서 ``(created_at, id) < (%s, %s)`` 조건으로 인덱스에서 바로 이어 읽는다.
+
+전체 건수는 선택 사항이다:
+    exact    — SELECT COUNT(*) (기존 동작)
+    estimate — EXPLAIN 의 플래너 추정 행 수 (테이블 스캔 없음)
+    none     — 건수 조회 생략
+"""
+
+import base64
+import json
+
+TOTAL_MODES = ("exact", "estimate", "none")
+
+
+def encode_cursor(values) -> str:
+    """정렬 키 값 튜플 → URL-safe cursor 문자열."""
+    raw = json.dumps(list(values), default=str, separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, size: int) -> list:
+    """cursor 문자열 → 정렬 키 값 리스트. 형식이 맞지 않으면 ValueError."""
+    try:
+        pad = "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(cursor + pad))
+    except (ValueError, TypeError) as e:
+        raise ValueError("invalid cursor") from e
+    if not isinstance(values, list) or len(values) != size:
+        raise ValueError("invalid cursor")
+    return values
+
+
+def keyset_condition(columns, values, desc: bool = False):
+    """(col1, col2, ...) 행 비교 조건과 파라미터 반환.
+
+    정렬 방향의 모든 컬럼이 같아야 복합 인덱스 한 번의 range scan 으로 처리된다.
+    """
+    op = "<" if desc else ">"
+    cols = ", ".join(columns)
+    marks = ", ".join(["%s"] * len(columns))
+    return f"({cols}) {op} ({marks})", list(values)
+
+
+def count_rows(cursor, from_sql: str, params, mode: str = "exact"):
+    """FROM/WHERE 절 기준 건수. mode=none 이면 None."""
+    if mode == "none":
+        return None
+    if mode == "estimate":
+        cursor.execute(f"EXPLAIN (FORMAT JSON) SELECT 1 FROM {from_sql}", params)
+        plan = cursor.fetchone()[0]
+        if isinstance(plan, str):
+            plan = json.loads(plan)
+        return int(plan[0]["Plan"]["Plan Rows"])
+    cursor.execute(f"SELECT COUNT(*) FROM {from_sql}", params)
+    return cursor.fetchone()[0]
+
+
+def split_page(rows, size: int, key):
+    """size+1 건 조회 결과 → (이번 페이지 rows, next_cursor).
+
+    key: 행에서 정렬 키 튜플을 꺼내는 함수.
+    """
+    if len(rows) <= size:
+        return rows, None
+    rows = rows[:size]
+    return rows, encode_cursor(key(rows[-1]))
@@ -0,0 +1,82 @@
+"""라우트 단위 응답 캐시 — 직렬화된 JSON 본문 + 강한 ETag, If-None-Match → 304.
+
+    @router.get("/items")
+    @cached_response("items", ttl=60)
+    async def list_items(..., request: Request = None, user=Depends(auth_required)):
+        ...
+
+- 캐시 키: "<namespace>:http:<sha1(경로?정렬된 쿼리)>" — 도메인 캐시와 같은
+  네임스페이스를 쓰므로 쓰기 함수의 cache_delete("<namespace>:*") 가 그대로
+  응답 캐시도 무효화한다 (버전 증가 + 워커 L1 pub/sub 이벤트).
+- 히트 시 JSON 재직렬화 없이 저장된 본문을 그대로 보내고, 클라이언트 ETag 가
+  같으면 본문 없이 304.
+- 인증 의존성은 그대로 먼저 실행된다. 사용자별로 달라지는 응답에는 쓰지 않는다.
+- {"error": ...} 응답은 캐시하지 않는다.
+"""
+
+import functools
+import hashlib
+import json
+
+from fastapi import Request, Response
+from fastapi.encoders import jsonable_encoder
+
+from api_modules.cache import cache_get, cache_set
+
+CACHE_CONTROL = "private, no-cache"  # 매번 재검증 → 변경 없으면 304
+
+
+def _etag(body: bytes) -> str:
+    return '"' + hashlib.sha256(body).hexdigest()[:32] + '"'
+
+
+def _etag_matches(header: str, etag: str) -> bool:
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    tags = [t.strip() for t in header.split(",")]
+    return etag in tags or f"W/{etag}" in tags
+
+
+def _cache_key(namespace: str, request: Request) -> str:
+    query = "&".join(f"{k}={v}" for k, v in sorted(request.query_params.multi_items()))
+    digest = hashlib.sha1(f"{request.url.path}?{query}".encode()).hexdigest()
+    return f"{namespace}:http:{digest}"
+
+
+def _response(body: str, etag: str, request: Request) -> Response:
+    headers = {"ETag": etag, "Cache-Control": CACHE_CONTROL}
+    if _etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
+
+
+def cached_response(namespace: str, ttl: int = 300):
+    """GET 라우트용 데코레이터. 엔드포인트에 ``request: Request`` 인자가 있어야 한다."""
+
+    def decorator(endpoint):
+        @functools.wraps(endpoint)
+        async def wrapper(*args, **kwargs):
+            request = kwargs.get("request")
+            if request is None:
+                return await endpoint(*args, **kwargs)
+
+            key = _cache_key(namespace, request)
+            entry = cache_get(key)
+            if entry is not None:
+                return _response(entry["body"], entry["etag"], request)
+
+            result = await endpoint(*args, **kwargs)
+            if isinstance(result, Response):
+                return result
+            body = json.dumps(jsonable_encoder(result), ensure_ascii=False,
+                              separators=(",", ":"))
+            etag = _etag(body.encode())
+            if not (isinstance(result, dict) and "error" in result):
+                cache_set(key, {"etag": etag, "body": body}, ttl=ttl)
+            return _response(body, etag, request)
+
+        return wrapper
+
+    return decorator
@@ -1,8 +1,10 @@
 """AI router — Demand forecast + Defect prediction + Failure prediction + Insights."""
 
 from fastapi import APIRouter, Depends, Request
-from api_modules import mes_ai_prediction, mes_defect_predict, mes_equipment, mes_reports, mes_plan
-from api_modules.auth_deps import auth_required
+from api_modules import (forecast_batch, mes_ai_prediction, mes_defect_predict, mes_equipment,
+                         mes_reports, mes_plan)
+from api_modules.auth_deps import admin_required, auth_required
+from api_modules.ai_model_cache import ModelCache
 
 router = APIRouter(prefix="/api/ai", tags=["AI"])
 
@@ -17,6 +19,13 @@ async def demand_forecast(request: Request, user=Depends(auth_required)):
     )
 
 
+@router.get("/demand-forecast/batch")
+async def demand_forecast_batch_status(request: Request = None,
+                                       user=Depends(admin_required)):
+    """Last nightly batch run (ai_forecasts) — items and generation time."""
+    return await forecast_batch.get_batch_status_async()
+
+
 @router.get("/demand-prediction/{item_code}")
 async def demand_prediction(item_code: str, request: Request,
                             user=Depends(auth_required)):
@@ -38,11 +47,29 @@ async def defect_prediction(request: Request, user=Depends(auth_required)):
     return await mes_defect_predict.predict_defect_probability(await request.json())
 
 
+@router.post("/defect-predict/batch")
+async def ai_defect_predict_batch(request: Request, user=Depends(auth_required)):
+    try:
+        data = await request.json()
+    except Exception:
+        data = {}
+    return await mes_defect_predict.predict_defect_batch(data)
+
+
 @router.post("/failure-predict")
 async def ai_failure_predict(request: Request, user=Depends(auth_required)):
     return await mes_equipment.predict_failure(await request.json())
 
 
+@router.post("/failure-predict/fleet")
+async def ai_failure_predict_fleet(request: Request, user=Depends(auth_required)):
+    try:
+        data = await request.json()
+    except Exception:
+        data = {}
+    return await mes_equipment.predict_failure_fleet(data)
+
+
 @router.post("/insights")
 async def analysis_insights(request: Request, user=Depends(auth_required)):
     try:
@@ -50,3 +77,9 @@ async def analysis_insights(request: Request, user=Depends(auth_required)):
     except Exception:
         data = {}
     return await mes_reports.ai_insights(data)
+
+
+@router.get("/model-jobs")
+async def model_jobs(request: Request, user=Depends(auth_required)):
+    """Background training jobs (queued/running/recent) + cached model metadata."""
+    return {**ModelCache.get_jobs(), "cache": ModelCache.get_stats()}
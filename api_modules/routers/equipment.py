@@ -1,9 +1,11 @@
 """Equipment router — Equipment + OEE + CMMS + Calibration + Energy + Sensor."""
 
-from fastapi import APIRouter, Depends, Request
+from fastapi import APIRouter, Depends, HTTPException, Request
 from api_modules import (mes_equipment, mes_oee, mes_maintenance,
-                         mes_calibration, mes_energy, mes_datacollect)
+                         mes_calibration, mes_energy, mes_datacollect,
+                         sensor_ingest, sensor_partitions)
 from api_modules.auth_deps import auth_required, admin_required
+from api_modules.response_cache import cached_response
 
 router = APIRouter(prefix="/api", tags=["Equipment"])
 
@@ -16,6 +18,7 @@ async def create_equipment(request: Request, user=Depends(auth_required)):
 
 
 @router.get("/equipments")
+@cached_response("equip", ttl=30)
 async def list_equipments(process_code: str = None, status: str = None,
                           request: Request = None, user=Depends(auth_required)):
     return await mes_equipment.get_equipments(process_code, status)
@@ -138,3 +141,35 @@ async def realtime_sensor(equip_code: str, sensor_type: str = None,
 @router.post("/datacollect/sensor")
 async def insert_sensor(request: Request, user=Depends(auth_required)):
     return await mes_datacollect.insert_sensor_data(await request.json())
+
+
+@router.post("/datacollect/sensor/bulk")
+async def bulk_insert_sensor(request: Request, source: str = "MANUAL",
+                             user=Depends(auth_required)):
+    """JSON 배열 / {"readings": [...]} / NDJSON(application/x-ndjson) 대량 수집.
+
+    본문이 JSON 이 아니거나 배열이 없으면 400. 행 단위 오류는 rejected/errors 로 돌려준다.
+    """
+    if "ndjson" in request.headers.get("content-type", ""):
+        readings = sensor_ingest.parse_ndjson(await request.body())
+    else:
+        try:
+            body = await request.json()
+        except ValueError:
+            raise HTTPException(status_code=400, detail="잘못된 JSON 본문입니다.")
+        readings = body.get("readings", []) if isinstance(body, dict) else body
+    if not isinstance(readings, list):
+        raise HTTPException(status_code=400, detail="readings 배열이 필요합니다.")
+    return await sensor_ingest.bulk_insert_sensor_data(readings, source.upper())
+
+
+@router.get("/datacollect/partitions")
+async def sensor_partition_status(request: Request = None,
+                                  user=Depends(admin_required)):
+    return await sensor_partitions.get_partition_status_async()
+
+
+@router.post("/datacollect/partitions/maintain")
+async def sensor_partition_maintain(request: Request = None,
+                                    user=Depends(admin_required)):
+    return await sensor_partitions.run_maintenance_async()
@@ -3,6 +3,7 @@
 from fastapi import APIRouter, Depends, Request
 from api_modules import mes_items, mes_bom, mes_process
 from api_modules.auth_deps import auth_required
+from api_modules.response_cache import cached_response
 
 router = APIRouter(prefix="/api", tags=["Master Data"])
 
@@ -15,13 +16,17 @@ async def create_item(request: Request, user=Depends(auth_required)):
 
 
 @router.get("/items")
+@cached_response("items", ttl=60)
 async def list_items(keyword: str = None, category: str = None,
-                     page: int = 1, size: int = 20, request: Request = None,
+                     page: int = 1, size: int = 20, cursor: str = None,
+                     total_mode: str = None, request: Request = None,
                      user=Depends(auth_required)):
-    return await mes_items.get_items(keyword, category, page, size)
+    return await mes_items.get_items(keyword, category, page, size,
+                                     cursor, total_mode)
 
 
 @router.get("/items/{item_code}")
+@cached_response("items", ttl=120)
 async def get_item(item_code: str, request: Request,
                    user=Depends(auth_required)):
     return await mes_items.get_item_detail(item_code)
@@ -47,6 +52,7 @@ async def create_bom(request: Request, user=Depends(auth_required)):
 
 
 @router.get("/bom")
+@cached_response("bom", ttl=300)
 async def list_bom(request: Request, user=Depends(auth_required)):
     return await mes_bom.list_bom()
 
@@ -64,17 +70,20 @@ async def delete_bom(bom_id: int, request: Request,
 
 
 @router.get("/bom/summary")
+@cached_response("bom", ttl=300)
 async def bom_summary(request: Request, user=Depends(auth_required)):
     return await mes_bom.bom_summary()
 
 
 @router.get("/bom/where-used/{item_code}")
+@cached_response("bom", ttl=300)
 async def bom_where_used(item_code: str, request: Request,
                          user=Depends(auth_required)):
     return await mes_bom.where_used(item_code)
 
 
 @router.get("/bom/explode/{item_code}")
+@cached_response("bom", ttl=300)
 async def explode_bom(item_code: str, qty: float = 1, request: Request = None,
                       user=Depends(auth_required)):
     return await mes_bom.explode_bom(item_code, qty)
@@ -83,6 +92,7 @@ async def explode_bom(item_code: str, qty: float = 1, request: Request = None,
 # ── Process & Routing ──
 
 @router.get("/processes")
+@cached_response("process", ttl=300)
 async def list_processes(request: Request, user=Depends(auth_required)):
     return await mes_process.list_processes()
 
@@ -105,6 +115,7 @@ async def delete_process(process_code: str, request: Request,
 
 
 @router.get("/routings")
+@cached_response("routing", ttl=300)
 async def list_routings_summary(request: Request, user=Depends(auth_required)):
     return await mes_process.list_routings_summary()
 
@@ -115,6 +126,7 @@ async def create_routing(request: Request, user=Depends(auth_required)):
 
 
 @router.get("/routings/{item_code}")
+@cached_response("routing", ttl=300)
 async def get_routing(item_code: str, request: Request,
                       user=Depends(auth_required)):
     return await mes_process.get_routing(item_code)
@@ -172,10 +172,12 @@ async def opcua_status(request: Request = None, user=Depends(auth_required)):
 async def get_audits(entity_type: str = None, entity_id: str = None,
                      user_id: str = None, action: str = None,
                      date_from: str = None, date_to: str = None,
-                     page: int = 1, page_size: int = 50,
+                     page: int = 1, page_size: int = 50, cursor: str = None,
+                     total_mode: str = None,
                      request: Request = None, user=Depends(admin_required)):
     return await mes_audit.get_audit_logs(
-        entity_type, entity_id, user_id, action, date_from, date_to, page, page_size)
+        entity_type, entity_id, user_id, action, date_from, date_to, page, page_size,
+        cursor, total_mode)
 
 
 @router.get("/audit/verify")
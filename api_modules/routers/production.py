@@ -17,9 +17,11 @@ async def create_plan(request: Request, user=Depends(auth_required)):
 
 @router.get("/plans")
 async def list_plans(start_date: str = None, end_date: str = None,
-                     status: str = None, page: int = 1, request: Request = None,
-                     user=Depends(auth_required)):
-    return await mes_plan.get_plans(start_date, end_date, status, page)
+                     status: str = None, page: int = 1, size: int = 20,
+                     cursor: str = None, total_mode: str = None,
+                     request: Request = None, user=Depends(auth_required)):
+    return await mes_plan.get_plans(start_date, end_date, status, page, size,
+                                    cursor, total_mode)
 
 
 @router.get("/plans/{plan_id}")
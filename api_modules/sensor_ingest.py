@@ -0,0 +1,214 @@
+"""센서 데이터 대량 수집 — 배열/NDJSON 배치를 검증 후 COPY 로 한 트랜잭션에 적재.
+
+단건 INSERT + 커밋(insert_sensor_data)은 게이트웨이 1Hz × 수천 센서를 따라가지
+못하므로, 배치 단위로:
+    1) 컬럼별 numpy 배열로 모아 한 번에 검증 (불량 행은 사유와 함께 거부)
+    2) 통과한 행만 CSV 버퍼로 COPY sensor_data ... FROM STDIN
+    3) 한 번 커밋 — 롤업 트리거도 COPY 문장당 1회만 실행된다.
+MQTT/OPC-UA 수집기도 copy_rows 로 같은 경로를 쓴다.
+
+value 는 필수다. sensor_data.value 컬럼은 NULL 을 허용하지만, 값 없는 측정은 롤업에도
+잡히지 않으므로 단건 insert_sensor_data 와 같이 거부한다("missing value").
+bool 은 숫자로 바꾸지 않고 거부한다("invalid value").
+"""
+
+import csv
+import io
+import json
+import logging
+import math
+import os
+from datetime import datetime
+
+import numpy as np
+
+from api_modules.database import get_conn, release_conn, run_in_db_thread
+
+log = logging.getLogger(__name__)
+
+try:
+    from prometheus_client import Counter, Histogram
+    _HAS_PROMETHEUS = True
+except ImportError:
+    _HAS_PROMETHEUS = False
+
+MAX_BATCH_ROWS = int(os.getenv("SENSOR_BULK_MAX_ROWS", "100000"))
+MAX_REPORTED_ERRORS = 100
+VALID_SOURCES = ("MQTT", "OPCUA", "MANUAL")
+# sensor_data.value NUMERIC(12,4) → 정수부 8자리
+_VALUE_LIMIT = 1e8
+_EQUIP_MAX, _TYPE_MAX = 20, 50
+
+_COPY_SQL = ("COPY sensor_data (equip_code, sensor_type, value, collected_at, source) "
+             "FROM STDIN WITH (FORMAT csv)")
+
+if _HAS_PROMETHEUS:
+    _INGEST_ROWS = Counter("mes_sensor_ingest_rows_total",
+                           "Sensor readings received by bulk ingest",
+                           ["result"])
+    _INGEST_SECONDS = Histogram("mes_sensor_ingest_copy_seconds",
+                                "Time spent in COPY + commit per batch")
+
+
+def parse_ndjson(body: bytes) -> list:
+    """NDJSON 본문 → 행 리스트. 파싱 불가 줄은 None (검증 단계에서 거부)."""
+    readings = []
+    for line in body.splitlines():
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            readings.append(json.loads(line))
+        except ValueError:
+            readings.append(None)
+    return readings
+
+
+def _to_float(v) -> float:
+    if isinstance(v, bool):
+        return math.nan
+    try:
+        return float(v)
+    except (TypeError, ValueError):
+        return math.nan
+
+
+def storable_value(v):
+    """sensor_data / opcua_node_status 의 NUMERIC(12,4) 에 넣을 수 있는 값이면 float,
+    아니면 None (bool, 비수치, NaN/inf, 범위 초과)."""
+    if isinstance(v, bool) or not isinstance(v, (int, float)):
+        return None
+    v = float(v)
+    if not math.isfinite(v) or abs(v) >= _VALUE_LIMIT:
+        return None
+    return round(v, 4)
+
+
+def _to_ts(v):
+    """ISO-8601 → naive datetime (tz 포함 시 로컬 시각으로 변환). None=서버 시각."""
+    if v is None or v == "":
+        return None
+    try:
+        ts = datetime.fromisoformat(str(v).replace("Z", "+00:00"))
+        return ts.astimezone().replace(tzinfo=None) if ts.tzinfo else ts
+    except (ValueError, OverflowError):   # 0001-01-01T00:00+01:00 등 변환 범위 밖
+        return False
+
+
+def validate_readings(readings: list, default_source: str = "MANUAL"):
+    """배치 검증.
+
+    Returns:
+        (rows, rejected)
+        rows: [(equip_code, sensor_type, value, collected_at|None, source), ...]
+        rejected: [(index, reason), ...]
+    """
+    n = len(readings)
+    if n == 0:
+        return [], []
+    is_obj = np.fromiter((isinstance(r, dict) for r in readings), bool, n)
+    recs = [r if ok else {} for r, ok in zip(readings, is_obj)]
+
+    equip = np.array([str(r.get("equip_code") or "").strip() for r in recs], dtype=object)
+    stype = np.array([str(r.get("sensor_type") or "").strip() for r in recs], dtype=object)
+    source = np.array([str(r.get("source") or default_source).upper() for r in recs],
+                      dtype=object)
+    raw_vals = [r.get("value") for r in recs]
+    try:
+        values = np.array(raw_vals, dtype=float)
+    except (TypeError, ValueError):
+        values = None
+    if values is None or values.ndim != 1:   # 같은 길이 리스트 값이면 2차원이 된다
+        values = np.fromiter((_to_float(v) for v in raw_vals), float, n)
+    is_null = np.fromiter((v is None for v in raw_vals), bool, n)
+    is_bool = np.fromiter((isinstance(v, bool) for v in raw_vals), bool, n)
+    ts = [_to_ts(r.get("collected_at")) for r in recs]
+
+    equip_len = np.fromiter((len(s) for s in equip), int, n)
+    type_len = np.fromiter((len(s) for s in stype), int, n)
+    checks = [
+        (~is_obj, "not an object"),
+        ((equip_len == 0) | (equip_len > _EQUIP_MAX), "invalid equip_code"),
+        ((type_len == 0) | (type_len > _TYPE_MAX), "invalid sensor_type"),
+        (is_null, "missing value"),
+        (is_bool | ~np.isfinite(values) | (np.abs(values) >= _VALUE_LIMIT), "invalid value"),
+        (np.fromiter((t is False for t in ts), bool, n), "invalid collected_at"),
+        (~np.isin(source, VALID_SOURCES), "invalid source"),
+    ]
+
+    bad = np.zeros(n, bool)
+    rejected = []
+    for mask, reason in checks:
+        new = mask & ~bad
+        rejected.extend((int(i), reason) for i in np.flatnonzero(new))
+        bad |= mask
+    rejected.sort()
+
+    ok = np.flatnonzero(~bad)
+    rows = [(equip[i], stype[i], round(float(values[i]), 4), ts[i], source[i])
+            for i in ok]
+    return rows, rejected
+
+
+def copy_rows(cur, rows: list, now: datetime = None) -> int:
+    """검증된 행을 COPY 로 적재. collected_at 없는 행은 now(기본: DB 시각)."""
+    if not rows:
+        return 0
+    if now is None and any(r[3] is None for r in rows):
+        cur.execute("SELECT LOCALTIMESTAMP")
+        now = cur.fetchone()[0]
+    buf = io.StringIO()
+    csv.writer(buf).writerows(
+        (e, t, v, (ts or now).isoformat(), s) for e, t, v, ts, s in rows)
+    buf.seek(0)
+    cur.copy_expert(_COPY_SQL, buf)
+    return len(rows)
+
+
+def ingest_readings(readings: list, default_source: str = "MANUAL") -> dict:
+    """배치 검증 + COPY + 커밋 (한 트랜잭션)."""
+    if len(readings) > MAX_BATCH_ROWS:
+        return {"error": f"배치당 최대 {MAX_BATCH_ROWS}건까지 허용됩니다."}
+    if default_source not in VALID_SOURCES:
+        return {"error": f"source는 {', '.join(VALID_SOURCES)} 중 하나여야 합니다."}
+
+    rows, rejected = validate_readings(readings, default_source)
+    result = {
+        "received": len(readings),
+        "accepted": 0,
+        "rejected": len(rejected),
+        "errors": [{"index": i, "error": reason}
+                   for i, reason in rejected[:MAX_REPORTED_ERRORS]],
+    }
+    if rows:
+        conn = get_conn()
+        if not conn:
+            return {"error": "데이터베이스 연결에 실패했습니다."}
+        try:
+            cur = conn.cursor()
+            if _HAS_PROMETHEUS:
+                with _INGEST_SECONDS.time():
+                    copy_rows(cur, rows)
+                    conn.commit()
+            else:
+                copy_rows(cur, rows)
+                conn.commit()
+            cur.close()
+        except Exception as e:
+            conn.rollback()
+            log.error("센서 대량 적재 오류: %s", e)
+            return {"error": "센서 데이터 적재 중 오류가 발생했습니다."}
+        finally:
+            release_conn(conn)
+        result["accepted"] = len(rows)
+
+    if _HAS_PROMETHEUS:
+        _INGEST_ROWS.labels(result="accepted").inc(result["accepted"])
+        _INGEST_ROWS.labels(result="rejected").inc(result["rejected"])
+    return result
+
+
+async def bulk_insert_sensor_data(readings: list,
+                                  default_source: str = "MANUAL") -> dict:
+    """대량 수집 (DB 스레드에서 검증/COPY 실행)."""
+    return await run_in_db_thread(ingest_readings, readings, default_source)
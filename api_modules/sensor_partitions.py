@@ -0,0 +1,251 @@
+"""sensor_data / equip_sensors 일 단위 파티션 유지보수.
+
+- 오늘부터 SENSOR_PARTITION_PREMAKE_DAYS 일 앞까지 파티션을 미리 생성
+  (DEFAULT 파티션에 이미 들어간 해당 일자 행은 새 파티션으로 이동)
+- SENSOR_RETENTION_DAYS 보다 오래된 파티션은 DROP, 또는
+  SENSOR_ARCHIVE_SCHEMA 가 지정되면 DETACH 후 해당 스키마로 이동(아카이브)
+- sensor_rollups 의 grain별 보존기간 경과 행 삭제 (sensor_rollups.RETENTION_DAYS)
+
+호출자 쿼리는 그대로 ``collected_at >= NOW() - INTERVAL ...`` 조건으로
+파티션 pruning 을 받는다. CronJob 에서 ``python -m api_modules.sensor_partitions``
+로 실행한다.
+"""
+
+import json
+import logging
+import os
+import re
+from datetime import date, datetime, timedelta
+
+from psycopg2 import sql
+
+from api_modules.database import get_conn, release_conn, run_in_db_thread
+from api_modules.sensor_rollups import prune_rollups
+
+log = logging.getLogger(__name__)
+
+# 파티션 테이블 → 파티션 키
+PARTITIONED_TABLES = {
+    "sensor_data": "collected_at",
+    "equip_sensors": "recorded_at",
+}
+
+RETENTION_DAYS = int(os.getenv("SENSOR_RETENTION_DAYS", "90"))
+PREMAKE_DAYS = int(os.getenv("SENSOR_PARTITION_PREMAKE_DAYS", "7"))
+ARCHIVE_SCHEMA = os.getenv("SENSOR_ARCHIVE_SCHEMA", "")
+# DDL 은 부모 테이블 ACCESS EXCLUSIVE 락이 필요 — 수집 INSERT 를 오래 막지 않도록 제한
+LOCK_TIMEOUT = os.getenv("SENSOR_PARTITION_LOCK_TIMEOUT", "5s")
+
+_BOUND_RE = re.compile(r"FROM \((.+?)\) TO \((.+?)\)")
+
+
+def partition_name(table: str, day: date) -> str:
+    return f"{table}_p{day:%Y%m%d}"
+
+
+def _parse_bound(value: str):
+    value = value.strip()
+    if value in ("MINVALUE", "MAXVALUE"):
+        return None
+    return datetime.fromisoformat(value.strip("'"))
+
+
+def list_partitions(cur, table: str) -> list[dict]:
+    """부모 테이블의 파티션 목록 (하한 기준 정렬, DEFAULT 는 마지막)."""
+    cur.execute(
+        "SELECT c.relname, pg_get_expr(c.relpartbound, c.oid) "
+        "FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid "
+        "WHERE i.inhparent = to_regclass(%s)",
+        (table,),
+    )
+    parts = []
+    for name, bound in cur.fetchall():
+        m = _BOUND_RE.search(bound or "")
+        if m:
+            parts.append({"name": name, "default": False,
+                          "lower": _parse_bound(m.group(1)),
+                          "upper": _parse_bound(m.group(2))})
+        else:
+            parts.append({"name": name, "default": True,
+                          "lower": None, "upper": None})
+    parts.sort(key=lambda p: (p["default"], p["lower"] or datetime.min))
+    return parts
+
+
+def ensure_partitions(cur, table: str, start: date, days: int) -> list[str]:
+    """start 부터 days 일치 일 단위 파티션 생성. 생성한 파티션명 반환."""
+    key = PARTITIONED_TABLES[table]
+    parts = list_partitions(cur, table)
+    default = next((p["name"] for p in parts if p["default"]), None)
+    created = []
+    for i in range(days):
+        lo = datetime.combine(start + timedelta(days=i), datetime.min.time())
+        hi = lo + timedelta(days=1)
+        # 기존 파티션(legacy 포함)과 범위가 겹치면 건너뜀
+        if any(not p["default"]
+               and (p["lower"] is None or p["lower"] < hi)
+               and (p["upper"] is None or p["upper"] > lo)
+               for p in parts):
+            continue
+        name = partition_name(table, lo.date())
+        ident = sql.Identifier(name)
+        parent = sql.Identifier(table)
+
+        moved = False
+        if default:
+            cur.execute(
+                sql.SQL("SELECT EXISTS (SELECT 1 FROM {d} WHERE {k} >= %s AND {k} < %s)")
+                .format(d=sql.Identifier(default), k=sql.Identifier(key)),
+                (lo, hi),
+            )
+            moved = cur.fetchone()[0]
+
+        if not moved:
+            cur.execute(
+                sql.SQL("CREATE TABLE {p} PARTITION OF {t} FOR VALUES FROM (%s) TO (%s)")
+                .format(p=ident, t=parent),
+                (str(lo), str(hi)),
+            )
+        else:
+            # DEFAULT 에 해당 일자 행이 있으면 PARTITION OF 가 실패하므로 이동 후 ATTACH
+            cur.execute(
+                sql.SQL("CREATE TABLE {p} (LIKE {t} INCLUDING DEFAULTS INCLUDING CONSTRAINTS)")
+                .format(p=ident, t=parent)
+            )
+            cur.execute(
+                sql.SQL("WITH moved AS (DELETE FROM {d} WHERE {k} >= %s AND {k} < %s "
+                        "RETURNING *) INSERT INTO {p} SELECT * FROM moved")
+                .format(d=sql.Identifier(default), k=sql.Identifier(key), p=ident),
+                (lo, hi),
+            )
+            cur.execute(
+                sql.SQL("ALTER TABLE {t} ATTACH PARTITION {p} FOR VALUES FROM (%s) TO (%s)")
+                .format(t=parent, p=ident),
+                (str(lo), str(hi)),
+            )
+        parts.append({"name": name, "default": False, "lower": lo, "upper": hi})
+        created.append(name)
+    return created
+
+
+def apply_retention(cur, table: str, cutoff: datetime,
+                    archive_schema: str = "") -> list[str]:
+    """상한이 cutoff 이하인 파티션을 DROP (또는 archive_schema 로 DETACH 이동).
+
+    DEFAULT 파티션에 남은 cutoff 이전 행은 삭제한다.
+    """
+    key = PARTITIONED_TABLES[table]
+    removed = []
+    if archive_schema:
+        cur.execute(sql.SQL("CREATE SCHEMA IF NOT EXISTS {}")
+                    .format(sql.Identifier(archive_schema)))
+    for p in list_partitions(cur, table):
+        ident = sql.Identifier(p["name"])
+        if p["default"]:
+            cur.execute(sql.SQL("DELETE FROM {p} WHERE {k} < %s")
+                        .format(p=ident, k=sql.Identifier(key)), (cutoff,))
+            continue
+        if p["upper"] is None or p["upper"] > cutoff:
+            continue
+        if archive_schema:
+            cur.execute(sql.SQL("ALTER TABLE {t} DETACH PARTITION {p}")
+                        .format(t=sql.Identifier(table), p=ident))
+            cur.execute(sql.SQL("ALTER TABLE {p} SET SCHEMA {s}")
+                        .format(p=ident, s=sql.Identifier(archive_schema)))
+        else:
+            cur.execute(sql.SQL("DROP TABLE {p}").format(p=ident))
+        removed.append(p["name"])
+    return removed
+
+
+def run_maintenance(today: date = None, retention_days: int = None,
+                    premake_days: int = None, archive_schema: str = None) -> dict:
+    """파티션 생성 + 보존기간 정리 (테이블별 트랜잭션) 후 롤업 보존기간 정리."""
+    today = today or date.today()
+    retention_days = RETENTION_DAYS if retention_days is None else retention_days
+    premake_days = PREMAKE_DAYS if premake_days is None else premake_days
+    archive_schema = ARCHIVE_SCHEMA if archive_schema is None else archive_schema
+    cutoff = datetime.combine(today - timedelta(days=retention_days),
+                              datetime.min.time())
+
+    conn = get_conn()
+    if not conn:
+        return {"error": "데이터베이스 연결에 실패했습니다."}
+    result = {}
+    try:
+        for table in PARTITIONED_TABLES:
+            cur = conn.cursor()
+            try:
+                cur.execute("SET LOCAL lock_timeout = %s", (LOCK_TIMEOUT,))
+                created = ensure_partitions(cur, table, today, premake_days + 1)
+                removed = apply_retention(cur, table, cutoff, archive_schema)
+                conn.commit()
+                result[table] = {
+                    "created": created,
+                    "archived" if archive_schema else "dropped": removed,
+                }
+            except Exception as e:
+                conn.rollback()
+                log.error("파티션 유지보수 오류 (%s): %s", table, e)
+                result[table] = {"error": str(e)}
+            finally:
+                cur.close()
+
+        cur = conn.cursor()
+        try:
+            result["sensor_rollups"] = {"deleted": prune_rollups(cur)}
+            conn.commit()
+        except Exception as e:
+            conn.rollback()
+            log.error("롤업 보존기간 정리 오류: %s", e)
+            result["sensor_rollups"] = {"error": str(e)}
+        finally:
+            cur.close()
+    finally:
+        release_conn(conn)
+    return result
+
+
+def get_partition_status() -> dict:
+    """테이블별 파티션 목록과 보존 설정."""
+    conn = get_conn(readonly=True)
+    if not conn:
+        return {"error": "데이터베이스 연결에 실패했습니다."}
+    try:
+        cur = conn.cursor()
+        tables = {}
+        for table in PARTITIONED_TABLES:
+            tables[table] = [
+                {"name": p["name"], "default": p["default"],
+                 "from": p["lower"].isoformat() if p["lower"] else None,
+                 "to": p["upper"].isoformat() if p["upper"] else None}
+                for p in list_partitions(cur, table)
+            ]
+        cur.close()
+        return {
+            "retention_days": RETENTION_DAYS,
+            "premake_days": PREMAKE_DAYS,
+            "archive_schema": ARCHIVE_SCHEMA or None,
+            "tables": tables,
+        }
+    except Exception as e:
+        log.error("파티션 상태 조회 오류: %s", e)
+        return {"error": "파티션 상태 조회 중 오류가 발생했습니다."}
+    finally:
+        release_conn(conn)
+
+
+async def run_maintenance_async(**kwargs) -> dict:
+    return await run_in_db_thread(run_maintenance, **kwargs)
+
+
+async def get_partition_status_async() -> dict:
+    return await run_in_db_thread(get_partition_status)
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=os.getenv("LOG_LEVEL", "INFO"))
+    summary = run_maintenance()
+    print(json.dumps(summary, ensure_ascii=False, indent=2))
+    raise SystemExit(1 if "error" in summary
+                     or any("error" in v for v in summary.values()) else 0)
@@ -0,0 +1,73 @@
+"""센서 롤업(sensor_rollups) 조회 / 보존기간 관리.
+
+sensor_rollups 는 sensor_data 의 문장 단위 트리거(sensor_rollup_ingest)가
+INSERT/COPY 될 때마다 (설비, 센서, grain, 버킷)별 count/sum/sumsq/min/max 로
+증분 갱신한다. 조회는 원천 행을 다시 집계하지 않고 롤업 행만 읽는다.
+"""
+
+import os
+from datetime import datetime, timedelta
+
+# grain → 버킷 폭
+GRAINS = {
+    "1min": timedelta(minutes=1),
+    "5min": timedelta(minutes=5),
+    "1h": timedelta(hours=1),
+    "1d": timedelta(days=1),
+}
+
+# grain → 보존 일수 (None: 무기한). SENSOR_ROLLUP_RETENTION="1min=7,5min=30"
+RETENTION_DAYS = {"1min": 7, "5min": 30, "1h": 365, "1d": None}
+for _item in filter(None, os.getenv("SENSOR_ROLLUP_RETENTION", "").split(",")):
+    _grain, _, _days = _item.partition("=")
+    if _grain.strip() in RETENTION_DAYS:
+        RETENTION_DAYS[_grain.strip()] = int(_days) if _days.strip() else None
+
+# 조회 구간(분) 상한 → 자동 선택 grain (버킷 수가 수백 개 이내가 되도록)
+_AUTO_GRAINS = [(120, "1min"), (12 * 60, "5min"), (14 * 24 * 60, "1h")]
+
+
+def pick_grain(minutes: int) -> str:
+    """조회 구간에 맞는 롤업 grain."""
+    for limit, grain in _AUTO_GRAINS:
+        if minutes <= limit:
+            return grain
+    return "1d"
+
+
+def merge_stats(buckets) -> dict:
+    """버킷 (cnt, sum, sumsq, min, max) 들을 합쳐 전체 구간 통계 산출 (모분산)."""
+    n = s = ss = 0
+    lo = hi = None
+    for cnt, sum_v, sumsq_v, min_v, max_v in buckets:
+        n += cnt
+        s += sum_v
+        ss += sumsq_v
+        if min_v is not None:
+            lo = float(min_v) if lo is None else min(lo, float(min_v))
+        if max_v is not None:
+            hi = float(max_v) if hi is None else max(hi, float(max_v))
+    avg = s / n if n else 0
+    std = max(ss / n - avg * avg, 0) ** 0.5 if n > 1 else 0
+    return {
+        "min": round(lo, 4) if lo is not None else 0,
+        "max": round(hi, 4) if hi is not None else 0,
+        "avg": round(avg, 4),
+        "std": round(std, 4),
+        "count": n,
+    }
+
+
+def prune_rollups(cur, now: datetime = None) -> dict:
+    """보존기간이 지난 롤업 행 삭제. grain별 삭제 건수 반환."""
+    now = now or datetime.now()
+    removed = {}
+    for grain, days in RETENTION_DAYS.items():
+        if days is None:
+            continue
+        cur.execute(
+            "DELETE FROM sensor_rollups WHERE grain = %s AND bucket_start < %s",
+            (grain, now - timedelta(days=days)),
+        )
+        removed[grain] = cur.rowcount
+    return removed
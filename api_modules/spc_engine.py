@@ -0,0 +1,285 @@
+"""SPC 관리도 계산 코어 (NumPy 벡터화).
+
+- 관리도: X-bar/R, X-bar/S, I-MR (계량형), p, np, c, u (계수형)
+- 이상 판정: Nelson 8 규칙을 누적합 기반 O(n) 롤링 윈도우로 평가
+- 증분 갱신: 관리한계는 (서브그룹 수, Σ점, Σ산포) 로 결정되고 규칙 판정은 최근
+  RULE_WINDOW 점만 필요하므로, 검사 등록 시 새 서브그룹 하나만 반영할 수 있다
+
+규칙 번호/이름은 기존 API(Western Electric 1~4)를 유지하고 나머지 Nelson 규칙을
+5~8 로 붙인다 (violation 의 "nelson" 은 Nelson 원래 번호):
+
+  RULE_1_BEYOND_3SIGMA               1점이 3σ 밖                      (Nelson 1)
+  RULE_2_2OF3_BEYOND_2SIGMA          연속 3점 중 2점이 같은 쪽 2σ 밖   (Nelson 5)
+  RULE_3_4OF5_BEYOND_1SIGMA          연속 5점 중 4점이 같은 쪽 1σ 밖   (Nelson 6)
+  RULE_4_8_CONSECUTIVE_ONE_SIDE      연속 8점이 중심선 한쪽            (Nelson 2, WE 길이 8)
+  RULE_5_6_TREND                     연속 6점 증가 또는 감소           (Nelson 3)
+  RULE_6_14_ALTERNATING              연속 14점 교대로 증감             (Nelson 4)
+  RULE_7_15_WITHIN_1SIGMA            연속 15점이 1σ 이내               (Nelson 7)
+  RULE_8_8_BEYOND_1SIGMA_BOTH_SIDES  연속 8점이 1σ 밖, 양쪽에 분포     (Nelson 8)
+
+위반은 윈도우의 마지막 점(서브그룹)에 기록된다. 규칙 평가의 σ 는 이론
+관리한계(cl ± 3σ)에서 얻으며, 규칙 테이블의 사용자 지정 UCL/LCL 은 표시용
+한계에만 적용된다 (기존 X-bar/R 동작과 동일).
+"""
+
+import math
+
+import numpy as np
+
+# SPC 상수표 (sample size n → 계수)
+A2 = {2: 1.880, 3: 1.023, 4: 0.729, 5: 0.577, 6: 0.483, 7: 0.419, 8: 0.373, 9: 0.337, 10: 0.308}
+D3 = {2: 0, 3: 0, 4: 0, 5: 0, 6: 0, 7: 0.076, 8: 0.136, 9: 0.184, 10: 0.223}
+D4 = {2: 3.267, 3: 2.575, 4: 2.282, 5: 2.115, 6: 2.004, 7: 1.924, 8: 1.864, 9: 1.816, 10: 1.777}
+d2 = {2: 1.128, 3: 1.693, 4: 2.059, 5: 2.326, 6: 2.534, 7: 2.704, 8: 2.847, 9: 2.970, 10: 3.078}
+
+VARIABLE_CHARTS = ("XBAR_R", "XBAR_S", "I_MR")
+ATTRIBUTE_CHARTS = ("P", "NP", "C", "U")
+CHART_TYPES = VARIABLE_CHARTS + ATTRIBUTE_CHARTS
+
+RULES = (
+    # (이름, Nelson 번호, severity)
+    ("RULE_1_BEYOND_3SIGMA", 1, "CRITICAL"),
+    ("RULE_2_2OF3_BEYOND_2SIGMA", 5, "WARNING"),
+    ("RULE_3_4OF5_BEYOND_1SIGMA", 6, "WARNING"),
+    ("RULE_4_8_CONSECUTIVE_ONE_SIDE", 2, "WARNING"),
+    ("RULE_5_6_TREND", 3, "WARNING"),
+    ("RULE_6_14_ALTERNATING", 4, "WARNING"),
+    ("RULE_7_15_WITHIN_1SIGMA", 7, "WARNING"),
+    ("RULE_8_8_BEYOND_1SIGMA_BOTH_SIDES", 8, "WARNING"),
+)
+
+
+def c4(n: int) -> float:
+    """표준편차 불편화 계수 c4(n)."""
+    return math.sqrt(2.0 / (n - 1)) * math.exp(math.lgamma(n / 2) - math.lgamma((n - 1) / 2))
+
+
+def s_chart_factors(n: int):
+    """(A3, B3, B4) — X-bar/S 관리도 계수."""
+    c = c4(n)
+    k = 3 * math.sqrt(1 - c * c) / c
+    return 3 / (c * math.sqrt(n)), max(0.0, 1 - k), 1 + k
+
+
+# ── 롤링 윈도우 ──
+
+def _window_count(mask, k):
+    """각 위치 i 에서 mask[i-k+1..i] 의 True 개수 (i < k-1 은 0)."""
+    out = np.zeros(len(mask), dtype=np.int64)
+    if len(mask) >= k:
+        c = np.concatenate(([0], np.cumsum(mask, dtype=np.int64)))
+        out[k - 1:] = c[k:] - c[:-k]
+    return out
+
+
+def _run(mask, k):
+    """mask 가 i 에서 끝나는 길이 k 의 연속 구간 전체에서 True 인지."""
+    return _window_count(mask, k) == k
+
+
+def evaluate_rules(x, cl, sigma, ucl=None, lcl=None) -> np.ndarray:
+    """(len(RULES), n) bool 배열. cl/sigma/ucl/lcl 는 스칼라 또는 점별 배열."""
+    x = np.asarray(x, dtype=float)
+    n = len(x)
+    ucl = cl + 3 * sigma if ucl is None else ucl
+    lcl = cl - 3 * sigma if lcl is None else lcl
+    above, below = x > cl, x < cl
+    up2, lo2 = x > cl + 2 * sigma, x < cl - 2 * sigma
+    up1, lo1 = x > cl + sigma, x < cl - sigma
+
+    diff = np.diff(x)
+    inc = np.concatenate(([False], diff > 0))
+    dec = np.concatenate(([False], diff < 0))
+    # 교대: 연속한 두 변화의 부호가 반대
+    alt = np.concatenate(([False, False], diff[1:] * diff[:-1] < 0)) if n > 2 else np.zeros(n, bool)
+    outside1 = up1 | lo1
+
+    rules = np.zeros((len(RULES), n), dtype=bool)
+    rules[0] = (x > ucl) | (x < lcl)
+    rules[1] = (_window_count(up2, 3) >= 2) | (_window_count(lo2, 3) >= 2)
+    rules[2] = (_window_count(up1, 5) >= 4) | (_window_count(lo1, 5) >= 4)
+    rules[3] = _run(above, 8) | _run(below, 8)
+    rules[4] = _run(inc, 5) | _run(dec, 5)          # 6점 = 5번의 연속 증가/감소
+    rules[5] = _run(alt, 12)                        # 14점 = 12번의 연속 교대
+    rules[6] = _run(~outside1, 15)
+    rules[7] = _run(outside1, 8) & (_window_count(up1, 8) > 0) & (_window_count(lo1, 8) > 0)
+    return rules
+
+
+def violations(x, cl, sigma, ucl=None, lcl=None, first_no=1) -> list[dict]:
+    """위반 목록 — 서브그룹 순, 같은 서브그룹 안에서는 규칙 순 (x[0] 의 번호가 first_no)."""
+    x = np.asarray(x, dtype=float)
+    hits = evaluate_rules(x, cl, sigma, ucl, lcl)
+    idx, rule = np.nonzero(hits.T)
+    return [
+        {"subgroup": int(i) + first_no, "rule": RULES[r][0], "nelson": RULES[r][1],
+         "value": float(x[i]), "severity": RULES[r][2]}
+        for i, r in zip(idx.tolist(), rule.tolist())
+    ]
+
+
+# ── 관리도 ──
+
+def subgroups(values, n):
+    """(m, n) 행렬 — 끝의 불완전한 서브그룹은 버린다."""
+    values = np.asarray(values, dtype=float)
+    m = len(values) // n
+    return values[:m * n].reshape(m, n)
+
+
+def _limits(cl, ucl, lcl):
+    return {"cl": round(float(cl), 4), "ucl": round(float(ucl), 4), "lcl": round(float(lcl), 4)}
+
+
+def _finish(result, viol):
+    result["violations"] = viol
+    result["in_control"] = not viol
+    return result
+
+
+# ── 서브그룹 점과 누적합 기반 관리한계 ──
+#
+# 전체 재계산(calculate)과 증분 상태(mes_spc.update_spc_state)가 같은 함수를
+# 쓴다. 관리한계는 (서브그룹 수, Σ점, Σ산포) 만으로 결정되므로 새 서브그룹마다
+# 누적합만 갱신하면 된다.
+
+def points(chart_type, values, n):
+    """원시 값 → (점, 산포) 배열 (완결 서브그룹만).
+
+    XBAR_R: (평균, 범위), XBAR_S: (평균, 표준편차), I_MR: (값, 이동범위 — 첫 점 NaN),
+    계수형: values 는 0/1 불량 여부, 점은 p·u 는 비율, np·c 는 불량 수 (산포 NaN).
+    """
+    if chart_type == "I_MR":
+        x = np.asarray(values, dtype=float)
+        return x, np.concatenate(([np.nan], np.abs(np.diff(x))))[:len(x)]
+    groups = subgroups(values, n)
+    if chart_type == "XBAR_R":
+        return groups.mean(axis=1), groups.max(axis=1) - groups.min(axis=1)
+    if chart_type == "XBAR_S":
+        return groups.mean(axis=1), groups.std(axis=1, ddof=1)
+    if chart_type in ATTRIBUTE_CHARTS:
+        d = groups.sum(axis=1)
+        return (d / n if chart_type in ("P", "U") else d), np.full(len(d), np.nan)
+    raise ValueError(f"unknown chart type: {chart_type}")
+
+
+def close_subgroup(chart_type, buffer, prev=None):
+    """완결된 서브그룹 하나 → (점, 산포). I_MR 의 산포는 직전 점 prev 와의 이동범위."""
+    if chart_type == "I_MR":
+        x = float(buffer[0])
+        return x, (abs(x - prev) if prev is not None else None)
+    x, spread = points(chart_type, buffer, len(buffer))
+    return float(x[0]), (None if np.isnan(spread[0]) else float(spread[0]))
+
+
+def control_limits(chart_type, n, count, sum_x, sum_r=0.0):
+    """누적합 → 관리한계 {"count", "cl", "ucl", "lcl", "sigma", "spread"}.
+
+    sigma 는 규칙 판정용 (0 이면 1), spread 는 R/S/MR 차트의 (cl, ucl, lcl).
+    계산 불가(데이터 부족)면 None.
+    """
+    if count < (2 if chart_type == "I_MR" else 1) or (chart_type == "XBAR_S" and n < 2):
+        return None
+    cl = sum_x / count
+    spread = None
+    if chart_type in ATTRIBUTE_CHARTS:
+        if chart_type == "P":
+            sigma = math.sqrt(max(cl * (1 - cl), 0.0) / n)
+        elif chart_type == "NP":
+            sigma = math.sqrt(max(cl * (1 - cl / n), 0.0))
+        elif chart_type == "C":
+            sigma = math.sqrt(cl)
+        else:
+            sigma = math.sqrt(cl / n)
+        ucl, lcl = cl + 3 * sigma, max(0.0, cl - 3 * sigma)
+        if chart_type == "P":
+            ucl = min(1.0, ucl)
+    else:
+        if chart_type == "XBAR_R":
+            r_bar = sum_r / count
+            half = A2.get(n, 0.577) * r_bar
+            spread = (r_bar, D4.get(n, 2.115) * r_bar, D3.get(n, 0) * r_bar)
+        elif chart_type == "XBAR_S":
+            a3, b3, b4 = s_chart_factors(n)
+            s_bar = sum_r / count
+            half = a3 * s_bar
+            spread = (s_bar, b4 * s_bar, b3 * s_bar)
+        elif chart_type == "I_MR":
+            mr_bar = sum_r / (count - 1)
+            half = 3 * mr_bar / d2[2]
+            spread = (mr_bar, D4[2] * mr_bar, 0.0)
+        else:
+            raise ValueError(f"unknown chart type: {chart_type}")
+        ucl, lcl = cl + half, cl - half
+        sigma = half / 3
+    return {"count": int(count), "cl": cl, "ucl": ucl, "lcl": lcl,
+            "sigma": sigma if sigma > 0 else 1.0, "spread": spread}
+
+
+def limits_of(chart_type, n, x, spread) -> dict:
+    """점/산포 배열 전체의 관리한계."""
+    return control_limits(chart_type, n, len(x), float(np.sum(x)), float(np.nansum(spread)))
+
+
+# 규칙 판정에 필요한 최대 과거 점 수 (규칙 7: 연속 15점)
+RULE_WINDOW = 15
+
+
+def latest_violations(recent, x, limits, subgroup_no) -> list[dict]:
+    """직전 점들(recent, 최대 RULE_WINDOW)에 새 점 x 를 붙여 x 에서 성립한 규칙만."""
+    window = list(recent)[-(RULE_WINDOW - 1):] + [x]
+    first = subgroup_no - len(window) + 1
+    return [v for v in violations(window, limits["cl"], limits["sigma"],
+                                  limits["ucl"], limits["lcl"], first_no=first)
+            if v["subgroup"] == subgroup_no]
+
+
+_SPREAD_CHART = {"XBAR_R": ("r_chart", "range"), "XBAR_S": ("s_chart", "std"),
+                 "I_MR": ("mr_chart", "range")}
+
+
+def chart(chart_type, n, x, spread, limits, first_no=1,
+          custom_ucl=None, custom_lcl=None, custom_target=None) -> dict:
+    """점 배열 + 관리한계 → 관리도 응답. first_no 는 x[0] 의 서브그룹 번호
+    (최근 구간만 표시할 때 전체 이력 기준 번호를 유지한다)."""
+    x = np.asarray(x, dtype=float)
+    spread = np.asarray(spread, dtype=float)
+    center = _limits(custom_target if custom_target is not None else limits["cl"],
+                     custom_ucl if custom_ucl is not None else limits["ucl"],
+                     custom_lcl if custom_lcl is not None else limits["lcl"])
+    nos = range(first_no, first_no + len(x))
+    xs = np.round(x, 4).tolist()
+    result = {"chart_type": chart_type,
+              "sample_size": 1 if chart_type == "I_MR" else n,
+              "subgroup_count": limits["count"]}
+
+    if chart_type in ATTRIBUTE_CHARTS:
+        key = chart_type.lower()
+        ucl, lcl = round(float(limits["ucl"]), 4), round(float(limits["lcl"]), 4)
+        result[f"{key}_chart"] = {
+            **center,
+            "data": [{"no": i, key: v, "n": n, "ucl": ucl, "lcl": lcl} for i, v in zip(nos, xs)],
+        }
+    else:
+        main_key, main_value = ("i_chart", "value") if chart_type == "I_MR" else ("x_bar_chart", "mean")
+        spread_key, spread_value = _SPREAD_CHART[chart_type]
+        result[main_key] = {**center, "data": [{"no": i, main_value: v} for i, v in zip(nos, xs)]}
+        result[spread_key] = {
+            **_limits(*limits["spread"]),
+            "data": [{"no": i, spread_value: v}
+                     for i, v in zip(nos, np.round(spread, 4).tolist()) if not math.isnan(v)],
+        }
+    return _finish(result, violations(x, limits["cl"], limits["sigma"],
+                                      limits["ucl"], limits["lcl"], first_no=first_no))
+
+
+def calculate(chart_type, values, n, custom_ucl=None, custom_lcl=None, custom_target=None):
+    """rule_type 별 관리도. 계수형은 values 가 0/1 불량 여부(검사 순)이고
+    n 개씩 묶어 서브그룹을 만든다. 계산 불가(데이터 부족)면 None."""
+    if chart_type not in CHART_TYPES:
+        raise ValueError(f"unknown chart type: {chart_type}")
+    x, spread = points(chart_type, values, n)
+    limits = limits_of(chart_type, n, x, spread)
+    if limits is None:
+        return None
+    return chart(chart_type, n, x, spread, limits, 1, custom_ucl, custom_lcl, custom_target)
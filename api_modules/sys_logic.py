@@ -2,8 +2,12 @@
 
 import os
 
-import psutil
-from kubernetes import client, config
+from api_modules.lazy_import import lazy_module
+
+# Imported on first call (not at API start-up)
+psutil = lazy_module("psutil")
+client = lazy_module("kubernetes.client")
+config = lazy_module("kubernetes.config")
 
 
 def get_pods():
@@ -55,6 +55,7 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
     allow_credentials=True,
+    expose_headers=["ETag"],
 )
 
 # ── Prometheus Metrics Instrumentation ──
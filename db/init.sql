@@ -165,6 +165,9 @@ CREATE TABLE IF NOT EXISTS inspection_details (
     judgment      VARCHAR(10) DEFAULT 'PASS'
                       CHECK (judgment IN ('PASS','FAIL'))
 );
+-- SPC/Cpk: 품목 이력 → 검사항목 상세를 한 번에 조회 (api_modules/mes_spc.py)
+CREATE INDEX IF NOT EXISTS idx_insp_item_time ON inspections(item_code, inspected_at);
+CREATE INDEX IF NOT EXISTS idx_insp_detail_insp_check ON inspection_details(inspection_id, check_name);
 
 -- ─── 13. 불량 코드 ──────────────────────────────────────────
 CREATE TABLE IF NOT EXISTS defect_codes (
@@ -225,14 +228,18 @@ CREATE TABLE IF NOT EXISTS defect_history (
 );
 
 -- ─── 18. 설비 센서 데이터 (AI 고장 예측용) ──────────────────
+-- 일 단위 RANGE 파티션 (api_modules/sensor_partitions.py 가 파티션 생성/보존기간 관리)
 CREATE TABLE IF NOT EXISTS equip_sensors (
-    sensor_id   SERIAL PRIMARY KEY,
+    sensor_id   SERIAL,
     equip_code  VARCHAR(20) REFERENCES equipments(equip_code),
     vibration   DECIMAL(8,4),
     temperature DECIMAL(8,4),
     current_amp DECIMAL(8,4),
-    recorded_at TIMESTAMP DEFAULT NOW()
-);
+    recorded_at TIMESTAMP NOT NULL DEFAULT NOW(),
+    PRIMARY KEY (sensor_id, recorded_at)
+) PARTITION BY RANGE (recorded_at);
+CREATE TABLE IF NOT EXISTS equip_sensors_default PARTITION OF equip_sensors DEFAULT;
+CREATE INDEX IF NOT EXISTS idx_equip_sensors_equip_time ON equip_sensors(equip_code, recorded_at);
 
 -- ─── 19. AI 예측 결과 저장 ──────────────────────────────────
 CREATE TABLE IF NOT EXISTS ai_forecasts (
@@ -243,6 +250,9 @@ CREATE TABLE IF NOT EXISTS ai_forecasts (
     result_json JSONB,
     created_at  TIMESTAMP DEFAULT NOW()
 );
+-- 수요 예측 야간 배치 결과 조회 (forecast_batch → predict_demand)
+CREATE INDEX IF NOT EXISTS idx_ai_forecasts_type_item
+    ON ai_forecasts(model_type, item_code, created_at DESC);
 
 
 -- =============================================================
@@ -255,7 +265,7 @@ CREATE TABLE IF NOT EXISTS spc_rules (
     item_code    VARCHAR(20) REFERENCES items(item_code),
     check_name   VARCHAR(100) NOT NULL,
     rule_type    VARCHAR(20) NOT NULL DEFAULT 'XBAR_R'
-                     CHECK (rule_type IN ('XBAR_R','XBAR_S','P','NP','C','U')),
+                     CHECK (rule_type IN ('XBAR_R','XBAR_S','I_MR','P','NP','C','U')),
     ucl          DECIMAL(12,4),
     lcl          DECIMAL(12,4),
     target       DECIMAL(12,4),
@@ -280,6 +290,30 @@ CREATE TABLE IF NOT EXISTS spc_violations (
     created_at     TIMESTAMP DEFAULT NOW()
 );
 
+-- ─── 23-1. SPC 증분 상태 (규칙별 누적합·열린 서브그룹·최근 점) ──
+CREATE TABLE IF NOT EXISTS spc_state (
+    rule_id        INTEGER PRIMARY KEY REFERENCES spc_rules(rule_id) ON DELETE CASCADE,
+    chart_type     VARCHAR(20) NOT NULL,
+    sample_size    INTEGER NOT NULL,
+    subgroup_count INTEGER NOT NULL DEFAULT 0,
+    sum_x          DOUBLE PRECISION NOT NULL DEFAULT 0,
+    sum_r          DOUBLE PRECISION NOT NULL DEFAULT 0,
+    buffer         JSONB NOT NULL DEFAULT '[]',
+    recent         JSONB NOT NULL DEFAULT '[]',
+    updated_at     TIMESTAMP DEFAULT NOW()
+);
+
+-- ─── 23-2. SPC 서브그룹 점 ───────────────────────────────────
+CREATE TABLE IF NOT EXISTS spc_points (
+    rule_id       INTEGER NOT NULL REFERENCES spc_rules(rule_id) ON DELETE CASCADE,
+    subgroup_no   INTEGER NOT NULL,
+    value         DOUBLE PRECISION NOT NULL,
+    spread        DOUBLE PRECISION,
+    inspection_id INTEGER,
+    created_at    TIMESTAMP DEFAULT NOW(),
+    PRIMARY KEY (rule_id, subgroup_no)
+);
+
 -- ─── 24. CAPA (시정/예방 조치) ───────────────────────────────
 CREATE TABLE IF NOT EXISTS capa (
     capa_id      VARCHAR(30) PRIMARY KEY,
@@ -545,15 +579,65 @@ CREATE TABLE IF NOT EXISTS mqtt_config (
 );
 
 -- ── 센서 데이터 (FN-055) ──────────────────────────────────
+-- 일 단위 RANGE 파티션 (api_modules/sensor_partitions.py 가 파티션 생성/보존기간 관리)
 CREATE TABLE IF NOT EXISTS sensor_data (
-    data_id       BIGSERIAL    PRIMARY KEY,
+    data_id       BIGSERIAL,
     equip_code    VARCHAR(20)  NOT NULL,
     sensor_type   VARCHAR(50)  NOT NULL,
     value         NUMERIC(12,4),
-    collected_at  TIMESTAMP    DEFAULT NOW(),
+    collected_at  TIMESTAMP    NOT NULL DEFAULT NOW(),
     source        VARCHAR(20)  DEFAULT 'MQTT'
-                  CHECK (source IN ('MQTT','OPCUA','MANUAL'))
+                  CHECK (source IN ('MQTT','OPCUA','MANUAL')),
+    PRIMARY KEY (data_id, collected_at)
+) PARTITION BY RANGE (collected_at);
+CREATE TABLE IF NOT EXISTS sensor_data_default PARTITION OF sensor_data DEFAULT;
+
+-- 센서 롤업 (1min/5min/1h/1d) — sensor_data INSERT 시 문장 단위 트리거로 증분 갱신
+-- (api_modules/sensor_rollups.py 가 조회/보존기간 관리)
+CREATE TABLE IF NOT EXISTS sensor_rollups (
+    equip_code    VARCHAR(20)  NOT NULL,
+    grain         VARCHAR(8)   NOT NULL CHECK (grain IN ('1min','5min','1h','1d')),
+    sensor_type   VARCHAR(50)  NOT NULL,
+    bucket_start  TIMESTAMP    NOT NULL,
+    cnt           BIGINT       NOT NULL,
+    sum_val       DOUBLE PRECISION NOT NULL,
+    sumsq_val     DOUBLE PRECISION NOT NULL,
+    min_val       NUMERIC(12,4),
+    max_val       NUMERIC(12,4),
+    PRIMARY KEY (equip_code, grain, sensor_type, bucket_start)
 );
+CREATE INDEX IF NOT EXISTS idx_sensor_rollups_grain_time ON sensor_rollups(grain, bucket_start);
+
+CREATE OR REPLACE FUNCTION sensor_rollup_ingest()
+RETURNS TRIGGER AS $$
+BEGIN
+    INSERT INTO sensor_rollups AS r
+        (equip_code, grain, sensor_type, bucket_start,
+         cnt, sum_val, sumsq_val, min_val, max_val)
+    SELECT n.equip_code, g.grain, n.sensor_type,
+           date_bin(g.step, n.collected_at, TIMESTAMP '2000-01-01') AS bucket_start,
+           COUNT(*), SUM(n.value), SUM(n.value * n.value), MIN(n.value), MAX(n.value)
+    FROM new_rows n
+    CROSS JOIN (VALUES ('1min', INTERVAL '1 minute'), ('5min', INTERVAL '5 minutes'),
+                       ('1h', INTERVAL '1 hour'), ('1d', INTERVAL '1 day')) AS g(grain, step)
+    WHERE n.value IS NOT NULL
+    GROUP BY 1, 2, 3, 4
+    ORDER BY 1, 2, 3, 4
+    ON CONFLICT (equip_code, grain, sensor_type, bucket_start) DO UPDATE SET
+        cnt       = r.cnt + EXCLUDED.cnt,
+        sum_val   = r.sum_val + EXCLUDED.sum_val,
+        sumsq_val = r.sumsq_val + EXCLUDED.sumsq_val,
+        min_val   = LEAST(r.min_val, EXCLUDED.min_val),
+        max_val   = GREATEST(r.max_val, EXCLUDED.max_val);
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS trg_sensor_rollup ON sensor_data;
+CREATE TRIGGER trg_sensor_rollup
+    AFTER INSERT ON sensor_data
+    REFERENCING NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION sensor_rollup_ingest();
 
 -- ── 문서 관리 DMS (REQ-043, FN-056) ──────────────────────
 CREATE TABLE IF NOT EXISTS documents (
@@ -649,6 +733,16 @@ CREATE TABLE IF NOT EXISTS opcua_config (
     created_at            TIMESTAMP    DEFAULT NOW()
 );
 
+-- OPC-UA 노드별 수신 상태 (opcua_ingest 엔진이 주기적으로 upsert)
+CREATE TABLE IF NOT EXISTS opcua_node_status (
+    config_id   INTEGER      PRIMARY KEY REFERENCES opcua_config(config_id) ON DELETE CASCADE,
+    status      VARCHAR(20)  NOT NULL,
+    last_seen   TIMESTAMP,
+    last_value  NUMERIC(12,4),
+    error       TEXT,
+    updated_at  TIMESTAMP    DEFAULT NOW()
+);
+
 -- ── 감사 추적 (REQ-049, FN-063) — NFR-014: append-only + hash chain ──
 CREATE TABLE IF NOT EXISTS audit_trail (
     audit_id    BIGSERIAL    PRIMARY KEY,
@@ -1865,6 +1959,23 @@ CREATE TABLE IF NOT EXISTS sites (
 );
 CREATE INDEX IF NOT EXISTS idx_site_parent ON sites(parent_site_id);
 
+-- ================================================================
+-- Performance Tables
+-- ================================================================
+
+-- 문서번호 채번 카운터 (PREFIX-YYYYMMDD-NNN, api_modules/doc_numbering.py)
+CREATE TABLE IF NOT EXISTS doc_sequences (
+  prefix VARCHAR(20) NOT NULL,
+  seq_date CHAR(8) NOT NULL,
+  last_no INT NOT NULL DEFAULT 0,
+  PRIMARY KEY (prefix, seq_date)
+);
+
+-- 키셋 페이지네이션 정렬 키 (api_modules/pagination.py)
+-- audit_trail.created_at 은 NULL 허용 → mes_audit 정렬 키와 같은 COALESCE 표현식
+CREATE INDEX IF NOT EXISTS idx_audit_created_id ON audit_trail((COALESCE(created_at, '-infinity'::timestamp)), audit_id);
+CREATE INDEX IF NOT EXISTS idx_plans_due_id ON production_plans(due_date, plan_id);
+
 -- ============================================================
 -- Phase 2+/3/3+ Seed Data
 -- ============================================================
@@ -1,6 +1,11 @@
-"""pytest fixtures — DB 연결, 인증 토큰, FastAPI 테스트 클라이언트."""
+"""pytest fixtures — DB 연결, 인증 토큰, FastAPI 테스트 클라이언트.
+
+DB 없이 쿼리를 흉내 내는 FakeCursor / FakeConn 은 ``from conftest import ...`` 로 쓴다.
+"""
 
 import os
+import threading
+
 import pytest
 from fastapi.testclient import TestClient
 
@@ -31,3 +36,64 @@ def auth_token(client):
 def auth_headers(auth_token):
     """인증 헤더."""
     return {"Authorization": f"Bearer {auth_token}"}
+
+
+class FakeCursor:
+    """execute 를 기록하고 정해진 결과를 돌려주는 psycopg2 커서 대역.
+
+    rows / one: fetchall / fetchone 이 매번 돌려줄 결과.
+    results / ones: 호출마다 차례로 꺼낼 결과 (남아 있으면 rows / one 보다 우선).
+    """
+
+    def __init__(self, rows=None, one=None, results=(), ones=()):
+        self.rows = [] if rows is None else rows
+        self.one = one
+        self.results = list(results)
+        self.ones = list(ones)
+        self.executed = []
+        self.threads = set()
+        self.rowcount = 0
+        self.closed = False
+
+    def execute(self, sql, params=None):
+        self.threads.add(threading.current_thread().name)
+        self.executed.append((sql, params))
+
+    def fetchall(self):
+        self.threads.add(threading.current_thread().name)
+        return self.results.pop(0) if self.results else self.rows
+
+    def fetchone(self):
+        return self.ones.pop(0) if self.ones else self.one
+
+    def close(self):
+        self.closed = True
+
+
+class FakeConn:
+    """FakeCursor 하나를 돌려주는 연결 대역. fail=True 면 cursor() 가 실패한다."""
+
+    def __init__(self, cur=None, fail=False):
+        self.cur = FakeCursor() if cur is None else cur
+        self.fail = fail
+        self.commits = 0
+        self.rollbacks = 0
+
+    @property
+    def committed(self):
+        return self.commits > 0
+
+    @property
+    def rolled_back(self):
+        return self.rollbacks > 0
+
+    def cursor(self, cursor_factory=None):
+        if self.fail:
+            raise RuntimeError("boom")
+        return self.cur
+
+    def commit(self):
+        self.commits += 1
+
+    def rollback(self):
+        self.rollbacks += 1
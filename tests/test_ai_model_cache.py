@@ -0,0 +1,180 @@
+"""AI 모델 캐시 테스트 — 학습 데이터 지문 기반 재사용/재학습."""
+
+import os
+import signal
+import time
+from concurrent.futures.process import BrokenProcessPool
+
+import numpy as np
+import pytest
+
+from api_modules import ai_model_cache
+from api_modules.ai_model_cache import ModelCache, data_fingerprint
+
+
+@pytest.fixture(autouse=True)
+def model_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(ai_model_cache, "MODEL_DIR", str(tmp_path))
+    monkeypatch.setattr(ai_model_cache, "_memory_cache", ai_model_cache._ModelLRU())
+    return tmp_path
+
+
+def _train(calls):
+    def train(data):
+        calls.append(1)
+        return {"mean": float(np.mean(data[0] if isinstance(data, tuple) else data))}
+    return train
+
+
+def _mean_model(data):
+    """프로세스 풀에서 실행되는 학습 함수 (모듈 최상위)."""
+    time.sleep(0.2)
+    return {"mean": float(np.mean(data))}
+
+
+def _killed_child(data):
+    """학습 중 자식 프로세스가 죽는 경우 (OOM kill 등)."""
+    os.kill(os.getpid(), signal.SIGKILL)
+
+
+def _wait_idle(timeout=30):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        jobs = ModelCache.get_jobs()
+        if not jobs["queued"] and not jobs["running"]:
+            return jobs
+        time.sleep(0.05)
+    raise AssertionError("training did not finish")
+
+
+class TestFingerprint:
+
+    def test_fingerprint_tracks_content_and_rows(self):
+        X = np.arange(12, dtype=float).reshape(4, 3)
+        assert data_fingerprint(X) == data_fingerprint(X.copy())
+        assert data_fingerprint(X).startswith("n4-")
+        Y = X.copy()
+        Y[0, 0] = 99
+        assert data_fingerprint(Y) != data_fingerprint(X)
+        assert data_fingerprint((X, np.zeros(4))) != data_fingerprint((X, np.ones(4)))
+
+
+class TestModelCache:
+
+    def test_reuse_when_unchanged_retrain_when_changed(self, monkeypatch):
+        monkeypatch.setattr(ai_model_cache, "MIN_RETRAIN_MINUTES", 0)
+        calls = []
+        X = np.ones((20, 3))
+        ModelCache.get_or_train("iforest_EQ1", _train(calls), X)
+        ModelCache.get_or_train("iforest_EQ1", _train(calls), X.copy())
+        assert len(calls) == 1
+
+        ai_model_cache._memory_cache.clear()  # 디스크 경로도 지문 검증
+        ModelCache.get_or_train("iforest_EQ1", _train(calls), X)
+        assert len(calls) == 1
+
+        ModelCache.get_or_train("iforest_EQ1", _train(calls), np.zeros((21, 3)))
+        assert len(calls) == 2
+
+    def test_recent_model_reused_despite_new_rows(self):
+        calls = []
+        ModelCache.get_or_train("prophet_A", _train(calls), np.ones(10))
+        ModelCache.get_or_train("prophet_A", _train(calls), np.ones(11))
+        assert len(calls) == 1
+
+    def test_stats_expose_metadata(self):
+        ModelCache.get_or_train("xgb_defect", _train([]), (np.ones((5, 4)), np.zeros(5)))
+        stats = ModelCache.get_stats()
+        assert stats["disk_count"] == 1 and stats["memory_count"] == 1
+        meta = stats["models"][0]
+        assert meta["model_key"] == "xgb_defect" and meta["training_rows"] == 5
+        assert meta["fingerprint"].startswith("n5-") and meta["in_memory"]
+        assert meta["train_seconds"] >= 0 and "trained_at" in meta
+
+
+class TestBackgroundTraining:
+
+    def test_schedule_then_serve_stale_while_retraining(self, monkeypatch):
+        monkeypatch.setattr(ai_model_cache, "MIN_RETRAIN_MINUTES", 0)
+        X = np.ones(10)
+        assert ModelCache.get_or_schedule("iforest_BG", _mean_model, X) is None
+        assert ModelCache.get_or_schedule("iforest_BG", _mean_model, X) is None
+        jobs = ModelCache.get_jobs()
+        assert len(jobs["queued"] + jobs["running"]) == 1  # 키당 잡 1개
+
+        jobs = _wait_idle()
+        assert jobs["recent"][0]["state"] == "done"
+        assert jobs["recent"][0]["train_seconds"] >= 0.2
+        assert ModelCache.get_or_schedule("iforest_BG", _mean_model, X) == {"mean": 1.0}
+
+        # 데이터 변경 → 재학습 잡 등록, 그동안 직전 모델 사용
+        Y = np.full(10, 3.0)
+        assert ModelCache.get_or_schedule("iforest_BG", _mean_model, Y) == {"mean": 1.0}
+        _wait_idle()
+        assert ModelCache.get_or_schedule("iforest_BG", _mean_model, Y) == {"mean": 3.0}
+
+    def test_failed_job_recorded(self):
+        ModelCache.get_or_schedule("broken", _mean_model, "not numeric")
+        jobs = _wait_idle()
+        assert jobs["recent"][0]["state"] == "failed" and jobs["recent"][0]["error"]
+
+    def test_killed_child_pool_is_replaced(self):
+        ModelCache.get_or_schedule("killed", _killed_child, np.ones(5))
+        jobs = _wait_idle()
+        assert jobs["recent"][0]["state"] == "failed"
+        assert ai_model_cache._executor is None
+
+        ModelCache.get_or_schedule("after_kill", _mean_model, np.ones(5))
+        jobs = _wait_idle()
+        assert jobs["recent"][0]["model_key"] == "after_kill"
+        assert jobs["recent"][0]["state"] == "done"
+
+    def test_submit_to_broken_pool_retries_on_new_pool(self, monkeypatch):
+        class _Broken:
+            def submit(self, *args):
+                raise BrokenProcessPool("child died")
+
+            def shutdown(self, **kw):
+                pass
+
+        monkeypatch.setattr(ai_model_cache, "_executor", _Broken())
+        ModelCache.get_or_schedule("after_broken", _mean_model, np.ones(5))
+        jobs = _wait_idle()
+        assert jobs["recent"][0]["model_key"] == "after_broken"
+        assert jobs["recent"][0]["state"] == "done"
+
+
+class TestMemoryBound:
+
+    def test_lru_evicts_by_count_and_bytes(self):
+        lru = ai_model_cache._ModelLRU(max_models=2, max_bytes=5_000)
+        lru["a"] = {"model": np.zeros(10), "meta": {}}
+        lru["b"] = {"model": np.zeros(10), "meta": {}}
+        lru.get("a")
+        lru["c"] = {"model": np.zeros(10), "meta": {}}
+        assert "b" not in lru and "a" in lru and "c" in lru
+        lru["big"] = {"model": np.zeros(1000), "meta": {}}  # 8KB > 상한 → 자신만 남음
+        assert [k for k, _ in lru.items()] == ["big"] and lru.evictions == 3
+        assert lru.bytes >= 8000
+
+    def test_compressed_load_does_not_request_mmap(self, recwarn):
+        ModelCache.get_or_train("prophet_CZ", lambda data: {"w": np.arange(1000.0)}, np.ones(5))
+        ai_model_cache._memory_cache.clear()
+        model = ModelCache.get_or_train("prophet_CZ", _train([]), np.ones(5))
+        assert not isinstance(model["w"], np.memmap) and model["w"][-1] == 999
+        assert not [w for w in recwarn if "mmap_mode" in str(w.message)]
+
+    def test_uncompressed_array_model_is_memory_mapped(self, monkeypatch):
+        monkeypatch.setattr(ai_model_cache, "COMPRESS", 0)
+        ModelCache.get_or_train("prophet_MM", _train([]), np.ones(5))
+        ai_model_cache._memory_cache.clear()
+
+        def weights(data):
+            return {"w": np.arange(100_000, dtype=float)}
+
+        ModelCache.invalidate("prophet_MM")
+        ModelCache.get_or_train("prophet_MM", weights, np.ones(5))
+        ai_model_cache._memory_cache.clear()
+        model = ModelCache.get_or_train("prophet_MM", weights, np.ones(5))
+        assert isinstance(model["w"], np.memmap) and model["w"][-1] == 99_999
+        assert ModelCache.get_stats()["memory_mb"] > 0.7
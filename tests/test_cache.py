@@ -0,0 +1,274 @@
+"""캐시 유틸리티 테스트 (Redis 는 dict 기반 가짜 클라이언트로 대체)."""
+
+import asyncio
+import fnmatch
+import threading
+
+import pytest
+
+from api_modules import cache
+
+
+class _FakeRedis:
+    def __init__(self):
+        self.data = {}
+        self.scanned = 0
+        self.published = []
+
+    def get(self, key):
+        return self.data.get(key)
+
+    def setex(self, key, ttl, value):
+        self.data[key] = value
+
+    def set(self, key, value, nx=False, px=None):
+        if nx and key in self.data:
+            return None
+        self.data[key] = value
+        return True
+
+    def incr(self, key):
+        self.data[key] = str(int(self.data.get(key, 0)) + 1)
+        return int(self.data[key])
+
+    def scan_iter(self, match, count=10):
+        self.scanned += 1
+        return [k for k in list(self.data) if fnmatch.fnmatchcase(k, match)]
+
+    def unlink(self, *keys):
+        for k in keys:
+            self.data.pop(k, None)
+
+    def publish(self, channel, message):
+        self.published.append((channel, message))
+
+    def keys(self, pattern):
+        raise AssertionError("KEYS 는 사용하지 않는다")
+
+    def register_script(self, lua):
+        def get(keys, args):
+            return self.data.get(args[0] + (self.data.get(keys[0]) or "0") + args[1])
+
+        def unlock(keys, args):
+            if self.data.get(keys[0]) == args[0]:
+                del self.data[keys[0]]
+        return unlock if "DEL" in lua else get
+
+
+@pytest.fixture
+def fake_redis(monkeypatch):
+    r = _FakeRedis()
+    monkeypatch.setattr(cache, "_redis", r)
+    monkeypatch.setattr(cache, "_get_script", None)
+    monkeypatch.setattr(cache, "_unlock_script", None)
+    monkeypatch.setattr(cache, "_memory_cache", cache.LRUCache())
+    return r
+
+
+class TestNamespaceInvalidation:
+
+    def test_namespace_delete_is_a_version_bump(self, fake_redis):
+        cache.cache_set("items:list:1", {"n": 1})
+        cache.cache_set("inventory:summary", {"n": 2})
+        assert cache.cache_get("items:list:1") == {"n": 1}
+
+        cache.cache_delete("items:*")
+        assert fake_redis.scanned == 0
+        assert cache.cache_get("items:list:1") is None
+        assert cache.cache_get("inventory:summary") == {"n": 2}
+
+        cache.cache_set("items:list:1", {"n": 3})
+        assert cache.cache_get("items:list:1") == {"n": 3}
+        assert "items:v1:list:1" in fake_redis.data
+        cache._memory_cache.clear()  # L1 우회 → Redis 경로 확인
+        assert cache.cache_get("items:list:1") == {"n": 3}
+
+    def test_narrow_pattern_scans_current_version_only(self, fake_redis):
+        cache.cache_set("process:list", {"a": 1})
+        cache.cache_set("process:detail:P1", {"b": 2})
+        cache.cache_delete("process:detail:*")
+        assert fake_redis.scanned == 1
+        assert cache.cache_get("process:detail:P1") is None
+        assert cache.cache_get("process:list") == {"a": 1}
+
+    def test_memory_fallback_prefix_delete(self, monkeypatch):
+        monkeypatch.setattr(cache, "_redis", False)
+        monkeypatch.setattr(cache, "_memory_cache", cache.LRUCache())
+        cache.cache_set("equip:list", {"x": 1})
+        cache.cache_delete("equip:*")
+        assert cache.cache_get("equip:list") is None
+
+
+class TestLRUCache:
+
+    def test_entry_and_byte_bounds_evict_lru(self):
+        c = cache.LRUCache(max_entries=3, max_bytes=100)
+        for k in "abc":
+            c.set(k, k, ttl=60, size=10)
+        c.get("a")  # a 를 최근으로
+        c.set("d", "d", ttl=60, size=10)
+        assert c.get("b") is None and c.get("a") == "a"
+        c.set("big", "x", ttl=60, size=90)
+        assert len(c) == 2 and c.bytes == 100 and c.get("a") == "a"
+        c.set("huge", "x", ttl=60, size=101)  # 상한 초과 항목은 저장 안 함
+        assert c.get("huge") is None
+        assert c.stats()["evictions"] == 3
+
+    def test_expired_entries_counted_separately(self, monkeypatch):
+        now = [1000.0]
+        monkeypatch.setattr(cache.time, "monotonic", lambda: now[0])
+        c = cache.LRUCache(max_entries=2, max_bytes=100)
+        c.set("a", 1, ttl=1, size=1)
+        c.set("b", 2, ttl=10, size=1)
+        now[0] += 5
+        assert c.get("a") is None
+        c.set("c", 3, ttl=10, size=1)
+        c.set("d", 4, ttl=10, size=1)
+        st = c.stats()
+        assert (st["expirations"], st["evictions"], st["entries"]) == (1, 1, 2)
+        assert (st["hits"], st["misses"]) == (0, 1)
+
+    def test_l1_serves_hot_keys_without_redis_round_trip(self, fake_redis, monkeypatch):
+        cache.cache_set("equip:list", {"x": 1})
+        monkeypatch.setattr(fake_redis, "register_script", None)  # Redis 조회 시 실패
+        assert cache.cache_get("equip:list") == {"x": 1}
+        assert cache.cache_stats()["memory_mode"] == "l1"
+
+
+class TestGetOrCompute:
+
+    def test_concurrent_misses_share_one_computation(self, fake_redis):
+        calls = []
+        gate = threading.Event()
+
+        def compute():
+            calls.append(1)
+            gate.wait(1)
+            return {"rows": [1, 2]}
+
+        async def scenario():
+            tasks = [asyncio.create_task(cache.get_or_compute("equip:list:x", compute, 30))
+                     for _ in range(20)]
+            await asyncio.sleep(0.05)
+            gate.set()
+            return await asyncio.gather(*tasks)
+
+        results = asyncio.run(scenario())
+        assert len(calls) == 1 and all(r == {"rows": [1, 2]} for r in results)
+        assert not any(k.startswith(cache.LOCK_PREFIX) for k in fake_redis.data)
+
+    def test_cancelled_leader_hands_over_to_waiter(self, fake_redis):
+        calls = []
+
+        async def compute():
+            calls.append(1)
+            await asyncio.sleep(0.05 if len(calls) == 1 else 0)
+            return len(calls)
+
+        async def scenario():
+            leader = asyncio.create_task(cache.get_or_compute("items:list:c", compute, 30))
+            await asyncio.sleep(0)
+            waiters = [asyncio.create_task(cache.get_or_compute("items:list:c", compute, 30))
+                       for _ in range(5)]
+            await asyncio.sleep(0.01)
+            leader.cancel()
+            results = await asyncio.gather(*waiters)
+            return leader, results
+
+        leader, results = asyncio.run(scenario())
+        assert leader.cancelled()
+        assert results == [2] * 5 and len(calls) == 2
+        assert "items:list:c" not in cache._inflight
+
+    def test_cancelled_waiter_does_not_cancel_leader(self, fake_redis):
+        async def compute():
+            await asyncio.sleep(0.02)
+            return "v"
+
+        async def scenario():
+            leader = asyncio.create_task(cache.get_or_compute("items:list:w", compute, 30))
+            await asyncio.sleep(0)
+            waiter = asyncio.create_task(cache.get_or_compute("items:list:w", compute, 30))
+            await asyncio.sleep(0.005)
+            waiter.cancel()
+            return await leader, waiter
+
+        value, waiter = asyncio.run(scenario())
+        assert value == "v" and waiter.cancelled()
+
+    def test_waits_for_other_worker_holding_lock(self, fake_redis, monkeypatch):
+        monkeypatch.setattr(cache, "LOCK_POLL", 0.01)
+        fake_redis.data[cache.LOCK_PREFIX + "items:list:a"] = "other-worker"
+
+        async def other_worker_finishes():
+            await asyncio.sleep(0.05)
+            cache.cache_set("items:list:a", {"v": {"from": "other"}, "d": 0.1, "e": 1e12})
+
+        async def scenario():
+            asyncio.create_task(other_worker_finishes())
+            return await cache.get_or_compute("items:list:a", lambda: {"from": "me"}, 60)
+
+        assert asyncio.run(scenario()) == {"from": "other"}
+
+    def test_errors_not_cached_and_early_refresh(self, fake_redis):
+        async def scenario():
+            err = await cache.get_or_compute("items:list:e", lambda: {"error": "x"}, 60)
+            assert err == {"error": "x"} and cache.cache_get("items:list:e") is None
+
+            n = []
+
+            async def compute():
+                n.append(1)
+                await asyncio.sleep(0.005)  # 계산 시간(delta) > 0 이어야 조기 갱신 대상
+                return len(n)
+
+            assert await cache.get_or_compute("items:list:r", compute, 60, beta=0) == 1
+            assert await cache.get_or_compute("items:list:r", compute, 60, beta=0) == 1
+            # beta 가 매우 크면 만료 전이라도 백그라운드 갱신, 응답은 기존 값
+            assert await cache.get_or_compute("items:list:r", compute, 60, beta=1e9) == 1
+            await asyncio.sleep(0.05)
+            assert await cache.get_or_compute("items:list:r", compute, 60, beta=0) == 2
+
+        asyncio.run(scenario())
+
+
+class TestCrossWorkerInvalidation:
+
+    def test_delete_publishes_and_peer_evicts_local_entries(self, fake_redis):
+        cache._memory_cache.set("items:detail:A", {"a": 1}, 60, 10)
+        cache._memory_cache.set("process:list", {"p": 1}, 60, 10)
+        cache.cache_delete("bom:*")
+        assert fake_redis.published == [(cache.INVALIDATION_CHANNEL, "bom:*")]
+
+        cache._on_invalidate("items:*")  # 다른 워커에서 받은 이벤트
+        assert cache._memory_cache.get("items:detail:A") is None
+        assert cache._memory_cache.get("process:list") == {"p": 1}
+
+    def test_value_read_before_invalidation_not_kept_in_l1(self, fake_redis, monkeypatch):
+        monkeypatch.setattr(cache, "L1_TTL", 5)
+        cache.cache_set("items:list:a", {"old": 1})
+        cache._memory_cache.clear()
+        versioned_get = fake_redis.register_script("GET")
+
+        def get_then_invalidated(keys, args):
+            value = versioned_get(keys, args)
+            cache._on_invalidate("items:*")  # GET 응답 직후 다른 워커의 삭제 이벤트
+            return value
+
+        monkeypatch.setattr(cache, "_get_script", get_then_invalidated)
+        assert cache.cache_get("items:list:a") == {"old": 1}
+        assert cache._memory_cache.get("items:list:a") is None
+
+        monkeypatch.setattr(cache, "_get_script", versioned_get)
+        assert cache.cache_get("items:list:a") == {"old": 1}
+        assert cache._memory_cache.get("items:list:a") == {"old": 1}
+
+    def test_master_data_kept_longer_only_while_subscribed(self, monkeypatch):
+        monkeypatch.setattr(cache, "L1_TTL", 5)
+        monkeypatch.setattr(cache, "L1_MASTER_TTL", 300)
+        monkeypatch.setattr(cache, "_coherent", threading.Event())
+        assert cache._l1_ttl("items:list:x", 60) == 5
+        cache._coherent.set()
+        assert cache._l1_ttl("items:list:x", 60) == 60
+        assert cache._l1_ttl("bom:list", 600) == 300
+        assert cache._l1_ttl("inventory:summary", 60) == 5
@@ -0,0 +1,240 @@
+"""DB 연결 계층 테스트 — async 커넥션/커서 래퍼."""
+
+import asyncio
+import threading
+
+import pytest
+
+from api_modules import database
+from conftest import FakeConn, FakeCursor
+
+
+class _FakePool:
+    closed = False
+
+    def __init__(self, conn):
+        self.conn = conn
+        self.released = []
+        self.timeouts = []
+
+    def getconn(self, timeout=None):
+        self.timeouts.append(timeout)
+        if self.conn is None:
+            raise RuntimeError("pool exhausted")
+        return self.conn
+
+    def putconn(self, conn):
+        self.released.append(conn)
+
+
+@pytest.fixture
+def fake_pool(monkeypatch):
+    def _install(conn):
+        pool = _FakePool(conn)
+        monkeypatch.setattr(database, "_pool", pool)
+        monkeypatch.setattr(database, "_get_pool", lambda: pool)
+        return pool
+    return _install
+
+
+class TestAsyncDatabase:
+    """get_conn_async / query_db_async 동작 검증."""
+
+    def test_query_db_async_fetch(self, fake_pool):
+        conn = FakeConn(FakeCursor([{"a": 1}]))
+        pool = fake_pool(conn)
+        rows = asyncio.run(database.query_db_async("SELECT 1", (1,)))
+        assert rows == [{"a": 1}]
+        assert conn.cur.executed == [("SELECT 1", (1,))]
+        assert conn.cur.closed
+        assert pool.released == [conn]
+
+    def test_queries_run_off_event_loop_thread(self, fake_pool):
+        conn = FakeConn(FakeCursor([(1,)]))
+        fake_pool(conn)
+        asyncio.run(database.query_db_async("SELECT 1"))
+        assert conn.cur.threads
+        assert all(t.startswith("mes-db") for t in conn.cur.threads)
+
+    def test_query_db_async_commit(self, fake_pool):
+        conn = FakeConn()
+        fake_pool(conn)
+        assert asyncio.run(database.query_db_async("UPDATE x", fetch=False)) is True
+        assert conn.committed
+
+    def test_query_db_async_error_rolls_back(self, fake_pool):
+        conn = FakeConn(fail=True)
+        pool = fake_pool(conn)
+        assert asyncio.run(database.query_db_async("UPDATE x", fetch=False)) == []
+        assert conn.rolled_back
+        assert pool.released == [conn]
+
+    def test_get_conn_async_failure_returns_none(self, fake_pool):
+        fake_pool(None)
+        assert asyncio.run(database.get_conn_async()) is None
+
+    def test_cancel_during_acquire_returns_connection(self, fake_pool):
+        conn = FakeConn()
+        pool = fake_pool(conn)
+        started, proceed, released = threading.Event(), threading.Event(), threading.Event()
+        getconn, putconn = pool.getconn, pool.putconn
+
+        def slow_getconn(timeout=None):
+            started.set()
+            proceed.wait(5)
+            return getconn(timeout)
+
+        pool.getconn = slow_getconn
+        pool.putconn = lambda c: (putconn(c), released.set())
+
+        async def scenario():
+            task = asyncio.create_task(database.get_conn_async())
+            await asyncio.get_running_loop().run_in_executor(None, started.wait, 5)
+            task.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await task
+
+        asyncio.run(scenario())
+        assert pool.released == []
+        proceed.set()
+        assert released.wait(5) and pool.released == [conn]
+
+    def test_db_connection_async_releases(self, fake_pool):
+        conn = FakeConn(FakeCursor(one=(7,)))
+        pool = fake_pool(conn)
+
+        async def _use():
+            async with database.db_connection_async() as c:
+                cur = c.cursor()
+                await cur.execute("SELECT 7")
+                row = await cur.fetchone()
+                cur.close()
+                return row
+
+        assert asyncio.run(_use()) == (7,)
+        assert pool.released == [conn]
+
+
+class _StubConn:
+    closed = False
+
+    class info:
+        transaction_status = 0  # TRANSACTION_STATUS_IDLE
+
+    def close(self):
+        self.closed = True
+
+
+class _StubPool(database.BoundedConnectionPool):
+    """실제 DB 없이 BoundedConnectionPool 대기/타임아웃 로직만 검증."""
+
+    def _connect(self, key=None):
+        conn = _StubConn()
+        if key is not None:
+            self._used[key] = conn
+            self._rused[id(conn)] = key
+        else:
+            self._pool.append(conn)
+        return conn
+
+
+class TestBoundedPool:
+    """풀 포화 시 대기열/타임아웃 동작 검증."""
+
+    def test_acquire_times_out_when_saturated(self):
+        pool = _StubPool(0, 1, acquire_timeout=0.05, max_waiters=5)
+        pool.getconn()
+        with pytest.raises(database.PoolExhaustedError):
+            pool.getconn()
+        assert pool.stats()["exhausted_total"] == 1
+
+    def test_waiter_gets_released_connection(self):
+        pool = _StubPool(0, 1, max_idle=1, acquire_timeout=2, max_waiters=5)
+        conn = pool.getconn()
+        threading.Timer(0.05, pool.putconn, args=(conn,)).start()
+        assert pool.getconn() is conn
+        assert pool.stats()["in_use"] == 1
+
+    def test_queue_full_rejects_immediately(self):
+        pool = _StubPool(0, 1, acquire_timeout=5, max_waiters=0)
+        pool.getconn()
+        with pytest.raises(database.PoolExhaustedError, match="waiting"):
+            pool.getconn()
+
+    def test_failed_putconn_still_frees_slot(self):
+        pool = _StubPool(0, 1, acquire_timeout=0.05)
+        pool.getconn()
+        with pytest.raises(Exception):
+            pool.putconn(_StubConn())   # 풀 소속이 아닌 연결 → PoolError
+        assert pool._slots.acquire(blocking=False)
+
+    def test_sync_get_conn_fails_fast_on_event_loop(self, fake_pool):
+        pool = fake_pool(FakeConn())
+        database.get_conn()
+
+        async def handler():
+            return database.get_conn()
+
+        asyncio.run(handler())
+        assert pool.timeouts == [None, 0]
+
+    def test_idle_connections_kept_up_to_max_idle(self):
+        pool = _StubPool(0, 3, max_idle=3)
+        conns = [pool.getconn() for _ in range(3)]
+        for c in conns:
+            pool.putconn(c)
+        stats = pool.stats()
+        assert stats["idle"] == 3 and stats["in_use"] == 0
+        assert not any(c.closed for c in conns)
+
+
+class _FakeReplica:
+    def __init__(self, name, conn, healthy=True):
+        self.name = name
+        self.pool = _FakePool(conn)
+        self.healthy = healthy
+
+    def usable(self):
+        return self.healthy
+
+    def get_pool(self):
+        return self.pool
+
+    def mark_down(self, reason):
+        self.healthy = False
+
+
+class TestReadReplicaRouting:
+    """readonly 조회의 복제본 라우팅 / primary fallback 검증."""
+
+    @pytest.fixture
+    def replicas(self, monkeypatch, fake_pool):
+        primary = fake_pool(FakeConn())
+        reps = [_FakeReplica("replica0", FakeConn()),
+                _FakeReplica("replica1", FakeConn())]
+        monkeypatch.setattr(database, "_replicas", reps)
+        monkeypatch.setattr(database, "DB_READ_ROUTING", "replica")
+        return primary, reps
+
+    def test_readonly_round_robin(self, replicas):
+        _, reps = replicas
+        got = {database.get_conn(readonly=True) for _ in range(4)}
+        assert got == {reps[0].pool.conn, reps[1].pool.conn}
+
+    def test_writes_stay_on_primary(self, replicas):
+        primary, _ = replicas
+        assert database.get_conn() is primary.conn
+
+    def test_lagging_replicas_fall_back_to_primary(self, replicas):
+        primary, reps = replicas
+        for r in reps:
+            r.healthy = False
+        assert database.get_conn(readonly=True) is primary.conn
+
+    def test_release_returns_to_owning_pool(self, replicas):
+        primary, reps = replicas
+        conn = database.get_conn(readonly=True)
+        database.release_conn(conn)
+        owner = next(r for r in reps if r.pool.conn is conn)
+        assert owner.pool.released == [conn]
+        assert primary.released == []
@@ -0,0 +1,128 @@
+"""불량 예측 배치 모드 테스트 (DB/XGBoost 없이 가짜 모델로)."""
+
+import asyncio
+
+import numpy as np
+import pytest
+
+from api_modules import ai_model_cache, mes_defect_predict
+from conftest import FakeConn, FakeCursor
+
+
+class _LinearModel:
+    """XGBRegressor 대역: 온도 편차에 비례하는 불량률."""
+
+    feature_importances_ = np.array([0.4, 0.3, 0.2, 0.1])
+
+    def __init__(self):
+        self.predict_calls = 0
+
+    def predict(self, X):
+        self.predict_calls += 1
+        return np.abs(X[:, 0] - 200.0) / 100.0
+
+
+def _train_linear(data):
+    return _LinearModel()
+
+
+class _Explainer:
+    built = 0
+
+    def __init__(self, model):
+        type(self).built += 1
+        self.rows_explained = []
+
+    def shap_values(self, X):
+        self.rows_explained.append(len(X))
+        return X * 0.001
+
+
+class _FakeShap:
+    TreeExplainer = _Explainer
+
+
+def _history(n=40):
+    return [(200 + i % 5, 10, 50, 55, i % 3, 100) for i in range(n)]
+
+
+@pytest.fixture
+def db(monkeypatch):
+    rows = _history()
+    monkeypatch.setattr(mes_defect_predict, "get_conn", lambda readonly=False: FakeConn(FakeCursor(rows)))
+    monkeypatch.setattr(mes_defect_predict, "release_conn", lambda conn: None)
+    return rows
+
+
+@pytest.fixture
+def fake_xgb(db, tmp_path, monkeypatch):
+    monkeypatch.setattr(ai_model_cache, "MODEL_DIR", str(tmp_path))
+    monkeypatch.setattr(ai_model_cache, "_memory_cache", ai_model_cache._ModelLRU())
+    monkeypatch.setattr(ai_model_cache.ModelCache, "get_or_schedule",
+                        staticmethod(ai_model_cache.ModelCache.get_or_train))
+    monkeypatch.setattr(mes_defect_predict, "HAS_XGBOOST", True)
+    monkeypatch.setattr(mes_defect_predict, "_train_xgb", _train_linear)
+    monkeypatch.setattr(mes_defect_predict, "shap", _FakeShap, raising=False)
+    _Explainer.built = 0
+
+
+def _run(coro):
+    return asyncio.run(coro)
+
+
+def _sweep(n):
+    return [{"temperature": 150 + i, "pressure": 10, "speed": 50, "humidity": 55}
+            for i in range(n)]
+
+
+class TestDefectBatch:
+
+    def test_single_predict_call_and_ranking(self, fake_xgb):
+        result = _run(mes_defect_predict.predict_defect_batch(
+            {"param_sets": _sweep(101), "top_k": 3}))
+        assert result["model"] == "XGBoost"
+        assert result["count"] == 101
+        model = ai_model_cache._memory_cache.get("xgb_defect")["model"]
+        assert model.predict_calls == 1
+        # 입력 순서 유지, top 은 위험도 내림차순
+        assert [p["index"] for p in result["predictions"]] == list(range(101))
+        assert [t["index"] for t in result["top"]] == [0, 100, 1]
+        assert result["top"][0]["defect_prob"] == 50.0
+        assert "factors" not in result["top"][0]
+        assert _Explainer.built == 0
+
+    def test_shap_only_top_k_and_explainer_cached(self, fake_xgb):
+        data = {"param_sets": _sweep(50), "top_k": 5, "explain": True}
+        first = _run(mes_defect_predict.predict_defect_batch(data))
+        _run(mes_defect_predict.predict_defect_batch(data))
+        single = _run(mes_defect_predict.predict_defect_probability(_sweep(1)[0]))
+
+        assert all(len(t["factors"]) == 4 for t in first["top"])
+        assert first["top"][0]["factors"][0]["name"] == "temperature"
+        assert _Explainer.built == 1
+        explainer = ai_model_cache._memory_cache.get("xgb_defect")["companions"]["shap"]
+        assert explainer.rows_explained == [5, 5, 1]
+        assert single["model"] == "XGBoost"
+
+    def test_threshold_fallback_matches_single(self, db):
+        sets = [{"temperature": 150}, {"temp": 200, "pressure": 30},
+                {"temperature": 300, "pressure": 30, "speed": 0, "humidity": 0}, {}]
+        result = _run(mes_defect_predict.predict_defect_batch(
+            {"param_sets": sets, "explain": True, "top_k": 4}))
+        assert result["model"] == "ThresholdScoring"
+        for params, pred in zip(sets, result["predictions"]):
+            single = mes_defect_predict._threshold_predict(params, db)
+            assert pred["defect_prob"] == single["defect_prob"]
+            assert pred["risk_level"] == single["risk_level"]
+        top = result["top"][0]
+        assert top["index"] == 2
+        assert top["factors"] == mes_defect_predict._threshold_predict(sets[2], db)["factors"]
+        assert result["summary"] == {"high": 2, "medium": 1, "low": 1}
+
+    def test_validation(self, db, monkeypatch):
+        assert "error" in _run(mes_defect_predict.predict_defect_batch({}))
+        assert "error" in _run(mes_defect_predict.predict_defect_batch(
+            {"param_sets": [{"temperature": "hot"}]}))
+        monkeypatch.setattr(mes_defect_predict, "BATCH_MAX_ROWS", 2)
+        assert "error" in _run(mes_defect_predict.predict_defect_batch(
+            {"param_sets": _sweep(3)}))
@@ -0,0 +1,62 @@
+"""문서번호 채번 테스트 (DB 없이 커서 응답을 흉내)."""
+
+import glob
+import os
+import re
+
+from api_modules import doc_numbering
+
+
+class _ScriptedCursor:
+    """execute 순서대로 미리 정한 fetchone 결과를 돌려주는 커서."""
+
+    def __init__(self, *results):
+        self.results = list(results)
+        self.executed = []
+
+    def execute(self, sql, params=None):
+        self.executed.append((sql, params))
+
+    def fetchone(self):
+        return self.results.pop(0)
+
+
+class TestDocNumbering:
+
+    def test_next_doc_no_format(self):
+        cur = _ScriptedCursor((7, False))
+        assert doc_numbering.next_doc_no(cur, "NCR", day="20261018") == "NCR-20261018-007"
+        assert cur.executed[0][1] == ("NCR", "20261018", 1)
+
+    def test_bulk_reservation_returns_contiguous_range(self):
+        cur = _ScriptedCursor((12, False))
+        nos = doc_numbering.reserve_doc_nos(cur, "LOT", 3, day="20261018")
+        assert nos == ["LOT-20261018-010", "LOT-20261018-011", "LOT-20261018-012"]
+        assert len(cur.executed) == 1
+
+    def test_new_counter_seeds_from_existing_rows(self):
+        # 카운터 신규 생성(inserted) → 기존 최대 번호 5 → 5 + 1 = 6
+        cur = _ScriptedCursor((1, True), (5,), (6,))
+        assert doc_numbering.next_doc_no(
+            cur, "WO", day="20261018", seed=("work_orders", "wo_id")) == "WO-20261018-006"
+        assert cur.executed[1][1] == (r"-(\d+)$", "WO-20261018-%")
+
+    def test_seed_skipped_when_counter_exists(self):
+        cur = _ScriptedCursor((4, False))
+        doc_numbering.next_doc_no(cur, "WO", day="20261018", seed=("work_orders", "wo_id"))
+        assert len(cur.executed) == 1
+
+    def test_zero_reservation(self):
+        assert doc_numbering.reserve_doc_nos(_ScriptedCursor(), "X", 0) == []
+
+    def test_each_prefix_seeds_from_one_column(self):
+        """같은 접두어 카운터를 쓰는 모듈들은 같은 (table, column) 으로 시드해야 한다."""
+        pattern = re.compile(
+            r'next_doc_no(?:_async)?\(\s*\w+,\s*"(\w+)".*?seed=\(("\w+", "\w+")\)', re.S)
+        seeds = {}
+        for path in glob.glob(os.path.join(os.path.dirname(doc_numbering.__file__), "*.py")):
+            with open(path, encoding="utf-8") as f:
+                for prefix, seed in pattern.findall(f.read()):
+                    seeds.setdefault(prefix, set()).add(seed)
+        assert seeds["WO"] == {'"work_orders", "wo_id"'}
+        assert all(len(s) == 1 for s in seeds.values()), seeds
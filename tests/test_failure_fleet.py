@@ -0,0 +1,63 @@
+"""설비 전체 고장 위험도 일괄 산출 테스트 (DB 없이)."""
+
+from datetime import datetime
+
+import numpy as np
+import pytest
+
+from api_modules import ai_model_cache, mes_equipment
+from conftest import FakeConn, FakeCursor
+
+
+@pytest.fixture
+def sync_models(tmp_path, monkeypatch):
+    """백그라운드 학습 대신 즉시 학습."""
+    monkeypatch.setattr(ai_model_cache, "MODEL_DIR", str(tmp_path))
+    monkeypatch.setattr(ai_model_cache, "_memory_cache", ai_model_cache._ModelLRU())
+    monkeypatch.setattr(ai_model_cache.ModelCache, "get_or_schedule",
+                        staticmethod(ai_model_cache.ModelCache.get_or_train))
+
+
+def _history(seed, n=60):
+    rng = np.random.default_rng(seed)
+    return np.column_stack([rng.normal(2, 0.1, n), rng.normal(50, 1, n), rng.normal(10, 0.3, n)])
+
+
+class TestFailureFleet:
+
+    def test_rule_based_vectorized_matches_single(self):
+        X = np.array([[4.5, 75.0, 20.0], [1.0, 40.0, 5.0], [6.5, 95.0, 30.0]])
+        ranked = mes_equipment._score_fleet(["A", "B", "C"], X, {})
+        assert [r["equip_code"] for r in ranked] == ["C", "A", "B"]
+        for r in ranked:
+            single = mes_equipment._rule_based_predict(*r["reading"].values())
+            assert r["failure_prob"] == single["failure_prob"]
+            assert r["remaining_life_hours"] == single["remaining_life_hours"]
+            assert r["recommendation"] == single["recommendation"]
+        assert ranked[-1]["top_factor"] is None
+
+    @pytest.mark.skipif(not mes_equipment.HAS_IFOREST, reason="scikit-learn 미설치")
+    def test_grouped_iforest_scoring(self, sync_models):
+        hist = {"EQ1": _history(1), "EQ2": _history(2), "EQ3": _history(3)[:5]}
+        X = np.array([[2.0, 50.0, 10.0], [2.0, 50.0, 10.0], [9.0, 50.0, 10.0], [2.0, 50.0, 10.0]])
+        ranked = mes_equipment._score_fleet(["EQ1", "EQ2", "EQ2", "EQ3"], X, hist)
+        by_model = {r["equip_code"]: r["model"] for r in ranked}
+        assert by_model == {"EQ1": "IsolationForest", "EQ2": "IsolationForest", "EQ3": "RuleBased"}
+        assert ranked[0]["equip_code"] == "EQ2" and ranked[0]["top_factor"] == "vibration"
+        assert ai_model_cache.ModelCache.get_stats()["memory_count"] == 2
+
+    def test_fleet_endpoint_two_queries(self, monkeypatch):
+        ts = datetime(2026, 10, 18, 9, 0)
+        cur = FakeCursor(results=[
+            [("EQ1", 7.0, 95.0, 30.0, ts), ("EQ2", 1.0, 40.0, 5.0, ts)],
+            [("EQ1", 1.0, 40.0, 5.0)] * 3,
+        ])
+        monkeypatch.setattr(mes_equipment, "get_conn", lambda readonly=False: FakeConn(cur))
+        monkeypatch.setattr(mes_equipment, "release_conn", lambda c: None)
+        import asyncio
+        res = asyncio.run(mes_equipment.predict_failure_fleet({}))
+        assert len(cur.executed) == 2 and "LATERAL" in cur.executed[1][0]
+        assert cur.executed[1][1] == (["EQ1", "EQ2"], 200)
+        assert res["total"] == 2 and res["summary"] == {"high": 1, "medium": 0, "low": 1}
+        assert res["equipments"][0]["equip_code"] == "EQ1"
+        assert res["equipments"][0]["recorded_at"] == "2026-10-18T09:00:00"
@@ -0,0 +1,92 @@
+"""수요 예측 배치 + 사전 계산 결과 서빙 테스트 (DB 없이)."""
+
+import asyncio
+from datetime import date, datetime, timedelta
+
+import pytest
+
+from api_modules import forecast_batch, mes_ai_prediction
+from conftest import FakeConn, FakeCursor
+
+
+@pytest.fixture(autouse=True)
+def linear_only(monkeypatch):
+    monkeypatch.setattr(mes_ai_prediction, "HAS_PROPHET", False)
+    monkeypatch.setattr(mes_ai_prediction, "_has_shipments", None)
+
+
+def _months(n, base=100):
+    return [(date(2025, m, 1), base + 10 * m) for m in range(1, n + 1)]
+
+
+class TestForecastBatch:
+
+    def test_series_query_checks_table_once(self):
+        cur = FakeCursor(ones=[(True,)])
+        sql, params = mes_ai_prediction.series_query(cur, 12, "ITEM001")
+        sql_all, params_all = mes_ai_prediction.series_query(cur, 12)
+        assert len(cur.executed) == 1
+        assert "to_regclass" in cur.executed[0][0]
+        assert "FROM shipments WHERE item_code = %s" in sql
+        assert params == ["ITEM001", 12]
+        assert "WHERE item_code" not in sql_all and "PARTITION BY item_code" in sql_all
+        assert params_all == [12]
+
+    def test_fit_all_inline_and_errors(self):
+        series = {"A": _months(6), "B": [(date(2025, 1, 1), 5)]}
+        results = forecast_batch.fit_all(series, 3, workers=1)
+        assert [r["item_code"] for r in results] == ["A", "B"]
+        assert results[0]["model"] == "LinearRegression"
+        assert len(results[0]["predictions"]) == 3
+        assert "error" in results[1]  # 한 점으로는 적합 불가
+
+    def test_fit_all_process_pool(self):
+        series = {f"ITEM{i}": _months(6, base=i) for i in range(4)}
+        results = forecast_batch.fit_all(series, 2, workers=2)
+        assert [r["item_code"] for r in results] == list(series)
+        assert all(len(r["predictions"]) == 2 for r in results)
+
+    def test_run_batch_replaces_rows(self, monkeypatch):
+        read = FakeCursor(ones=[(True,)], results=[
+            [("A", d, y) for d, y in _months(5)] + [("B", date(2025, 1, 1), 3)]])
+        write = FakeCursor()
+        conns = [FakeConn(read), FakeConn(write)]
+        monkeypatch.setattr(forecast_batch, "get_conn", lambda readonly=False: conns.pop(0))
+        monkeypatch.setattr(forecast_batch, "release_conn", lambda conn: None)
+        inserted = []
+        monkeypatch.setattr(forecast_batch, "execute_values",
+                            lambda cur, sql, rows, page_size: inserted.extend(rows))
+
+        summary = forecast_batch.run_batch(history_months=12, prediction_months=6, workers=1)
+        assert summary["items"] == 1  # B 는 데이터 부족
+        assert summary["written"] == 1
+        assert write.executed[0][0].startswith("DELETE FROM ai_forecasts")
+        model_type, item_code, payload = inserted[0]
+        assert (model_type, item_code) == ("demand", "A")
+        assert payload.adapted["history_months"] == 12
+        assert len(payload.adapted["predictions"]) == 6
+
+    def test_predict_demand_serves_precomputed(self, monkeypatch):
+        stored = {"item_code": "A", "model": "Prophet", "history_months": 12,
+                  "predictions": [{"month": f"2026-{m:02d}"} for m in range(1, 7)]}
+        cur = FakeCursor(ones=[(stored, datetime.now() - timedelta(hours=2))])
+        monkeypatch.setattr(mes_ai_prediction, "get_conn", lambda: FakeConn(cur))
+        monkeypatch.setattr(mes_ai_prediction, "release_conn", lambda conn: None)
+
+        result = asyncio.run(mes_ai_prediction.predict_demand("A", 12, 3))
+        assert result["precomputed"] is True
+        assert len(result["predictions"]) == 3
+        assert len(cur.executed) == 1  # 시계열 조회·적합 없음
+
+    def test_predict_demand_falls_back_for_other_window(self, monkeypatch):
+        stored = {"item_code": "A", "model": "Prophet", "history_months": 24,
+                  "predictions": [{}] * 6}
+        cur = FakeCursor(ones=[(stored, datetime.now()), (False,)],
+                      results=[[("A", d, y) for d, y in _months(6)]])
+        monkeypatch.setattr(mes_ai_prediction, "get_conn", lambda: FakeConn(cur))
+        monkeypatch.setattr(mes_ai_prediction, "release_conn", lambda conn: None)
+
+        result = asyncio.run(mes_ai_prediction.predict_demand("A", 12, 3))
+        assert result["model"] == "LinearRegression"
+        assert "precomputed" not in result
+        assert "FROM work_results" in cur.executed[-1][0]
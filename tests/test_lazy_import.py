@@ -0,0 +1,47 @@
+"""선택 의존성 지연 import 테스트."""
+
+import sys
+
+import pytest
+
+from api_modules import lazy_import
+from api_modules.lazy_import import LazyModule, available, parse_importtime
+
+
+class TestLazyImport:
+
+    def test_lazy_module_imports_on_first_use(self, monkeypatch):
+        monkeypatch.delitem(sys.modules, "calendar", raising=False)
+        mod = LazyModule("calendar")
+        assert not mod.loaded
+        assert "calendar" not in sys.modules
+        assert mod.isleap(2024) is True
+        assert mod.loaded and "calendar" in sys.modules
+
+    def test_missing_module_fails_on_use_only(self):
+        mod = LazyModule("no_such_module_xyz")
+        assert not available("no_such_module_xyz")
+        with pytest.raises(ImportError):
+            mod.anything
+
+    def test_available_does_not_import(self, monkeypatch):
+        monkeypatch.delitem(sys.modules, "calendar", raising=False)
+        assert available("calendar.sub")
+        assert "calendar" not in sys.modules
+
+    def test_parse_importtime(self):
+        stderr = (
+            "import time: self [us] | cumulative | imported package\n"
+            "import time:       120 |        120 |     numpy.core\n"
+            "import time:       500 |       2500 |   numpy\n"
+            "import time:      1000 |       4000 | app\n"
+        )
+        rows = parse_importtime(stderr)
+        assert [r["module"] for r in rows] == ["numpy.core", "numpy", "app"]
+        assert [r["depth"] for r in rows] == [2, 1, 0]
+        assert rows[2]["cumulative_ms"] == 4.0
+
+    def test_app_import_does_not_load_heavy_modules(self):
+        report = lazy_import.profile_imports("app")
+        assert "error" not in report, report.get("error")
+        assert report["heavy_loaded"] == []
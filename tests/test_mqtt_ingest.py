@@ -0,0 +1,219 @@
+"""MQTT 수집 워커 테스트.
+
+단위 테스트는 가짜 클라이언트/writer 로 실행한다. 로컬 mosquitto 에 대한
+통합 테스트는 MQTT_TEST_BROKER=localhost:1883 처럼 지정했을 때만 실행된다.
+"""
+
+import json
+import os
+import threading
+import time
+import types
+
+import pytest
+
+from api_modules import mqtt_ingest
+
+
+class _FakeClient:
+    def __init__(self, client_id):
+        self.subscribed = []
+        self.unsubscribed = []
+        self.connected_to = None
+        self.stopped = False
+
+    def reconnect_delay_set(self, **kw):
+        pass
+
+    def connect_async(self, host, port, keepalive=60):
+        self.connected_to = (host, port)
+
+    def loop_start(self):
+        # 즉시 연결된 것으로 간주
+        self.on_connect(self, None, None, 0)
+
+    def loop_stop(self):
+        self.stopped = True
+
+    def disconnect(self):
+        pass
+
+    def subscribe(self, pattern, qos=0):
+        self.subscribed.append(pattern)
+
+    def unsubscribe(self, pattern):
+        self.unsubscribed.append(pattern)
+
+
+def _cfg(cid, url, pattern, equip="EQ-001", sensor="temp"):
+    return {"config_id": cid, "broker_url": url, "topic_pattern": pattern,
+            "equip_code": equip, "sensor_type": sensor}
+
+
+def _reading(value):
+    return {"equip_code": "EQ-001", "sensor_type": "temp", "value": value, "source": "MQTT"}
+
+
+def _msg(topic, payload):
+    return types.SimpleNamespace(topic=topic, payload=payload)
+
+
+class TestMqttIngest:
+
+    def test_parse_payload_formats(self):
+        cfg = {"equip_code": "EQ-001", "sensor_type": None}
+        assert mqtt_ingest.parse_payload(cfg, b"21.5")[0]["value"] == 21.5
+        r = mqtt_ingest.parse_payload(
+            cfg, json.dumps({"value": 3, "sensor_type": "vib", "ts": "2026-10-18T09:00:00"}).encode())[0]
+        assert (r["equip_code"], r["sensor_type"], r["collected_at"]) == \
+            ("EQ-001", "vib", "2026-10-18T09:00:00")
+        assert len(mqtt_ingest.parse_payload(cfg, b'[{"value":1},{"value":2}]')) == 2
+
+    def test_parse_broker_url(self):
+        assert mqtt_ingest.parse_broker_url("mqtt://mes-mqtt:1884") == ("mes-mqtt", 1884)
+        assert mqtt_ingest.parse_broker_url("localhost") == ("localhost", 1883)
+
+    def test_buffer_back_pressure_then_drop(self):
+        buf = mqtt_ingest.ReadingBuffer(maxsize=2, put_timeout=0.05)
+        assert buf.put({}) and buf.put({})
+        assert not buf.put({})
+        assert buf.dropped == 1
+        # 대기 중 drain 되면 put 성공
+        threading.Timer(0.02, buf.drain, args=(1,)).start()
+        buf.put_timeout = 1
+        assert buf.put({})
+
+    def test_hot_reload_diffs_subscriptions(self):
+        configs = [_cfg(1, "mqtt://a", "plant/+/temp"), _cfg(2, "mqtt://b", "line1/#")]
+        worker = mqtt_ingest.MqttIngestWorker(
+            client_factory=_FakeClient, config_loader=lambda: configs, writer=None)
+        assert worker.reload()
+        a = worker.brokers["mqtt://a"].client
+        b = worker.brokers["mqtt://b"].client
+        assert a.subscribed == ["plant/+/temp"] and b.connected_to == ("b", 1883)
+        assert not worker.reload()  # 변경 없음
+
+        configs[:] = [_cfg(1, "mqtt://a", "plant/+/temp"), _cfg(3, "mqtt://a", "plant/+/vib")]
+        assert worker.reload()
+        assert a.subscribed == ["plant/+/temp", "plant/+/vib"]
+        assert "mqtt://b" not in worker.brokers and b.stopped
+
+    def test_messages_buffered_and_flushed_in_batches(self):
+        batches = []
+        worker = mqtt_ingest.MqttIngestWorker(
+            client_factory=_FakeClient, writer=lambda rows: batches.append(rows) or len(rows),
+            config_loader=lambda: [_cfg(1, "mqtt://a", "plant/+/temp")])
+        worker.reload()
+        broker = worker.brokers["mqtt://a"]
+        for i in range(5):
+            worker.on_message(broker, _msg("plant/eq1/temp", str(i).encode()))
+        worker.on_message(broker, _msg("other/topic", b"1"))
+        assert len(worker.buffer) == 5
+        assert worker.flush() == 5
+        assert len(batches) == 1 and batches[0][0][4] == "MQTT"
+
+    def test_overlapping_patterns_fan_out_to_every_config(self):
+        worker = mqtt_ingest.MqttIngestWorker(
+            client_factory=_FakeClient, writer=None,
+            config_loader=lambda: [_cfg(1, "mqtt://a", "plant/+/temp", sensor="temp"),
+                                   _cfg(2, "mqtt://a", "plant/+/temp", sensor="temp_raw"),
+                                   _cfg(3, "mqtt://a", "plant/#", equip="EQ-002")])
+        worker.reload()
+        worker.on_message(worker.brokers["mqtt://a"], _msg("plant/eq1/temp", b"21.5"))
+        rows = worker.buffer.drain(10)
+        assert [(r["equip_code"], r["sensor_type"]) for r in rows] == [
+            ("EQ-001", "temp"), ("EQ-001", "temp_raw"), ("EQ-002", "temp")]
+
+    def test_collect_interval_downsamples_per_config_and_topic(self, monkeypatch):
+        clock = [100.0]
+        monkeypatch.setattr(mqtt_ingest.time, "monotonic", lambda: clock[0])
+        slow = {**_cfg(1, "mqtt://a", "plant/+/temp"), "collect_interval_sec": 10}
+        fast = {**_cfg(2, "mqtt://a", "plant/+/temp", sensor="raw"), "collect_interval_sec": 0}
+        worker = mqtt_ingest.MqttIngestWorker(
+            client_factory=_FakeClient, writer=None, config_loader=lambda: [slow, fast])
+        worker.reload()
+        broker = worker.brokers["mqtt://a"]
+        for t, topic in [(100, "plant/eq1/temp"), (105, "plant/eq1/temp"),
+                         (105, "plant/eq2/temp"), (110, "plant/eq1/temp")]:
+            clock[0] = t
+            worker.on_message(broker, _msg(topic, str(t).encode()))
+        rows = worker.buffer.drain(10)
+        assert [r["value"] for r in rows if r["sensor_type"] == "temp"] == [100, 105, 110]
+        assert len([r for r in rows if r["sensor_type"] == "raw"]) == 4
+        assert worker.stats()["brokers"]["mqtt://a"]["throttled"] == 1
+
+    def test_failed_flush_is_retried(self):
+        calls = []
+
+        def writer(rows):
+            calls.append(len(rows))
+            if len(calls) == 1:
+                raise RuntimeError("db down")
+            return len(rows)
+
+        worker = mqtt_ingest.MqttIngestWorker(client_factory=_FakeClient, writer=writer,
+                                              config_loader=list)
+        worker.buffer.put(_reading(1))
+        assert worker.flush() == 0 and worker.stats()["pending"] == 1
+        assert worker.flush() == 1 and calls == [1, 1]
+
+    def test_poisoned_batch_dropped_after_max_attempts(self, monkeypatch):
+        monkeypatch.setattr(mqtt_ingest, "FLUSH_MAX_ATTEMPTS", 2)
+        calls = []
+
+        def writer(rows):
+            calls.append([r[2] for r in rows])
+            if len(calls) <= 2:
+                raise ValueError("numeric field overflow")
+            return len(rows)
+
+        worker = mqtt_ingest.MqttIngestWorker(client_factory=_FakeClient, writer=writer,
+                                              config_loader=list)
+        worker.buffer.put(_reading(1))
+        assert worker.flush() == 0
+        assert worker.flush() == 0 and worker.stats()["pending"] == 0
+        assert worker.stats()["dropped"] == 1
+        worker.buffer.put(_reading(2))
+        assert worker.flush() == 1 and calls[-1] == [2.0]
+
+    def test_bad_rows_rejected_not_retried(self):
+        calls = []
+        worker = mqtt_ingest.MqttIngestWorker(
+            client_factory=_FakeClient, writer=lambda rows: calls.append(rows) or len(rows),
+            config_loader=list)
+        worker.buffer.put(_reading([5]))
+        worker.buffer.put(_reading(3))
+        assert worker.flush() == 1 and len(calls) == 1
+        assert worker.stats()["rejected"] == 1 and worker.stats()["pending"] == 0
+
+
+@pytest.mark.skipif(not os.getenv("MQTT_TEST_BROKER") or not mqtt_ingest.HAS_PAHO,
+                    reason="MQTT_TEST_BROKER 미설정 (로컬 mosquitto 통합 테스트)")
+def test_local_mosquitto_round_trip():
+    url = os.environ["MQTT_TEST_BROKER"]
+    batches = []
+    worker = mqtt_ingest.MqttIngestWorker(
+        writer=lambda rows: batches.extend(rows) or len(rows),
+        config_loader=lambda: [_cfg(1, url, "mes-test/+/temp")])
+    worker.reload()
+    deadline = time.time() + 5
+    while not worker.brokers[url].connected and time.time() < deadline:
+        time.sleep(0.05)
+
+    host, port = mqtt_ingest.parse_broker_url(url)
+    pub = mqtt_ingest._paho_client("mes-test-pub")
+    pub.connect(host, port)
+    pub.loop_start()
+    for i in range(20):
+        pub.publish("mes-test/eq1/temp", json.dumps({"value": i}), qos=1).wait_for_publish()
+    pub.disconnect()
+    pub.loop_stop()
+
+    deadline = time.time() + 5
+    while len(worker.buffer) < 20 and time.time() < deadline:
+        time.sleep(0.05)
+    worker.flush()
+    worker.stop()
+    for broker in worker.brokers.values():
+        worker._stop_broker(broker)
+    assert [r[2] for r in batches] == list(range(20))
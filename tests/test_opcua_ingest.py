@@ -0,0 +1,226 @@
+"""OPC-UA 구독 엔진 테스트.
+
+단위 테스트는 가짜 클라이언트/writer 로, 통합 테스트는 asyncua 의 로컬
+테스트 서버(127.0.0.1)에 실제로 구독해서 확인한다.
+"""
+
+import asyncio
+import socket
+import types
+from datetime import datetime, timezone
+
+import pytest
+
+from api_modules import opcua_ingest
+
+
+def _cfg(cid, url, node, equip="EQ-001", sensor="temp", interval=1000):
+    return {"config_id": cid, "server_url": url, "equip_code": equip,
+            "node_id": node, "sensor_type": sensor, "subscribe_interval_ms": interval}
+
+
+class _FakeSub:
+    def __init__(self, client, period, handler):
+        self.client, self.period, self.handler = client, period, handler
+
+    async def subscribe_data_change(self, nodes, sampling_interval=0):
+        self.client.subscribed.append((self.period, [n.nodeid.to_string() for n in nodes]))
+        return [1 if "bad" not in n.nodeid.to_string() else "BadNodeIdUnknown" for n in nodes]
+
+
+class _FakeClient:
+    instances = []
+
+    def __init__(self, url):
+        self.url = url
+        self.subscribed = []
+        self.subs = []
+        self.disconnected = False
+        _FakeClient.instances.append(self)
+
+    async def connect(self):
+        pass
+
+    async def disconnect(self):
+        self.disconnected = True
+
+    async def check_connection(self):
+        pass
+
+    def get_node(self, node_id):
+        return types.SimpleNamespace(nodeid=types.SimpleNamespace(to_string=lambda: node_id))
+
+    async def create_subscription(self, period, handler):
+        sub = _FakeSub(self, period, handler)
+        self.subs.append(sub)
+        return sub
+
+
+def _notify(sub, node_id, value, ts=None):
+    node = types.SimpleNamespace(nodeid=types.SimpleNamespace(to_string=lambda: node_id))
+    data = types.SimpleNamespace(monitored_item=types.SimpleNamespace(
+        Value=types.SimpleNamespace(SourceTimestamp=ts, ServerTimestamp=None)))
+    sub.handler.datachange_notification(node, value, data)
+
+
+class TestOpcuaEngine:
+
+    def setup_method(self):
+        _FakeClient.instances.clear()
+
+    def test_one_session_per_server_grouped_by_interval(self):
+        configs = [
+            _cfg(1, "opc.tcp://a:4840", "ns=2;i=1"),
+            _cfg(2, "opc.tcp://a:4840", "ns=2;i=2", interval=100),
+            _cfg(3, "opc.tcp://a:4840", "ns=2;s=bad"),
+            _cfg(4, "opc.tcp://b:4840", "ns=2;i=1"),
+        ]
+        engine = opcua_ingest.OpcuaEngine(client_factory=_FakeClient, config_loader=lambda: configs)
+
+        async def scenario():
+            await engine.reload()
+            await asyncio.sleep(0.01)
+            assert sorted(c.url for c in _FakeClient.instances) == \
+                ["opc.tcp://a:4840", "opc.tcp://b:4840"]
+            a = next(c for c in _FakeClient.instances if c.url.endswith("a:4840"))
+            assert sorted(a.subscribed) == [(100, ["ns=2;i=2"]), (1000, ["ns=2;i=1", "ns=2;s=bad"])]
+            assert engine.state(1).status == "CONNECTED"
+            assert engine.state(3).status == "BAD_NODE"
+            assert not await engine.reload()  # 변경 없음
+
+            configs.pop()  # 서버 b 제거
+            assert await engine.reload()
+            assert set(engine.sessions) == {"opc.tcp://a:4840"} and 4 not in engine.nodes
+            await engine.apply_configs([])
+
+        asyncio.run(scenario())
+
+    def test_samples_batched_with_node_state(self):
+        batches = []
+
+        def writer(readings, states):
+            batches.append((readings, states))
+            return len(readings), 0
+
+        configs = [_cfg(1, "opc.tcp://a:4840", "ns=2;i=1")]
+        engine = opcua_ingest.OpcuaEngine(client_factory=_FakeClient, writer=writer,
+                                          config_loader=lambda: configs)
+
+        async def scenario():
+            await engine.reload()
+            await asyncio.sleep(0.01)
+            sub = _FakeClient.instances[0].subs[0]
+            ts = datetime(2026, 10, 18, 0, 0, tzinfo=timezone.utc)
+            for i in range(3):
+                _notify(sub, "ns=2;i=1", 20.0 + i, ts)
+            _notify(sub, "ns=2;i=999", 1.0)  # 미설정 노드는 무시
+            assert await engine.flush() == 3
+            assert await engine.flush() == 0  # 변경 없으면 쓰기 없음
+            await engine.apply_configs([])
+
+        asyncio.run(scenario())
+        readings, states = batches[0]
+        assert [r["value"] for r in readings] == [20.0, 21.0, 22.0]
+        assert readings[0]["source"] == "OPCUA" and readings[0]["equip_code"] == "EQ-001"
+        local = datetime(2026, 10, 18, tzinfo=timezone.utc).astimezone().replace(tzinfo=None)
+        assert states == [(1, "CONNECTED", local, 22.0, None)]
+        assert len(batches) == 1
+
+    def test_failed_flush_is_retried_and_buffer_bounded(self, monkeypatch):
+        monkeypatch.setattr(opcua_ingest, "BUFFER_MAX", 2)
+        calls = []
+
+        def writer(readings, states):
+            calls.append(len(readings))
+            if len(calls) == 1:
+                raise RuntimeError("db down")
+            return len(readings), 0
+
+        engine = opcua_ingest.OpcuaEngine(writer=writer, config_loader=list)
+        cfg = _cfg(1, "opc.tcp://a:4840", "ns=2;i=1")
+        for v in (1.0, 2.0, 3.0):
+            engine.on_sample(cfg, v)
+        assert engine.dropped == 1 and [r["value"] for r in engine.buffer] == [2.0, 3.0]
+        assert asyncio.run(engine.flush()) == 0
+        assert asyncio.run(engine.flush()) == 2 and calls == [2, 2]
+
+
+    def test_poisoned_batch_dropped_after_max_attempts(self, monkeypatch):
+        monkeypatch.setattr(opcua_ingest, "FLUSH_MAX_ATTEMPTS", 2)
+        calls = []
+
+        def writer(readings, states):
+            calls.append([r["value"] for r in readings])
+            if len(calls) <= 2:
+                raise ValueError("numeric field overflow")
+            return len(readings), 0
+
+        engine = opcua_ingest.OpcuaEngine(writer=writer, config_loader=list)
+        cfg = _cfg(1, "opc.tcp://a:4840", "ns=2;i=1")
+        engine.on_sample(cfg, 1.0)
+        assert asyncio.run(engine.flush()) == 0
+        assert asyncio.run(engine.flush()) == 0 and engine.dropped == 1
+        engine.on_sample(cfg, 2.0)
+        assert asyncio.run(engine.flush()) == 1 and calls[-1] == [2.0]
+
+    @pytest.mark.parametrize("value", [1e9, float("nan"), float("inf"), True, "x"])
+    def test_unstorable_last_value_written_as_null(self, value):
+        batches = []
+        engine = opcua_ingest.OpcuaEngine(
+            writer=lambda r, s: batches.append(s) or (0, len(r)), config_loader=list)
+        engine.on_sample(_cfg(1, "opc.tcp://a:4840", "ns=2;i=1"), value)
+        asyncio.run(engine.flush())
+        assert batches[0][0][3] is None
+
+    def test_heartbeat_rewrites_all_node_states(self):
+        batches = []
+        engine = opcua_ingest.OpcuaEngine(
+            writer=lambda r, s: batches.append(s) or (len(r), 0), config_loader=list)
+        engine.on_sample(_cfg(1, "opc.tcp://a:4840", "ns=2;i=1"), 5.0)
+        asyncio.run(engine.flush())
+        assert asyncio.run(engine.flush()) == 0 and len(batches) == 1
+        engine.heartbeat()
+        asyncio.run(engine.flush())
+        assert batches[-1] == [(1, "CONNECTED", batches[0][0][2], 5.0, None)]
+
+
+def _free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+@pytest.mark.skipif(not opcua_ingest.HAS_ASYNCUA, reason="asyncua 미설치")
+def test_local_opcua_server_round_trip():
+    from asyncua import Server
+
+    url = f"opc.tcp://127.0.0.1:{_free_port()}/mes-test/"
+    batches = []
+
+    async def scenario():
+        server = Server()
+        await server.init()
+        server.set_endpoint(url)
+        idx = await server.register_namespace("urn:mes-test")
+        obj = await server.nodes.objects.add_object(idx, "EQ001")
+        var = await obj.add_variable(idx, "Temp", 0.0)
+        node_id = var.nodeid.to_string()
+        async with server:
+            engine = opcua_ingest.OpcuaEngine(
+                writer=lambda r, s: (batches.append((r, s)), (len(r), 0))[1],
+                config_loader=lambda: [_cfg(1, url, node_id, interval=50)])
+            await engine.reload()
+            for _ in range(100):
+                if engine.state(1).status == "CONNECTED":
+                    break
+                await asyncio.sleep(0.05)
+            for v in (1.5, 2.5, 3.5):
+                await var.write_value(v)
+                await asyncio.sleep(0.2)
+            await engine.flush()
+            await engine.apply_configs([])
+
+    asyncio.run(scenario())
+    values = [r["value"] for readings, _ in batches for r in readings]
+    assert values[-3:] == [1.5, 2.5, 3.5]
+    assert batches[-1][1][0][1:2] == ("CONNECTED",)
@@ -0,0 +1,93 @@
+"""키셋(cursor) 페이지네이션 테스트 (DB 없이 커서 응답을 흉내)."""
+
+import asyncio
+from datetime import datetime
+
+import pytest
+
+from api_modules import mes_audit, pagination
+from conftest import FakeConn, FakeCursor
+
+
+def _audit_row(audit_id, ts):
+    return (audit_id, "admin", "UPDATE", "items", "ITM-00001",
+            None, None, None, None, None, "h", ts)
+
+
+class TestCursorHelpers:
+
+    def test_cursor_round_trip(self):
+        ts = datetime(2026, 10, 18, 9, 30, 0, 123456)
+        token = pagination.encode_cursor((ts, 42))
+        assert "=" not in token
+        assert pagination.decode_cursor(token, 2) == [str(ts), 42]
+
+    @pytest.mark.parametrize("token", ["!!!", pagination.encode_cursor((1,))])
+    def test_invalid_cursor(self, token):
+        with pytest.raises(ValueError):
+            pagination.decode_cursor(token, 2)
+
+    def test_keyset_condition_direction(self):
+        cond, params = pagination.keyset_condition(("created_at", "id"), ["t", 1], desc=True)
+        assert cond == "(created_at, id) < (%s, %s)"
+        assert params == ["t", 1]
+        assert pagination.keyset_condition(("id",), [1])[0] == "(id) > (%s)"
+
+    def test_count_modes(self):
+        cur = FakeCursor(one=([{"Plan": {"Plan Rows": 1234}}],))
+        assert pagination.count_rows(cur, "audit_trail", (), "estimate") == 1234
+        assert cur.executed[0][0].startswith("EXPLAIN (FORMAT JSON)")
+        assert pagination.count_rows(FakeCursor(), "audit_trail", (), "none") is None
+
+    def test_split_page(self):
+        rows, nxt = pagination.split_page([(1,), (2,), (3,)], 2, lambda r: r)
+        assert rows == [(1,), (2,)]
+        assert pagination.decode_cursor(nxt, 1) == [2]
+        assert pagination.split_page([(1,)], 2, lambda r: r) == ([(1,)], None)
+
+
+class TestAuditKeyset:
+
+    @pytest.fixture
+    def audit_cursor(self, monkeypatch):
+        ts = datetime(2026, 10, 18, 9, 0)
+        cur = FakeCursor(rows=[_audit_row(i, ts) for i in (9, 8, 7)])
+        monkeypatch.setattr(mes_audit, "get_conn", lambda readonly=False: FakeConn(cur))
+        monkeypatch.setattr(mes_audit, "release_conn", lambda conn: None)
+        return cur
+
+    def test_cursor_mode_skips_count_and_offset(self, audit_cursor):
+        token = pagination.encode_cursor(("2026-10-18 10:00:00", 10))
+        res = asyncio.run(mes_audit.get_audit_logs(page_size=2, cursor=token))
+        assert len(audit_cursor.executed) == 1
+        sql, params = audit_cursor.executed[0]
+        assert "(COALESCE(created_at, '-infinity'::timestamp), audit_id) < (%s, %s)" in sql
+        assert "ORDER BY COALESCE(created_at, '-infinity'::timestamp) DESC" in sql
+        assert "OFFSET" not in sql
+        assert params == ("2026-10-18 10:00:00", 10, 3)
+        assert [i["audit_id"] for i in res["items"]] == [9, 8]
+        assert pagination.decode_cursor(res["next_cursor"], 2)[1] == 8
+        assert res["total"] is None and "page" not in res
+
+    def test_null_created_at_cursor_keeps_paging(self, audit_cursor):
+        audit_cursor.rows = [_audit_row(i, None) for i in (5, 4, 3)]
+        token = pagination.encode_cursor(("2026-10-18 10:00:00", 10))
+        res = asyncio.run(mes_audit.get_audit_logs(page_size=2, cursor=token))
+        after = pagination.decode_cursor(res["next_cursor"], 2)
+        assert after == ["-infinity", 4]
+        assert [i["created_at"] for i in res["items"]] == [None, None]
+
+        asyncio.run(mes_audit.get_audit_logs(page_size=2, cursor=res["next_cursor"]))
+        assert audit_cursor.executed[-1][1] == ("-infinity", 4, 3)
+
+    def test_page_mode_keeps_exact_total(self, audit_cursor):
+        audit_cursor.one = (5,)
+        res = asyncio.run(mes_audit.get_audit_logs(page=2, page_size=2))
+        assert audit_cursor.executed[0][0].startswith("SELECT COUNT(*)")
+        assert audit_cursor.executed[1][1] == (3, 2)
+        assert res["total"] == 5 and res["total_pages"] == 3 and res["page"] == 2
+
+    def test_bad_cursor_returns_error(self, audit_cursor):
+        res = asyncio.run(mes_audit.get_audit_logs(cursor="not-a-cursor"))
+        assert "error" in res
+        assert audit_cursor.executed == []
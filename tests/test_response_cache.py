@@ -0,0 +1,62 @@
+"""라우트 응답 캐시 / ETag 테스트 (메모리 캐시 모드, DB 없음)."""
+
+import pytest
+from fastapi import APIRouter, Depends, FastAPI, Request
+from fastapi.testclient import TestClient
+
+from api_modules import cache
+from api_modules.response_cache import cached_response
+
+
+def _user():
+    return {"user_id": "tester"}
+
+
+@pytest.fixture
+def app_client(monkeypatch):
+    monkeypatch.setattr(cache, "_redis", False)
+    monkeypatch.setattr(cache, "_memory_cache", cache.LRUCache())
+    calls = []
+    router = APIRouter()
+
+    @router.get("/things")
+    @cached_response("things", ttl=60)
+    async def list_things(kind: str = None, request: Request = None, user=Depends(_user)):
+        calls.append(kind)
+        if kind == "bad":
+            return {"error": "nope"}
+        return {"things": [kind, "한글"], "n": len(calls)}
+
+    app = FastAPI()
+    app.include_router(router)
+    return TestClient(app), calls
+
+
+class TestCachedResponse:
+
+    def test_hit_reuses_body_and_etag(self, app_client):
+        client, calls = app_client
+        r1 = client.get("/things?kind=a")
+        r2 = client.get("/things?kind=a")
+        assert r1.status_code == r2.status_code == 200
+        assert r1.json() == {"things": ["a", "한글"], "n": 1} and r2.content == r1.content
+        assert r1.headers["etag"] == r2.headers["etag"] and calls == ["a"]
+        client.get("/things?kind=b")
+        assert calls == ["a", "b"]
+
+    def test_if_none_match_returns_304(self, app_client):
+        client, calls = app_client
+        etag = client.get("/things").headers["etag"]
+        r = client.get("/things", headers={"If-None-Match": f'"x", {etag}'})
+        assert r.status_code == 304 and r.content == b"" and r.headers["etag"] == etag
+        assert client.get("/things", headers={"If-None-Match": '"stale"'}).status_code == 200
+
+    def test_domain_invalidation_and_errors_not_cached(self, app_client):
+        client, calls = app_client
+        etag = client.get("/things").headers["etag"]
+        cache.cache_delete("things:*")  # 쓰기 함수의 무효화
+        r = client.get("/things", headers={"If-None-Match": etag})
+        assert r.status_code == 200 and r.json()["n"] == 2
+        client.get("/things?kind=bad")
+        client.get("/things?kind=bad")
+        assert calls.count("bad") == 2
@@ -0,0 +1,97 @@
+"""센서 대량 수집 테스트 (DB 없이 COPY 버퍼를 확인)."""
+
+import csv
+from datetime import datetime
+
+from api_modules import sensor_ingest
+from conftest import FakeConn, FakeCursor
+
+
+class _CopyCursor(FakeCursor):
+    def __init__(self):
+        super().__init__(one=(datetime(2026, 10, 18, 12, 0),))
+        self.copied = []
+
+    def copy_expert(self, sql, buf):
+        self.sql = sql
+        self.copied = list(csv.reader(buf))
+
+
+def _reading(**kw):
+    base = {"equip_code": "EQ-001", "sensor_type": "temp", "value": 21.5}
+    base.update(kw)
+    return base
+
+
+class TestSensorIngest:
+
+    def test_validation_rejects_with_reasons(self):
+        rows, rejected = sensor_ingest.validate_readings([
+            _reading(),
+            _reading(value="abc"),
+            "not-a-dict",
+            _reading(equip_code=""),
+            _reading(value=float("inf")),
+            _reading(collected_at="yesterday"),
+            _reading(source="modbus"),
+            _reading(value="3.25", collected_at="2026-10-18T09:00:00"),
+        ])
+        assert [r[2] for r in rows] == [21.5, 3.25]
+        assert dict(rejected) == {
+            1: "invalid value", 2: "not an object", 3: "invalid equip_code",
+            4: "invalid value", 5: "invalid collected_at", 6: "invalid source",
+        }
+
+    def test_bool_and_null_values_rejected(self):
+        rows, rejected = sensor_ingest.validate_readings([
+            _reading(value=True), _reading(value=None), _reading(value=0),
+        ])
+        assert [r[2] for r in rows] == [0.0]
+        assert dict(rejected) == {0: "invalid value", 1: "missing value"}
+        rows, rejected = sensor_ingest.validate_readings([_reading(value=False),
+                                                          _reading(value="x")])
+        assert rows == [] and dict(rejected) == {0: "invalid value", 1: "invalid value"}
+
+    def test_list_values_and_out_of_range_timestamps_rejected_per_row(self):
+        rows, rejected = sensor_ingest.validate_readings(
+            [_reading(value=[1]), _reading(value=[2])])
+        assert rows == [] and dict(rejected) == {0: "invalid value", 1: "invalid value"}
+
+        rows, rejected = sensor_ingest.validate_readings([
+            _reading(collected_at="0001-01-01T00:00:00+01:00"), _reading(value=[3, 4]),
+            _reading(value=[5, 6]), _reading(),
+        ])
+        assert [r[2] for r in rows] == [21.5]
+        assert dict(rejected) == {0: "invalid collected_at", 1: "invalid value",
+                                  2: "invalid value"}
+
+    def test_parse_ndjson_keeps_bad_lines_as_rejects(self):
+        body = b'{"equip_code":"EQ-001","sensor_type":"t","value":1}\n\n{broken\n'
+        readings = sensor_ingest.parse_ndjson(body)
+        assert len(readings) == 2 and readings[1] is None
+
+    def test_copy_fills_missing_timestamp_from_db(self):
+        cur = _CopyCursor()
+        rows, _ = sensor_ingest.validate_readings(
+            [_reading(), _reading(collected_at="2026-10-18T09:00:00")], "MQTT")
+        assert sensor_ingest.copy_rows(cur, rows) == 2
+        assert cur.executed == [("SELECT LOCALTIMESTAMP", None)]
+        assert cur.sql.startswith("COPY sensor_data")
+        assert cur.copied == [
+            ["EQ-001", "temp", "21.5", "2026-10-18T12:00:00", "MQTT"],
+            ["EQ-001", "temp", "21.5", "2026-10-18T09:00:00", "MQTT"],
+        ]
+
+    def test_ingest_single_transaction_and_counts(self, monkeypatch):
+        conn = FakeConn(_CopyCursor())
+        monkeypatch.setattr(sensor_ingest, "get_conn", lambda: conn)
+        monkeypatch.setattr(sensor_ingest, "release_conn", lambda c: None)
+        readings = [_reading(value=i) for i in range(1000)] + [_reading(value=None)]
+        res = sensor_ingest.ingest_readings(readings)
+        assert (res["accepted"], res["rejected"]) == (1000, 1)
+        assert res["errors"] == [{"index": 1000, "error": "missing value"}]
+        assert conn.commits == 1 and len(conn.cur.copied) == 1000
+
+    def test_batch_limit(self, monkeypatch):
+        monkeypatch.setattr(sensor_ingest, "MAX_BATCH_ROWS", 2)
+        assert "error" in sensor_ingest.ingest_readings([_reading()] * 3)
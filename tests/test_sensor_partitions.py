@@ -0,0 +1,78 @@
+"""센서 파티션 유지보수 테스트 (DB 없이 카탈로그 조회 결과를 흉내)."""
+
+from datetime import date, datetime
+
+from api_modules import sensor_partitions
+
+
+class _CatalogCursor:
+    """pg_inherits 조회에는 bounds 를, EXISTS 조회에는 default_has_rows 를 반환."""
+
+    def __init__(self, bounds, default_has_rows=False):
+        self.bounds = bounds
+        self.default_has_rows = default_has_rows
+        self.executed = []
+
+    def execute(self, query, params=None):
+        text = query if isinstance(query, str) else repr(query)
+        self.executed.append((text, params))
+
+    def fetchall(self):
+        return self.bounds
+
+    def fetchone(self):
+        return (self.default_has_rows,)
+
+    def ddl(self, keyword):
+        return [q for q, _ in self.executed if keyword in q]
+
+
+def _bound(lo, hi):
+    return f"FOR VALUES FROM ('{lo} 00:00:00') TO ('{hi} 00:00:00')"
+
+
+LEGACY = ("sensor_data_legacy", "FOR VALUES FROM (MINVALUE) TO ('2026-10-18 00:00:00')")
+DEFAULT = ("sensor_data_default", "DEFAULT")
+
+
+class TestSensorPartitions:
+
+    def test_list_partitions_parses_bounds(self):
+        cur = _CatalogCursor([DEFAULT, ("sensor_data_p20261018", _bound("2026-10-18", "2026-10-19")), LEGACY])
+        parts = sensor_partitions.list_partitions(cur, "sensor_data")
+        assert [p["name"] for p in parts] == [
+            "sensor_data_legacy", "sensor_data_p20261018", "sensor_data_default"]
+        assert parts[0]["lower"] is None
+        assert parts[1]["upper"] == datetime(2026, 10, 19)
+        assert parts[2]["default"]
+
+    def test_ensure_skips_existing_and_creates_missing(self):
+        cur = _CatalogCursor([LEGACY, ("sensor_data_p20261018", _bound("2026-10-18", "2026-10-19"))])
+        created = sensor_partitions.ensure_partitions(cur, "sensor_data", date(2026, 10, 17), 3)
+        assert created == ["sensor_data_p20261019"]
+        assert len(cur.ddl("PARTITION OF")) == 1
+
+    def test_ensure_moves_rows_out_of_default(self):
+        cur = _CatalogCursor([DEFAULT], default_has_rows=True)
+        created = sensor_partitions.ensure_partitions(cur, "sensor_data", date(2026, 10, 18), 1)
+        assert created == ["sensor_data_p20261018"]
+        assert cur.ddl("DELETE FROM") and cur.ddl("ATTACH PARTITION")
+        assert not cur.ddl("PARTITION OF")
+
+    def test_retention_drops_expired_partitions_only(self):
+        cur = _CatalogCursor([
+            LEGACY, DEFAULT,
+            ("sensor_data_p20261018", _bound("2026-10-18", "2026-10-19")),
+        ])
+        removed = sensor_partitions.apply_retention(cur, "sensor_data", datetime(2026, 10, 18))
+        assert removed == ["sensor_data_legacy"]
+        assert len(cur.ddl("DROP TABLE")) == 1
+        assert cur.ddl("DELETE FROM")  # default 파티션의 만료 행
+
+    def test_retention_archive_detaches(self):
+        cur = _CatalogCursor([LEGACY])
+        removed = sensor_partitions.apply_retention(
+            cur, "sensor_data", datetime(2026, 10, 18), archive_schema="sensor_archive")
+        assert removed == ["sensor_data_legacy"]
+        assert cur.ddl("DETACH PARTITION") and cur.ddl("SET SCHEMA")
+        assert not cur.ddl("DROP TABLE")
@@ -0,0 +1,71 @@
+"""센서 롤업 조회 테스트 (DB 없이 롤업 행을 흉내)."""
+
+import asyncio
+import statistics
+from datetime import datetime
+from decimal import Decimal
+
+from api_modules import mes_datacollect, sensor_rollups
+from conftest import FakeConn, FakeCursor
+
+
+def _bucket(values):
+    return (len(values), float(sum(values)), float(sum(v * v for v in values)),
+            Decimal(str(min(values))), Decimal(str(max(values))))
+
+
+class TestSensorRollups:
+
+    def test_merge_stats_matches_raw_population_stats(self):
+        a, b = [1.0, 2.0, 3.0], [10.0, 4.0]
+        stats = sensor_rollups.merge_stats([_bucket(a), _bucket(b)])
+        raw = a + b
+        assert stats["count"] == 5
+        assert stats["avg"] == round(statistics.fmean(raw), 4)
+        assert stats["std"] == round(statistics.pstdev(raw), 4)
+        assert (stats["min"], stats["max"]) == (1.0, 10.0)
+
+    def test_pick_grain_by_window(self):
+        assert sensor_rollups.pick_grain(30) == "1min"
+        assert sensor_rollups.pick_grain(6 * 60) == "5min"
+        assert sensor_rollups.pick_grain(7 * 24 * 60) == "1h"
+        assert sensor_rollups.pick_grain(30 * 24 * 60) == "1d"
+
+    def test_prune_skips_unbounded_grain(self):
+        cur = FakeCursor([])
+        removed = sensor_rollups.prune_rollups(cur, now=datetime(2026, 10, 18))
+        assert "1d" not in removed
+        assert all(p[0] != "1d" for _, p in cur.executed)
+
+    def test_realtime_reads_rollups(self, monkeypatch):
+        t0, t1 = datetime(2026, 10, 18, 9, 0), datetime(2026, 10, 18, 9, 5)
+        cur = FakeCursor([("temp", t0) + _bucket([20.0, 22.0]),
+                          ("temp", t1) + _bucket([24.0])],
+                         one=(datetime(2026, 10, 18, 9, 4),))
+        monkeypatch.setattr(mes_datacollect, "get_conn", lambda: FakeConn(cur))
+        monkeypatch.setattr(mes_datacollect, "release_conn", lambda conn: None)
+
+        res = asyncio.run(mes_datacollect.get_realtime_sensor("EQ-001", minutes=60, interval="5min"))
+        sql, params = cur.executed[0]
+        assert "FROM sensor_rollups" in sql and "GROUP BY" not in sql
+        assert params == ("EQ-001", "5min", 60, 300)
+        temp = res["sensors"][0]
+        assert [p["value"] for p in temp["data"]] == [21.0, 24.0]
+        assert temp["stats"]["count"] == 3 and temp["stats"]["avg"] == 22.0
+
+    def test_partial_first_bucket_included(self, monkeypatch):
+        # 1d 버킷은 60분 구간보다 넓다 — 버킷 시작이 아니라 끝으로 겹침을 판단해야 한다
+        cur = FakeCursor([])
+        monkeypatch.setattr(mes_datacollect, "get_conn", lambda: FakeConn(cur))
+        monkeypatch.setattr(mes_datacollect, "release_conn", lambda conn: None)
+
+        asyncio.run(mes_datacollect.get_realtime_sensor("EQ-001", minutes=60, interval="1d"))
+        sql, params = cur.executed[0]
+        assert " ".join(sql.split()).endswith(
+            "bucket_start > NOW() - %s * INTERVAL '1 minute' - %s * INTERVAL '1 second' "
+            "ORDER BY bucket_start")
+        assert params == ("EQ-001", "1d", 60, 86400)
+
+    def test_unknown_interval_rejected(self):
+        res = asyncio.run(mes_datacollect.get_realtime_sensor("EQ-001", interval="2min"))
+        assert "error" in res
@@ -0,0 +1,130 @@
+"""SPC 벡터화 엔진 테스트 — 단순 루프 기준 구현과 비교."""
+
+import time
+
+import numpy as np
+import pytest
+
+from api_modules import mes_spc, spc_engine
+
+
+def _reference_rules(x, cl, sigma):
+    """Nelson 규칙의 점별 루프 구현 (기준값)."""
+    n = len(x)
+    hits = np.zeros((8, n), dtype=bool)
+    for i in range(n):
+        def win(k):
+            return x[i - k + 1:i + 1] if i >= k - 1 else None
+        hits[0, i] = abs(x[i] - cl) > 3 * sigma
+        w = win(3)
+        if w is not None:
+            hits[1, i] = sum(w > cl + 2 * sigma) >= 2 or sum(w < cl - 2 * sigma) >= 2
+        w = win(5)
+        if w is not None:
+            hits[2, i] = sum(w > cl + sigma) >= 4 or sum(w < cl - sigma) >= 4
+        w = win(8)
+        if w is not None:
+            hits[3, i] = all(w > cl) or all(w < cl)
+            out = (w > cl + sigma) | (w < cl - sigma)
+            hits[7, i] = all(out) and any(w > cl) and any(w < cl)
+        w = win(6)
+        if w is not None:
+            d = np.diff(w)
+            hits[4, i] = all(d > 0) or all(d < 0)
+        w = win(14)
+        if w is not None:
+            d = np.diff(w)
+            hits[5, i] = all(d[1:] * d[:-1] < 0)
+        w = win(15)
+        if w is not None:
+            hits[6, i] = all(abs(w - cl) <= sigma)
+    return hits
+
+
+def _old_xbar_r(measurements, n):
+    """기존 mes_spc._calculate_chart 의 X-bar/R 계산 (dict 기반)."""
+    groups = [measurements[i:i + n] for i in range(0, len(measurements) - n + 1, n)]
+    means = [sum(g) / len(g) for g in groups]
+    ranges = [max(g) - min(g) for g in groups]
+    x_bar, r_bar = sum(means) / len(means), sum(ranges) / len(ranges)
+    a2 = spc_engine.A2[n]
+    return means, ranges, x_bar, r_bar, x_bar + a2 * r_bar, x_bar - a2 * r_bar
+
+
+class TestSpcEngine:
+
+    @pytest.mark.parametrize("seed", [0, 1, 2])
+    def test_rules_match_reference(self, seed):
+        rng = np.random.default_rng(seed)
+        # 드리프트 + 교대 + 이상점이 섞인 시계열
+        x = rng.normal(0, 1, 400)
+        x[50:60] += 2.5
+        x[100:116] = np.where(np.arange(16) % 2, 0.5, -0.5)
+        x[200:207] = np.arange(7) * 0.8
+        x[300] = 5
+        x[350:358] = np.where(np.arange(8) % 3, 1.5, -1.5)
+        got = spc_engine.evaluate_rules(x, 0.0, 1.0)
+        np.testing.assert_array_equal(got, _reference_rules(x, 0.0, 1.0))
+        assert got.any(axis=1).all()  # 8 규칙 모두 한 번 이상 발생
+
+    def test_xbar_r_same_as_previous_api(self):
+        rng = np.random.default_rng(7)
+        data = list(rng.normal(10, 0.2, 503))
+        chart = mes_spc._calculate_chart("ITEM", "두께", data, 5)
+        means, ranges, x_bar, r_bar, ucl, lcl = _old_xbar_r(data, 5)
+
+        assert chart["subgroup_count"] == 100
+        assert chart["x_bar_chart"]["cl"] == round(x_bar, 4)
+        assert chart["x_bar_chart"]["ucl"] == round(ucl, 4)
+        assert chart["r_chart"]["ucl"] == round(spc_engine.D4[5] * r_bar, 4)
+        assert [d["mean"] for d in chart["x_bar_chart"]["data"]] == [round(m, 4) for m in means]
+        assert [d["range"] for d in chart["r_chart"]["data"]] == [round(r, 4) for r in ranges]
+        # 규칙 1 은 기존과 동일
+        beyond = [i + 1 for i, m in enumerate(means) if m > ucl or m < lcl]
+        assert [v["subgroup"] for v in chart["violations"]
+                if v["rule"] == "RULE_1_BEYOND_3SIGMA"] == beyond
+
+    def test_custom_limits_only_change_display(self):
+        data = [10.0, 10.1, 9.9, 10.0, 10.2] * 4 + [12.0] * 5
+        base = mes_spc._calculate_chart("ITEM", "c", data, 5)
+        custom = mes_spc._calculate_chart("ITEM", "c", data, 5, 20.0, 0.0, 10.0)
+        assert custom["x_bar_chart"]["ucl"] == 20.0
+        assert custom["violations"] == base["violations"]
+        assert base["violations"][0]["rule"] == "RULE_1_BEYOND_3SIGMA"
+
+    def test_xbar_s_and_imr_constants(self):
+        a3, b3, b4 = spc_engine.s_chart_factors(5)
+        assert round(spc_engine.c4(5), 4) == 0.9400
+        assert (round(a3, 3), b3, round(b4, 3)) == (1.427, 0.0, 2.089)
+
+        chart = spc_engine.calculate("XBAR_S", np.arange(20.0), 5)
+        assert chart["s_chart"]["cl"] == round(np.arange(5.0).std(ddof=1), 4)
+        imr = spc_engine.calculate("I_MR", [1.0, 2.0, 1.0, 2.0], 1)
+        assert imr["mr_chart"]["cl"] == 1.0
+        assert imr["i_chart"]["ucl"] == round(1.5 + 3 / 1.128, 4)
+
+    def test_attribute_charts(self):
+        fails = np.zeros(200)
+        fails[::10] = 1          # 서브그룹(20개)마다 불량 2개
+        fails[180:200] = 1       # 마지막 서브그룹 전수 불량
+        p = spc_engine.calculate("P", fails, 20)
+        assert p["p_chart"]["cl"] == round(38 / 200, 4)
+        assert {"subgroup": 10, "rule": "RULE_1_BEYOND_3SIGMA", "nelson": 1,
+                "value": 1.0, "severity": "CRITICAL"} in p["violations"]
+        assert spc_engine.calculate("NP", fails, 20)["np_chart"]["cl"] == 3.8
+        assert spc_engine.calculate("C", fails, 20)["c_chart"]["cl"] == 3.8
+        assert spc_engine.calculate("U", fails, 20)["u_chart"]["cl"] == round(38 / 200, 4)
+
+    def test_rules_scale_linearly(self):
+        # 절대 시간 대신 n → 10n 증가율로 확인 (선형 ≈ 10배, 점별 창 재계산 같은 O(n²) 는 ≈ 100배)
+        def best_of(n, repeat=5):
+            x = np.random.default_rng(3).normal(0, 1, n)
+            spc_engine.evaluate_rules(x, 0.0, 1.0)
+            times = []
+            for _ in range(repeat):
+                started = time.perf_counter()
+                spc_engine.evaluate_rules(x, 0.0, 1.0)
+                times.append(time.perf_counter() - started)
+            return min(times)
+
+        assert best_of(100_000) < 50 * best_of(10_000)
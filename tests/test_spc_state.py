@@ -0,0 +1,258 @@
+"""SPC 증분 상태 테스트 — 검사 단위 갱신이 전체 재계산과 같은지 확인."""
+
+import asyncio
+import json
+
+import numpy as np
+import pytest
+
+from api_modules import mes_quality, mes_spc, spc_engine
+
+
+def _feed(chart_type, n, values):
+    state = mes_spc._new_state(1, chart_type, n)
+    closed = [p for p in (mes_spc._advance(state, v) for v in values) if p]
+    return state, closed
+
+
+def _series(seed=5, size=423):
+    x = np.random.default_rng(seed).normal(10, 0.3, size)
+    x[300:340] += 0.6   # 평균 이동 → 규칙 2/3/4
+    x[380] += 3         # 이상점 → 규칙 1
+    return x.tolist()
+
+
+class FakeCursor:
+    """SQL 내용으로 응답을 고르는 AsyncCursor 대역."""
+
+    def __init__(self, rules=(), states=(), history=(), points=(), stats=(), standards=()):
+        self.rules, self.states, self.history = list(rules), list(states), list(history)
+        self.points, self.stats, self.standards = list(points), list(stats), list(standards)
+        self.executed = []
+        self._last = ""
+        self._stream = []
+
+    async def execute(self, sql, params=None):
+        self._last = " ".join(sql.split())
+        self.executed.append((self._last, params))
+        if "FROM inspection_details" in self._last or "JOIN inspection_details" in self._last:
+            self._stream = list(self.history)
+        elif "FROM spc_points" in self._last:
+            self._stream = list(self.points)
+
+    async def fetchall(self):
+        if "FROM spc_rules" in self._last:
+            return self.rules
+        if "FROM spc_state" in self._last:
+            return self.states
+        if "FROM quality_standards" in self._last:
+            return self.standards
+        if "STDDEV_SAMP" in self._last:
+            return self.stats
+        return []
+
+    async def fetchmany(self, size=None):
+        rows, self._stream = self._stream[:size], self._stream[size:]
+        return rows
+
+    def close(self):
+        pass
+
+    def sql(self, prefix):
+        return [p for s, p in self.executed if s.startswith(prefix)]
+
+
+class FakeConn:
+
+    def __init__(self, cursor):
+        self._cursor = cursor
+        self.commits = 0
+
+    def cursor(self):
+        return self._cursor
+
+    async def commit(self):
+        self.commits += 1
+
+    async def rollback(self):
+        pass
+
+
+def _use(monkeypatch, cursor):
+    conn = FakeConn(cursor)
+
+    async def get_conn_async(readonly=False):
+        return conn
+
+    async def release_conn_async(c):
+        pass
+
+    monkeypatch.setattr(mes_spc, "get_conn_async", get_conn_async)
+    monkeypatch.setattr(mes_spc, "release_conn_async", release_conn_async)
+    return conn
+
+
+class TestSpcState:
+
+    @pytest.mark.parametrize("chart_type,n", [("XBAR_R", 5), ("XBAR_S", 4), ("I_MR", 1)])
+    def test_incremental_matches_full_recompute(self, monkeypatch, chart_type, n):
+        monkeypatch.setattr(mes_spc, "SPC_MIN_SUBGROUPS", 1)
+        values = _series()
+        state, closed = _feed(chart_type, n, values)
+        rebuilt, x, spread = mes_spc._state_from_history(1, chart_type, n, values)
+
+        assert state["count"] == rebuilt["count"] == len(x) == len(closed)
+        assert state["buffer"] == rebuilt["buffer"]
+        assert state["sum_x"] == pytest.approx(rebuilt["sum_x"])
+        assert state["sum_r"] == pytest.approx(rebuilt["sum_r"])
+        np.testing.assert_allclose(state["recent"], rebuilt["recent"])
+        np.testing.assert_allclose([p["value"] for p in closed], x)
+
+        full = spc_engine.calculate(chart_type, values, n)
+        limits = mes_spc._state_limits(state)
+        stored = spc_engine.chart(chart_type, n, [p["value"] for p in closed],
+                                  [np.nan if p["spread"] is None else p["spread"] for p in closed],
+                                  limits)
+        assert stored == full
+
+    def test_insert_time_violations_use_running_limits(self, monkeypatch):
+        monkeypatch.setattr(mes_spc, "SPC_MIN_SUBGROUPS", 20)
+        values = _series()
+        _, closed = _feed("XBAR_R", 5, values)
+        x, spread = spc_engine.points("XBAR_R", values, 5)
+
+        for p in closed:
+            k = p["no"]
+            if k < 20:
+                assert p["violations"] == []
+                continue
+            limits = spc_engine.limits_of("XBAR_R", 5, x[:k], spread[:k])
+            expected = [v for v in spc_engine.violations(
+                x[:k], limits["cl"], limits["sigma"], limits["ucl"], limits["lcl"])
+                if v["subgroup"] == k]
+            assert p["violations"] == expected
+        assert any(p["violations"] for p in closed)
+
+    def test_attribute_state(self, monkeypatch):
+        monkeypatch.setattr(mes_spc, "SPC_MIN_SUBGROUPS", 1)
+        fails = [0.0] * 200
+        fails[::10] = [1.0] * 20
+        fails[180:200] = [1.0] * 20
+        state, closed = _feed("P", 20, fails)
+        assert state["count"] == 10 and state["buffer"] == []
+        assert mes_spc._sample("P", None, "FAIL") == 1.0
+        assert mes_spc._sample("XBAR_R", "abc", "PASS") is None
+        assert closed[-1]["violations"][0]["rule"] == "RULE_1_BEYOND_3SIGMA"
+
+    def test_chart_window_keeps_history_numbering(self):
+        values = _series()
+        x, spread = spc_engine.points("XBAR_R", values, 5)
+        limits = spc_engine.limits_of("XBAR_R", 5, x, spread)
+        window = spc_engine.chart("XBAR_R", 5, x[-30:], spread[-30:], limits, len(x) - 29)
+        full = spc_engine.calculate("XBAR_R", values, 5)
+
+        assert window["subgroup_count"] == len(x)
+        assert window["x_bar_chart"]["data"] == full["x_bar_chart"]["data"][-30:]
+        assert window["x_bar_chart"]["ucl"] == full["x_bar_chart"]["ucl"]
+        # 구간 앞쪽은 윈도우가 짧아 연속 규칙이 덜 잡힐 수 있으므로 15점 이후만 비교
+        tail = len(x) - 29 + spc_engine.RULE_WINDOW
+        assert [v for v in window["violations"] if v["subgroup"] >= tail] == \
+            [v for v in full["violations"] if v["subgroup"] >= tail]
+        assert any(v["subgroup"] >= tail for v in window["violations"])
+
+    def test_update_spc_state_records_violation(self, monkeypatch):
+        monkeypatch.setattr(mes_spc, "SPC_MIN_SUBGROUPS", 20)
+        recent = [10.0, 10.1, 9.9, 10.0, 10.1] * 3
+        row = (7, "I_MR", 1, 30, 300.0, 3.0, [], recent)   # x̄=10, MR̄≈0.103
+        cur = FakeCursor([(7, "두께", "I_MR", 1)], states=[row])
+
+        found = asyncio.run(mes_spc.update_spc_state(
+            cur, "ITEM", 99, [("두께", "12.5", "PASS"), ("외관", "OK", "PASS")]))
+
+        assert [v["rule"] for v in found] == ["RULE_1_BEYOND_3SIGMA"]
+        assert found[0]["check_name"] == "두께" and found[0]["subgroup"] == 31
+        assert cur.sql("INSERT INTO spc_points") == [(7, 31, 12.5, pytest.approx(2.4), 99)]
+        (viol,) = cur.sql("INSERT INTO spc_violations")
+        assert viol[:3] == (7, 99, "RULE_1_BEYOND_3SIGMA") and viol[-1] == "CRITICAL"
+        saved = cur.sql("INSERT INTO spc_state")[0]
+        assert saved[3] == 31 and json.loads(saved[7])[-1] == 12.5
+
+    def test_missing_state_is_rebuilt_from_history(self):
+        cur = FakeCursor([(7, "두께", "XBAR_R", 5)],
+                         history=[("두께", 10.0, False, 1), ("두께", 10.2, False, 2)])
+        found = asyncio.run(mes_spc.update_spc_state(cur, "ITEM", 2, [("두께", 10.2, "PASS")]))
+
+        assert found == []
+        assert cur.sql("DELETE FROM spc_points") == [(7,)]
+        saved = cur.sql("INSERT INTO spc_state")[0]
+        assert saved[3] == 0 and json.loads(saved[6]) == [10.0, 10.2]
+
+    def test_chart_for_many_rules_in_three_queries(self, monkeypatch):
+        values = _series()
+        x, spread = spc_engine.points("XBAR_R", values, 5)
+        state = mes_spc._state_from_history(0, "XBAR_R", 5, values)[0]
+        rules = [(i, f"c{i}", "XBAR_R", None, None, None, 5) for i in range(1, 21)]
+        states = [(i, "XBAR_R", 5, state["count"], state["sum_x"], state["sum_r"], [], [])
+                  for i in range(1, 21)]
+        points = [(i, k + 1, v, r) for i in range(1, 21)
+                  for k, (v, r) in enumerate(zip(x.tolist(), spread.tolist()))]
+        cur = FakeCursor(rules, states=states, points=points)
+        conn = _use(monkeypatch, cur)
+
+        result = asyncio.run(mes_spc.get_spc_chart("ITEM"))
+
+        assert len(cur.executed) == 3   # 규칙 / 상태 / 최근 점
+        assert conn.commits == 0
+        full = spc_engine.calculate("XBAR_R", values, 5)
+        assert [c["check_name"] for c in result["charts"]] == [f"c{i}" for i in range(1, 21)]
+        assert all({**c, "check_name": None, "item_code": None} ==
+                   {**full, "check_name": None, "item_code": None} for c in result["charts"])
+
+    def test_cpk_in_one_aggregate_query(self, monkeypatch):
+        standards = [(f"c{i}", 9.0, 11.0, 10.0) for i in range(20)]
+        stats = [(f"c{i}", 50, 10.1, 0.2) for i in range(19)]   # c19 은 측정값 없음
+        cur = FakeCursor(standards=standards, stats=stats)
+        _use(monkeypatch, cur)
+
+        result = asyncio.run(mes_spc.get_cpk("ITEM"))["cpk_analysis"]
+
+        assert len(cur.executed) == 2
+        assert result[0]["cpk"] == round((11.0 - 10.1) / 0.6, 4) and result[0]["n"] == 50
+        assert result[-1] == {"check_name": "c19", "message": "데이터 부족"}
+
+    @pytest.mark.parametrize("rule_type,size,ok", [
+        ("XBAR_R", 5, True), ("XBAR_R", 1, False), ("XBAR_R", 11, False),
+        ("XBAR_S", 2, True), ("XBAR_S", 1, False), ("P", 1, True), ("P", 0, False),
+        ("I_MR", 1, True), ("C", "5", False), ("NP", True, False),
+    ])
+    def test_sample_size_validation(self, rule_type, size, ok):
+        assert (mes_spc._sample_size_error(rule_type, size) is None) is ok
+
+    def test_spc_failure_does_not_reject_inspection(self, monkeypatch):
+        class InspectionCursor(FakeCursor):
+            async def fetchone(self):
+                return (41,)
+
+        async def broken(*args):
+            raise ZeroDivisionError("sample_size 0")
+
+        cur = InspectionCursor()
+        conn = FakeConn(cur)
+
+        async def get_conn_async(readonly=False):
+            return conn
+
+        async def release_conn_async(c):
+            pass
+
+        monkeypatch.setattr(mes_quality, "get_conn_async", get_conn_async)
+        monkeypatch.setattr(mes_quality, "release_conn_async", release_conn_async)
+        monkeypatch.setattr(mes_quality, "update_spc_state", broken)
+
+        result = asyncio.run(mes_quality.create_inspection(
+            {"item_code": "ITEM", "results": [{"check_name": "두께", "value": 1.0}]}))
+
+        assert result["inspection_id"] == 41 and result["spc_violations"] == []
+        assert conn.commits == 1
+        assert [s for s, _ in cur.executed if "SAVEPOINT" in s] == \
+            ["SAVEPOINT spc_state", "ROLLBACK TO SAVEPOINT spc_state"]